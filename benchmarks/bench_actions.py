@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+#
+# Copyright 2026 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark output handling of actions running migration tools.
+
+The ``migrate-mtu``, ``migrate-ovn-db`` and ``offline-neutron-morph-db``
+actions of a built charm are run against a fake Juju hook environment with
+the tool each of them executes replaced by a fake child executable.  The
+fake writes a configurable volume of log lines to standard output and
+standard error and optionally fails part way through:
+
+none  The tool succeeds.
+word  The tool logs a line with a word the action looks for to detect
+      failure and carries on, as the tools do not set an error code.
+exit  The tool exits with code 1.
+
+For every action, volume and error pattern the benchmark reports:
+
+wall      Wall time of the action process.
+rss       Peak resident set size of the largest process of the action, in
+          practice the action itself as the fake tool streams its output.
+detect    Seconds from the failure of the tool to the action reporting it
+          with ``action-fail``, ``-`` when the failure went unnoticed.
+
+The actions are run in dry-run mode, which handles the output of the tools
+the same way.  The Neutron DB fingerprint taken by ``migrate-ovn-db`` fails
+fast against the placeholder ``neutron.conf`` written when none exists.
+
+Usage:
+
+    tox -e build
+    sudo python3 benchmarks/bench_actions.py \\
+        build/builds/neutron-api-plugin-ovn --volumes 1,100,500
+
+The fake tools are installed in ``/usr/bin``, an existing tool is never
+replaced.  See ``fakejuju.py`` for the requirements on the host running the
+benchmark.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import sys
+import time
+
+import common
+import fakejuju
+
+UNIT_NAME = 'neutron-api-plugin-ovn/0'
+NEUTRON_CONF = '/etc/neutron/neutron.conf'
+NEUTRON_CONF_PLACEHOLDER = """[DEFAULT]
+core_plugin = ml2
+
+[database]
+connection = sqlite:////nonexistent/neutron.sqlite
+
+[keystone_authtoken]
+auth_url = http://10.5.0.30:5000
+project_domain_name = service_domain
+user_domain_name = service_domain
+project_name = services
+username = neutron
+password = password
+"""
+# Tool executed by each action, paths not starting with a slash are relative
+# to the charm directory, and the action parameters of a dry-run.
+ACTIONS = {
+    'migrate-mtu': {
+        'tool': '/usr/bin/neutron-ovn-migration-mtu',
+        'params': {'i-really-mean-it': False},
+        'fail_line': 'Traceback (most recent call last):\n',
+    },
+    'migrate-ovn-db': {
+        'tool': '/usr/bin/neutron-ovn-db-sync-util',
+        'params': {'i-really-mean-it': False, 'since': '',
+                   'reuse-dry-run': True, 'offline-build': False},
+        'fail_line': ('2026-10-19 10:00:00.000 4242 ERROR '
+                      'neutron.cmd.ovn.neutron_ovn_db_sync_util [-] '
+                      'Error syncing resources\n'),
+    },
+    'offline-neutron-morph-db': {
+        'tool': 'files/scripts/neutron_offline_network_type_update.py',
+        'params': {'i-really-mean-it': False, 'rehearse': False},
+        'fail_line': 'Traceback (most recent call last):\n',
+    },
+}
+ERRORS = ('none', 'word', 'exit')
+LOG_LINE = ('2026-10-19 10:00:00.000 4242 INFO neutron.benchmark [-] '
+            'resource 00000000-0000-0000-0000-000000000000 in sync')
+FAKE_TOOL = """#!{python}
+# Fake migration tool written by benchmarks/bench_actions.py.
+import sys
+import time
+
+SCENARIO = {scenario!r}
+
+
+def main():
+    line = SCENARIO['line'].encode('utf-8')
+    lines = SCENARIO['volume'] // len(line)
+    error_line = int(lines * SCENARIO['error_at'])
+    stderr_every = SCENARIO['stderr_every']
+    stdout, stderr = sys.stdout.buffer, sys.stderr.buffer
+    for n in range(lines):
+        if SCENARIO['error'] != 'none' and n == error_line:
+            stdout.flush()
+            stderr.flush()
+            with open(SCENARIO['marker'], 'w') as fout:
+                fout.write(repr(time.time()))
+            if SCENARIO['error'] == 'exit':
+                return 1
+            stdout.write(SCENARIO['fail_line'].encode('utf-8'))
+        if stderr_every and n % stderr_every == 0:
+            stderr.write(line)
+        else:
+            stdout.write(line)
+    return 0
+
+
+sys.exit(main())
+"""
+
+
+@contextlib.contextmanager
+def placeholder_neutron_conf():
+    """Provide a ``neutron.conf`` for the actions to read credentials from.
+
+    An existing file is left alone, a placeholder is removed on exit.
+    """
+    if os.path.exists(NEUTRON_CONF):
+        yield
+        return
+    created_dir = None
+    if not os.path.isdir(os.path.dirname(NEUTRON_CONF)):
+        created_dir = os.path.dirname(NEUTRON_CONF)
+        os.makedirs(created_dir)
+    with open(NEUTRON_CONF, 'w') as fout:
+        fout.write(NEUTRON_CONF_PLACEHOLDER)
+    try:
+        yield
+    finally:
+        if created_dir:
+            shutil.rmtree(created_dir)
+        else:
+            os.unlink(NEUTRON_CONF)
+
+
+@contextlib.contextmanager
+def fake_tools(charm_dir, action_names):
+    """Make room for fake tools, restoring the original state on exit.
+
+    :param charm_dir: Path to built charm
+    :type charm_dir: str
+    :param action_names: Actions to be benchmarked
+    :type action_names: List[str]
+    :returns: Context manager yielding map of action name to tool path.
+    :rtype: Iterator[Dict[str,str]]
+    :raises: RuntimeError
+    """
+    paths = {
+        action_name: os.path.join(charm_dir, ACTIONS[action_name]['tool'])
+        for action_name in action_names
+    }
+    for path in paths.values():
+        if path.startswith('/usr/bin/') and os.path.exists(path):
+            raise RuntimeError('{} is installed, refusing to replace it'
+                               .format(path))
+    backups = {}
+    try:
+        for path in paths.values():
+            if os.path.exists(path):
+                backups[path] = path + '.bench-orig'
+                os.rename(path, backups[path])
+        yield paths
+    finally:
+        for path in paths.values():
+            if os.path.exists(path):
+                os.unlink(path)
+            if path in backups:
+                os.rename(backups[path], path)
+
+
+def write_fake_tool(path, scenario):
+    """Write fake tool executable for a scenario.
+
+    :param path: Path to tool
+    :type path: str
+    :param scenario: Parameters of the fake tool
+    :type scenario: Dict[str,any]
+    """
+    with open(path, 'w') as fout:
+        fout.write(FAKE_TOOL.format(python=sys.executable,
+                                    scenario=scenario))
+    os.chmod(path, 0o755)
+
+
+def log_line(line_size):
+    """Get log line of given size, including the line feed.
+
+    :param line_size: Size in bytes
+    :type line_size: int
+    :rtype: str
+    """
+    return LOG_LINE[:line_size - 1].ljust(line_size - 1, '.') + '\n'
+
+
+def measure(juju, action_name, tool, scenario, iterations):
+    """Measure an action for a scenario.
+
+    :param juju: Fake Juju environment
+    :type juju: fakejuju.FakeJuju
+    :param action_name: Name of action
+    :type action_name: str
+    :param tool: Path to the tool executed by the action.
+    :type tool: str
+    :param scenario: Parameters of the fake tool
+    :type scenario: Dict[str,any]
+    :param iterations: Number of runs
+    :type iterations: int
+    :returns: Measurements
+    :rtype: Dict[str,any]
+    """
+    write_fake_tool(tool, scenario)
+    walls = []
+    rss = []
+    detects = []
+    failed = 0
+    for _ in range(iterations):
+        if os.path.exists(scenario['marker']):
+            os.unlink(scenario['marker'])
+        wall, rusage = juju.run_action(action_name,
+                                       ACTIONS[action_name]['params'])
+        walls.append(wall)
+        rss.append(rusage.ru_maxrss)
+        state = juju.action_state()
+        if 'failed' in state:
+            failed += 1
+            if os.path.exists(scenario['marker']):
+                with open(scenario['marker']) as fin:
+                    detects.append(state['fail_time'] - float(fin.read()))
+    return {
+        'wall': common.summarize(walls),
+        'rss_kib': max(rss),
+        'detect': common.summarize(detects) if detects else None,
+        'failed': failed,
+    }
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('charm_dir', help='Path to built charm')
+    parser.add_argument('--actions', default=','.join(ACTIONS),
+                        help='Comma separated list of actions')
+    parser.add_argument('--volumes', default='1,100,500',
+                        help='Comma separated list of output volumes in MiB')
+    parser.add_argument('--errors', default=','.join(ERRORS),
+                        help='Comma separated list of error patterns, {}'
+                             .format(', '.join(ERRORS)))
+    parser.add_argument('--error-at', type=float, default=0.1,
+                        help='Fraction of the output written before the '
+                             'tool fails')
+    parser.add_argument('--stderr-share', type=float, default=0.1,
+                        help='Fraction of the lines written to stderr')
+    parser.add_argument('--line-size', type=int, default=200,
+                        help='Size of log lines in bytes')
+    parser.add_argument('--iterations', type=int, default=1)
+    parser.add_argument('--json', action='store_true',
+                        help='Print results as JSON')
+    args = parser.parse_args(argv)
+
+    action_names = args.actions.split(',')
+    errors = args.errors.split(',')
+    for name, known in [(name, ACTIONS) for name in action_names] + [
+            (error, ERRORS) for error in errors]:
+        if name not in known:
+            parser.error('unknown action or error pattern: {}'.format(name))
+    volumes = [int(volume) for volume in args.volumes.split(',')]
+    stderr_every = (
+        max(int(round(1 / args.stderr_share)), 1) if args.stderr_share else 0)
+
+    results = []
+    with fakejuju.FakeJuju(args.charm_dir, unit_name=UNIT_NAME) as juju, \
+            placeholder_neutron_conf(), \
+            fake_tools(juju.charm_dir, action_names) as tools:
+        # Bring the unit to a steady state, the install hook creates the
+        # virtualenv the actions run in.
+        for hook_name in ('install', 'config-changed', 'start'):
+            if os.path.exists(
+                    os.path.join(juju.charm_dir, 'hooks', hook_name)):
+                juju.run_hook(hook_name)
+        marker = os.path.join(juju.tmpdir, 'tool-failed')
+        for action_name in action_names:
+            for volume in volumes:
+                for error in errors:
+                    scenario = {
+                        'volume': volume * 1024 * 1024,
+                        'line': log_line(args.line_size),
+                        'stderr_every': stderr_every,
+                        'error': error,
+                        'error_at': args.error_at,
+                        'fail_line': ACTIONS[action_name]['fail_line'],
+                        'marker': marker,
+                    }
+                    start = time.monotonic()
+                    result = measure(juju, action_name, tools[action_name],
+                                     scenario, args.iterations)
+                    result.update({
+                        'action': action_name,
+                        'volume_mib': volume,
+                        'error': error,
+                    })
+                    results.append(result)
+                    print('{} {} MiB {}: {:.1f}s'.format(
+                        action_name, volume, error,
+                        time.monotonic() - start), file=sys.stderr)
+
+    if args.json:
+        print(json.dumps(results, indent=2, sort_keys=True))
+        return 0
+    rows = []
+    for result in results:
+        rows.append([
+            result['action'],
+            result['volume_mib'],
+            result['error'],
+            result['wall']['n'],
+            result['wall']['p50'],
+            result['wall']['max'],
+            result['rss_kib'] // 1024,
+            result['detect']['p50'] if result['detect'] else '-',
+            result['failed'],
+        ])
+    common.print_table(
+        ('action', 'MiB', 'error', 'n', 'wall p50', 'wall max', 'rss MiB',
+         'detect p50', 'failed'),
+        rows)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
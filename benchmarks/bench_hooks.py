@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+#
+# Copyright 2026 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark end-to-end cost of reactive hook dispatch per hook type.
+
+The hooks of a built charm are dispatched against fake ``neutron-plugin``,
+``ovsdb-cms`` and ``certificates`` endpoints, so the real handlers, layers
+and interfaces run.  For every hook type the benchmark reports:
+
+wall      Wall time of the hook process(es), over ``--iterations`` runs.
+import    Time spent importing modules, from one run with
+          ``PYTHONPROFILEIMPORTTIME`` set.
+peak      Peak memory allocated by Python, from one run with ``tracemalloc``
+          enabled from interpreter start.
+blocks    Number of memory blocks allocated by Python and still live at
+          hook exit, from the same run.
+
+The number of ``ovn-central`` units and the size of the charm configuration
+and of the data published by the principal charm can be scaled to look for
+handlers whose cost grows with the deployment.
+
+Usage:
+
+    tox -e build
+    sudo python3 benchmarks/bench_hooks.py \\
+        build/builds/neutron-api-plugin-ovn --remotes 3 --config-size 50
+
+See ``fakejuju.py`` for the requirements on the host running the benchmark.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import common
+import fakejuju
+
+UNIT_NAME = 'neutron-api-plugin-ovn/0'
+# Hooks dispatched to bring the unit to a steady state before measuring.
+SETUP_HOOKS = (
+    ('install', None, None),
+    ('leader-elected', None, None),
+    ('config-changed', None, None),
+    ('start', None, None),
+    ('neutron-plugin-relation-joined', 'neutron-plugin:1', 'neutron-api/0'),
+    ('neutron-plugin-relation-changed', 'neutron-plugin:1', 'neutron-api/0'),
+    ('certificates-relation-joined', 'certificates:3', 'vault/0'),
+    ('certificates-relation-changed', 'certificates:3', 'vault/0'),
+)
+# Hooks measured, relation hooks are dispatched for the first remote unit.
+MEASURED_HOOKS = (
+    ('config-changed', None),
+    ('update-status', None),
+    ('leader-settings-changed', None),
+    ('neutron-plugin-relation-changed', 'neutron-plugin:1'),
+    ('ovsdb-cms-relation-changed', 'ovsdb-cms:2'),
+    ('certificates-relation-changed', 'certificates:3'),
+)
+SITECUSTOMIZE = """
+import atexit
+import json
+import os
+import tracemalloc
+
+
+def _report():
+    current, peak = tracemalloc.get_traced_memory()
+    blocks = sum(
+        stat.count
+        for stat in tracemalloc.take_snapshot().statistics('filename'))
+    with open(os.environ['BENCH_TRACEMALLOC_OUTPUT'], 'a') as fout:
+        fout.write(json.dumps({
+            'current': current, 'peak': peak, 'blocks': blocks}) + '\\n')
+
+
+if tracemalloc.is_tracing():
+    atexit.register(_report)
+"""
+
+
+def scaled_config(size):
+    """Get charm configuration with list type options of given size.
+
+    :param size: Number of entries in each list type option
+    :type size: int
+    :returns: Charm configuration
+    :rtype: Dict[str,str]
+    """
+    return {
+        'dns-servers': ' '.join(
+            '10.6.{}.{}'.format(n // 250, n % 250 + 1) for n in range(size)),
+        'geneve-vni-ranges': ' '.join(
+            '{}:{}'.format(n * 1000 + 1, n * 1000 + 999)
+            for n in range(size)),
+        'ovn-dhcp4-global-options': ' '.join(
+            'option{}:value{}'.format(n, n) for n in range(size)),
+        'ovn-dhcp6-global-options': ' '.join(
+            'option{}:value{}'.format(n, n) for n in range(size)),
+    }
+
+
+def scaled_neutron_config_data(size):
+    """Get data published by the principal charm of given size.
+
+    :param size: Number of additional service plugins and mechanism drivers
+    :type size: int
+    :returns: Data for the ``neutron_config_data`` relation key
+    :rtype: Dict[str,str]
+    """
+    return {
+        'mechanism_drivers': ','.join(
+            ['openvswitch', 'l2population', 'sriovnicswitch'] +
+            ['driver{}'.format(n) for n in range(size)]),
+        'service_plugins': ','.join(
+            ['router', 'firewall_v2', 'metering', 'segments'] +
+            ['plugin{}'.format(n) for n in range(size)]),
+        'tenant_network_types': 'gre,vxlan,vlan,flat,local',
+    }
+
+
+def parse_importtime(stderr):
+    """Get total time spent importing modules from importtime output.
+
+    :param stderr: Standard error of processes run with
+                   ``PYTHONPROFILEIMPORTTIME`` set.
+    :type stderr: str
+    :returns: Seconds
+    :rtype: float
+    """
+    total = 0
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        try:
+            total += int(fields[0])
+        except ValueError:
+            # header
+            continue
+    return total / 1000000
+
+
+def measure(juju, hook_name, relation_id, iterations, tmpdir):
+    """Measure a hook type.
+
+    :param juju: Fake Juju environment
+    :type juju: fakejuju.FakeJuju
+    :param hook_name: Name of hook
+    :type hook_name: str
+    :param relation_id: Relation ID for relation hooks
+    :type relation_id: Optional[str]
+    :param iterations: Number of runs for wall time measurement
+    :type iterations: int
+    :param tmpdir: Directory holding ``sitecustomize.py``
+    :type tmpdir: str
+    :returns: Measurements
+    :rtype: Dict[str,any]
+    """
+    remote_unit = None
+    if relation_id:
+        remote_unit = sorted(juju.state['relations'][relation_id]['units'])[0]
+    samples = [
+        juju.run_hook(hook_name, relation_id, remote_unit)
+        for _ in range(iterations)
+    ]
+    result = {'wall': common.summarize(samples)}
+    juju.run_hook(hook_name, relation_id, remote_unit,
+                  extra_env={'PYTHONPROFILEIMPORTTIME': '1'})
+    result['import'] = parse_importtime(juju.last_stderr)
+    output = os.path.join(tmpdir, 'tracemalloc.json')
+    juju.run_hook(
+        hook_name, relation_id, remote_unit,
+        extra_env={
+            'PYTHONTRACEMALLOC': '1',
+            'PYTHONPATH': tmpdir,
+            'BENCH_TRACEMALLOC_OUTPUT': output,
+        })
+    with open(output) as fin:
+        # The last line is written by the process that ran the handlers.
+        result['memory'] = json.loads(fin.read().splitlines()[-1])
+    os.unlink(output)
+    return result
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('charm_dir', help='Path to built charm')
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--remotes', type=int, default=3,
+                        help='Number of units on the ovsdb-cms relation')
+    parser.add_argument('--config-size', type=int, default=1,
+                        help='Number of entries in list type config options '
+                             'and in data published by the principal')
+    parser.add_argument('--tool-latency', type=float, default=0.0,
+                        help='Seconds added to every hook tool invocation')
+    parser.add_argument('--json', action='store_true',
+                        help='Print results as JSON')
+    args = parser.parse_args(argv)
+
+    relations = fakejuju.default_relations(
+        UNIT_NAME,
+        n_ovsdb_remotes=args.remotes,
+        neutron_config_data=scaled_neutron_config_data(args.config_size))
+    tmpdir = tempfile.mkdtemp(prefix='bench-hooks-')
+    results = {}
+    try:
+        with open(os.path.join(tmpdir, 'sitecustomize.py'), 'w') as fout:
+            fout.write(SITECUSTOMIZE)
+        with fakejuju.FakeJuju(args.charm_dir, unit_name=UNIT_NAME,
+                               config=scaled_config(args.config_size),
+                               relations=relations,
+                               tool_latency=args.tool_latency) as juju:
+            setup_hooks = list(SETUP_HOOKS) + [
+                (hook_name, 'ovsdb-cms:2', unit)
+                for unit in sorted(relations['ovsdb-cms:2']['units'])
+                for hook_name in ('ovsdb-cms-relation-joined',
+                                  'ovsdb-cms-relation-changed')
+            ]
+            for hook_name, relation_id, remote_unit in setup_hooks:
+                juju.run_hook(hook_name, relation_id, remote_unit)
+            for hook_name, relation_id in MEASURED_HOOKS:
+                results[hook_name] = measure(
+                    juju, hook_name, relation_id, args.iterations, tmpdir)
+    finally:
+        shutil.rmtree(tmpdir)
+
+    if args.json:
+        print(json.dumps(results, indent=2, sort_keys=True))
+        return 0
+    rows = []
+    for hook_name, result in results.items():
+        rows.append([
+            hook_name,
+            result['wall']['n'],
+            result['wall']['p50'],
+            result['wall']['p90'],
+            result['wall']['mean'],
+            result['import'],
+            result['memory']['peak'] // 1024,
+            result['memory']['blocks'],
+        ])
+    common.print_table(
+        ('hook', 'n', 'wall p50', 'wall p90', 'wall mean', 'import',
+         'peak KiB', 'blocks'),
+        rows)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
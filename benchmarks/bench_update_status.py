@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+#
+# Copyright 2026 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark the per-invocation cost of the update-status hook.
+
+The ``update-status`` hook of a built charm is dispatched repeatedly against
+a fake Juju hook environment in two modes:
+
+full  The status snapshot is removed before every invocation, so each hook
+      performs a full run of the reactive framework.  This is the cost of
+      the hook before the fast path was introduced.
+fast  A snapshot recorded by a priming full run is left in place, so each
+      hook re-applies the recorded status.
+
+Usage:
+
+    tox -e build
+    sudo python3 benchmarks/bench_update_status.py \\
+        build/builds/neutron-api-plugin-ovn --iterations 20
+
+See ``fakejuju.py`` for the requirements on the host running the benchmark.
+"""
+
+import argparse
+import os
+import sys
+
+import common
+import fakejuju
+
+SNAPSHOT_KEY = 'neutron-api-plugin-ovn.status-snapshot'
+
+
+def run(juju, iterations, invalidate):
+    """Dispatch update-status hooks.
+
+    :param juju: Fake Juju environment
+    :type juju: fakejuju.FakeJuju
+    :param iterations: Number of hook invocations
+    :type iterations: int
+    :param invalidate: Remove status snapshot before each invocation
+    :type invalidate: bool
+    :returns: Wall time samples and mean number of hook tool calls
+    :rtype: Tuple[List[float],float]
+    """
+    samples = []
+    juju.pop_tool_calls()
+    for _ in range(iterations):
+        if invalidate:
+            juju.kv_unset(SNAPSHOT_KEY)
+        samples.append(juju.run_hook('update-status'))
+    calls = sum(juju.pop_tool_calls().values())
+    return samples, calls / iterations
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('charm_dir', help='Path to built charm')
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--remotes', type=int, default=3,
+                        help='Number of units on the ovsdb-cms relation')
+    parser.add_argument('--tool-latency', type=float, default=0.0,
+                        help='Seconds added to every hook tool invocation')
+    args = parser.parse_args(argv)
+
+    relations = fakejuju.default_relations(
+        'neutron-api-plugin-ovn/0', n_ovsdb_remotes=args.remotes)
+    rows = []
+    with fakejuju.FakeJuju(args.charm_dir, relations=relations,
+                           tool_latency=args.tool_latency) as juju:
+        # Bring the unit to a steady state and warm up the page cache.
+        for hook_name in ('install', 'config-changed', 'start'):
+            if os.path.exists(
+                    os.path.join(juju.charm_dir, 'hooks', hook_name)):
+                juju.run_hook(hook_name)
+        for mode, invalidate in (('full', True), ('fast', False)):
+            juju.run_hook('update-status')
+            samples, calls = run(juju, args.iterations, invalidate)
+            stats = common.summarize(samples)
+            rows.append([mode, stats['n'], stats['min'], stats['p50'],
+                         stats['p90'], stats['mean'], calls])
+    common.print_table(
+        ('mode', 'n', 'min', 'p50', 'p90', 'mean', 'tool calls'), rows)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
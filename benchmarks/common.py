@@ -0,0 +1,71 @@
+# Copyright 2026 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Helpers shared by the benchmarks."""
+
+import math
+import statistics
+
+
+def percentile(samples, pct):
+    """Get percentile of samples using the nearest-rank method.
+
+    :param samples: Samples
+    :type samples: List[float]
+    :param pct: Percentile
+    :type pct: int
+    :returns: Value at percentile
+    :rtype: float
+    """
+    ordered = sorted(samples)
+    rank = max(int(math.ceil(pct / 100 * len(ordered))), 1)
+    return ordered[rank - 1]
+
+
+def summarize(samples):
+    """Summarize samples.
+
+    :param samples: Samples
+    :type samples: List[float]
+    :returns: Map of statistic name to value
+    :rtype: Dict[str,float]
+    """
+    return {
+        'n': len(samples),
+        'min': min(samples),
+        'p50': percentile(samples, 50),
+        'p90': percentile(samples, 90),
+        'mean': statistics.mean(samples),
+        'max': max(samples),
+    }
+
+
+def print_table(columns, rows):
+    """Print rows as a plain text table.
+
+    :param columns: Column headings
+    :type columns: List[str]
+    :param rows: Rows of values, floats are printed with 4 decimals.
+    :type rows: List[List[any]]
+    """
+    def fmt(value):
+        if isinstance(value, float):
+            return '{:.4f}'.format(value)
+        return str(value)
+
+    cells = [list(columns)] + [[fmt(value) for value in row] for row in rows]
+    widths = [max(len(row[n]) for row in cells) for n in range(len(columns))]
+    for row in cells:
+        print('  '.join(
+            cell.rjust(width) for cell, width in zip(row, widths)))
@@ -15,9 +15,16 @@
 # limitations under the License.
 
 import contextlib
+import datetime
+import functools
+import json
 import os
+import re
+import shutil
 import subprocess
 import sys
+import tempfile
+import time
 import traceback
 
 from oslo_config import cfg
@@ -31,14 +38,60 @@ basic.bootstrap_charm_deps()
 basic.init_config_states()
 
 import charms_openstack.bus
+import charms_openstack.charm
 
 import charmhelpers.core as ch_core
+import charmhelpers.core.unitdata as unitdata
+import charmhelpers.fetch as ch_fetch
+
+import charm.openstack.neutron_api_plugin_ovn as neutron_api_plugin_ovn
+import charm.openstack.sync_health as sync_health
+import charm.openstack.timings as timings
+import charm.ovn_tools.dhcp as dhcp
+import charm.ovn_tools.drift as drift
+import charm.ovn_tools.fip as fip
+import charm.ovn_tools.gateway as gateway
+import charm.ovn_tools.offline_nb as offline_nb
+import charm.ovn_tools.orphans as orphans
+import charm.ovn_tools.ovsdb as ovsdb
+import charm.ovn_tools.pipeline as pipeline
+import charm.ovn_tools.scale as scale
 
 charms_openstack.bus.discover()
 
 
 NEUTRON_CONF = '/etc/neutron/neutron.conf'
 NEUTRON_OVN_DB_SYNC_CONF = '/etc/neutron/neutron-ovn-db-sync.conf'
+NEUTRON_DB_UTIL = 'files/scripts/neutron_db_util.py'
+ML2_CONF = '/etc/neutron/plugins/ml2/ml2_conf.ini'
+# Northbound DB file built by ``migrate-ovn-db`` with offline-build.
+OFFLINE_NB_DB = '/var/lib/neutron/ovnnb_db.offline.db'
+# Start time of the last successful repair run of ``migrate-ovn-db``.
+LAST_OVN_DB_SYNC_KEY = 'neutron-api-plugin-ovn.last-ovn-db-sync'
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+# Path and start time of the last Northbound DB file built by
+# ``migrate-ovn-db`` with offline-build, until loaded by
+# ``restore-offline-nb-db``.
+OFFLINE_NB_BUILD_KEY = 'neutron-api-plugin-ovn.offline-nb-build'
+# Result of the last dry-run of ``migrate-ovn-db``.
+OVN_DB_SYNC_DRY_RUN_KEY = 'neutron-api-plugin-ovn.ovn-db-sync-dry-run'
+# Words in the output of migration tools that indicate failure, as the
+# tools do not set an error code on failure.
+MIGRATION_MTU_FAIL_WORDS = ('Exception', 'Traceback')
+OVN_DB_SYNC_FAIL_WORDS = ('ERROR',)
+# IDs of resources in the output of `neutron-ovn-db-sync-util`, other than
+# the request ID of the log context.
+RESOURCE_ID_RE = re.compile(
+    r'(?<!req-)\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}'
+    r'\b')
+# Stages of ``migrate-to-ovn`` completed by earlier runs and their durations.
+MIGRATION_PIPELINE_KEY = 'neutron-api-plugin-ovn.migration-pipeline'
+# Read-only stages of ``migrate-to-ovn``, run before pausing neutron-server.
+MIGRATION_VERIFY_STAGES = ('verify-mtu', 'dry-run-ovn-db-sync',
+                           'rehearse-morph')
+# Seconds after which completed verify stages of ``migrate-to-ovn`` must run
+# again, as the databases keep changing while neutron-server is running.
+MIGRATION_VERIFY_MAX_AGE = 24 * 60 * 60
 
 
 def get_neutron_credentials():
@@ -82,6 +135,29 @@ def get_neutron_db_connection_string():
     return sections['database']['connection'][0]
 
 
+def get_ovn_connection(db='nb'):
+    """Retrieve OVN DB connection from the ML2 configuration file.
+
+    The remotes and TLS key, certificate and CA certificate paths are the
+    ones published by this charm and rendered by the principal charm.
+
+    :param db: Database, 'nb' or 'sb'.
+    :type db: str
+    :returns: Keyword arguments for ``ovsdb.Client``.
+    :rtype: Dict[str,str]
+    """
+    sections = {}
+    parser = cfg.ConfigParser(ML2_CONF, sections)
+    parser.parse()
+    ovn = sections['ovn']
+    return {
+        'remotes': ovn['ovn_{}_connection'.format(db)][0],
+        'private_key': ovn.get('ovn_{}_private_key'.format(db), [None])[0],
+        'certificate': ovn.get('ovn_{}_certificate'.format(db), [None])[0],
+        'ca_cert': ovn.get('ovn_{}_ca_cert'.format(db), [None])[0],
+    }
+
+
 @contextlib.contextmanager
 def write_filtered_neutron_config_for_sync_util():
     """This helper exists to work around LP: #1894048.
@@ -116,16 +192,49 @@ def write_filtered_neutron_config_for_sync_util():
     os.unlink(NEUTRON_OVN_DB_SYNC_CONF)
 
 
-def migrate_mtu(args):
-    """Reduce MTU on overlay networks prior to migration to Geneve.
+def print_tool_output(banner_msg, cp):
+    """Pass output of a tool through to the action log and output.
 
-    :param args: Argument list
-    :type args: List[str]
+    :param banner_msg: Banner preceding the output.
+    :type banner_msg: str
+    :param cp: Completed tool process
+    :type cp: subprocess.CompletedProcess
     """
-    action_name = os.path.basename(args[0])
-    dry_run = not ch_core.hookenv.action_get('i-really-mean-it')
-    mode = 'verify' if dry_run else 'update'
-    cp = subprocess.run(
+    for output_name in ('stdout', 'stderr'):
+        print('{} ON {}:\n'.format(banner_msg, output_name.upper()) +
+              getattr(cp, output_name),
+              file=getattr(sys, output_name))
+
+
+def tool_failed(cp, fail_words=()):
+    """Check whether a tool failed.
+
+    Some of the migration tools do not set an error code on failure, errors
+    are then detected by looking for words in the output.
+
+    :param cp: Completed tool process
+    :type cp: subprocess.CompletedProcess
+    :param fail_words: Words in the output indicating failure.
+    :type fail_words: Iterable[str]
+    :returns: Whether the tool failed.
+    :rtype: bool
+    """
+    return cp.returncode != 0 or any(
+        fail_word in data
+        for data in (cp.stdout, cp.stderr)
+        for fail_word in fail_words)
+
+
+def run_migration_mtu_tool(mode):
+    """Run the `neutron-ovn-migration-mtu` tool.
+
+    :param mode: 'verify' or 'update'
+    :type mode: str
+    :returns: Completed process, use ``tool_failed`` with
+              ``MIGRATION_MTU_FAIL_WORDS`` to check for failure.
+    :rtype: subprocess.CompletedProcess
+    """
+    return subprocess.run(
         (
             'neutron-ovn-migration-mtu',
             mode,
@@ -137,6 +246,18 @@ def migrate_mtu(args):
             'PATH': '/usr/bin',
             **get_neutron_credentials(),
         })
+
+
+def migrate_mtu(args):
+    """Reduce MTU on overlay networks prior to migration to Geneve.
+
+    :param args: Argument list
+    :type args: List[str]
+    """
+    action_name = os.path.basename(args[0])
+    dry_run = not ch_core.hookenv.action_get('i-really-mean-it')
+    mode = 'verify' if dry_run else 'update'
+    cp = run_migration_mtu_tool(mode)
     if dry_run:
         banner_msg = '{}: OUTPUT FROM VERIFY'.format(action_name)
     else:
@@ -144,44 +265,342 @@ def migrate_mtu(args):
 
     # we pass the output through and it will be captured both in log and
     # action output
-    output_indicates_failure = False
-    for output_name in ('stdout', 'stderr'):
-        fh = getattr(sys, output_name)
-        data = getattr(cp, output_name)
-        print('{} ON {}:\n'.format(banner_msg, output_name.upper()) + data,
-              file=fh)
-        for fail_word in ('Exception', 'Traceback'):
-            if fail_word in data:
-                # the `neutron-ovn-migration-mtu` tool does not set an error
-                # code on failure, look for errors in the output and set action
-                # status accordingly.
-                output_indicates_failure = True
-
-    if cp.returncode != 0 or output_indicates_failure:
+    print_tool_output(banner_msg, cp)
+    if tool_failed(cp, MIGRATION_MTU_FAIL_WORDS):
         ch_core.hookenv.action_fail(
             'Execution failed, please investigate output.')
 
 
-def migrate_ovn_db(args):
-    """Migrate the Neutron DB into OVN with the `neutron-ovn-db-sync-util`.
+def parse_since(value):
+    """Parse the ``since`` parameter of the ``migrate-ovn-db`` action.
 
-    :param args: Argument list
-    :type args: List[str]
+    :param value: ISO 8601 timestamp, UTC unless it has an offset, or
+                  ``last`` for the start of the last successful repair run.
+    :type value: str
+    :returns: Timestamp in UTC formatted like Neutron stores timestamps.
+    :rtype: str
+    :raises: ValueError
+    """
+    if value == 'last':
+        value = unitdata.kv().get(LAST_OVN_DB_SYNC_KEY)
+        if not value:
+            raise ValueError('no successful repair run has been recorded, '
+                             'specify a timestamp')
+        return value
+    try:
+        timestamp = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError('"{}" is not an ISO 8601 timestamp or "last"'
+                         .format(value))
+    if timestamp.tzinfo:
+        timestamp = timestamp.astimezone(
+            datetime.timezone.utc).replace(tzinfo=None)
+    return timestamp.strftime(TIMESTAMP_FORMAT)
+
+
+def record_ovn_db_sync(started):
+    """Record the start time of a successful repair run.
+
+    :param started: Start time in UTC
+    :type started: datetime.datetime
+    """
+    kv = unitdata.kv()
+    kv.set(LAST_OVN_DB_SYNC_KEY, started.strftime(TIMESTAMP_FORMAT))
+    kv.flush()
+
+
+def get_ovn_db_sync_fingerprint():
+    """Get fingerprint of the state of the Neutron and OVN Northbound DBs.
+
+    :returns: Fingerprints of both databases, or None if they could not be
+              retrieved.
+    :rtype: Optional[Dict[str,str]]
+    """
+    try:
+        neutron = run_neutron_db_util('fingerprint')['fingerprint']
+        with ovsdb.Client(**get_ovn_connection()) as client:
+            nb = ovsdb.fingerprint(client, drift.NB_DB)
+    except Exception as e:
+        ch_core.hookenv.log('unable to get fingerprint of databases: {}'
+                            .format(e), level=ch_core.hookenv.WARNING)
+        return None
+    return {'neutron': neutron, 'nb': nb}
+
+
+def sync_util_warnings(output):
+    """Get warnings logged by `neutron-ovn-db-sync-util`.
+
+    In log mode the tool reports every inconsistency it would repair as a
+    warning.
+
+    :param output: Output of the tool
+    :type output: str
+    :returns: Lines with warnings
+    :rtype: List[str]
+    """
+    return [line for line in output.splitlines() if ' WARNING ' in line]
+
+
+def warning_resource_ids(warnings):
+    """Get IDs of the resources warnings of `neutron-ovn-db-sync-util` name.
+
+    :param warnings: Lines with warnings
+    :type warnings: List[str]
+    :returns: Resource IDs, or None if a warning does not name a resource.
+    :rtype: Optional[List[str]]
+    """
+    ids = set()
+    for line in warnings:
+        line_ids = RESOURCE_ID_RE.findall(line)
+        if not line_ids:
+            return None
+        ids.update(line_ids)
+    return sorted(ids)
+
+
+def repair_ovn_db_resources(ids):
+    """Mark resources found inconsistent by a dry-run for OVN maintenance.
+
+    The maintenance task of neutron-server then repairs exactly those
+    resources in the OVN Northbound DB.  Nothing is marked if any of them is
+    not found in Neutron, as resources only in the OVN Northbound DB are not
+    removed by the maintenance task.
+
+    :param ids: Resource IDs
+    :type ids: List[str]
+    :returns: Result of the Neutron DB maintenance tool, None if any of the
+              resources was not found.
+    :rtype: Optional[Dict[str,any]]
+    """
+    data = ''.join('{}\n'.format(uuid) for uuid in ids)
+    if run_neutron_db_util('mark-ids', data=data)['not-found']:
+        return None
+    return run_neutron_db_util('mark-ids', '--commit', data=data)
+
+
+def migrate_ovn_db_incremental(since, dry_run):
+    """Reconcile resources changed since a timestamp with OVN.
+
+    The OVN revision rows of the resources are marked as inconsistent, the
+    maintenance task of neutron-server then repairs them in the OVN
+    Northbound DB.
+
+    :param since: Timestamp in UTC formatted like Neutron stores timestamps.
+    :type since: str
+    :param dry_run: Only count the resources.
+    :type dry_run: bool
+    :returns: Result of the Neutron DB maintenance tool.
+    :rtype: Dict[str,any]
+    """
+    cmd = ('mark-changed', since)
+    if not dry_run:
+        cmd += ('--commit',)
+    return run_neutron_db_util(*cmd)
+
+
+def run_ovn_db_sync_util(sync_mode, config_files=()):
+    """Run the `neutron-ovn-db-sync-util` tool.
+
+    :param sync_mode: 'log' or 'repair'
+    :type sync_mode: str
+    :param config_files: Additional configuration files, overriding the
+                         Neutron and ML2 configuration.
+    :type config_files: Iterable[str]
+    :returns: Completed process, use ``tool_failed`` with
+              ``OVN_DB_SYNC_FAIL_WORDS`` to check for failure.
+    :rtype: subprocess.CompletedProcess
     """
-    action_name = os.path.basename(args[0])
-    dry_run = not ch_core.hookenv.action_get('i-really-mean-it')
-    sync_mode = 'log' if dry_run else 'repair'
     with write_filtered_neutron_config_for_sync_util():
-        cp = subprocess.run(
+        return subprocess.run(
             (
                 'neutron-ovn-db-sync-util',
                 '--config-file', NEUTRON_OVN_DB_SYNC_CONF,
                 '--config-file', '/etc/neutron/plugins/ml2/ml2_conf.ini',
+            ) + tuple(
+                arg for config_file in config_files
+                for arg in ('--config-file', config_file)
+            ) + (
                 '--ovn-neutron_sync_mode', sync_mode,
             ),
             capture_output=True,
             universal_newlines=True,
         )
+
+
+def migrate_ovn_db_offline(action_name, dry_run):
+    """Build the OVN Northbound DB offline into a database file.
+
+    See ``charm.ovn_tools.offline_nb``.  A dry-run only checks the
+    prerequisites.  The build directory is kept for investigation when the
+    build fails.  The file is loaded into the cluster by the
+    ``restore-offline-nb-db`` action.
+
+    :param action_name: Name of the action
+    :type action_name: str
+    :param dry_run: Only check the prerequisites.
+    :type dry_run: bool
+    :returns: Path, size and row counts of the database file and duration
+              of each step.
+    :rtype: Dict[str,any]
+    :raises: offline_nb.OfflineBuildError, ovsdb.OVSDBError, OSError
+    """
+    missing = [tool for tool in offline_nb.TOOLS if not shutil.which(tool)]
+    if missing:
+        raise offline_nb.OfflineBuildError(
+            '{} not installed'.format(', '.join(missing)))
+    connection = get_ovn_connection()
+    with ovsdb.Client(**connection) as client:
+        offline_nb.check_empty(client)
+        schema = client.get_schema(offline_nb.NB_DB)
+    result = {'file': OFFLINE_NB_DB}
+    if dry_run:
+        return result
+
+    seconds = {}
+    start = time.monotonic()
+
+    def step(name):
+        nonlocal start
+        seconds[name] = round(time.monotonic() - start, 3)
+        start = time.monotonic()
+
+    workdir = tempfile.mkdtemp(prefix='ovn-offline-build-',
+                               dir=os.path.dirname(OFFLINE_NB_DB))
+    try:
+        with offline_nb.local_server(workdir, schema) as remote:
+            with ovsdb.Client(**connection) as source, \
+                    ovsdb.Client(remote) as target:
+                offline_nb.copy_rows(source, target)
+            cp = run_ovn_db_sync_util(
+                'repair',
+                config_files=(offline_nb.write_config(workdir, remote),))
+            print_tool_output(
+                '{}: OUTPUT FROM OFFLINE BUILD'.format(action_name), cp)
+            if tool_failed(cp, OVN_DB_SYNC_FAIL_WORDS):
+                raise offline_nb.OfflineBuildError(
+                    'neutron-ovn-db-sync-util failed')
+            with ovsdb.Client(remote) as target:
+                result['rows'] = offline_nb.count_rows(target)
+        step('build')
+        db = os.path.join(workdir, offline_nb.DB_FILE)
+        offline_nb.compact(db)
+        os.replace(db, OFFLINE_NB_DB)
+        result['bytes'] = os.path.getsize(OFFLINE_NB_DB)
+        step('compact')
+    except (offline_nb.OfflineBuildError, ovsdb.OVSDBError, OSError) as e:
+        raise offline_nb.OfflineBuildError(
+            '{}, build directory kept in {}'.format(e, workdir)) from e
+    shutil.rmtree(workdir)
+    result['seconds'] = seconds
+    return result
+
+
+def restore_offline_nb_db(args):
+    """Load the Northbound DB file built offline into the cluster.
+
+    :param args: Argument list
+    :type args: List[str]
+    """
+    kv = unitdata.kv()
+    build = kv.get(OFFLINE_NB_BUILD_KEY)
+    if not build or not os.path.exists(build['file']):
+        ch_core.hookenv.action_fail(
+            'No database file built offline, run migrate-ovn-db with '
+            'offline-build=true and i-really-mean-it=true first.')
+        return
+    result = dict(build, bytes=os.path.getsize(build['file']))
+    connection = get_ovn_connection()
+    try:
+        with ovsdb.Client(**connection) as client:
+            offline_nb.check_empty(client)
+        if ch_core.hookenv.action_get('i-really-mean-it'):
+            start = time.monotonic()
+            offline_nb.restore(build['file'], **connection)
+            result['seconds'] = round(time.monotonic() - start, 3)
+    except (offline_nb.OfflineBuildError, ovsdb.OVSDBError, OSError) as e:
+        ch_core.hookenv.action_fail('Restore failed: {}'.format(e))
+        return
+    if 'seconds' in result:
+        kv.unset(OFFLINE_NB_BUILD_KEY)
+        kv.unset(OVN_DB_SYNC_DRY_RUN_KEY)
+        kv.flush()
+        record_ovn_db_sync(
+            datetime.datetime.strptime(build['started'], TIMESTAMP_FORMAT))
+    ch_core.hookenv.action_set({
+        'result': json.dumps(result, indent=2, sort_keys=True),
+    })
+
+
+def migrate_ovn_db(args):
+    """Migrate the Neutron DB into OVN with the `neutron-ovn-db-sync-util`.
+
+    With the ``since`` parameter only resources changed since then are
+    reconciled, see ``migrate_ovn_db_incremental``.  With the
+    ``offline-build`` parameter the Northbound DB is built offline, see
+    ``migrate_ovn_db_offline``.
+
+    :param args: Argument list
+    :type args: List[str]
+    """
+    action_name = os.path.basename(args[0])
+    dry_run = not ch_core.hookenv.action_get('i-really-mean-it')
+    started = datetime.datetime.utcnow()
+    since = ch_core.hookenv.action_get('since')
+    if since:
+        result = migrate_ovn_db_incremental(parse_since(since), dry_run)
+        if not dry_run:
+            record_ovn_db_sync(started)
+        ch_core.hookenv.action_set({
+            'result': json.dumps(result, indent=2, sort_keys=True),
+        })
+        return
+    kv = unitdata.kv()
+    if ch_core.hookenv.action_get('offline-build'):
+        try:
+            result = migrate_ovn_db_offline(action_name, dry_run)
+        except (offline_nb.OfflineBuildError, ovsdb.OVSDBError,
+                OSError) as e:
+            ch_core.hookenv.action_fail(
+                'Offline build failed: {}'.format(e))
+            return
+        if not dry_run:
+            kv.set(OFFLINE_NB_BUILD_KEY, {
+                'file': result['file'],
+                'started': started.strftime(TIMESTAMP_FORMAT),
+            })
+            kv.flush()
+        ch_core.hookenv.action_set({
+            'result': json.dumps(result, indent=2, sort_keys=True),
+        })
+        return
+    fingerprint = get_ovn_db_sync_fingerprint()
+    previous = kv.get(OVN_DB_SYNC_DRY_RUN_KEY)
+    if (not dry_run and fingerprint and previous and
+            previous['fingerprint'] == fingerprint and
+            previous.get('resources') is not None and
+            ch_core.hookenv.action_get('reuse-dry-run')):
+        kv.unset(OVN_DB_SYNC_DRY_RUN_KEY)
+        kv.flush()
+        if not previous['resources']:
+            print('{}: REUSING DRY-RUN FROM {}, NEITHER DATABASE CHANGED '
+                  'SINCE AND IT FOUND NOTHING TO REPAIR'
+                  .format(action_name, previous['started']))
+            record_ovn_db_sync(started)
+            return
+        result = repair_ovn_db_resources(previous['resources'])
+        if result:
+            print('{}: REUSING DRY-RUN FROM {}, NEITHER DATABASE CHANGED '
+                  'SINCE, MARKED THE RESOURCES IT FOUND INCONSISTENT FOR '
+                  'REPAIR BY THE MAINTENANCE TASK'
+                  .format(action_name, previous['started']))
+            record_ovn_db_sync(started)
+            ch_core.hookenv.action_set({
+                'result': json.dumps(result, indent=2, sort_keys=True),
+            })
+            return
+        print('{}: NOT REUSING DRY-RUN FROM {}, IT FOUND RESOURCES MISSING '
+              'IN NEUTRON'.format(action_name, previous['started']))
+    cp = run_ovn_db_sync_util('log' if dry_run else 'repair')
     if dry_run:
         banner_msg = '{}: OUTPUT FROM DRY-RUN'.format(action_name)
     else:
@@ -189,33 +608,42 @@ def migrate_ovn_db(args):
 
     # we pass the output through and it will be captured both in log and
     # action output
-    output_indicates_failure = False
-    for output_name in ('stdout', 'stderr'):
-        fh = getattr(sys, output_name)
-        data = getattr(cp, output_name)
-        print('{} ON {}:\n'.format(banner_msg, output_name.upper()) + data,
-              file=fh)
-        if 'ERROR' in data:
-            # the `neutron-ovn-db-sync-util` tool does not set an error code on
-            # failure, look for errors in the output and set action status
-            # accordingly.
-            output_indicates_failure = True
-
-    if cp.returncode != 0 or output_indicates_failure:
+    print_tool_output(banner_msg, cp)
+    if tool_failed(cp, OVN_DB_SYNC_FAIL_WORDS):
+        kv.unset(OVN_DB_SYNC_DRY_RUN_KEY)
+        kv.flush()
         ch_core.hookenv.action_fail(
             'Execution failed, please investigate output.')
+    elif dry_run:
+        warnings = sync_util_warnings(cp.stdout + cp.stderr)
+        if fingerprint:
+            kv.set(OVN_DB_SYNC_DRY_RUN_KEY, {
+                'fingerprint': fingerprint,
+                'started': started.strftime(TIMESTAMP_FORMAT),
+                'warnings': len(warnings),
+                'resources': warning_resource_ids(warnings),
+            })
+        else:
+            kv.unset(OVN_DB_SYNC_DRY_RUN_KEY)
+        kv.flush()
+        ch_core.hookenv.action_set({'warnings': len(warnings)})
+    else:
+        kv.unset(OVN_DB_SYNC_DRY_RUN_KEY)
+        record_ovn_db_sync(started)
 
 
-def offline_neutron_morph_db(args):
-    """Perform offline moprhing of tunnel networks in the Neutron DB.
+def run_offline_morph_tool(mode, preserve_vni=False):
+    """Run the offline network type morphing tool.
 
-    :param args: Argument list
-    :type args: List[str]
+    :param mode: 'dry', 'morph' or 'rehearse'
+    :type mode: str
+    :param preserve_vni: Keep segmentation IDs that are free in the geneve
+                         VNI ranges.
+    :type preserve_vni: bool
+    :returns: Completed process
+    :rtype: subprocess.CompletedProcess
     """
-    action_name = os.path.basename(args[0])
-    dry_run = not ch_core.hookenv.action_get('i-really-mean-it')
-    mode = 'dry' if dry_run else 'morph'
-    cp = subprocess.run(
+    return subprocess.run(
         (
             '{}'.format(
                 os.path.join(
@@ -223,13 +651,58 @@ def offline_neutron_morph_db(args):
                     'files/scripts/neutron_offline_network_type_update.py')),
             get_neutron_db_connection_string(),
             mode,
-        ),
+        ) + (('--preserve-vni',) if preserve_vni else ()),
         capture_output=True,
         universal_newlines=True,
         # We want this tool to run outside of the charm venv to let it consume
         # system Python packages.
         env={'PATH': '/usr/bin'},
     )
+
+
+def rehearse_offline_neutron_morph_db(preserve_vni):
+    """Forecast the duration of morphing on a local snapshot of the DB.
+
+    The tool only reads from the Neutron DB and may run while
+    neutron-server is running.
+
+    :param preserve_vni: Keep segmentation IDs that are free in the geneve
+                         VNI ranges.
+    :type preserve_vni: bool
+    """
+    cp = run_offline_morph_tool('rehearse', preserve_vni=preserve_vni)
+    # progress is passed through to the action log
+    print(cp.stderr, file=sys.stderr)
+    if cp.returncode != 0:
+        ch_core.hookenv.action_fail(
+            'Execution failed, please investigate output.')
+        return
+    result = json.loads(cp.stdout)
+    ch_core.hookenv.action_set({
+        'result': json.dumps(result, indent=2, sort_keys=True),
+    })
+    if result.get('error'):
+        ch_core.hookenv.action_fail(
+            'Morphing the snapshot failed: {}, the geneve VNI range must '
+            'have at least {} free VNIs.'.format(
+                result['error'].rstrip('.'),
+                sum(result['segments'].values())))
+
+
+def offline_neutron_morph_db(args):
+    """Perform offline moprhing of tunnel networks in the Neutron DB.
+
+    :param args: Argument list
+    :type args: List[str]
+    """
+    preserve_vni = ch_core.hookenv.action_get('preserve-vni')
+    if ch_core.hookenv.action_get('rehearse'):
+        rehearse_offline_neutron_morph_db(preserve_vni)
+        return
+    action_name = os.path.basename(args[0])
+    dry_run = not ch_core.hookenv.action_get('i-really-mean-it')
+    cp = run_offline_morph_tool('dry' if dry_run else 'morph',
+                                preserve_vni=preserve_vni)
     if dry_run:
         banner_msg = '{}: OUTPUT FROM DRY-RUN'.format(action_name)
     else:
@@ -237,21 +710,625 @@ def offline_neutron_morph_db(args):
 
     # we pass the output through and it will be captured both in log and
     # action output
-    for output_name in ('stdout', 'stderr'):
-        fh = getattr(sys, output_name)
-        data = getattr(cp, output_name)
-        print('{} ON {}:\n'.format(banner_msg, output_name.upper()) + data,
-              file=fh)
-
-    if cp.returncode != 0:
+    print_tool_output(banner_msg, cp)
+    if tool_failed(cp):
         ch_core.hookenv.action_fail(
             'Execution failed, please investigate output.')
 
 
+def migration_preflight(dry_run, completed, morph):
+    """Check prerequisites of the ``migrate-to-ovn`` stages about to run.
+
+    The verify stages query the Neutron API and run while neutron-server
+    is running, the stages changing the databases require the neutron-api
+    units to be paused.  Only neutron-server on this unit is checked, the
+    subordinate has no view of the other neutron-api units and pausing all
+    of them is left to the operator.
+
+    :param dry_run: Whether only the verify stages run.
+    :type dry_run: bool
+    :param completed: Names of stages completed by earlier runs.
+    :type completed: List[str]
+    :param morph: Whether the morph stages are part of the pipeline.
+    :type morph: bool
+    :raises: pipeline.StageFailed
+    """
+    for tool in ('neutron-ovn-migration-mtu', 'neutron-ovn-db-sync-util'):
+        if not shutil.which(tool):
+            raise pipeline.StageFailed('{} is not installed'.format(tool))
+    try:
+        run_neutron_db_util('fingerprint')
+    except (subprocess.CalledProcessError, ValueError) as e:
+        raise pipeline.StageFailed(
+            'unable to query the Neutron DB: {}'.format(e))
+    try:
+        with ovsdb.Client(**get_ovn_connection()) as client:
+            client.echo()
+    except (ovsdb.OVSDBError, OSError) as e:
+        raise pipeline.StageFailed(
+            'unable to connect to the OVN Northbound DB: {}'.format(e))
+    running = ch_core.host.service_running('neutron-server')
+    if dry_run:
+        if not running and 'verify-mtu' not in completed:
+            raise pipeline.StageFailed(
+                'neutron-server is not running, it is required to verify '
+                'the MTU of networks')
+        return
+    verify = [stage for stage in MIGRATION_VERIFY_STAGES
+              if stage not in completed and (
+                  morph or stage != 'rehearse-morph')]
+    if verify:
+        raise pipeline.StageFailed(
+            'run the action without i-really-mean-it first to complete {}'
+            .format(', '.join(verify)))
+    if running:
+        raise pipeline.StageFailed(
+            'neutron-server is running on this unit, pause all neutron-api '
+            'units first')
+
+
+def expire_verify_stages(state, now):
+    """Forget verify stages of ``migrate-to-ovn`` completed too long ago.
+
+    :param state: Recorded state of the pipeline, updated in place.
+    :type state: Dict[str,any]
+    :param now: Current time in UTC
+    :type now: datetime.datetime
+    :returns: Names of the expired stages.
+    :rtype: List[str]
+    """
+    completed_at = state.setdefault('completed-at', {})
+    expired = []
+    for name in MIGRATION_VERIFY_STAGES:
+        if name not in state['completed']:
+            continue
+        try:
+            age = now - datetime.datetime.strptime(completed_at.get(name),
+                                                   TIMESTAMP_FORMAT)
+        except (TypeError, ValueError):
+            age = None
+        if age is None or age.total_seconds() > MIGRATION_VERIFY_MAX_AGE:
+            state['completed'].remove(name)
+            completed_at.pop(name, None)
+            expired.append(name)
+    return expired
+
+
+def migration_tool_stage(run, mode, fail_words=()):
+    """Build ``migrate-to-ovn`` stage function running a migration tool.
+
+    :param run: Function running the tool
+    :type run: Callable[[str],subprocess.CompletedProcess]
+    :param mode: Mode of the tool
+    :type mode: str
+    :param fail_words: Words in the output indicating failure.
+    :type fail_words: Iterable[str]
+    :returns: Stage function returning the completed process.
+    :rtype: Callable[[],subprocess.CompletedProcess]
+    """
+    def stage():
+        cp = run(mode)
+        if tool_failed(cp, fail_words):
+            raise pipeline.StageFailed('execution failed', output=cp)
+        return cp
+
+    return stage
+
+
+def rehearse_morph_stage():
+    """Run ``migrate-to-ovn`` stage rehearsing morphing on a DB snapshot.
+
+    Unlike the dry-run mode of the tool, which changes the Neutron DB and
+    rolls back at the end, the rehearsal only reads from the Neutron DB and
+    does not hold locks neutron-server may wait for.
+
+    :returns: Completed process
+    :rtype: subprocess.CompletedProcess
+    :raises: pipeline.StageFailed
+    """
+    cp = run_offline_morph_tool('rehearse')
+    if tool_failed(cp):
+        raise pipeline.StageFailed('execution failed', output=cp)
+    try:
+        error = json.loads(cp.stdout).get('error')
+    except ValueError:
+        raise pipeline.StageFailed('unexpected output', output=cp)
+    if error:
+        raise pipeline.StageFailed(
+            'morphing the snapshot failed: {}'.format(error.rstrip('.')),
+            output=cp)
+    return cp
+
+
+def migrate_to_ovn(args):
+    """Run the database stages of the migration to OVN as a pipeline.
+
+    Without i-really-mean-it pre-flight checks run followed by the verify and
+    dry-run modes of the migration tools and a rehearsal of the morphing,
+    concurrently and while neutron-server is running, none of them change
+    the databases.  With it, the OVN DB sync and the optional morphing of
+    tunnel networks are performed once the neutron-api units are paused.
+    Completed stages are recorded and skipped by later runs, verify stages
+    only for ``MIGRATION_VERIFY_MAX_AGE`` seconds.
+
+    :param args: Argument list
+    :type args: List[str]
+    """
+    action_name = os.path.basename(args[0])
+    dry_run = not ch_core.hookenv.action_get('i-really-mean-it')
+    morph = ch_core.hookenv.action_get('morph')
+    kv = unitdata.kv()
+    if ch_core.hookenv.action_get('reset'):
+        kv.unset(MIGRATION_PIPELINE_KEY)
+    state = kv.get(MIGRATION_PIPELINE_KEY) or {'completed': [], 'timings': {}}
+    started = datetime.datetime.utcnow()
+    expired = expire_verify_stages(state, started)
+    if expired:
+        print('{}: VERIFY STAGES COMPLETED MORE THAN {} HOURS AGO RUN AGAIN: '
+              '{}'.format(action_name, MIGRATION_VERIFY_MAX_AGE // 3600,
+                          ', '.join(expired)))
+
+    def sync_ovn_db():
+        cp = migration_tool_stage(run_ovn_db_sync_util, 'repair',
+                                  OVN_DB_SYNC_FAIL_WORDS)()
+        kv.unset(OVN_DB_SYNC_DRY_RUN_KEY)
+        record_ovn_db_sync(started)
+        return cp
+
+    stages = [
+        # not recorded as completed, the checks depend on the current state
+        pipeline.Stage(
+            'pre-flight',
+            functools.partial(migration_preflight, dry_run,
+                              list(state['completed']), morph),
+            False),
+        pipeline.Stage(
+            'verify-mtu',
+            migration_tool_stage(run_migration_mtu_tool, 'verify',
+                                 MIGRATION_MTU_FAIL_WORDS),
+            True),
+        pipeline.Stage(
+            'dry-run-ovn-db-sync',
+            migration_tool_stage(run_ovn_db_sync_util, 'log',
+                                 OVN_DB_SYNC_FAIL_WORDS),
+            True),
+    ]
+    if morph:
+        stages.append(pipeline.Stage('rehearse-morph', rehearse_morph_stage,
+                                     True))
+    if not dry_run:
+        stages.append(pipeline.Stage('sync-ovn-db', sync_ovn_db, False))
+        if morph:
+            stages.append(pipeline.Stage(
+                'morph-db',
+                migration_tool_stage(run_offline_morph_tool, 'morph'),
+                False))
+
+    def on_result(result):
+        if isinstance(result['output'], subprocess.CompletedProcess):
+            print_tool_output('{}: {}: OUTPUT'.format(
+                action_name, result['name'].upper()), result['output'])
+        if result['status'] == pipeline.OK and result['name'] != 'pre-flight':
+            state['completed'].append(result['name'])
+            state['completed-at'][result['name']] = (
+                datetime.datetime.utcnow().strftime(TIMESTAMP_FORMAT))
+        state['timings'][result['name']] = result['seconds']
+        kv.set(MIGRATION_PIPELINE_KEY, state)
+        kv.flush()
+
+    results = pipeline.run(stages, completed=state['completed'],
+                           on_result=on_result)
+    ch_core.hookenv.action_set({
+        'stages': format_table(
+            ('stage', 'status', 'seconds', 'error'),
+            ([result['name'], result['status'],
+              result.get('seconds', '-'), result.get('error', '')]
+             for result in results)),
+        'timings': json.dumps(state['timings'], indent=2, sort_keys=True),
+    })
+    failed = [result for result in results
+              if result['status'] == pipeline.FAILED]
+    if failed:
+        ch_core.hookenv.action_fail(
+            'Stage {} failed: {}, please investigate output and run the '
+            'action again to resume.'.format(failed[0]['name'],
+                                             failed[0]['error']))
+
+
+def run_neutron_db_util(*args, data=None):
+    """Run the Neutron DB maintenance tool.
+
+    :param args: Sub-command and its arguments.
+    :type args: str
+    :param data: Input for the tool.
+    :type data: Optional[str]
+    :returns: Result decoded from the JSON output of the tool.
+    :rtype: Dict[str,any]
+    :raises: subprocess.CalledProcessError
+    """
+    cp = subprocess.run(
+        (
+            os.path.join(ch_core.hookenv.charm_dir(), NEUTRON_DB_UTIL),
+            get_neutron_db_connection_string(),
+        ) + args,
+        input=data,
+        capture_output=True,
+        universal_newlines=True,
+        # We want this tool to run outside of the charm venv to let it consume
+        # system Python packages.
+        env={'PATH': '/usr/bin'},
+    )
+    # progress is passed through to the action log
+    print(cp.stderr, file=sys.stderr)
+    cp.check_returncode()
+    return json.loads(cp.stdout)
+
+
+def sync_geneve_allocations(args):
+    """Populate or shrink the Geneve allocations table in bulk.
+
+    :param args: Argument list
+    :type args: List[str]
+    """
+    if not ch_core.hookenv.is_leader():
+        ch_core.hookenv.action_fail('This action must be run on the leader '
+                                    'unit.')
+        return
+    dry_run = not ch_core.hookenv.action_get('i-really-mean-it')
+    try:
+        ranges = neutron_api_plugin_ovn.format_vni_ranges(
+            neutron_api_plugin_ovn.parse_vni_ranges(
+                ch_core.hookenv.action_get('vni-ranges') or
+                ch_core.hookenv.config('geneve-vni-ranges')))
+    except ValueError as e:
+        ch_core.hookenv.action_fail('invalid VNI ranges: {}'.format(e))
+        return
+    if not ranges:
+        ch_core.hookenv.action_fail(
+            "no VNI ranges, set the 'vni-ranges' parameter or the "
+            "'geneve-vni-ranges' configuration option")
+        return
+    cmd = (
+        'geneve-allocations',
+        ranges,
+        '--chunk-size', str(ch_core.hookenv.action_get('chunk-size')),
+    )
+    if not dry_run:
+        cmd += ('--commit',)
+    result = run_neutron_db_util(*cmd)
+    if not dry_run:
+        ch_core.hookenv.leader_set({
+            neutron_api_plugin_ovn.GENEVE_ALLOCATIONS_KEY: ranges})
+    ch_core.hookenv.action_set({
+        'result': json.dumps(result, indent=2, sort_keys=True),
+    })
+
+
+def apply_dhcp_global_options(args):
+    """Apply changes of the global DHCP options to the OVN Northbound DB.
+
+    :param args: Argument list
+    :type args: List[str]
+    """
+    if not ch_core.hookenv.is_leader():
+        ch_core.hookenv.action_fail('This action must be run on the leader '
+                                    'unit.')
+        return
+    dry_run = not ch_core.hookenv.action_get('i-really-mean-it')
+    applied = json.loads(
+        ch_core.hookenv.leader_get(
+            neutron_api_plugin_ovn.DHCP_GLOBAL_OPTIONS_KEY) or '{}')
+    options = {}
+    deltas = {}
+    dropped = {}
+    for version in (4, 6):
+        option = 'ovn-dhcp{}-global-options'.format(version)
+        try:
+            options[str(version)] = dhcp.parse_global_options(
+                ch_core.hookenv.config(option))
+        except ValueError as e:
+            ch_core.hookenv.action_fail("invalid '{}': {}".format(option, e))
+            return
+        deltas[version] = dhcp.options_delta(options[str(version)])
+        dropped[version] = dhcp.dropped_options(
+            applied.get(str(version), {}), options[str(version)])
+    with ovsdb.Client(**get_ovn_connection()) as client:
+        result = dhcp.apply(client, deltas,
+                            batch_size=ch_core.hookenv.action_get(
+                                'batch-size'),
+                            dry_run=dry_run)
+    result['delta'] = {
+        'ipv{}'.format(version): {'set': to_set, 'unset': to_unset,
+                                  'dropped': dropped[version]}
+        for version, (to_set, to_unset) in deltas.items()
+    }
+    if not dry_run:
+        ch_core.hookenv.leader_set({
+            neutron_api_plugin_ovn.DHCP_GLOBAL_OPTIONS_KEY: json.dumps(
+                options, sort_keys=True)})
+    ch_core.hookenv.action_set({
+        'result': json.dumps(result, indent=2, sort_keys=True),
+    })
+
+
+def apply_distributed_floating_ip(args):
+    """Apply the distributed floating IP setting to the OVN Northbound DB.
+
+    :param args: Argument list
+    :type args: List[str]
+    """
+    if not ch_core.hookenv.is_leader():
+        ch_core.hookenv.action_fail('This action must be run on the leader '
+                                    'unit.')
+        return
+    dry_run = not ch_core.hookenv.action_get('i-really-mean-it')
+    distributed = bool(
+        ch_core.hookenv.config('enable-distributed-floating-ip'))
+    macs = {}
+    if distributed:
+        macs = dict(drift.neutron_records(
+            os.path.join(ch_core.hookenv.charm_dir(), NEUTRON_DB_UTIL),
+            get_neutron_db_connection_string(),
+            'floating_ip_macs'))
+    with ovsdb.Client(**get_ovn_connection()) as client:
+        result = fip.apply(client, distributed, macs,
+                           batch_size=ch_core.hookenv.action_get(
+                               'batch-size'),
+                           dry_run=dry_run)
+    result['distributed'] = distributed
+    ch_core.hookenv.action_set({
+        'result': json.dumps(result, indent=2, sort_keys=True),
+    })
+
+
+def ovn_drift_report(args):
+    """Report drift between the Neutron DB and the OVN Northbound DB.
+
+    :param args: Argument list
+    :type args: List[str]
+    """
+    resources = (ch_core.hookenv.action_get('resources').split() or
+                 drift.RESOURCES)
+    report = drift.detect(
+        resources,
+        functools.partial(
+            drift.neutron_records,
+            os.path.join(ch_core.hookenv.charm_dir(), NEUTRON_DB_UTIL),
+            get_neutron_db_connection_string()),
+        functools.partial(ovsdb.Client, **get_ovn_connection()),
+        samples=ch_core.hookenv.action_get('samples'))
+    ch_core.hookenv.action_set({
+        'drift': json.dumps(report, indent=2, sort_keys=True),
+    })
+
+
+def cleanup_ovn_orphans(args):
+    """Delete OVN Northbound rows no Neutron resource owns.
+
+    :param args: Argument list
+    :type args: List[str]
+    """
+    if not ch_core.hookenv.is_leader():
+        ch_core.hookenv.action_fail('This action must be run on the leader '
+                                    'unit.')
+        return
+    dry_run = not ch_core.hookenv.action_get('i-really-mean-it')
+    script = os.path.join(ch_core.hookenv.charm_dir(), NEUTRON_DB_UTIL)
+    connection = get_neutron_db_connection_string()
+
+    def neutron_ids(resource):
+        return set(key for key, _ in drift.neutron_records(
+            script, connection, resource))
+
+    with ovsdb.Client(**get_ovn_connection()) as client:
+        found = orphans.find(client, neutron_ids)
+        transactions = 0
+        if not dry_run:
+            transactions = orphans.delete(
+                client, found,
+                batch_size=ch_core.hookenv.action_get('batch-size'))
+    result = orphans.report(found,
+                            samples=ch_core.hookenv.action_get('samples'))
+    result['transactions'] = transactions
+    ch_core.hookenv.action_set({
+        'result': json.dumps(result, indent=2, sort_keys=True),
+    })
+
+
+def format_table(header, rows):
+    """Format rows as a table with aligned columns.
+
+    :param header: Column names
+    :type header: Iterable[str]
+    :param rows: Rows
+    :type rows: Iterable[Iterable[any]]
+    :returns: Table
+    :rtype: str
+    """
+    rows = [[str(value) for value in row] for row in [header] + list(rows)]
+    widths = [max(len(row[n]) for row in rows) for n in range(len(header))]
+    return '\n'.join(
+        '  '.join(value.ljust(width)
+                  for value, width in zip(row, widths)).rstrip()
+        for row in rows)
+
+
+def ovsdb_probe(args):
+    """Probe all OVN Northbound and Southbound DB remotes concurrently.
+
+    :param args: Argument list
+    :type args: List[str]
+    """
+    nb = get_ovn_connection('nb')
+    sb = get_ovn_connection('sb')
+    context = ovsdb.ssl_context(nb['private_key'], nb['certificate'],
+                                nb['ca_cert'])
+    results = ovsdb.probe_all(
+        {'nb': nb['remotes'], 'sb': sb['remotes']},
+        context=context,
+        timeout=ch_core.hookenv.action_get('timeout'))
+    table = format_table(
+        ('db', 'remote', 'connect', 'tls', 'echo', 'list_dbs', 'leader',
+         'error'),
+        ([result['db'], result['remote'],
+          result.get('connect', '-'), result.get('tls', '-'),
+          result.get('echo', '-'), result.get('list_dbs', '-'),
+          ','.join(result.get('leader', [])) or '-',
+          result.get('error', '')]
+         for result in results))
+    ch_core.hookenv.action_set({
+        'table': table,
+        'result': json.dumps(results, indent=2, sort_keys=True),
+        'unreachable': sum(1 for result in results if 'error' in result),
+    })
+
+
+def ovn_sync_health(args):
+    """Report OVN revision backlog and hash ring health.
+
+    :param args: Argument list
+    :type args: List[str]
+    """
+    try:
+        result = run_neutron_db_util('ovn-health')
+    except (subprocess.CalledProcessError, ValueError) as e:
+        ch_core.hookenv.action_fail(
+            'Unable to query the Neutron DB: {}'.format(e))
+        return
+    if sync_health.enabled():
+        sync_health.record(sync_health.summarize(result))
+        unitdata.kv().flush()
+    ch_core.hookenv.action_set({
+        'result': json.dumps(result, indent=2, sort_keys=True),
+        'hash-ring': format_table(
+            ('hostname', 'nodes', 'alive', 'last-seen'),
+            ([hostname, host['nodes'], host['alive'], host['last-seen']]
+             for hostname, host in sorted(result['hash-ring'].items()))),
+    })
+
+
+def rebalance_gateway_chassis(args):
+    """Rebalance gateway chassis priorities of existing router ports.
+
+    :param args: Argument list
+    :type args: List[str]
+    """
+    if not ch_core.hookenv.is_leader():
+        ch_core.hookenv.action_fail('This action must be run on the leader '
+                                    'unit.')
+        return
+    dry_run = not ch_core.hookenv.action_get('i-really-mean-it')
+    with ovsdb.Client(**get_ovn_connection()) as client:
+        groups = gateway.read_groups(client)
+        changes = gateway.plan(groups)
+        transactions = 0
+        if not dry_run:
+            transactions = gateway.apply(
+                client, changes,
+                batch_size=ch_core.hookenv.action_get('batch-size'))
+    loads = gateway.chassis_loads(groups, changes)
+    ch_core.hookenv.action_set({
+        'plan': format_table(
+            ('group', 'before', 'after'),
+            ([change['name'], ','.join(change['before']),
+              ','.join(change['after'])]
+             for change in changes)),
+        'loads': format_table(
+            ('chassis', 'before', 'after'),
+            ([chassis, load['before'], load['after']]
+             for chassis, load in loads.items())),
+        'result': json.dumps({
+            'groups': len(groups),
+            'changed': len(changes),
+            'transactions': transactions,
+        }, indent=2, sort_keys=True),
+    })
+
+
+def scale_report(args):
+    """Report resource counts with recommended settings for this scale.
+
+    :param args: Argument list
+    :type args: List[str]
+    """
+    apply = ch_core.hookenv.action_get('apply')
+    if apply and not ch_core.hookenv.is_leader():
+        ch_core.hookenv.action_fail('Recording the Northbound DB size with '
+                                    'apply=true must be run on the leader '
+                                    'unit.')
+        return
+    neutron_counts = run_neutron_db_util('counts')
+    with ovsdb.Client(**get_ovn_connection()) as client:
+        nb_counts = scale.nb_row_counts(client)
+    report = scale.report(neutron_counts, nb_counts,
+                          ch_core.hookenv.config())
+    if apply:
+        ch_core.hookenv.leader_set({
+            neutron_api_plugin_ovn.SCALE_NB_ROWS_KEY: str(report['nb-rows'])})
+    ch_core.hookenv.action_set({
+        'report': json.dumps(report, indent=2, sort_keys=True),
+    })
+
+
+def show_timings(args):
+    """Show time spent in handlers and charm methods per hook.
+
+    :param args: Argument list
+    :type args: List[str]
+    """
+    report = timings.report()
+    hook_name = ch_core.hookenv.action_get('hook')
+    if hook_name:
+        report = {hook_name: report.get(hook_name, {})}
+    ch_core.hookenv.action_set({
+        'timings': json.dumps(report, indent=2, sort_keys=True),
+    })
+
+
+def stage_ovn_packages(args):
+    """Download the packages of an OVN source upgrade ahead of time.
+
+    :param args: Argument list
+    :type args: List[str]
+    """
+    with charms_openstack.charm.provide_charm_instance() as instance:
+        if not hasattr(instance, 'stage_ovn_packages'):
+            ch_core.hookenv.action_fail(
+                'OVN packages are not installed by this charm on OpenStack '
+                '{}.'.format(instance.release.capitalize()))
+            return
+        try:
+            result = instance.stage_ovn_packages(
+                ch_core.hookenv.action_get('source') or None)
+        except (ValueError, ch_fetch.SourceConfigError) as e:
+            ch_core.hookenv.action_fail(str(e))
+            return
+        except subprocess.CalledProcessError as e:
+            ch_core.hookenv.action_fail(
+                'Downloading packages failed: {}'.format(e))
+            return
+    ch_core.hookenv.action_set({
+        'result': json.dumps(result, indent=2, sort_keys=True),
+    })
+
+
 ACTIONS = {
+    'apply-dhcp-global-options': apply_dhcp_global_options,
+    'apply-distributed-floating-ip': apply_distributed_floating_ip,
+    'cleanup-ovn-orphans': cleanup_ovn_orphans,
     'migrate-mtu': migrate_mtu,
     'migrate-ovn-db': migrate_ovn_db,
+    'migrate-to-ovn': migrate_to_ovn,
     'offline-neutron-morph-db': offline_neutron_morph_db,
+    'ovn-drift-report': ovn_drift_report,
+    'ovn-sync-health': ovn_sync_health,
+    'ovsdb-probe': ovsdb_probe,
+    'rebalance-gateway-chassis': rebalance_gateway_chassis,
+    'restore-offline-nb-db': restore_offline_nb_db,
+    'scale-report': scale_report,
+    'show-timings': show_timings,
+    'stage-ovn-packages': stage_ovn_packages,
+    'sync-geneve-allocations': sync_geneve_allocations,
 }
 
 
@@ -0,0 +1,799 @@
+#!/usr/bin/env python3
+
+# Copyright 2026 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""neutron_db_util
+
+Maintenance operations on the Neutron database used by the charm actions.
+
+The tool runs outside of the charm venv to consume the system Python
+``oslo.db`` and ``SQLAlchemy`` packages installed along with Neutron.  Results
+are written as JSON to stdout, progress and errors to stderr.
+
+Sub-commands:
+
+geneve-allocations
+    Populate the ``ml2_geneve_allocations`` table for the given VNI ranges
+    and remove unallocated rows outside of them.  neutron-server performs
+    the same synchronization on startup, doing it ahead of time in bounded
+    transactions keeps the following restart fast.  Allocated rows outside
+    of the ranges are left in place, as does Neutron.
+
+mark-changed
+    Mark the ``ovn_revision_numbers`` rows of resources created or updated
+    since a timestamp as inconsistent, adding missing rows.  The maintenance
+    task of neutron-server then reconciles exactly those resources with the
+    OVN Northbound DB on its next run, instead of a walk of every resource.
+
+mark-ids
+    Like ``mark-changed``, for the resources with the IDs read from stdin,
+    one per line, and print the number of IDs not found in Neutron.
+
+counts
+    Print the number of resources per type and of network segments per
+    network type, using aggregate queries.
+
+fingerprint
+    Print a digest of the revision state of all resources, which changes
+    whenever a resource is created, updated or deleted, or its OVN revision
+    is bumped.
+
+ovn-health
+    Print the number of resources whose OVN revision lags their Neutron
+    revision and of deletions pending, per resource type, the oldest lagging
+    change, and the number of live OVN hash ring nodes per neutron-server
+    host, using aggregate queries.
+
+dump
+    Stream records of a resource type ordered by ID, one JSON list of key and
+    value per line, for comparison with the OVN Northbound DB.  The value is
+    the revision number, the list of addresses for address sets, the MAC
+    address of the floating IP port for floating IP MACs, or null.
+"""
+
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import sys
+
+from oslo_db.sqlalchemy import session
+
+import sqlalchemy
+
+# Format of timestamps as stored by Neutron, in UTC.
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def parse_vni_ranges(value):
+    """Parse VNI ranges.
+
+    :param value: Comma delimited list of <vni_min>:<vni_max> tuples, as
+                  validated by the charm.
+    :type value: str
+    :returns: List of inclusive ranges.
+    :rtype: List[Tuple[int,int]]
+    :raises: ValueError
+    """
+    ranges = []
+    for entry in value.split(','):
+        vni_min, vni_max = (int(vni) for vni in entry.split(':'))
+        if vni_min > vni_max:
+            raise ValueError('invalid range "{}"'.format(entry))
+        ranges.append((vni_min, vni_max))
+    return ranges
+
+
+def timestamp(value):
+    """Validate timestamp argument.
+
+    :param value: Timestamp in UTC as ``YYYY-MM-DD HH:MM:SS``.
+    :type value: str
+    :returns: Timestamp
+    :rtype: str
+    :raises: argparse.ArgumentTypeError
+    """
+    try:
+        datetime.datetime.strptime(value, TIMESTAMP_FORMAT)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return value
+
+
+def outside_ranges_clause(ranges):
+    """Get SQL condition matching VNIs outside of ranges.
+
+    :param ranges: List of inclusive ranges.
+    :type ranges: List[Tuple[int,int]]
+    :returns: SQL condition
+    :rtype: str
+    """
+    return ' AND '.join(
+        'geneve_vni NOT BETWEEN {:d} AND {:d}'.format(vni_min, vni_max)
+        for vni_min, vni_max in ranges) or '1=1'
+
+
+def populate_geneve_allocations(db_session, ranges, chunk_size, commit):
+    """Insert missing rows for ranges, one transaction per chunk of VNIs.
+
+    :param db_session: SQLAlchemy DB Session object.
+    :type db_session: SQLAlchemy DB Session object.
+    :param ranges: List of inclusive ranges.
+    :type ranges: List[Tuple[int,int]]
+    :param chunk_size: Number of VNIs per chunk.
+    :type chunk_size: int
+    :param commit: Perform the inserts, otherwise only count them.
+    :type commit: bool
+    :returns: Number of rows inserted, or to insert, and number of chunks.
+    :rtype: Tuple[int,int]
+    """
+    select_stmt = sqlalchemy.text(
+        'SELECT geneve_vni FROM ml2_geneve_allocations '
+        'WHERE geneve_vni BETWEEN :low AND :high')
+    insert_stmt = sqlalchemy.text(
+        'INSERT INTO ml2_geneve_allocations (geneve_vni, allocated) '
+        'VALUES (:vni, 0)')
+    n_inserted = n_chunks = 0
+    for vni_min, vni_max in ranges:
+        for low in range(vni_min, vni_max + 1, chunk_size):
+            high = min(low + chunk_size - 1, vni_max)
+            existing = {
+                row[0]
+                for row in db_session.execute(
+                    select_stmt, {'low': low, 'high': high})
+            }
+            missing = [
+                {'vni': vni}
+                for vni in range(low, high + 1)
+                if vni not in existing
+            ]
+            if not missing:
+                continue
+            n_inserted += len(missing)
+            n_chunks += 1
+            if commit:
+                db_session.execute(insert_stmt, missing)
+                db_session.commit()
+                print('inserted {} rows for VNIs {}:{}'
+                      .format(len(missing), low, high), file=sys.stderr)
+    return n_inserted, n_chunks
+
+
+def prune_geneve_allocations(db_session, ranges, chunk_size, commit):
+    """Delete unallocated rows outside of ranges, one transaction per chunk.
+
+    :param db_session: SQLAlchemy DB Session object.
+    :type db_session: SQLAlchemy DB Session object.
+    :param ranges: List of inclusive ranges.
+    :type ranges: List[Tuple[int,int]]
+    :param chunk_size: Number of rows per chunk.
+    :type chunk_size: int
+    :param commit: Perform the deletes, otherwise only count them.
+    :type commit: bool
+    :returns: Number of rows deleted, or to delete, and number of chunks.
+    :rtype: Tuple[int,int]
+    """
+    outside = outside_ranges_clause(ranges)
+    if not commit:
+        stmt = sqlalchemy.text(
+            'SELECT COUNT(*) FROM ml2_geneve_allocations '
+            'WHERE allocated=0 AND {}'.format(outside))
+        n_deleted = db_session.execute(stmt).scalar()
+        return n_deleted, -(-n_deleted // chunk_size)
+
+    select_stmt = sqlalchemy.text(
+        'SELECT geneve_vni FROM ml2_geneve_allocations '
+        'WHERE geneve_vni > :last AND allocated=0 AND {} '
+        'ORDER BY geneve_vni LIMIT :limit'.format(outside))
+    delete_stmt = sqlalchemy.text(
+        'DELETE FROM ml2_geneve_allocations '
+        'WHERE allocated=0 AND geneve_vni IN :vnis').bindparams(
+            sqlalchemy.bindparam('vnis', expanding=True))
+    n_deleted = n_chunks = 0
+    last = 0
+    while True:
+        vnis = [
+            row[0]
+            for row in db_session.execute(
+                select_stmt, {'last': last, 'limit': chunk_size})
+        ]
+        if not vnis:
+            break
+        db_session.execute(delete_stmt, {'vnis': vnis})
+        db_session.commit()
+        print('deleted {} rows for VNIs {}:{}'
+              .format(len(vnis), vnis[0], vnis[-1]), file=sys.stderr)
+        n_deleted += len(vnis)
+        n_chunks += 1
+        last = vnis[-1]
+    return n_deleted, n_chunks
+
+
+def geneve_allocations(db_session, args):
+    """Synchronize the ``ml2_geneve_allocations`` table with VNI ranges.
+
+    :param db_session: SQLAlchemy DB Session object.
+    :type db_session: SQLAlchemy DB Session object.
+    :param args: Parsed command line arguments.
+    :type args: argparse.Namespace
+    :returns: Result
+    :rtype: Dict[str,any]
+    """
+    ranges = parse_vni_ranges(args.vni_ranges)
+    n_inserted, n_insert_chunks = populate_geneve_allocations(
+        db_session, ranges, args.chunk_size, args.commit)
+    n_deleted, n_delete_chunks = prune_geneve_allocations(
+        db_session, ranges, args.chunk_size, args.commit)
+    stmt = sqlalchemy.text(
+        'SELECT COUNT(*) FROM ml2_geneve_allocations '
+        'WHERE allocated=1 AND {}'.format(outside_ranges_clause(ranges)))
+    return {
+        'vni-ranges': args.vni_ranges,
+        'size': sum(vni_max - vni_min + 1 for vni_min, vni_max in ranges),
+        'inserted': n_inserted,
+        'deleted': n_deleted,
+        'chunks': n_insert_chunks + n_delete_chunks,
+        'allocated-outside-ranges': db_session.execute(stmt).scalar(),
+        'dry-run': not args.commit,
+    }
+
+
+# Neutron resource tables with the type used for them in
+# ``ovn_revision_numbers`` and a condition on the rows the OVN driver keeps
+# revisions for.  Router ports share the standard attributes of their port
+# and are covered by marking the rows of changed ports.  The OVN driver
+# does not create logical ports for floating IPs.
+REVISION_RESOURCES = (
+    ('networks', 'networks', None),
+    ('subnets', 'subnets', None),
+    ('ports', 'ports', "t.device_owner != 'network:floatingip'"),
+    ('routers', 'routers', None),
+    ('floatingips', 'floatingips', None),
+    ('securitygroups', 'security_groups', None),
+    ('securitygrouprules', 'security_group_rules', None),
+)
+# Revision number of rows of resources not yet created in the OVN Northbound
+# DB, as used by Neutron.
+INITIAL_REV_NUM = -1
+CHANGED_SINCE = 'COALESCE(sa.updated_at, sa.created_at) >= :since'
+
+
+def mark_existing_revisions(db_session, since, chunk_size, commit):
+    """Mark existing revision rows of changed resources, per chunk.
+
+    The rows are set one revision behind the resource, for the maintenance
+    task to compare the resource with the OVN Northbound DB and update it
+    there if needed, rather than taking the rows for resources never
+    created there.
+
+    :param db_session: SQLAlchemy DB Session object.
+    :type db_session: SQLAlchemy DB Session object.
+    :param since: Timestamp in UTC as ``YYYY-MM-DD HH:MM:SS``.
+    :type since: str
+    :param chunk_size: Number of resources per chunk.
+    :type chunk_size: int
+    :param commit: Mark the rows, otherwise only count them.
+    :type commit: bool
+    :returns: Number of changed and of already inconsistent rows per
+              resource type.
+    :rtype: Tuple[Dict[str,int],Dict[str,int]]
+    """
+    select_stmt = sqlalchemy.text(
+        'SELECT r.standard_attr_id, r.resource_type, '
+        'r.revision_number != sa.revision_number '
+        'FROM ovn_revision_numbers r '
+        'JOIN standardattributes sa ON sa.id = r.standard_attr_id '
+        'WHERE r.standard_attr_id > :last AND {} '
+        'ORDER BY r.standard_attr_id LIMIT :limit'.format(CHANGED_SINCE))
+    update_stmt = sqlalchemy.text(
+        'UPDATE ovn_revision_numbers '
+        'SET revision_number = ('
+        'SELECT sa.revision_number - 1 FROM standardattributes sa '
+        'WHERE sa.id = ovn_revision_numbers.standard_attr_id), '
+        'updated_at = NULL '
+        'WHERE standard_attr_id IN :ids').bindparams(
+            sqlalchemy.bindparam('ids', expanding=True))
+    changed = {}
+    inconsistent = {}
+    last = 0
+    while True:
+        rows = db_session.execute(
+            select_stmt,
+            {'last': last, 'since': since, 'limit': chunk_size}).fetchall()
+        if not rows:
+            break
+        # Rows for router ports share the ID of their port, leave rows of
+        # an ID the limit may have split to the next chunk.
+        if len(rows) == chunk_size and rows[0][0] != rows[-1][0]:
+            rows = [row for row in rows if row[0] != rows[-1][0]]
+        for _, resource_type, is_inconsistent in rows:
+            changed[resource_type] = changed.get(resource_type, 0) + 1
+            if is_inconsistent:
+                inconsistent[resource_type] = (
+                    inconsistent.get(resource_type, 0) + 1)
+        ids = sorted({row[0] for row in rows})
+        if commit:
+            db_session.execute(update_stmt, {'ids': ids})
+            db_session.commit()
+            print('marked {} rows for resources {}:{}'
+                  .format(len(rows), ids[0], ids[-1]), file=sys.stderr)
+        last = ids[-1]
+    return changed, inconsistent
+
+
+def add_missing_revisions(db_session, since, chunk_size, commit):
+    """Add revision rows missing for changed resources, per chunk.
+
+    The rows are added with the initial revision, as Neutron does before
+    creating a resource in the OVN Northbound DB.  The maintenance task
+    updates resources it finds there instead.
+
+    :param db_session: SQLAlchemy DB Session object.
+    :type db_session: SQLAlchemy DB Session object.
+    :param since: Timestamp in UTC as ``YYYY-MM-DD HH:MM:SS``.
+    :type since: str
+    :param chunk_size: Number of resources per chunk.
+    :type chunk_size: int
+    :param commit: Add the rows, otherwise only count them.
+    :type commit: bool
+    :returns: Number of rows added, or to add, per resource type.
+    :rtype: Dict[str,int]
+    """
+    insert_stmt = sqlalchemy.text(
+        'INSERT INTO ovn_revision_numbers '
+        '(standard_attr_id, resource_uuid, resource_type, revision_number, '
+        'created_at) VALUES (:id, :uuid, :type, :revision, :now)')
+    now = datetime.datetime.utcnow().strftime(TIMESTAMP_FORMAT)
+    missing = {}
+    for table, resource_type, condition in REVISION_RESOURCES:
+        select_stmt = sqlalchemy.text(
+            'SELECT sa.id, t.id FROM {} t '
+            'JOIN standardattributes sa ON sa.id = t.standard_attr_id '
+            'LEFT JOIN ovn_revision_numbers r '
+            'ON r.standard_attr_id = sa.id AND r.resource_type = :type '
+            'WHERE r.standard_attr_id IS NULL AND sa.id > :last AND {}{} '
+            'ORDER BY sa.id LIMIT :limit'.format(
+                table, CHANGED_SINCE,
+                ' AND {}'.format(condition) if condition else ''))
+        last = 0
+        while True:
+            rows = db_session.execute(
+                select_stmt,
+                {'type': resource_type, 'last': last, 'since': since,
+                 'limit': chunk_size}).fetchall()
+            if not rows:
+                break
+            missing[resource_type] = missing.get(resource_type, 0) + len(rows)
+            if commit:
+                db_session.execute(insert_stmt, [
+                    {'id': std_attr_id, 'uuid': uuid, 'type': resource_type,
+                     'revision': INITIAL_REV_NUM, 'now': now}
+                    for std_attr_id, uuid in rows
+                ])
+                db_session.commit()
+                print('added {} rows for {}'.format(len(rows), resource_type),
+                      file=sys.stderr)
+            last = rows[-1][0]
+    return missing
+
+
+def mark_changed(db_session, args):
+    """Mark resources changed since a timestamp for OVN maintenance.
+
+    :param db_session: SQLAlchemy DB Session object.
+    :type db_session: SQLAlchemy DB Session object.
+    :param args: Parsed command line arguments.
+    :type args: argparse.Namespace
+    :returns: Result
+    :rtype: Dict[str,any]
+    """
+    changed, inconsistent = mark_existing_revisions(
+        db_session, args.since, args.chunk_size, args.commit)
+    missing = add_missing_revisions(
+        db_session, args.since, args.chunk_size, args.commit)
+    return {
+        'since': args.since,
+        'changed': changed,
+        'inconsistent': inconsistent,
+        'missing': missing,
+        'marked': sum(changed.values()) + sum(missing.values()),
+        'dry-run': not args.commit,
+    }
+
+
+def mark_resources(db_session, ids, chunk_size, commit):
+    """Mark the revision rows of resources with the given IDs, per chunk.
+
+    Existing rows are set one revision behind the resource and missing rows
+    are added with the initial revision, like ``mark_existing_revisions``
+    and ``add_missing_revisions`` do for changed resources.
+
+    :param db_session: SQLAlchemy DB Session object.
+    :type db_session: SQLAlchemy DB Session object.
+    :param ids: Resource IDs
+    :type ids: List[str]
+    :param chunk_size: Number of resources per chunk.
+    :type chunk_size: int
+    :param commit: Mark the rows, otherwise only count them.
+    :type commit: bool
+    :returns: Number of existing rows and of rows added, or to add, per
+              resource type, and IDs not found.
+    :rtype: Tuple[Dict[str,int],Dict[str,int],List[str]]
+    """
+    select_existing_stmt = sqlalchemy.text(
+        'SELECT standard_attr_id, resource_type, resource_uuid '
+        'FROM ovn_revision_numbers WHERE resource_uuid IN :ids').bindparams(
+            sqlalchemy.bindparam('ids', expanding=True))
+    update_stmt = sqlalchemy.text(
+        'UPDATE ovn_revision_numbers '
+        'SET revision_number = ('
+        'SELECT sa.revision_number - 1 FROM standardattributes sa '
+        'WHERE sa.id = ovn_revision_numbers.standard_attr_id), '
+        'updated_at = NULL '
+        'WHERE resource_uuid IN :ids').bindparams(
+            sqlalchemy.bindparam('ids', expanding=True))
+    insert_stmt = sqlalchemy.text(
+        'INSERT INTO ovn_revision_numbers '
+        '(standard_attr_id, resource_uuid, resource_type, revision_number, '
+        'created_at) VALUES (:id, :uuid, :type, :revision, :now)')
+    select_missing_stmts = [
+        (resource_type, sqlalchemy.text(
+            'SELECT sa.id, t.id FROM {} t '
+            'JOIN standardattributes sa ON sa.id = t.standard_attr_id '
+            'LEFT JOIN ovn_revision_numbers r '
+            'ON r.standard_attr_id = sa.id AND r.resource_type = :type '
+            'WHERE r.standard_attr_id IS NULL AND t.id IN :ids{}'.format(
+                table, ' AND {}'.format(condition) if condition else '')
+        ).bindparams(sqlalchemy.bindparam('ids', expanding=True)))
+        for table, resource_type, condition in REVISION_RESOURCES
+    ]
+    now = datetime.datetime.utcnow().strftime(TIMESTAMP_FORMAT)
+    changed = {}
+    missing = {}
+    found = set()
+    for start in range(0, len(ids), chunk_size):
+        chunk = ids[start:start + chunk_size]
+        for _, resource_type, uuid in db_session.execute(
+                select_existing_stmt, {'ids': chunk}):
+            changed[resource_type] = changed.get(resource_type, 0) + 1
+            found.add(uuid)
+        if commit:
+            db_session.execute(update_stmt, {'ids': chunk})
+        for resource_type, select_stmt in select_missing_stmts:
+            rows = db_session.execute(
+                select_stmt, {'type': resource_type, 'ids': chunk}).fetchall()
+            if not rows:
+                continue
+            missing[resource_type] = missing.get(resource_type, 0) + len(rows)
+            found.update(uuid for _, uuid in rows)
+            if commit:
+                db_session.execute(insert_stmt, [
+                    {'id': std_attr_id, 'uuid': uuid, 'type': resource_type,
+                     'revision': INITIAL_REV_NUM, 'now': now}
+                    for std_attr_id, uuid in rows
+                ])
+        if commit:
+            db_session.commit()
+            print('marked resources {}:{}'.format(chunk[0], chunk[-1]),
+                  file=sys.stderr)
+    return changed, missing, [uuid for uuid in ids if uuid not in found]
+
+
+def mark_ids(db_session, args):
+    """Mark resources with IDs read from stdin for OVN maintenance.
+
+    :param db_session: SQLAlchemy DB Session object.
+    :type db_session: SQLAlchemy DB Session object.
+    :param args: Parsed command line arguments.
+    :type args: argparse.Namespace
+    :returns: Result
+    :rtype: Dict[str,any]
+    """
+    ids = sorted(set(line.strip() for line in sys.stdin if line.strip()))
+    changed, missing, not_found = mark_resources(
+        db_session, ids, args.chunk_size, args.commit)
+    return {
+        'ids': len(ids),
+        'changed': changed,
+        'missing': missing,
+        'not-found': len(not_found),
+        'marked': sum(changed.values()) + sum(missing.values()),
+        'dry-run': not args.commit,
+    }
+
+
+COUNT_QUERIES = {
+    'networks': 'SELECT COUNT(*) FROM networks',
+    'subnets': 'SELECT COUNT(*) FROM subnets',
+    'ports': 'SELECT COUNT(*) FROM ports',
+    'compute-ports': (
+        "SELECT COUNT(*) FROM ports WHERE device_owner LIKE 'compute:%'"),
+    'routers': 'SELECT COUNT(*) FROM routers',
+    'floatingips': 'SELECT COUNT(*) FROM floatingips',
+    'security-groups': 'SELECT COUNT(*) FROM securitygroups',
+    'security-group-rules': 'SELECT COUNT(*) FROM securitygrouprules',
+}
+
+
+def counts(db_session, args):
+    """Count resources.
+
+    :param db_session: SQLAlchemy DB Session object.
+    :type db_session: SQLAlchemy DB Session object.
+    :param args: Parsed command line arguments.
+    :type args: argparse.Namespace
+    :returns: Result
+    :rtype: Dict[str,any]
+    """
+    result = {
+        name: db_session.execute(sqlalchemy.text(query)).scalar()
+        for name, query in COUNT_QUERIES.items()
+    }
+    result['segments'] = {
+        network_type: count
+        for network_type, count in db_session.execute(sqlalchemy.text(
+            'SELECT network_type, COUNT(*) FROM networksegments '
+            'GROUP BY network_type'))
+    }
+    return result
+
+
+FINGERPRINT_QUERIES = {
+    'standardattributes': (
+        'SELECT COUNT(*), MAX(id), SUM(revision_number), MAX(created_at), '
+        'MAX(updated_at) FROM standardattributes'),
+    'ovn_revision_numbers': (
+        'SELECT COUNT(*), SUM(revision_number), MAX(created_at), '
+        'MAX(updated_at) FROM ovn_revision_numbers'),
+}
+
+
+def fingerprint(db_session, args):
+    """Get digest of the revision state of all resources.
+
+    :param db_session: SQLAlchemy DB Session object.
+    :type db_session: SQLAlchemy DB Session object.
+    :param args: Parsed command line arguments.
+    :type args: argparse.Namespace
+    :returns: Result
+    :rtype: Dict[str,any]
+    """
+    state = {
+        table: [
+            str(value) if value is not None else None
+            for value in db_session.execute(sqlalchemy.text(query)).first()
+        ]
+        for table, query in FINGERPRINT_QUERIES.items()
+    }
+    digest = hashlib.sha256(json.dumps(state, sort_keys=True).encode('utf-8'))
+    return {
+        'fingerprint': 'sha256:{}'.format(digest.hexdigest()),
+        'state': state,
+    }
+
+
+# Seconds after which neutron-server considers a hash ring node dead if it
+# has not updated it, ``HASH_RING_NODES_TIMEOUT`` in Neutron.
+HASH_RING_NODES_TIMEOUT = 60
+
+
+def ovn_health(db_session, args):
+    """Get OVN revision backlog and hash ring health.
+
+    :param db_session: SQLAlchemy DB Session object.
+    :type db_session: SQLAlchemy DB Session object.
+    :param args: Parsed command line arguments.
+    :type args: argparse.Namespace
+    :returns: Result
+    :rtype: Dict[str,any]
+    """
+    backlog = {}
+    oldest = None
+    for resource_type, count, updated_at in db_session.execute(
+            sqlalchemy.text(
+                'SELECT r.resource_type, COUNT(*), '
+                'MIN(COALESCE(sa.updated_at, sa.created_at)) '
+                'FROM ovn_revision_numbers r '
+                'JOIN standardattributes sa ON sa.id = r.standard_attr_id '
+                'WHERE r.revision_number < sa.revision_number '
+                'GROUP BY r.resource_type')):
+        backlog[resource_type] = count
+        if updated_at is not None:
+            oldest = min(oldest or updated_at, updated_at)
+    # Rows of deleted resources lose their standard attributes and are
+    # removed once the resources have been deleted from OVN.
+    pending_deletes = {
+        resource_type: count
+        for resource_type, count in db_session.execute(sqlalchemy.text(
+            'SELECT resource_type, COUNT(*) FROM ovn_revision_numbers '
+            'WHERE standard_attr_id IS NULL GROUP BY resource_type'))
+    }
+    cutoff = (datetime.datetime.utcnow() - datetime.timedelta(
+        seconds=HASH_RING_NODES_TIMEOUT)).strftime(TIMESTAMP_FORMAT)
+    hash_ring = {
+        hostname: {
+            'nodes': nodes,
+            'alive': int(alive or 0),
+            'last-seen': str(last_seen) if last_seen else None,
+        }
+        for hostname, nodes, alive, last_seen in db_session.execute(
+            sqlalchemy.text(
+                'SELECT hostname, COUNT(*), '
+                'SUM(CASE WHEN updated_at >= :cutoff THEN 1 ELSE 0 END), '
+                'MAX(updated_at) FROM ovn_hash_ring GROUP BY hostname'),
+            {'cutoff': cutoff})
+    }
+    return {
+        'backlog': backlog,
+        'pending-deletes': pending_deletes,
+        'oldest-lagging': str(oldest) if oldest else None,
+        'hash-ring': hash_ring,
+    }
+
+
+DUMP_QUERIES = {
+    'networks': (
+        'SELECT n.id, sa.revision_number FROM networks n '
+        'JOIN standardattributes sa ON sa.id = n.standard_attr_id '
+        'ORDER BY n.id'),
+    'ports': (
+        # The OVN driver does not create logical ports for floating IPs.
+        'SELECT p.id, sa.revision_number FROM ports p '
+        'JOIN standardattributes sa ON sa.id = p.standard_attr_id '
+        "WHERE p.device_owner != 'network:floatingip' "
+        'ORDER BY p.id'),
+    'routers': (
+        'SELECT r.id, sa.revision_number FROM routers r '
+        'JOIN standardattributes sa ON sa.id = r.standard_attr_id '
+        'ORDER BY r.id'),
+    'security_groups': (
+        'SELECT id, NULL FROM securitygroups ORDER BY id'),
+    'security_group_rules': (
+        'SELECT id, NULL FROM securitygrouprules ORDER BY id'),
+    'address_sets': (
+        'SELECT sg.id, ip.ip_address FROM securitygroups sg '
+        'LEFT JOIN securitygroupportbindings b '
+        'ON b.security_group_id = sg.id '
+        'LEFT JOIN ipallocations ip ON ip.port_id = b.port_id '
+        'ORDER BY sg.id'),
+    'floating_ip_macs': (
+        'SELECT fip.id, p.mac_address FROM floatingips fip '
+        'JOIN ports p ON p.id = fip.floating_port_id '
+        'ORDER BY fip.id'),
+}
+
+
+def address_set_records(rows):
+    """Group security group addresses into per address family records.
+
+    :param rows: Security group ID and address, or None, ordered by ID.
+    :type rows: Iterable[Tuple[str,Optional[str]]]
+    :returns: Iterator of records keyed by security group ID and family.
+    :rtype: Iterator[Tuple[Tuple[str,str],List[str]]]
+    """
+    current = None
+    addresses = {'ip4': set(), 'ip6': set()}
+    for sg_id, address in rows:
+        if sg_id != current:
+            if current is not None:
+                for family in ('ip4', 'ip6'):
+                    yield (current, family), sorted(addresses[family])
+            current = sg_id
+            addresses = {'ip4': set(), 'ip6': set()}
+        if address:
+            addresses['ip6' if ':' in address else 'ip4'].add(address)
+    if current is not None:
+        for family in ('ip4', 'ip6'):
+            yield (current, family), sorted(addresses[family])
+
+
+def dump(db_session, args):
+    """Write records of a resource type to stdout.
+
+    :param db_session: SQLAlchemy DB Session object.
+    :type db_session: SQLAlchemy DB Session object.
+    :param args: Parsed command line arguments.
+    :type args: argparse.Namespace
+    :returns: None, records are written as they are read.
+    :rtype: None
+    """
+    stmt = sqlalchemy.text(DUMP_QUERIES[args.resource]).execution_options(
+        stream_results=True)
+    rows = (tuple(row) for row in db_session.execute(stmt))
+    if args.resource == 'address_sets':
+        rows = address_set_records(rows)
+    for record in rows:
+        sys.stdout.write(json.dumps(record) + '\n')
+    sys.stdout.flush()
+
+
+def main(argv):
+    """Main function.
+
+    :param argv: Argument list
+    :type argv: List[str]
+    :returns: POSIX exit code
+    :rtype: int
+    """
+    parser = argparse.ArgumentParser(
+        prog=os.path.basename(argv[0]),
+        description='Maintenance operations on the Neutron database.')
+    parser.add_argument('connection', help='Database connection string')
+    subparsers = parser.add_subparsers(dest='command')
+    subparser = subparsers.add_parser(
+        'geneve-allocations',
+        help='Synchronize ml2_geneve_allocations with VNI ranges.')
+    subparser.add_argument('vni_ranges',
+                           help='Comma delimited <vni_min>:<vni_max> tuples')
+    subparser.add_argument('--chunk-size', type=int, default=10000,
+                           help='Number of rows per transaction')
+    subparser.add_argument('--commit', action='store_true',
+                           help='Perform changes, the default is a dry run')
+    subparser.set_defaults(func=geneve_allocations)
+    subparser = subparsers.add_parser(
+        'mark-changed',
+        help='Mark resources changed since a timestamp for OVN maintenance.')
+    subparser.add_argument('since', type=timestamp,
+                           help='Timestamp in UTC as "YYYY-MM-DD HH:MM:SS"')
+    subparser.add_argument('--chunk-size', type=int, default=10000,
+                           help='Number of rows per transaction')
+    subparser.add_argument('--commit', action='store_true',
+                           help='Perform changes, the default is a dry run')
+    subparser.set_defaults(func=mark_changed)
+    subparser = subparsers.add_parser(
+        'mark-ids',
+        help='Mark resources with IDs read from stdin for OVN maintenance.')
+    subparser.add_argument('--chunk-size', type=int, default=10000,
+                           help='Number of resources per transaction')
+    subparser.add_argument('--commit', action='store_true',
+                           help='Perform changes, the default is a dry run')
+    subparser.set_defaults(func=mark_ids)
+    subparser = subparsers.add_parser(
+        'counts', help='Print the number of resources per type.')
+    subparser.set_defaults(func=counts)
+    subparser = subparsers.add_parser(
+        'fingerprint', help='Print digest of the revision state.')
+    subparser.set_defaults(func=fingerprint)
+    subparser = subparsers.add_parser(
+        'ovn-health', help='Print OVN revision backlog and hash ring health.')
+    subparser.set_defaults(func=ovn_health)
+    subparser = subparsers.add_parser(
+        'dump', help='Stream records of a resource type ordered by ID.')
+    subparser.add_argument('resource', choices=sorted(DUMP_QUERIES))
+    subparser.set_defaults(func=dump)
+    args = parser.parse_args(argv[1:])
+    if not getattr(args, 'func', None):
+        parser.print_usage(file=sys.stderr)
+        return os.EX_USAGE
+    if getattr(args, 'chunk_size', 1) < 1:
+        parser.error('chunk size must be a positive integer')
+
+    db_engine = session.create_engine(args.connection)
+    db_maker = session.get_maker(db_engine, autocommit=False)
+    db_session = db_maker(bind=db_engine)
+    try:
+        result = args.func(db_session, args)
+    finally:
+        db_session.rollback()
+        db_session.close()
+        db_engine.dispose()
+    if result is not None:
+        print(json.dumps(result, sort_keys=True))
+    return os.EX_OK
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
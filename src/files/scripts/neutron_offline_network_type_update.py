@@ -45,6 +45,19 @@ with `openstack network set` throwing error messages about networks of type
 After running this script said networks will have their `network_type` field
 changed to 'geneve' which will fix the above described problems.
 
+With the '--preserve-vni' option networks keep their segmentation ID when it is
+within the configured geneve VNI ranges and free there, only the others get a
+newly allocated VNI.  This keeps the IDs visible to the end user stable and
+saves looking up a free VNI for most networks.
+
+In 'rehearse' mode the `networksegments` and `ml2_*_allocations` tables are
+copied into a local SQLite snapshot with read-only keyset-paginated reads and
+the morph is run against the snapshot instead. The measured durations and the
+VNI usage before and after the morph are written as JSON to stdout, which
+allows planning the maintenance window with the data of the actual cloud while
+neutron-server is still running. SQLite is not the production database engine,
+the duration is a forecast.
+
 NOTE: Use this script with caution, it is of absolute importance that the
       `neutron-server` process is stopped while the script is running.
 
@@ -57,13 +70,50 @@ NOTE: While we regularly exercise the script as part of our functional testing
 0: https://github.com/ovn-org/ovn/blob/1e07781310d8155997672bdce01a2ff4f5a93e83/northd/ovn-northd.c#L1188-L1268
 """  # noqa
 
+import json
 import os
 import sys
+import tempfile
+import time
 
 from oslo_db.sqlalchemy import session
 
 import sqlalchemy
 
+# Number of rows read per query when taking a snapshot.
+PAGE_SIZE = 10000
+# Tables copied into the rehearsal snapshot, with their key and columns.
+SNAPSHOT_TABLES = (
+    ('networksegments', 'id',
+     ('id', 'network_id', 'network_type', 'physical_network',
+      'segmentation_id')),
+    ('ml2_gre_allocations', 'gre_id', ('gre_id', 'allocated')),
+    ('ml2_vxlan_allocations', 'vxlan_vni', ('vxlan_vni', 'allocated')),
+    ('ml2_geneve_allocations', 'geneve_vni', ('geneve_vni', 'allocated')),
+)
+# Schema of the snapshot, with the indexes Neutron creates on the columns
+# the morph queries.
+SNAPSHOT_SCHEMA = (
+    'CREATE TABLE networksegments ('
+    '  id VARCHAR(36) NOT NULL PRIMARY KEY,'
+    '  network_id VARCHAR(36) NOT NULL,'
+    '  network_type VARCHAR(32) NOT NULL,'
+    '  physical_network VARCHAR(64),'
+    '  segmentation_id INTEGER)',
+    'CREATE INDEX ix_networksegments_network_id '
+    'ON networksegments (network_id)',
+) + tuple(
+    statement
+    for table, key in (('ml2_gre_allocations', 'gre_id'),
+                       ('ml2_vxlan_allocations', 'vxlan_vni'),
+                       ('ml2_geneve_allocations', 'geneve_vni'))
+    for statement in (
+        'CREATE TABLE {} ({} INTEGER NOT NULL PRIMARY KEY, '
+        'allocated BOOLEAN NOT NULL DEFAULT 0)'.format(table, key),
+        'CREATE INDEX ix_{0}_allocated ON {0} (allocated)'.format(table),
+    )
+)
+
 
 class NotFound(Exception):
     pass
@@ -81,18 +131,40 @@ def main(argv):
     if len(argv) < 2:
         usage(program)
         return os.EX_USAGE
-    elif len(argv) < 3 or argv[2] != 'morph':
+    elif len(argv) < 3 or argv[2] not in ('morph', 'rehearse'):
         print('DRY-RUN, WILL NOT COMMIT TRANSACTION')
 
+    preserve = '--preserve-vni' in argv[3:]
     db_engine = session.create_engine(argv[1])
     db_maker = session.get_maker(db_engine, autocommit=False)
     db_session = db_maker(bind=db_engine)
 
+    if len(argv) > 2 and argv[2] == 'rehearse':
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                result = rehearse(db_session,
+                                  os.path.join(tmpdir, 'snapshot.db'),
+                                  preserve=preserve)
+        finally:
+            db_session.rollback()
+            db_session.close()
+            db_engine.dispose()
+        print(json.dumps(result, sort_keys=True))
+        return os.EX_OK
+
     to_network_type = 'geneve'
+    n_preserved = {}
+    # segmentation IDs are preserved for all network types before allocating
+    # any VNI, so that no allocation takes an ID another network could keep.
+    for network_type in ('gre', 'vxlan'):
+        n_preserved[network_type] = preserve_segments(
+            db_session, network_type, to_network_type) if preserve else 0
     for network_type in ('gre', 'vxlan'):
         n_morphed = morph_networks(db_session, network_type, to_network_type)
-        print('Morphed {} networks of type {} to {}.'
-              .format(n_morphed, network_type, to_network_type))
+        print('Morphed {} networks of type {} to {}, {} of them keeping '
+              'their segmentation ID.'
+              .format(n_morphed + n_preserved[network_type], network_type,
+                      to_network_type, n_preserved[network_type]))
 
     if len(argv) < 3 or argv[2] != 'morph':
         print('DRY-RUN, WILL NOT COMMIT TRANSACTION')
@@ -110,7 +182,7 @@ def usage(program):
     :param program: Name of program
     :type program: str
     """
-    print('usage {} db-connection-string [morph]\n'
+    print('usage {} db-connection-string [morph|rehearse] [--preserve-vni]\n'
           '\n'
           'Morph non-physical networks of type "gre" and "vxlan" into '
           'geneve networks.\n'
@@ -124,6 +196,12 @@ def usage(program):
           'The second argument must be the literal string "morph" for the\n'
           'tool to perform an action, otherwise it will not commit the\n'
           'transaction to the database, effectively performing a dry run.\n'
+          '\n'
+          'With "rehearse" the morph is performed on a local snapshot of the\n'
+          'tables it uses, reporting its duration and the VNI usage as JSON.\n'
+          '\n'
+          'With "--preserve-vni" networks keep their segmentation ID when it\n'
+          'is free in the geneve VNI ranges.\n'
           ''.format(program),
           file=sys.stderr)
 
@@ -181,6 +259,28 @@ def allocate_segment(db_session, network_type):
     return vni
 
 
+def claim_segment(db_session, network_type, vni):
+    """Allocate a specific VNI for network_type if it is free.
+
+    :param db_session: SQLAlchemy DB Session object.
+    :type db_session: SQLAlchemy DB Session object.
+    :param network_type: Network type to allocate vni for.
+    :type network_type: str
+    :param vni: VNI
+    :type vni: int
+    :returns: Whether the VNI was allocated, it is not when outside of the
+              configured ranges or allocated already.
+    :rtype: bool
+    """
+    alloc_table = 'ml2_{}_allocations'.format(network_type)
+    vni_row = vni_row_name(network_type)
+
+    stmt = sqlalchemy.text(
+        'UPDATE {} SET allocated=1 WHERE {}=:vni AND allocated=0'
+        .format(alloc_table, vni_row))
+    return db_session.execute(stmt, {'vni': vni}).rowcount == 1
+
+
 def deallocate_segment(db_session, network_type, vni):
     """Deallocate VNI for network_type.
 
@@ -224,7 +324,8 @@ def get_network_segments(db_session, network_type):
             yield row
 
 
-def morph_networks(db_session, from_network_type, to_network_type):
+def morph_networks(db_session, from_network_type, to_network_type,
+                   verbose=True):
     """Morph all networks of one network type to another.
 
     :param db_session: SQLAlchemy DB Session object.
@@ -233,6 +334,8 @@ def morph_networks(db_session, from_network_type, to_network_type):
     :type from_network_type: str
     :param to_network_type: Network type to morph to.
     :type to_network_type: str
+    :param verbose: Print every segment changed.
+    :type verbose: bool
     :returns: Number of networks morphed
     :rtype: int
     """
@@ -249,13 +352,191 @@ def morph_networks(db_session, from_network_type, to_network_type):
             'new_vni': new_vni,
             'id': segment_id,
         })
-        print('segment {} for network {} changed from {}:{} to {}:{}'
-              .format(segment_id, network_id, network_type, vni,
-                      to_network_type, new_vni))
+        if verbose:
+            print('segment {} for network {} changed from {}:{} to {}:{}'
+                  .format(segment_id, network_id, network_type, vni,
+                          to_network_type, new_vni))
         deallocate_segment(db_session, from_network_type, vni)
         n_morphed += 1
     return n_morphed
 
 
+def preserve_segments(db_session, from_network_type, to_network_type,
+                      verbose=True):
+    """Morph networks whose segmentation ID is free for the new type.
+
+    The networks left are morphed with a newly allocated VNI by
+    ``morph_networks``.
+
+    :param db_session: SQLAlchemy DB Session object.
+    :type db_session: SQLAlchemy DB Session object.
+    :param from_network_type: Network type to morph from.
+    :type from_network_type: str
+    :param to_network_type: Network type to morph to.
+    :type to_network_type: str
+    :param verbose: Print every segment changed.
+    :type verbose: bool
+    :returns: Number of networks morphed
+    :rtype: int
+    """
+    stmt = sqlalchemy.text(
+        'UPDATE networksegments '
+        'SET network_type=:new_network_type '
+        'WHERE id=:id')
+    n_preserved = 0
+    for segment_id, network_id, network_type, vni in list(
+            get_network_segments(db_session, from_network_type)):
+        if not claim_segment(db_session, to_network_type, vni):
+            continue
+        db_session.execute(stmt, {
+            'new_network_type': to_network_type,
+            'id': segment_id,
+        })
+        if verbose:
+            print('segment {} for network {} changed from {}:{} to {}:{}'
+                  .format(segment_id, network_id, network_type, vni,
+                          to_network_type, vni))
+        deallocate_segment(db_session, from_network_type, vni)
+        n_preserved += 1
+    return n_preserved
+
+
+def copy_table(source_session, target_session, table, key, columns,
+               page_size=PAGE_SIZE):
+    """Copy rows of a table with keyset-paginated reads.
+
+    Every page is read with its own query ordered by the key, starting after
+    the last key read, which keeps each read short and uses the primary key
+    index instead of scanning with an offset.
+
+    :param source_session: SQLAlchemy DB Session object to read from.
+    :type source_session: SQLAlchemy DB Session object.
+    :param target_session: SQLAlchemy DB Session object to write to.
+    :type target_session: SQLAlchemy DB Session object.
+    :param table: Table name
+    :type table: str
+    :param key: Primary key column
+    :type key: str
+    :param columns: Columns to copy, including the key.
+    :type columns: Tuple[str]
+    :param page_size: Number of rows per read.
+    :type page_size: int
+    :returns: Number of rows copied
+    :rtype: int
+    """
+    select = 'SELECT {} FROM {} {{}} ORDER BY {} LIMIT :limit'.format(
+        ','.join(columns), table, key)
+    first_stmt = sqlalchemy.text(select.format(''))
+    next_stmt = sqlalchemy.text(select.format(
+        'WHERE {} > :last'.format(key)))
+    insert_stmt = sqlalchemy.text('INSERT INTO {} ({}) VALUES ({})'.format(
+        table, ','.join(columns),
+        ','.join(':{}'.format(column) for column in columns)))
+    key_index = columns.index(key)
+    n_copied = 0
+    last = None
+    while True:
+        if last is None:
+            rows = source_session.execute(
+                first_stmt, {'limit': page_size}).fetchall()
+        else:
+            rows = source_session.execute(
+                next_stmt, {'last': last, 'limit': page_size}).fetchall()
+        if not rows:
+            break
+        target_session.execute(
+            insert_stmt, [dict(zip(columns, row)) for row in rows])
+        n_copied += len(rows)
+        last = rows[-1][key_index]
+        print('copied {} rows of {}'.format(n_copied, table), file=sys.stderr)
+    return n_copied
+
+
+def vni_usage(db_session):
+    """Count total and allocated VNIs per tunnel network type.
+
+    :param db_session: SQLAlchemy DB Session object.
+    :type db_session: SQLAlchemy DB Session object.
+    :returns: Total, allocated and free VNIs per network type.
+    :rtype: Dict[str,Dict[str,int]]
+    """
+    result = {}
+    for network_type in ('gre', 'vxlan', 'geneve'):
+        total, allocated = db_session.execute(sqlalchemy.text(
+            'SELECT COUNT(*), COALESCE(SUM(allocated), 0) '
+            'FROM ml2_{}_allocations'.format(network_type))).fetchone()
+        result[network_type] = {
+            'total': total,
+            'allocated': allocated,
+            'free': total - allocated,
+        }
+    return result
+
+
+def rehearse(source_session, path, to_network_type='geneve',
+             preserve=False):
+    """Morph networks in a local snapshot and measure the duration.
+
+    Running out of VNIs is reported in the result, as it would make the
+    actual morph fail.
+
+    :param source_session: SQLAlchemy DB Session object of the Neutron DB,
+                           only read from.
+    :type source_session: SQLAlchemy DB Session object.
+    :param path: Path of the SQLite snapshot to create.
+    :type path: str
+    :param to_network_type: Network type to morph to.
+    :type to_network_type: str
+    :param preserve: Keep segmentation IDs free for the new type.
+    :type preserve: bool
+    :returns: Rows copied, segments to morph, morphed and morphed keeping
+              their segmentation ID per network type, durations in seconds
+              and VNI usage before and after the morph.
+    :rtype: Dict[str,any]
+    """
+    snapshot_engine = session.create_engine('sqlite:///{}'.format(path))
+    snapshot_maker = session.get_maker(snapshot_engine, autocommit=False)
+    snapshot_session = snapshot_maker(bind=snapshot_engine)
+    result = {'rows': {}, 'morphed': {}, 'preserved': {}, 'seconds': {}}
+    try:
+        start = time.monotonic()
+        for statement in SNAPSHOT_SCHEMA:
+            snapshot_session.execute(sqlalchemy.text(statement))
+        for table, key, columns in SNAPSHOT_TABLES:
+            result['rows'][table] = copy_table(
+                source_session, snapshot_session, table, key, columns)
+        snapshot_session.commit()
+        result['seconds']['snapshot'] = round(time.monotonic() - start, 3)
+        result['vnis_before'] = vni_usage(snapshot_session)
+        result['segments'] = {
+            network_type: snapshot_session.execute(sqlalchemy.text(
+                'SELECT COUNT(*) FROM networksegments '
+                'WHERE physical_network IS NULL AND '
+                '      network_type=:network_type'),
+                {'network_type': network_type}).scalar()
+            for network_type in ('gre', 'vxlan')
+        }
+
+        start = time.monotonic()
+        for network_type in ('gre', 'vxlan'):
+            result['preserved'][network_type] = preserve_segments(
+                snapshot_session, network_type, to_network_type,
+                verbose=False) if preserve else 0
+        try:
+            for network_type in ('gre', 'vxlan'):
+                result['morphed'][network_type] = morph_networks(
+                    snapshot_session, network_type, to_network_type,
+                    verbose=False) + result['preserved'][network_type]
+        except NotFound as e:
+            result['error'] = str(e)
+        snapshot_session.commit()
+        result['seconds']['morph'] = round(time.monotonic() - start, 3)
+        result['vnis_after'] = vni_usage(snapshot_session)
+    finally:
+        snapshot_session.close()
+        snapshot_engine.dispose()
+    return result
+
+
 if __name__ == '__main__':
     sys.exit(main(sys.argv))
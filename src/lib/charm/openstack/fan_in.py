@@ -0,0 +1,142 @@
+# Copyright 2026 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""OVSDB client connection fan-in of the neutron-server on this unit.
+
+Every neutron-server process loading the OVN mechanism driver opens its own
+connection to the Northbound and to the Southbound DB.  The number of
+processes follows from the worker settings the principal charm renders into
+``neutron.conf``, unset settings take the Neutron defaults.
+
+The expected number of connections is published on the ``ovsdb-cms``
+relation for the OVN central units to account for, and shown in the
+workload status.
+
+NOTE: This module is imported from ``hooks/update-status`` before the
+      reactive framework and must not import anything heavier than
+      ``charmhelpers.core``.
+"""
+
+import configparser
+import json
+import os
+
+import charmhelpers.core.hookenv as hookenv
+import charmhelpers.core.unitdata as unitdata
+
+NEUTRON_CONF = '/etc/neutron/neutron.conf'
+FAN_IN_KEY = 'neutron-api-plugin-ovn.ovsdb-fan-in'
+# Relations the recorded expected connections were published on.
+PUBLISHED_KEY = 'neutron-api-plugin-ovn.ovsdb-fan-in-published'
+RELATION_NAME = 'ovsdb-cms'
+RELATION_KEY = 'ovsdb-client-connections'
+# Workers added by the OVN mechanism driver, the maintenance worker.
+OVN_DRIVER_WORKERS = 1
+
+
+def _get_int(parser, option, default):
+    value = parser.get('DEFAULT', option, fallback='').strip()
+    return int(value) if value else default
+
+
+def worker_counts(path=NEUTRON_CONF):
+    """Get number of neutron-server processes per kind of worker.
+
+    :param path: Path to ``neutron.conf``
+    :type path: str
+    :returns: Map of kind of worker to number of processes.
+    :rtype: Dict[str,int]
+    :raises: configparser.Error, ValueError
+    """
+    parser = configparser.ConfigParser(interpolation=None, strict=False)
+    if not parser.read(path):
+        raise configparser.Error('unable to read {}'.format(path))
+    api = _get_int(parser, 'api_workers', os.cpu_count() or 1)
+    return {
+        # with no API workers the API is served by the parent process
+        'api': max(api, 1),
+        'rpc': _get_int(parser, 'rpc_workers', max(api // 2, 1)),
+        'rpc-state-report': _get_int(parser, 'rpc_state_report_workers', 1),
+        'ovn-driver': OVN_DRIVER_WORKERS,
+    }
+
+
+def expected(workers):
+    """Get expected number of OVSDB client connections.
+
+    :param workers: Map of kind of worker to number of processes.
+    :type workers: Dict[str,int]
+    :returns: Number of Northbound and Southbound DB connections along with
+              the worker counts.
+    :rtype: Dict[str,any]
+    """
+    processes = sum(workers.values())
+    return {'nb': processes, 'sb': processes, 'workers': workers}
+
+
+def publish(fan_in, rids):
+    """Publish expected connections on ``ovsdb-cms`` relations.
+
+    :param fan_in: Expected connections as returned by ``expected``.
+    :type fan_in: Dict[str,any]
+    :param rids: Relation IDs
+    :type rids: Iterable[str]
+    """
+    value = json.dumps({'nb': fan_in['nb'], 'sb': fan_in['sb']},
+                       sort_keys=True)
+    for rid in rids:
+        hookenv.relation_set(relation_id=rid,
+                             relation_settings={RELATION_KEY: value})
+
+
+def refresh(new_relations=False):
+    """Work out and record the expected connections, publish them on change.
+
+    Nothing is published until the principal charm has rendered
+    ``neutron.conf``.
+
+    :param new_relations: Also publish unchanged expected connections on
+                          relations they have not been published on yet.
+    :type new_relations: bool
+    """
+    kv = unitdata.kv()
+    try:
+        fan_in = expected(worker_counts(NEUTRON_CONF))
+    except (configparser.Error, ValueError) as e:
+        hookenv.log('unable to work out OVSDB connection fan-in: {}'
+                    .format(e), level=hookenv.DEBUG)
+        kv.unset(FAN_IN_KEY)
+        return
+    if fan_in != kv.get(FAN_IN_KEY):
+        published = []
+    elif new_relations:
+        published = kv.get(PUBLISHED_KEY, [])
+    else:
+        return
+    rids = hookenv.relation_ids(RELATION_NAME)
+    publish(fan_in, [rid for rid in rids if rid not in published])
+    kv.set(FAN_IN_KEY, fan_in)
+    kv.set(PUBLISHED_KEY, rids)
+
+
+def status_note():
+    """Get note on the expected connections for the workload status.
+
+    :returns: Note, or None when not worked out yet.
+    :rtype: Optional[str]
+    """
+    fan_in = unitdata.kv().get(FAN_IN_KEY)
+    if not fan_in:
+        return None
+    return 'OVSDB connections NB {}, SB {}'.format(fan_in['nb'], fan_in['sb'])
@@ -12,19 +12,398 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import functools
+import hashlib
+import json
 import os
+import subprocess
+import time
 
+from charmhelpers import coordinator
+
+import charmhelpers.contrib.openstack.utils as os_utils
 import charmhelpers.core as ch_core
 import charmhelpers.fetch as ch_fetch
 import charms_openstack.adapters
 import charms_openstack.charm
+import charms.leadership as leadership
 import charms.reactive as reactive
 
 import charmhelpers.core.hookenv as hookenv
+import charmhelpers.core.unitdata as unitdata
+
+import charm.openstack.fan_in as fan_in
+import charm.openstack.sync_health as sync_health
+import charm.openstack.timings as timings
+import charm.openstack.update_status as update_status
 
 CERT_RELATION = 'certificates'
 NEUTRON_PLUGIN_ML2_DIR = '/etc/neutron/plugins/ml2'
 
+# Name of the ``charmhelpers.coordinator.Serial`` lock that allows one unit of
+# the application at a time to have neutron-server restarted.
+RESTART_LOCK = 'restart'
+# Leader setting holding the time the ``RESTART_LOCK`` was last granted, and
+# the minimum number of seconds between grants.  The lock is released at the
+# end of the hook it was granted in, long before neutron-server restarted by
+# the principal charm is serving again, spacing out the grants keeps the
+# units from restarting together.
+RESTART_GRANTED_KEY = 'restart_lock_granted'
+RESTART_INTERVAL = 300
+RESTART_REASON_CONFIG = 'plugin configuration changed'
+RESTART_REASONS_KEY = 'neutron-api-plugin-ovn.restart-reasons'
+PUBLISHED_CONFIG_KEY = 'neutron-api-plugin-ovn.published-config-digest'
+
+# Unit data key holding host facts that are expensive to detect, such as the
+# OpenStack release from the package database, with the state of the files
+# the facts are derived from.
+HOST_FACTS_KEY = 'neutron-api-plugin-ovn.host-facts'
+HOST_FACTS_SOURCES = ('/var/lib/dpkg/status', '/etc/os-release')
+
+GENEVE_VNI_MIN = 1
+GENEVE_VNI_MAX = 2 ** 24 - 1
+# Leader setting holding the VNI ranges the ``ml2_geneve_allocations`` table
+# is populated for, either by neutron-server on restart after the ranges were
+# published or by the ``sync-geneve-allocations`` action.
+GENEVE_ALLOCATIONS_KEY = 'geneve_allocations_ranges'
+GENEVE_VNI_RANGES_GUARDS = ('warn', 'block')
+# Leader setting holding the global DHCP options last applied to the OVN
+# Northbound DB by the ``apply-dhcp-global-options`` action, as JSON map of
+# IP version to options.
+DHCP_GLOBAL_OPTIONS_KEY = 'dhcp_global_options'
+
+# Unit data key holding the OVN source whose packages the
+# ``stage-ovn-packages`` action downloaded into the apt cache.
+STAGED_OVN_SOURCE_KEY = 'neutron-api-plugin-ovn.staged-ovn-source'
+APT_ARCHIVES = '/var/cache/apt/archives'
+DPKG_OPTIONS = [
+    '--option', 'Dpkg::Options::=--force-confnew',
+    '--option', 'Dpkg::Options::=--force-confdef',
+]
+
+# Leader setting holding the number of Northbound DB rows counted by the
+# last ``scale-report`` action on the leader, shared for all units to derive
+# the same OVSDB client settings.
+SCALE_NB_ROWS_KEY = 'ovn_nb_rows'
+# Configuration options for OVSDB client settings of neutron-server, with
+# the key rendered in the ``[ovn]`` section.
+OVSDB_TUNABLES = (
+    ('ovsdb-connection-timeout', 'ovsdb_connection_timeout'),
+    ('ovsdb-probe-interval', 'ovsdb_probe_interval'),
+    ('ovsdb-retry-max-interval', 'ovsdb_retry_max_interval'),
+    ('ovsdb-log-level', 'ovsdb_log_level'),
+)
+OVSDB_LOG_LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+# Values for ``auto`` tunables by size of the OVN Northbound DB:
+# (minimum number of rows, connection timeout in seconds, probe interval in
+# milliseconds, maximum retry interval in seconds, log level).  The first
+# tier matches the upstream defaults.
+OVSDB_SIZE_TIERS = (
+    (0, 180, 60000, 180, 'INFO'),
+    (100000, 300, 120000, 180, 'INFO'),
+    (1000000, 600, 180000, 300, 'INFO'),
+)
+# Connection timeout allowed per remote, as the client tries the remotes in
+# turn until it has connected and received the initial copy of the DB.
+OVSDB_CONNECTION_TIMEOUT_PER_REMOTE = 60
+
+
+def memoize(f):
+    """Decorator memoizing return value of a charm class method.
+
+    ``charms_openstack.charm.provide_charm_instance`` provides the same
+    charm class instance to every handler of a hook, so values derived from
+    configuration, relation data or the host are computed at most once per
+    hook.  Callers must not modify the returned value.
+
+    :param f: Charm class method
+    :type f: Callable
+    :returns: Wrapped method
+    :rtype: Callable
+    """
+    @functools.wraps(f)
+    def wrapper(self, *args, **kwargs):
+        memo = self.__dict__.setdefault('_memo', {})
+        key = (f.__name__, args, tuple(sorted(kwargs.items())))
+        if key not in memo:
+            memo[key] = f(self, *args, **kwargs)
+        return memo[key]
+
+    return wrapper
+
+
+def request_restart(reason):
+    """Request a restart of neutron-server.
+
+    Reasons are accumulated in unit-local storage so that all requests made
+    while processing a hook can be merged into a single restart, which is
+    performed once this unit has been granted the ``RESTART_LOCK``.
+
+    :param reason: Human readable reason for the restart.
+    :type reason: str
+    """
+    kv = unitdata.kv()
+    reasons = kv.get(RESTART_REASONS_KEY, [])
+    if reason not in reasons:
+        reasons.append(reason)
+        kv.set(RESTART_REASONS_KEY, reasons)
+    reactive.set_flag('restart-needed')
+
+
+def pop_restart_reasons():
+    """Retrieve and forget reasons for pending restart of neutron-server.
+
+    :returns: Reasons in the order they were requested.
+    :rtype: List[str]
+    """
+    kv = unitdata.kv()
+    reasons = kv.get(RESTART_REASONS_KEY, [])
+    kv.unset(RESTART_REASONS_KEY)
+    return reasons
+
+
+def restart_grant_due(now):
+    """Whether the ``RESTART_LOCK`` may be granted again.
+
+    :param now: Current time in seconds since the epoch.
+    :type now: float
+    :returns: True if the lock was never granted or was last granted at least
+              ``RESTART_INTERVAL`` seconds ago.
+    :rtype: bool
+    """
+    granted_at = hookenv.leader_get(RESTART_GRANTED_KEY)
+    try:
+        return now - float(granted_at) >= RESTART_INTERVAL
+    except (TypeError, ValueError):
+        return True
+
+
+class RestartSerial(coordinator.Serial):
+    """Serial coordinator spacing out grants of the ``RESTART_LOCK``.
+
+    Requests refused because the lock was granted too recently stay queued,
+    the leader grants them in a later hook, at the latest in update-status.
+    """
+
+    def grant_restart(self, lock, unit, granted, queue):
+        now = time.time()
+        if not (self.default_grant(lock, unit, granted, queue) and
+                restart_grant_due(now)):
+            return False
+        leadership.leader_set({RESTART_GRANTED_KEY: str(now)})
+        return True
+
+
+def plugin_config_digest(plugin_config):
+    """Get digest of configuration published to the principal charm.
+
+    :param plugin_config: Keyword arguments for ``configure_plugin``.
+    :type plugin_config: Dict[str,any]
+    :returns: Hex digest
+    :rtype: str
+    """
+    return hashlib.sha256(
+        json.dumps(plugin_config, sort_keys=True).encode('utf-8')
+    ).hexdigest()
+
+
+def published_config_digest():
+    """Get digest of configuration last published to the principal charm.
+
+    :returns: Hex digest or None if configuration was never published.
+    :rtype: Optional[str]
+    """
+    return unitdata.kv().get(PUBLISHED_CONFIG_KEY)
+
+
+def record_published_config(digest):
+    """Record digest of configuration published to the principal charm.
+
+    :param digest: Hex digest as returned by ``plugin_config_digest``.
+    :type digest: str
+    """
+    unitdata.kv().set(PUBLISHED_CONFIG_KEY, digest)
+
+
+def host_facts_fingerprint():
+    """Get state of the files host facts are derived from.
+
+    Every change of the package database rewrites the dpkg status file.
+
+    :returns: Path, modification time and size of every file, or None for
+              files that do not exist.
+    :rtype: List[Optional[List[any]]]
+    """
+    fingerprint = []
+    for path in HOST_FACTS_SOURCES:
+        try:
+            st = os.stat(path)
+        except OSError:
+            fingerprint.append(None)
+        else:
+            fingerprint.append([path, st.st_mtime_ns, st.st_size])
+    return fingerprint
+
+
+def cached_host_fact(name, detect):
+    """Get host fact cached in unit-local storage.
+
+    The cache is discarded when the package database or the OS release
+    changes.
+
+    :param name: Name of fact
+    :type name: str
+    :param detect: Callable detecting the fact on cache miss.
+    :type detect: Callable[[],any]
+    :returns: Fact
+    :rtype: any
+    """
+    kv = unitdata.kv()
+    fingerprint = host_facts_fingerprint()
+    facts = kv.get(HOST_FACTS_KEY) or {}
+    if facts.get('fingerprint') != fingerprint:
+        facts = {'fingerprint': fingerprint}
+    if name not in facts:
+        facts[name] = detect()
+        kv.set(HOST_FACTS_KEY, facts)
+    return facts[name]
+
+
+@charms_openstack.charm.register_os_release_selector
+def select_release():
+    """Determine the OpenStack release from the installed Neutron version.
+
+    :returns: OpenStack release codename
+    :rtype: str
+    """
+    return cached_host_fact(
+        'release',
+        lambda: os_utils.os_release(BaseNeutronAPIPluginCharm.release_pkg))
+
+
+def parse_vni_ranges(value):
+    """Parse and validate VNI ranges.
+
+    :param value: Space or comma delimited list of <vni_min>:<vni_max>
+                  tuples.
+    :type value: Optional[str]
+    :returns: Sorted list of non-overlapping inclusive ranges.
+    :rtype: List[Tuple[int,int]]
+    :raises: ValueError
+    """
+    ranges = []
+    for entry in (value or '').replace(',', ' ').split():
+        try:
+            vni_min, vni_max = (int(vni) for vni in entry.split(':'))
+        except ValueError:
+            raise ValueError('"{}" is not a <vni_min>:<vni_max> tuple'
+                             .format(entry))
+        if not GENEVE_VNI_MIN <= vni_min <= vni_max <= GENEVE_VNI_MAX:
+            raise ValueError('"{}" is not a range within {}:{}'
+                             .format(entry, GENEVE_VNI_MIN, GENEVE_VNI_MAX))
+        ranges.append((vni_min, vni_max))
+    merged = []
+    for vni_min, vni_max in sorted(ranges):
+        if merged and vni_min <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], vni_max))
+        else:
+            merged.append((vni_min, vni_max))
+    return merged
+
+
+def format_vni_ranges(ranges):
+    """Format VNI ranges the way Neutron expects them.
+
+    :param ranges: Ranges as returned by ``parse_vni_ranges``.
+    :type ranges: List[Tuple[int,int]]
+    :returns: Comma delimited list of <vni_min>:<vni_max> tuples.
+    :rtype: str
+    """
+    return ','.join('{}:{}'.format(*vni_range) for vni_range in ranges)
+
+
+def vni_ranges_size(ranges):
+    """Get number of VNIs in ranges.
+
+    :param ranges: Ranges as returned by ``parse_vni_ranges``.
+    :type ranges: List[Tuple[int,int]]
+    :returns: Number of VNIs
+    :rtype: int
+    """
+    return sum(vni_max - vni_min + 1 for vni_min, vni_max in ranges)
+
+
+def vni_ranges_delta(old, new):
+    """Get number of allocation rows to add or remove to go from old to new.
+
+    :param old: Ranges as returned by ``parse_vni_ranges``.
+    :type old: List[Tuple[int,int]]
+    :param new: Ranges as returned by ``parse_vni_ranges``.
+    :type new: List[Tuple[int,int]]
+    :returns: Number of VNIs in either but not both of the ranges.
+    :rtype: int
+    """
+    common = 0
+    i = j = 0
+    while i < len(old) and j < len(new):
+        low = max(old[i][0], new[j][0])
+        high = min(old[i][1], new[j][1])
+        if low <= high:
+            common += high - low + 1
+        if old[i][1] < new[j][1]:
+            i += 1
+        else:
+            j += 1
+    return vni_ranges_size(old) + vni_ranges_size(new) - 2 * common
+
+
+def auto_ovsdb_tunables(n_remotes, nb_rows=None):
+    """Derive OVSDB client settings from the size of the deployment.
+
+    :param n_remotes: Number of OVSDB remotes.
+    :type n_remotes: int
+    :param nb_rows: Number of rows in the OVN Northbound DB, if known.
+    :type nb_rows: Optional[int]
+    :returns: Map of ``[ovn]`` key to value.
+    :rtype: Dict[str,any]
+    """
+    tier = [
+        tier for tier in OVSDB_SIZE_TIERS if (nb_rows or 0) >= tier[0]][-1]
+    _, timeout, probe_interval, retry_max_interval, log_level = tier
+    return {
+        'ovsdb_connection_timeout': max(
+            timeout, n_remotes * OVSDB_CONNECTION_TIMEOUT_PER_REMOTE),
+        'ovsdb_probe_interval': probe_interval,
+        'ovsdb_retry_max_interval': retry_max_interval,
+        'ovsdb_log_level': log_level,
+    }
+
+
+def parse_ovsdb_tunable(key, value):
+    """Validate explicit value of an OVSDB client setting.
+
+    :param key: ``[ovn]`` key
+    :type key: str
+    :param value: Configured value
+    :type value: str
+    :returns: Value to render
+    :rtype: Union[int,str]
+    :raises: ValueError
+    """
+    if key == 'ovsdb_log_level':
+        if value.upper() not in OVSDB_LOG_LEVELS:
+            raise ValueError('"{}" is not one of {}'.format(
+                value, ', '.join(OVSDB_LOG_LEVELS)))
+        return value.upper()
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError('"{}" is not "auto" or an integer'.format(value))
+    # a probe interval of 0 disables probes
+    if number < 0 or (number == 0 and key != 'ovsdb_probe_interval'):
+        raise ValueError('"{}" is out of range'.format(value))
+    return number
+
 
 @charms_openstack.adapters.config_property
 def ovn_key(cls):
@@ -96,6 +475,7 @@ class BaseNeutronAPIPluginCharm(charms_openstack.charm.OpenStackCharm):
     # Neutron tenant network types to prepend
     network_types = ['geneve']
 
+    @timings.timed
     def configure_tls(self, certificates_interface=None):
         """Override configure_tls method for neutron-api-plugin-ovn.
 
@@ -157,6 +537,177 @@ class BaseNeutronAPIPluginCharm(charms_openstack.charm.OpenStackCharm):
 
         return states_to_check
 
+    def geneve_vni_ranges_status(self):
+        """Check the configured Geneve VNI ranges.
+
+        On restart neutron-server synchronizes the ``ml2_geneve_allocations``
+        table with the configured ranges, one row per VNI.  A large change
+        stalls the restart, so the number of rows to add or remove is checked
+        against the ``geneve-vni-ranges-threshold`` configuration option.
+
+        Until ranges have been recorded, as on deployments upgraded from a
+        charm that did not record them, the table is assumed to match the
+        configuration and the ranges are recorded on the next publish.
+
+        :returns: Tuple of 'blocked' and message if the configuration must
+                  not be published, 'active' and message if the operator
+                  should be warned, or (None, None).
+        :rtype: Tuple[Optional[str],Optional[str]]
+        """
+        try:
+            ranges = parse_vni_ranges(self.options.geneve_vni_ranges)
+        except ValueError as e:
+            return 'blocked', "invalid 'geneve-vni-ranges': {}".format(e)
+        guard = self.options.geneve_vni_ranges_guard
+        if guard not in GENEVE_VNI_RANGES_GUARDS:
+            return 'blocked', (
+                "invalid 'geneve-vni-ranges-guard': \"{}\" is not one of {}"
+                .format(guard, ', '.join(GENEVE_VNI_RANGES_GUARDS)))
+        threshold = self.options.geneve_vni_ranges_threshold
+        recorded = hookenv.leader_get(GENEVE_ALLOCATIONS_KEY)
+        if not threshold or not recorded:
+            return None, None
+        try:
+            current = parse_vni_ranges(recorded)
+        except ValueError:
+            current = []
+        delta = vni_ranges_delta(current, ranges)
+        if delta <= threshold:
+            return None, None
+        message = ("'geneve-vni-ranges' changes {} of {} VNIs, above "
+                   "threshold {}, run action 'sync-geneve-allocations'"
+                   .format(delta, vni_ranges_size(ranges), threshold))
+        if guard == 'block':
+            return 'blocked', message
+        return 'active', message
+
+    def record_geneve_vni_ranges(self):
+        """Record configured Geneve VNI ranges as populated.
+
+        Called after publishing the configuration, neutron-server will
+        populate the allocations table for the ranges on its next restart.
+        """
+        if not hookenv.is_leader():
+            return
+        ranges = format_vni_ranges(
+            parse_vni_ranges(self.options.geneve_vni_ranges))
+        if hookenv.leader_get(GENEVE_ALLOCATIONS_KEY) != ranges:
+            leadership.leader_set({GENEVE_ALLOCATIONS_KEY: ranges})
+
+    def _configured_ovsdb_tunables(self):
+        """Get OVSDB client settings configured with explicit values.
+
+        :returns: Iterator of option, ``[ovn]`` key and value tuples.
+        :rtype: Iterator[Tuple[str,str,str]]
+        """
+        for option, key in OVSDB_TUNABLES:
+            value = str(
+                getattr(self.options, option.replace('-', '_'), None) or
+                'auto')
+            if value != 'auto':
+                yield option, key, value
+
+    def ovsdb_tunables_errors(self):
+        """Check the configured OVSDB client settings.
+
+        :returns: Messages for invalid settings.
+        :rtype: List[str]
+        """
+        errors = []
+        for option, key, value in self._configured_ovsdb_tunables():
+            try:
+                parse_ovsdb_tunable(key, value)
+            except ValueError as e:
+                errors.append("invalid '{}': {}".format(option, e))
+        return errors
+
+    def ovsdb_tunables(self, n_remotes):
+        """Get OVSDB client settings to render in the ``[ovn]`` section.
+
+        Settings configured as ``auto``, or with an invalid value, are
+        derived from the number of remotes and the size of the Northbound DB
+        recorded by the last ``scale-report`` action on the leader.
+
+        :param n_remotes: Number of OVSDB remotes.
+        :type n_remotes: int
+        :returns: List of ``[ovn]`` key and value tuples.
+        :rtype: List[Tuple[str,any]]
+        """
+        try:
+            nb_rows = int(hookenv.leader_get(SCALE_NB_ROWS_KEY))
+        except (TypeError, ValueError):
+            nb_rows = None
+        tunables = auto_ovsdb_tunables(n_remotes, nb_rows)
+        for _, key, value in self._configured_ovsdb_tunables():
+            try:
+                tunables[key] = parse_ovsdb_tunable(key, value)
+            except ValueError:
+                pass
+        return [(key, tunables[key]) for _, key in OVSDB_TUNABLES]
+
+    def custom_assess_status_check(self):
+        """Override parent method to block on invalid configuration.
+
+        :returns: Tuple of status and message, or (None, None).
+        :rtype: Tuple[Optional[str],Optional[str]]
+        """
+        status, message = self.geneve_vni_ranges_status()
+        if status == 'blocked':
+            return status, message
+        errors = self.ovsdb_tunables_errors()
+        if errors:
+            return 'blocked', '; '.join(errors)
+        return None, None
+
+    def status_notes(self):
+        """Get notes to append to the message of an active workload status.
+
+        :returns: Notes
+        :rtype: List[str]
+        """
+        notes = []
+        status, message = self.geneve_vni_ranges_status()
+        if status == 'active':
+            notes.append(message)
+        for note in (fan_in.status_note(), sync_health.status_note()):
+            if note:
+                notes.append(note)
+        return notes
+
+    def assess_status(self):
+        """Override parent method to time the deferred assessment.
+
+        Hook exit callbacks run in the reverse order of registration, the
+        flush of timings is scheduled first for it to include the assessment.
+        """
+        timings.schedule_flush()
+        super().assess_status()
+
+    @timings.timed
+    def _assess_status(self):
+        """Override parent method to add notes and record status.
+
+        The parent method assesses the workload status at hook exit, notes
+        from ``status_notes`` are then appended to an active workload status.
+        The assessment runs once per call of ``assess_status`` and sets the
+        status from scratch, so notes are never appended twice.
+
+        The recorded status is re-applied by subsequent update-status hooks
+        for as long as its inputs remain unchanged, see
+        ``charm.openstack.update_status``.  A status is not recorded while a
+        restart is pending, as we will need to keep trying to acquire the
+        restart lock.
+        """
+        super()._assess_status()
+        notes = self.status_notes()
+        if notes:
+            status, message = hookenv.status_get()
+            if status == 'active':
+                hookenv.status_set(status, '; '.join([message] + notes))
+        if (hookenv.hook_name() == 'update-status' and
+                not reactive.is_flag_set('restart-needed')):
+            update_status.record_snapshot()
+
     @property
     def db_migration_needed(self):
         """Determine whether DB migration is needed.
@@ -168,6 +719,7 @@ class BaseNeutronAPIPluginCharm(charms_openstack.charm.OpenStackCharm):
         """
         return self._db_migration_needed
 
+    @memoize
     def service_plugins(self, neutron_svc_plugins=None):
         """Provide list of service plugins for current OpenStack release.
 
@@ -190,6 +742,7 @@ class BaseNeutronAPIPluginCharm(charms_openstack.charm.OpenStackCharm):
             if service_plugin not in self.svc_plugin_denylist
         ] + self.svc_plugins
 
+    @memoize
     def mechanism_drivers(self, neutron_mech_drivers=None):
         """Provide list of mechanism drivers for current OpenStack release.
 
@@ -212,6 +765,7 @@ class BaseNeutronAPIPluginCharm(charms_openstack.charm.OpenStackCharm):
             if mech_driver in self.mech_driver_allowlist
         ]
 
+    @memoize
     def tenant_network_types(self, neutron_tenant_network_types=None):
         """Provide list of tenant network types for current OpenStack release.
 
@@ -230,6 +784,7 @@ class BaseNeutronAPIPluginCharm(charms_openstack.charm.OpenStackCharm):
             for network_type in neutron_tenant_network_types.split(',')
         ]
 
+    @timings.timed
     def upgrade_charm(self):
         """ It rises 'restart-needed' flag as a part of "upgrade-charm" hook.
 
@@ -238,7 +793,7 @@ class BaseNeutronAPIPluginCharm(charms_openstack.charm.OpenStackCharm):
         :returns: None
         """
         super().upgrade_charm()
-        reactive.set_flag('restart-needed')
+        request_restart('upgrade-charm')
 
 
 class TrainNeutronAPIPluginCharm(BaseNeutronAPIPluginCharm):
@@ -274,11 +829,14 @@ class UssuriNeutronAPIPluginCharm(BaseNeutronAPIPluginCharm):
     def series(self):
         """Caching property of host's distribution release codename."""
         if self._series is None:
-            self._series = ch_core.host.lsb_release()['DISTRIB_CODENAME']
+            self._series = cached_host_fact(
+                'series',
+                lambda: ch_core.host.lsb_release()['DISTRIB_CODENAME'])
 
         return self._series
 
     @property
+    @memoize
     def ovn_source(self):
         """Return OVN UCA pocket that should be installed based on the config.
 
@@ -305,19 +863,25 @@ class UssuriNeutronAPIPluginCharm(BaseNeutronAPIPluginCharm):
         """Return True if charm-upgrade handler is in progress."""
         return reactive.is_flag_set('leadership.set.install_stamp')
 
-    def _upgrade_packages(self):
+    @timings.timed
+    def _upgrade_packages(self, update=True, download_only=False):
         """Trigger upgrade of openstack packages.
 
         This function mimics behavior of
         'BaseOpenstackCharmActions.do_openstack_pkg_upgrade(False)' that was
         added in Yoga release.
+
+        :param update: Update the package indexes first.
+        :type update: bool
+        :param download_only: Only download the packages into the apt cache.
+        :type download_only: bool
         """
-        ch_fetch.apt_update()
+        if update:
+            ch_fetch.apt_update()
 
-        dpkg_opts = [
-            '--option', 'Dpkg::Options::=--force-confnew',
-            '--option', 'Dpkg::Options::=--force-confdef',
-        ]
+        dpkg_opts = list(DPKG_OPTIONS)
+        if download_only:
+            dpkg_opts.append('--download-only')
         ch_fetch.apt_upgrade(
             options=dpkg_opts,
             fatal=True,
@@ -326,8 +890,67 @@ class UssuriNeutronAPIPluginCharm(BaseNeutronAPIPluginCharm):
             packages=self.all_packages,
             options=dpkg_opts,
             fatal=True)
-        self.remove_obsolete_packages()
+        if not download_only:
+            self.remove_obsolete_packages()
+
+    def packages_cached(self):
+        """Check whether the packages of an upgrade are in the apt cache.
+
+        ``apt-get --print-uris`` lists the packages it would have to
+        download, based on the package indexes as of the last update.
 
+        :returns: Whether no package has to be downloaded.
+        :rtype: bool
+        """
+        cmds = [['apt-get', '-qq', '--print-uris', 'dist-upgrade']]
+        if self.all_packages:
+            cmds.append(['apt-get', '-qq', '--print-uris', 'install'] +
+                        list(self.all_packages))
+        try:
+            return not any(
+                subprocess.check_output(cmd, universal_newlines=True).strip()
+                for cmd in cmds)
+        except subprocess.CalledProcessError as e:
+            hookenv.log('Unable to check apt cache: {}'.format(e),
+                        level=hookenv.WARNING)
+            return False
+
+    def stage_ovn_packages(self, source=None):
+        """Add OVN pocket and download the packages of the upgrade.
+
+        A following ``upgrade_ovn`` for the same source installs from the apt
+        cache without updating the package indexes.
+
+        :param source: OVN source, defaults to the configured one.
+        :type source: Optional[str]
+        :returns: Source, number and size of the packages downloaded.
+        :rtype: Dict[str,any]
+        :raises: ValueError, subprocess.CalledProcessError
+        """
+        source = source or self.ovn_source
+        if not source:
+            raise ValueError('no OVN source configured or given')
+
+        def archives():
+            with os.scandir(APT_ARCHIVES) as entries:
+                return {entry.name: entry.stat().st_size
+                        for entry in entries if entry.name.endswith('.deb')}
+
+        before = archives()
+        ch_fetch.add_source(source)
+        self._upgrade_packages(download_only=True)
+        downloaded = {name: size for name, size in archives().items()
+                      if name not in before}
+        kv = unitdata.kv()
+        kv.set(STAGED_OVN_SOURCE_KEY, source)
+        kv.flush()
+        return {
+            'source': source,
+            'packages': len(downloaded),
+            'bytes': sum(downloaded.values()),
+        }
+
+    @timings.timed
     def install(self):
         """Install or upgrade OVN packages from dedicated pocket.
 
@@ -336,18 +959,27 @@ class UssuriNeutronAPIPluginCharm(BaseNeutronAPIPluginCharm):
         if self.fresh_deployment:
             self.upgrade_ovn()
 
+    @timings.timed
     def upgrade_ovn(self):
-        """Upgrade ovn packages based configured UCA pocket."""
+        """Upgrade ovn packages based configured UCA pocket.
+
+        Packages staged by ``stage_ovn_packages`` for the source are
+        installed from the apt cache, as long as the package indexes have
+        not been updated since and nothing else has to be downloaded.
+        """
         if self.ovn_source:
             hookenv.log('Adding "{}" pocket and upgrading '
                         'packages.'.format(self.ovn_source))
             ch_fetch.add_source(self.ovn_source)
-            self._upgrade_packages()
-            neutron_api = reactive.endpoint_from_flag(
-                'neutron-plugin.connected'
-            )
-            if neutron_api is not None:
-                neutron_api.request_restart()
+            kv = unitdata.kv()
+            if (kv.get(STAGED_OVN_SOURCE_KEY) == self.ovn_source and
+                    self.packages_cached()):
+                hookenv.log('Installing packages staged in the apt cache.')
+                self._upgrade_packages(update=False)
+            else:
+                self._upgrade_packages()
+            kv.unset(STAGED_OVN_SOURCE_KEY)
+            request_restart('ovn-source {}'.format(self.ovn_source))
 
 
 class BobcatNeutronAPIPluginCharm(UssuriNeutronAPIPluginCharm):
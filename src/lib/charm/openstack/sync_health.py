@@ -0,0 +1,153 @@
+# Copyright 2026 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""OVN sync backlog and hash ring health for the workload status.
+
+The Neutron OVN driver records the revision of each resource synced to the
+OVN Northbound DB in ``ovn_revision_numbers``, resources whose revision lags
+behind Neutron's are repaired by the maintenance task.  Every neutron-server
+worker keeps a node in ``ovn_hash_ring`` alive, the nodes share the handling
+of OVN events.
+
+With the ``ovn-sync-status`` configuration option the leader queries both
+tables in the update-status hook and shows a summary in its workload status.
+The summary is part of the inputs of the recorded workload status, see
+``charm.openstack.update_status``.
+
+NOTE: This module is imported from ``hooks/update-status`` before the
+      reactive framework and must not import anything heavier than
+      ``charmhelpers.core``.
+"""
+
+import configparser
+import json
+import os
+import subprocess
+
+import charmhelpers.core.hookenv as hookenv
+import charmhelpers.core.unitdata as unitdata
+
+NEUTRON_CONF = '/etc/neutron/neutron.conf'
+NEUTRON_DB_UTIL = 'files/scripts/neutron_db_util.py'
+SYNC_HEALTH_KEY = 'neutron-api-plugin-ovn.sync-health'
+CONFIG_OPTION = 'ovn-sync-status'
+QUERY_TIMEOUT = 60
+
+
+def enabled():
+    """Check whether this unit shows the sync health in its status.
+
+    :rtype: bool
+    """
+    return bool(hookenv.config(CONFIG_OPTION)) and hookenv.is_leader()
+
+
+def neutron_db_connection():
+    """Read the Neutron DB connection string without ``oslo.config``.
+
+    :returns: SQLAlchemy consumable DB connection string.
+    :rtype: str
+    :raises: configparser.Error
+    """
+    parser = configparser.ConfigParser(interpolation=None, strict=False)
+    if not parser.read(NEUTRON_CONF):
+        raise configparser.Error('unable to read {}'.format(NEUTRON_CONF))
+    return parser.get('database', 'connection')
+
+
+def query():
+    """Query the OVN revision backlog and hash ring health.
+
+    :returns: Result of the ``ovn-health`` sub-command of the Neutron DB
+              maintenance tool.
+    :rtype: Dict[str,any]
+    :raises: configparser.Error, subprocess.SubprocessError, ValueError
+    """
+    cp = subprocess.run(
+        (
+            os.path.join(hookenv.charm_dir(), NEUTRON_DB_UTIL),
+            neutron_db_connection(),
+            'ovn-health',
+        ),
+        capture_output=True,
+        universal_newlines=True,
+        timeout=QUERY_TIMEOUT,
+        # Run outside of the charm venv to consume system Python packages.
+        env={'PATH': '/usr/bin'},
+    )
+    cp.check_returncode()
+    return json.loads(cp.stdout)
+
+
+def summarize(result):
+    """Summarize result of the ``ovn-health`` sub-command.
+
+    :param result: Result
+    :type result: Dict[str,any]
+    :returns: Number of resources to sync, of neutron-server hosts and of
+              hosts with live hash ring nodes.
+    :rtype: Dict[str,int]
+    """
+    return {
+        'backlog': (sum(result['backlog'].values()) +
+                    sum(result['pending-deletes'].values())),
+        'hosts': len(result['hash-ring']),
+        'alive-hosts': sum(1 for host in result['hash-ring'].values()
+                           if host['alive']),
+    }
+
+
+def record(summary):
+    """Record summary for the workload status.
+
+    :param summary: Summary, or None to forget it.
+    :type summary: Optional[Dict[str,any]]
+    """
+    kv = unitdata.kv()
+    if summary is None:
+        kv.unset(SYNC_HEALTH_KEY)
+    else:
+        kv.set(SYNC_HEALTH_KEY, summary)
+
+
+def refresh():
+    """Query and record the sync health when shown in the status."""
+    if not enabled():
+        record(None)
+        return
+    try:
+        summary = summarize(query())
+    except (configparser.Error, subprocess.SubprocessError,
+            ValueError) as e:
+        hookenv.log('unable to query OVN sync health: {}'.format(e),
+                    level=hookenv.WARNING)
+        summary = {'error': True}
+    record(summary)
+
+
+def status_note():
+    """Get note on the sync health for the workload status.
+
+    :returns: Note, or None when not shown or not queried yet.
+    :rtype: Optional[str]
+    """
+    if not enabled():
+        return None
+    summary = unitdata.kv().get(SYNC_HEALTH_KEY)
+    if not summary:
+        return None
+    if summary.get('error'):
+        return 'OVN sync health unknown'
+    return 'OVN sync backlog {}, hash ring {}/{} hosts alive'.format(
+        summary['backlog'], summary['alive-hosts'], summary['hosts'])
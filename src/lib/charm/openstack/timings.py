@@ -0,0 +1,195 @@
+# Copyright 2026 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+import functools
+import math
+import os
+import tempfile
+import time
+
+import charmhelpers.core.hookenv as hookenv
+import charmhelpers.core.unitdata as unitdata
+
+TIMINGS_KEY = 'neutron-api-plugin-ovn.timings'
+# Number of samples kept per hook and handler
+HISTORY_LENGTH = 100
+PERCENTILES = (50, 90, 99)
+PROMETHEUS_TEXTFILE = 'neutron_api_plugin_ovn.prom'
+PROMETHEUS_METRIC = 'neutron_api_plugin_ovn_handler_duration_seconds'
+
+# Wall time spent in each timed callable during this hook invocation
+_samples = collections.OrderedDict()
+_flush_scheduled = False
+
+
+def timed(f):
+    """Decorator recording the wall time spent in the decorated callable.
+
+    Samples are kept in memory and merged into the rolling history in
+    unit-local storage once at the end of the hook.
+
+    :param f: Reactive handler or charm class method.
+    :type f: Callable
+    :returns: Wrapped callable
+    :rtype: Callable
+    """
+    name = f.__qualname__
+
+    @functools.wraps(f)
+    def wrapper(*args, **kwargs):
+        start = time.monotonic()
+        try:
+            return f(*args, **kwargs)
+        finally:
+            _record(name, time.monotonic() - start)
+
+    # charms.reactive identifies and logs handlers by their code object, make
+    # it use the wrapped function, otherwise all handlers decorated here
+    # would be registered as one and logged as this wrapper.  Hooks run in
+    # the charm directory, which the short ID is relative to.
+    location = (f.__code__.co_firstlineno, f.__code__.co_name)
+    wrapper._action_id = ':'.join(map(str, (
+        f.__code__.co_filename,) + location))
+    wrapper._short_action_id = ':'.join(map(str, (
+        os.path.relpath(f.__code__.co_filename),) + location))
+    return wrapper
+
+
+def schedule_flush():
+    """Register the flush of samples at hook exit, once per hook.
+
+    Hook exit callbacks run in the reverse order of registration, callables
+    timed in callbacks registered after this are included in the flush.
+    """
+    global _flush_scheduled
+    if not _flush_scheduled:
+        hookenv.atexit(flush)
+        _flush_scheduled = True
+
+
+def _record(name, duration):
+    """Record a sample, scheduling the flush at hook exit on first use.
+
+    :param name: Name of timed callable
+    :type name: str
+    :param duration: Wall time in seconds
+    :type duration: float
+    """
+    schedule_flush()
+    _samples[name] = _samples.get(name, 0.0) + duration
+
+
+def flush():
+    """Merge samples from this hook invocation into the rolling history."""
+    global _flush_scheduled
+    _flush_scheduled = False
+    if not _samples:
+        return
+    hook_name = hookenv.hook_name()
+    kv = unitdata.kv()
+    history = kv.get(TIMINGS_KEY, {})
+    hook_history = history.setdefault(hook_name, {})
+    for name, duration in _samples.items():
+        hook_history[name] = (
+            hook_history.get(name, []) + [duration])[-HISTORY_LENGTH:]
+    kv.set(TIMINGS_KEY, history)
+    _samples.clear()
+
+    textfile_dir = hookenv.config().get('prometheus-textfile-directory')
+    if textfile_dir:
+        try:
+            write_prometheus_textfile(textfile_dir, history)
+        except OSError as e:
+            hookenv.log('Unable to write Prometheus textfile: "{}"'
+                        .format(e), level=hookenv.WARNING)
+
+
+def percentile(samples, pct):
+    """Get percentile of samples using the nearest-rank method.
+
+    :param samples: Samples
+    :type samples: List[float]
+    :param pct: Percentile
+    :type pct: int
+    :returns: Value at percentile, None if there are no samples
+    :rtype: Optional[float]
+    """
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(int(math.ceil(pct / 100 * len(ordered))), 1)
+    return ordered[rank - 1]
+
+
+def report(history=None):
+    """Summarize timing history per hook and handler.
+
+    :param history: Timing history, defaults to history in unit-local
+                    storage.
+    :type history: Optional[Dict[str,Dict[str,List[float]]]]
+    :returns: Map of hook name to map of handler name to statistics.
+    :rtype: Dict[str,Dict[str,Dict[str,float]]]
+    """
+    if history is None:
+        history = unitdata.kv().get(TIMINGS_KEY, {})
+    result = {}
+    for hook_name, handlers in history.items():
+        for name, samples in handlers.items():
+            stats = {
+                'count': len(samples),
+                'sum': round(sum(samples), 6),
+                'max': round(max(samples), 6),
+            }
+            for pct in PERCENTILES:
+                stats['p{}'.format(pct)] = round(
+                    percentile(samples, pct), 6)
+            result.setdefault(hook_name, {})[name] = stats
+    return result
+
+
+def write_prometheus_textfile(directory, history):
+    """Write timing history for the node-exporter textfile collector.
+
+    The file is replaced atomically so the collector never reads a partial
+    file.
+
+    :param directory: Directory watched by the textfile collector.
+    :type directory: str
+    :param history: Timing history
+    :type history: Dict[str,Dict[str,List[float]]]
+    """
+    unit = hookenv.local_unit()
+    lines = [
+        '# HELP {} Wall time spent in charm handlers.'
+        .format(PROMETHEUS_METRIC),
+        '# TYPE {} summary'.format(PROMETHEUS_METRIC),
+    ]
+    for hook_name, handlers in sorted(report(history).items()):
+        for name, stats in sorted(handlers.items()):
+            labels = 'unit="{}",hook="{}",handler="{}"'.format(
+                unit, hook_name, name)
+            for pct in PERCENTILES:
+                lines.append('{}{{{},quantile="{}"}} {}'.format(
+                    PROMETHEUS_METRIC, labels, pct / 100,
+                    stats['p{}'.format(pct)]))
+            lines.append('{}_sum{{{}}} {}'.format(
+                PROMETHEUS_METRIC, labels, stats['sum']))
+            lines.append('{}_count{{{}}} {}'.format(
+                PROMETHEUS_METRIC, labels, stats['count']))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.tmp')
+    with os.fdopen(fd, 'w') as fout:
+        fout.write('\n'.join(lines) + '\n')
+    os.chmod(tmp_path, 0o644)
+    os.rename(tmp_path, os.path.join(directory, PROMETHEUS_TEXTFILE))
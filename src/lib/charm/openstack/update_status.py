@@ -0,0 +1,117 @@
+# Copyright 2026 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Fast path for the update-status hook.
+
+The workload status of this charm is a function of its configuration, the
+data on its relations, leadership, the reactive flags, the OVN sync health
+recorded by ``charm.openstack.sync_health`` and the OVSDB connection fan-in
+recorded by ``charm.openstack.fan_in``.  When a full run of the reactive
+framework in the update-status hook has assessed the status, a
+snapshot of the status and a digest of those inputs is recorded.  Subsequent
+update-status hooks re-apply the recorded status without importing the
+reactive framework, discovering the charm release or re-rendering relation
+data as long as the digest of the inputs is unchanged.
+
+The snapshot is invalidated at the start of every other run of the reactive
+framework, as handlers may change the flags, and expires after
+``SNAPSHOT_MAX_AGE`` seconds.
+
+NOTE: This module is imported from ``hooks/update-status`` before the
+      reactive framework and must not import anything heavier than
+      ``charmhelpers.core``.
+"""
+
+import hashlib
+import json
+import time
+
+import charmhelpers.core.hookenv as hookenv
+import charmhelpers.core.unitdata as unitdata
+
+import charm.openstack.fan_in as fan_in
+import charm.openstack.sync_health as sync_health
+import charm.openstack.timings as timings
+
+SNAPSHOT_KEY = 'neutron-api-plugin-ovn.status-snapshot'
+# Perform a full run of the reactive framework at least this often (seconds).
+SNAPSHOT_MAX_AGE = 3600
+RELATIONS = ('certificates', 'cluster', 'neutron-plugin', 'ovsdb-cms')
+
+
+def inputs_digest():
+    """Get digest of the inputs the workload status is derived from.
+
+    :returns: Hex digest
+    :rtype: str
+    """
+    relations = {}
+    for relation_name in RELATIONS:
+        for rid in hookenv.relation_ids(relation_name):
+            relations[rid] = {
+                unit: hookenv.relation_get(rid=rid, unit=unit)
+                for unit in hookenv.related_units(rid)
+            }
+    inputs = {
+        'config': dict(hookenv.config()),
+        'fan_in': unitdata.kv().get(fan_in.FAN_IN_KEY),
+        'is_leader': hookenv.is_leader(),
+        'leader_settings': hookenv.leader_get(),
+        'relations': relations,
+        'sync_health': unitdata.kv().get(sync_health.SYNC_HEALTH_KEY),
+    }
+    return hashlib.sha256(
+        json.dumps(inputs, sort_keys=True, default=str).encode('utf-8')
+    ).hexdigest()
+
+
+def record_snapshot():
+    """Record current workload status along with digest of its inputs."""
+    status, message = hookenv.status_get()
+    unitdata.kv().set(SNAPSHOT_KEY, {
+        'digest': inputs_digest(),
+        'status': status,
+        'message': message,
+        'timestamp': time.time(),
+    })
+
+
+def invalidate_snapshot():
+    """Forget recorded workload status."""
+    unitdata.kv().unset(SNAPSHOT_KEY)
+
+
+@timings.timed
+def fast_path():
+    """Re-apply recorded workload status if none of its inputs changed.
+
+    :returns: True if status was re-applied and the reactive framework does
+              not need to run, False otherwise.
+    :rtype: bool
+    """
+    snapshot = unitdata.kv().get(SNAPSHOT_KEY)
+    if not snapshot:
+        return False
+    if time.time() - snapshot['timestamp'] > SNAPSHOT_MAX_AGE:
+        return False
+    if snapshot['digest'] != inputs_digest():
+        return False
+    hookenv.status_set(snapshot['status'], snapshot['message'])
+    return True
+
+
+def finish():
+    """Persist unit-local data at the end of a fast path hook."""
+    timings.flush()
+    unitdata.kv().flush()
@@ -0,0 +1,177 @@
+# Copyright 2026 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Apply changes of global DHCP options to the OVN Northbound DB.
+
+neutron-server applies the ``ovn_dhcp4_global_options`` and
+``ovn_dhcp6_global_options`` settings to the ``DHCP_Options`` row of every
+subnet when it starts.  Here the difference between two sets of global
+options is applied to the rows directly, with one ``mutate`` operation per
+row so that concurrent changes of other options by neutron-server are
+preserved.
+"""
+
+import ipaddress
+
+import charm.ovn_tools.ovsdb as ovsdb
+
+NB_DB = 'OVN_Northbound'
+TABLE = 'DHCP_Options'
+
+
+def parse_global_options(value):
+    """Parse value of a global DHCP options configuration option.
+
+    :param value: Comma or space delimited list of <option>:<value> pairs,
+                  an empty value unsets the option.
+    :type value: Optional[str]
+    :returns: Map of option to value.
+    :rtype: Dict[str,str]
+    :raises: ValueError
+    """
+    options = {}
+    for pair in (value or '').replace(',', ' ').split():
+        option, sep, option_value = pair.partition(':')
+        if not option or not sep:
+            raise ValueError('"{}" is not an <option>:<value> pair'
+                             .format(pair))
+        options[option] = option_value
+    return options
+
+
+def options_delta(new):
+    """Compute the changes of a set of global DHCP options.
+
+    Like neutron-server, only options given an empty value are removed.
+
+    :param new: Global options to apply.
+    :type new: Dict[str,str]
+    :returns: Options to set and options to remove.
+    :rtype: Tuple[Dict[str,str],List[str]]
+    """
+    to_set = {option: value for option, value in new.items() if value}
+    to_unset = sorted(option for option, value in new.items() if not value)
+    return to_set, to_unset
+
+
+def dropped_options(old, new):
+    """Get options of a previous set of global DHCP options no longer set.
+
+    Subnets keep the value of an option dropped from the configuration, as
+    neutron-server cannot tell it from a value set by the user on the subnet.
+
+    :param old: Global options previously applied.
+    :type old: Dict[str,str]
+    :param new: Global options to apply.
+    :type new: Dict[str,str]
+    :rtype: List[str]
+    """
+    return sorted(option for option, value in old.items()
+                  if value and option not in new)
+
+
+def ip_version(row):
+    """Get IP version of the subnet of a ``DHCP_Options`` row.
+
+    :param row: ``DHCP_Options`` row
+    :type row: Dict[str,any]
+    :returns: IP version, or None if the CIDR is not valid.
+    :rtype: Optional[int]
+    """
+    try:
+        return ipaddress.ip_network(row['cidr'], strict=False).version
+    except ValueError:
+        return None
+
+
+def row_mutations(rows, deltas):
+    """Compute mutations for the subnet rows the deltas change.
+
+    Rows of ports are skipped, as neutron-server overlays the extra DHCP
+    options of the port on the options of the subnet and which option came
+    from where is not recorded.
+
+    :param rows: ``DHCP_Options`` rows with ``_uuid``, ``cidr``, ``options``
+                 and ``external_ids`` columns.
+    :type rows: Iterable[Dict[str,any]]
+    :param deltas: Map of IP version to options to set and to remove.
+    :type deltas: Dict[int,Tuple[Dict[str,str],List[str]]]
+    :returns: Mutations by row UUID, and number of rows of ports skipped.
+    :rtype: Tuple[List[Tuple[str,List[List[any]]]],int]
+    """
+    mutations = []
+    skipped = 0
+    for row in rows:
+        if 'port_id' in row['external_ids']:
+            skipped += 1
+            continue
+        if 'subnet_id' not in row['external_ids']:
+            continue
+        to_set, to_unset = deltas.get(ip_version(row), ({}, []))
+        options = row['options']
+        changed = sorted(
+            set(option for option in to_unset if option in options) |
+            set(option for option, value in to_set.items()
+                if options.get(option) != value))
+        if not changed:
+            continue
+        # an insert does not replace the value of an existing key
+        changes = [['options', 'delete', ovsdb.to_ovsdb_set(changed)]]
+        inserts = {option: to_set[option]
+                   for option in changed if option in to_set}
+        if inserts:
+            changes.append(
+                ['options', 'insert', ovsdb.to_ovsdb_map(inserts)])
+        mutations.append((row['_uuid'], changes))
+    return mutations, skipped
+
+
+def apply(client, deltas, batch_size=1000, dry_run=True):
+    """Apply global DHCP option deltas to the ``DHCP_Options`` table.
+
+    :param client: Connected client
+    :type client: ovsdb.Client
+    :param deltas: Map of IP version to options to set and to remove.
+    :type deltas: Dict[int,Tuple[Dict[str,str],List[str]]]
+    :param batch_size: Number of rows to change per transaction.
+    :type batch_size: int
+    :param dry_run: Only count the rows to change.
+    :type dry_run: bool
+    :returns: Counts of rows and transactions.
+    :rtype: Dict[str,int]
+    :raises: ovsdb.OVSDBError
+    """
+    rows = client.select(NB_DB, TABLE,
+                         ['_uuid', 'cidr', 'options', 'external_ids'])
+    mutations, skipped = row_mutations(rows, deltas)
+    transactions = 0
+    if not dry_run:
+        for start in range(0, len(mutations), batch_size):
+            client.transact(NB_DB, *[
+                {
+                    'op': 'mutate',
+                    'table': TABLE,
+                    'where': [['_uuid', '==', ['uuid', uuid]]],
+                    'mutations': changes,
+                }
+                for uuid, changes in mutations[
+                    start:start + batch_size]
+            ])
+            transactions += 1
+    return {
+        'rows': len(rows),
+        'changed': len(mutations),
+        'skipped-port-rows': skipped,
+        'transactions': transactions,
+    }
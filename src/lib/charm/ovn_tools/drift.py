@@ -0,0 +1,292 @@
+# Copyright 2026 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Detect drift between the Neutron database and the OVN Northbound DB.
+
+For every resource type, records keyed by Neutron ID are read from both
+databases in key order and merged in a single pass.  Neutron records are
+streamed from ``files/scripts/neutron_db_util.py``, which runs with the
+system Python, Northbound records are selected with
+``charm.ovn_tools.ovsdb``.  Resource types are processed in parallel.
+
+The value compared for records present on both sides is the Neutron
+revision number, which the Neutron OVN driver stores in ``external_ids`` of
+the Northbound row, or the set of addresses for address sets.
+
+Both sources can be pointed at local test instances, e.g. a SQLite database
+with the Neutron schema and a local ``ovsdb-server`` serving the Northbound
+schema::
+
+    detect(RESOURCES,
+           functools.partial(neutron_records, script, 'sqlite:///neutron.db'),
+           functools.partial(ovsdb.Client, 'unix:/tmp/ovnnb_db.sock'))
+"""
+
+import concurrent.futures
+import json
+import subprocess
+import time
+
+import charm.ovn_tools.ovsdb as ovsdb
+
+NB_DB = 'OVN_Northbound'
+RESOURCES = (
+    'networks',
+    'ports',
+    'routers',
+    'security_groups',
+    'address_sets',
+)
+REVISION_KEY = 'neutron:revision_number'
+# Drift categories
+MISSING = 'missing-in-nb'
+EXTRA = 'extra-in-nb'
+MISMATCHED = 'mismatched'
+
+
+class _MissingValue(object):
+
+    def __repr__(self):
+        return 'MISSING_VALUE'
+
+
+MISSING_VALUE = _MissingValue()
+
+
+def keyed_merge(left, right):
+    """Merge two iterables of (key, value) pairs sorted by unique keys.
+
+    :param left: Pairs sorted by key
+    :type left: Iterable[Tuple[any,any]]
+    :param right: Pairs sorted by key
+    :type right: Iterable[Tuple[any,any]]
+    :returns: Iterator of key, left value and right value, where a value is
+              ``MISSING_VALUE`` if the key is not present on that side.
+    :rtype: Iterator[Tuple[any,any,any]]
+    """
+    left = iter(left)
+    right = iter(right)
+    lpair = next(left, None)
+    rpair = next(right, None)
+    while lpair is not None or rpair is not None:
+        if rpair is None or (lpair is not None and lpair[0] < rpair[0]):
+            yield lpair[0], lpair[1], MISSING_VALUE
+            lpair = next(left, None)
+        elif lpair is None or rpair[0] < lpair[0]:
+            yield rpair[0], MISSING_VALUE, rpair[1]
+            rpair = next(right, None)
+        else:
+            yield lpair[0], lpair[1], rpair[1]
+            lpair = next(left, None)
+            rpair = next(right, None)
+
+
+def compare(neutron, nb, samples=10):
+    """Compare Neutron and Northbound records.
+
+    :param neutron: Neutron records sorted by key
+    :type neutron: Iterable[Tuple[any,any]]
+    :param nb: Northbound records sorted by key
+    :type nb: Iterable[Tuple[any,any]]
+    :param samples: Maximum number of keys to report per category.
+    :type samples: int
+    :returns: Counts and sample keys
+    :rtype: Dict[str,any]
+    """
+    result = {
+        'neutron': 0,
+        'nb': 0,
+        MISSING: 0,
+        EXTRA: 0,
+        MISMATCHED: 0,
+        'samples': {MISSING: [], EXTRA: [], MISMATCHED: []},
+    }
+    for key, neutron_value, nb_value in keyed_merge(neutron, nb):
+        if neutron_value is MISSING_VALUE:
+            category = EXTRA
+        elif nb_value is MISSING_VALUE:
+            category = MISSING
+        elif neutron_value != nb_value:
+            category = MISMATCHED
+        else:
+            category = None
+        result['neutron'] += neutron_value is not MISSING_VALUE
+        result['nb'] += nb_value is not MISSING_VALUE
+        if category:
+            result[category] += 1
+            if len(result['samples'][category]) < samples:
+                result['samples'][category].append(
+                    '-'.join(key) if isinstance(key, tuple) else key)
+    return result
+
+
+def _revision(row):
+    """Get Neutron revision number stored in Northbound row.
+
+    :param row: Northbound row
+    :type row: Dict[str,any]
+    :returns: Revision number
+    :rtype: Optional[int]
+    """
+    try:
+        return int(row['external_ids'][REVISION_KEY])
+    except (KeyError, ValueError):
+        return None
+
+
+def nb_records(client, resource):
+    """Get Northbound records for resource type sorted by Neutron ID.
+
+    :param client: Connected client
+    :type client: ovsdb.Client
+    :param resource: Resource type
+    :type resource: str
+    :returns: Records, or None if the Northbound DB does not use this
+              resource type.
+    :rtype: Optional[List[Tuple[any,any]]]
+    :raises: ValueError
+    """
+    if resource in ('networks', 'routers'):
+        table = 'Logical_Switch' if resource == 'networks' else (
+            'Logical_Router')
+        records = [
+            (row['name'][len('neutron-'):], _revision(row))
+            for row in client.select(NB_DB, table,
+                                     ['name', 'external_ids'])
+            if row['name'].startswith('neutron-')
+        ]
+    elif resource == 'ports':
+        records = [
+            (row['name'], _revision(row))
+            for row in client.select(NB_DB, 'Logical_Switch_Port',
+                                     ['name', 'external_ids'])
+            # localnet ports for provider networks are not Neutron ports
+            if not row['name'].startswith('provnet-')
+        ]
+    elif resource == 'security_groups':
+        records = [
+            (row['name'][len('pg_'):].replace('_', '-'), None)
+            for row in client.select(NB_DB, 'Port_Group', ['name'])
+            if row['name'].startswith('pg_')
+        ]
+    elif resource == 'address_sets':
+        rows = [
+            row
+            for row in client.select(NB_DB, 'Address_Set',
+                                     ['name', 'addresses'])
+            if row['name'].startswith(('as_ip4_', 'as_ip6_'))
+        ]
+        if not rows:
+            # Recent Neutron releases match on port groups instead.
+            return None
+        records = [
+            ((row['name'][len('as_ip4_'):].replace('_', '-'),
+              row['name'][len('as_'):len('as_ip4')]),
+             sorted(ovsdb.as_set(row['addresses'])))
+            for row in rows
+        ]
+    else:
+        raise ValueError('unknown resource type "{}"'.format(resource))
+    return sorted(records)
+
+
+def neutron_records(script, connection, resource):
+    """Stream Neutron records for resource type sorted by Neutron ID.
+
+    :param script: Path to ``neutron_db_util.py``
+    :type script: str
+    :param connection: Neutron DB connection string
+    :type connection: str
+    :param resource: Resource type
+    :type resource: str
+    :returns: Iterator of records
+    :rtype: Iterator[Tuple[any,any]]
+    :raises: subprocess.CalledProcessError
+    """
+    cmd = (script, connection, 'dump', resource)
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE,
+                          stderr=subprocess.PIPE, universal_newlines=True,
+                          # We want this tool to run outside of the charm
+                          # venv to let it consume system Python packages.
+                          env={'PATH': '/usr/bin'}) as proc:
+        for line in proc.stdout:
+            key, value = json.loads(line)
+            yield (tuple(key) if isinstance(key, list) else key), value
+        stderr = proc.stderr.read()
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, cmd[:1],
+                                            stderr=stderr)
+
+
+def detect_resource(resource, neutron_source, nb_client_factory, samples):
+    """Detect drift for one resource type.
+
+    :param resource: Resource type
+    :type resource: str
+    :param neutron_source: Callable returning Neutron records for resource.
+    :type neutron_source: Callable[[str],Iterable[Tuple[any,any]]]
+    :param nb_client_factory: Callable returning an unconnected client.
+    :type nb_client_factory: Callable[[],ovsdb.Client]
+    :param samples: Maximum number of keys to report per category.
+    :type samples: int
+    :returns: Counts and sample keys
+    :rtype: Dict[str,any]
+    """
+    start = time.monotonic()
+    with nb_client_factory() as client:
+        nb = nb_records(client, resource)
+    if nb is None:
+        return {'skipped': 'not used by the Northbound DB'}
+    result = compare(neutron_source(resource), nb, samples=samples)
+    result['seconds'] = round(time.monotonic() - start, 3)
+    return result
+
+
+def detect(resources, neutron_source, nb_client_factory, samples=10):
+    """Detect drift for resource types in parallel.
+
+    :param resources: Resource types
+    :type resources: Iterable[str]
+    :param neutron_source: Callable returning Neutron records for resource.
+    :type neutron_source: Callable[[str],Iterable[Tuple[any,any]]]
+    :param nb_client_factory: Callable returning an unconnected client.
+    :type nb_client_factory: Callable[[],ovsdb.Client]
+    :param samples: Maximum number of keys to report per category.
+    :type samples: int
+    :returns: Map of resource type to counts and sample keys, and total
+              number of drifted records.
+    :rtype: Dict[str,any]
+    :raises: ValueError, ovsdb.OVSDBError, subprocess.CalledProcessError
+    """
+    resources = list(resources)
+    for resource in resources:
+        if resource not in RESOURCES:
+            raise ValueError('unknown resource type "{}"'.format(resource))
+    with concurrent.futures.ThreadPoolExecutor(
+            max_workers=len(resources) or 1) as executor:
+        futures = {
+            resource: executor.submit(detect_resource, resource,
+                                      neutron_source, nb_client_factory,
+                                      samples)
+            for resource in resources
+        }
+        results = {
+            resource: future.result()
+            for resource, future in futures.items()
+        }
+    results['total-drift'] = sum(
+        result.get(category, 0)
+        for result in list(results.values())
+        for category in (MISSING, EXTRA, MISMATCHED))
+    return results
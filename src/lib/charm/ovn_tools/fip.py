@@ -0,0 +1,167 @@
+# Copyright 2026 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Apply the distributed floating IP setting to the OVN Northbound DB.
+
+The Neutron OVN driver sets the ``logical_port`` of the ``NAT`` row of a
+floating IP to the port the floating IP is associated with.  With
+``enable_distributed_floating_ip`` it also sets the ``external_mac`` to the
+MAC address of the floating IP port while that port is up, so that the
+traffic is handled on the chassis of the port.  Without it the
+``external_mac`` is empty and the traffic goes through the gateway chassis.
+
+neutron-server only rewrites the rows of floating IPs it touches after the
+setting changed.  Here the rows of all floating IPs are brought in line
+with the setting directly.
+"""
+
+import charm.ovn_tools.ovsdb as ovsdb
+
+NB_DB = 'OVN_Northbound'
+TABLE = 'NAT'
+FIP_ID_KEY = 'neutron:fip_id'
+FIP_PORT_KEY = 'neutron:fip_port_id'
+FIP_MAC_KEY = 'neutron:fip_external_mac'
+
+
+def _optional(value):
+    """Get optional column value converted by ``to_python``.
+
+    :rtype: Optional[any]
+    """
+    values = ovsdb.as_set(value)
+    return values[0] if values else None
+
+
+def row_changes(rows, distributed, macs, up_ports):
+    """Compute changes of the floating IP rows for the setting.
+
+    :param rows: ``NAT`` rows with ``_uuid``, ``type``, ``logical_port``,
+                 ``external_mac`` and ``external_ids`` columns.
+    :type rows: Iterable[Dict[str,any]]
+    :param distributed: Whether floating IPs are distributed.
+    :type distributed: bool
+    :param macs: Map of floating IP ID to MAC address of its floating IP
+                 port, only used for distributed floating IPs.
+    :type macs: Dict[str,str]
+    :param up_ports: Names of logical switch ports that are up.
+    :type up_ports: Set[str]
+    :returns: Operations by row UUID, number of floating IP rows and of
+              rows of floating IPs missing in Neutron.
+    :rtype: Tuple[List[Tuple[str,List[Dict[str,any]]]],int,int]
+    """
+    changes = []
+    n_rows = 0
+    unknown = 0
+    for row in rows:
+        external_ids = row['external_ids']
+        if row['type'] != 'dnat_and_snat' or FIP_ID_KEY not in external_ids:
+            continue
+        n_rows += 1
+        logical_port = external_ids.get(FIP_PORT_KEY)
+        external_mac = mac = None
+        if distributed:
+            mac = macs.get(external_ids[FIP_ID_KEY])
+            if not mac or not logical_port:
+                unknown += 1
+                continue
+            if logical_port in up_ports:
+                external_mac = mac
+        elif not logical_port:
+            logical_port = _optional(row['logical_port'])
+        where = [['_uuid', '==', ['uuid', row['_uuid']]]]
+        operations = []
+        if (_optional(row['logical_port']) != logical_port or
+                _optional(row['external_mac']) != external_mac):
+            operations.append({
+                'op': 'update',
+                'table': TABLE,
+                'where': where,
+                'row': {
+                    'logical_port': ovsdb.to_ovsdb_set(
+                        [logical_port] if logical_port else []),
+                    'external_mac': ovsdb.to_ovsdb_set(
+                        [external_mac] if external_mac else []),
+                },
+            })
+        if mac and external_ids.get(FIP_MAC_KEY) != mac:
+            # an insert does not replace the value of an existing key
+            operations.append({
+                'op': 'mutate',
+                'table': TABLE,
+                'where': where,
+                'mutations': [
+                    ['external_ids', 'delete',
+                     ovsdb.to_ovsdb_set([FIP_MAC_KEY])],
+                    ['external_ids', 'insert',
+                     ovsdb.to_ovsdb_map({FIP_MAC_KEY: mac})],
+                ],
+            })
+        if operations:
+            changes.append((row['_uuid'], operations))
+    return changes, n_rows, unknown
+
+
+def up_ports(client):
+    """Get names of logical switch ports that are up.
+
+    :param client: Connected client
+    :type client: ovsdb.Client
+    :rtype: Set[str]
+    """
+    return set(
+        row['name']
+        for row in client.select(NB_DB, 'Logical_Switch_Port',
+                                 ['name', 'up'])
+        if _optional(row['up']))
+
+
+def apply(client, distributed, macs, batch_size=1000, dry_run=True):
+    """Apply the distributed floating IP setting to the ``NAT`` table.
+
+    :param client: Connected client
+    :type client: ovsdb.Client
+    :param distributed: Whether floating IPs are distributed.
+    :type distributed: bool
+    :param macs: Map of floating IP ID to MAC address of its floating IP
+                 port, only used for distributed floating IPs.
+    :type macs: Dict[str,str]
+    :param batch_size: Number of rows to change per transaction.
+    :type batch_size: int
+    :param dry_run: Only count the rows to change.
+    :type dry_run: bool
+    :returns: Counts of rows and transactions.
+    :rtype: Dict[str,int]
+    :raises: ovsdb.OVSDBError
+    """
+    rows = client.select(
+        NB_DB, TABLE,
+        ['_uuid', 'type', 'logical_port', 'external_mac', 'external_ids'])
+    changes, n_rows, unknown = row_changes(
+        rows, distributed, macs, up_ports(client) if distributed else set())
+    transactions = 0
+    if not dry_run:
+        for start in range(0, len(changes), batch_size):
+            client.transact(NB_DB, *[
+                operation
+                for _, operations in changes[start:start + batch_size]
+                for operation in operations
+            ])
+            transactions += 1
+    return {
+        'rows': n_rows,
+        'changed': len(changes),
+        'unknown-floating-ips': unknown,
+        'transactions': transactions,
+    }
@@ -0,0 +1,225 @@
+# Copyright 2026 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Rebalance gateway chassis priorities in the OVN Northbound DB.
+
+The OVN L3 scheduler of neutron-server only places new gateway ports, after
+gateway chassis have been added or removed the chassis with the highest
+priority, which carries the traffic, is unevenly spread over the existing
+ports.
+
+A group is the set of chassis of a router port with ``Gateway_Chassis``
+rows, or the chassis of a ``HA_Chassis_Group``.  The chassis of each group
+and the set of priority values used by the group are kept, only the order
+of the chassis is changed.  Ranks are balanced from the highest priority
+down by moving a chassis to a higher rank of a group where it is less loaded
+than the chassis currently holding that rank, which changes as few groups
+as needed.
+"""
+
+import charm.ovn_tools.ovsdb as ovsdb
+
+NB_DB = 'OVN_Northbound'
+
+
+def read_groups(client):
+    """Read gateway chassis groups.
+
+    :param client: Connected client
+    :type client: ovsdb.Client
+    :returns: Groups with name, table of the members and members sorted by
+              descending priority.
+    :rtype: List[Dict[str,any]]
+    """
+    tables = client.get_schema(NB_DB)['tables']
+    result = []
+    for group_table, name_column, member_column, member_table in (
+            ('Logical_Router_Port', 'name', 'gateway_chassis',
+             'Gateway_Chassis'),
+            ('HA_Chassis_Group', 'name', 'ha_chassis', 'HA_Chassis')):
+        if group_table not in tables or member_table not in tables:
+            continue
+        members = {
+            row['_uuid']: row
+            for row in client.select(NB_DB, member_table,
+                                     ['_uuid', 'chassis_name', 'priority'])
+        }
+        for row in client.select(NB_DB, group_table,
+                                 [name_column, member_column]):
+            group_members = [
+                members[uuid]
+                for uuid in ovsdb.as_set(row[member_column])
+                if uuid in members
+            ]
+            if len(group_members) < 2:
+                continue
+            result.append({
+                'name': row[name_column],
+                'table': member_table,
+                'members': sorted(
+                    group_members,
+                    key=lambda m: (-m['priority'], m['chassis_name'])),
+            })
+    return sorted(result, key=lambda g: (g['table'], g['name']))
+
+
+def loads(orders, rank=0):
+    """Count groups per chassis at rank.
+
+    :param orders: Chassis names of each group by descending priority.
+    :type orders: Iterable[List[str]]
+    :param rank: Rank, 0 being the highest priority.
+    :type rank: int
+    :returns: Map of chassis name to number of groups.
+    :rtype: Dict[str,int]
+    """
+    orders = list(orders)
+    result = {
+        chassis: 0 for order in orders for chassis in order[rank:]}
+    for order in orders:
+        if len(order) > rank:
+            result[order[rank]] += 1
+    return result
+
+
+def _balance_rank(orders, rank):
+    """Balance the number of groups per chassis at rank in place.
+
+    :param orders: Chassis names of each group by descending priority.
+    :type orders: List[List[str]]
+    :param rank: Rank, 0 being the highest priority.
+    :type rank: int
+    """
+    load = loads(orders, rank)
+    moved = True
+    # Every move lowers the sum of squared loads, so this terminates.
+    while moved:
+        moved = False
+        for order in orders:
+            if len(order) <= rank + 1:
+                continue
+            current = order[rank]
+            best = min(order[rank + 1:], key=lambda c: (load[c], c))
+            if load[best] + 1 < load[current]:
+                index = order.index(best)
+                order[rank], order[index] = best, current
+                load[current] -= 1
+                load[best] += 1
+                moved = True
+
+
+def balance(orders):
+    """Balance the number of groups per chassis at every rank.
+
+    :param orders: Chassis names of each group by descending priority.
+    :type orders: Iterable[List[str]]
+    :returns: New orders
+    :rtype: List[List[str]]
+    """
+    orders = [list(order) for order in orders]
+    depth = max((len(order) for order in orders), default=0)
+    for rank in range(depth - 1):
+        _balance_rank(orders, rank)
+    return orders
+
+
+def plan(groups):
+    """Plan priority changes balancing the groups.
+
+    :param groups: Output of ``read_groups``.
+    :type groups: List[Dict[str,any]]
+    :returns: Changed groups with name, table, chassis before and after and
+              updates of member UUID, old and new priority.
+    :rtype: List[Dict[str,any]]
+    """
+    before = [[m['chassis_name'] for m in group['members']]
+              for group in groups]
+    changes = []
+    for group, old, new in zip(groups, before, balance(before)):
+        if old == new:
+            continue
+        priorities = [m['priority'] for m in group['members']]
+        updates = [
+            (m['_uuid'], m['priority'], priorities[new.index(
+                m['chassis_name'])])
+            for m in group['members']
+            if m['priority'] != priorities[new.index(m['chassis_name'])]
+        ]
+        if not updates:
+            # members with equal priorities
+            continue
+        changes.append({
+            'name': group['name'],
+            'table': group['table'],
+            'before': old,
+            'after': new,
+            'updates': updates,
+        })
+    return changes
+
+
+def apply(client, changes, batch_size=100):
+    """Apply planned priority changes in batches of groups.
+
+    Every update is preceded by a check of the old priority, a concurrent
+    change by neutron-server aborts the transaction.
+
+    :param client: Connected client
+    :type client: ovsdb.Client
+    :param changes: Output of ``plan``.
+    :type changes: List[Dict[str,any]]
+    :param batch_size: Number of groups to change per transaction.
+    :type batch_size: int
+    :returns: Number of transactions
+    :rtype: int
+    :raises: ovsdb.OVSDBError
+    """
+    transactions = 0
+    for start in range(0, len(changes), batch_size):
+        operations = []
+        for change in changes[start:start + batch_size]:
+            for uuid, old, new in change['updates']:
+                where = [['_uuid', '==', ['uuid', uuid]]]
+                operations.extend([
+                    {'op': 'wait', 'timeout': 0, 'table': change['table'],
+                     'where': where, 'columns': ['priority'], 'until': '==',
+                     'rows': [{'priority': old}]},
+                    {'op': 'update', 'table': change['table'],
+                     'where': where, 'row': {'priority': new}},
+                ])
+        client.transact(NB_DB, *operations)
+        transactions += 1
+    return transactions
+
+
+def chassis_loads(groups, changes):
+    """Count groups per chassis at the highest priority before and after.
+
+    :param groups: Output of ``read_groups``.
+    :type groups: List[Dict[str,any]]
+    :param changes: Output of ``plan``.
+    :type changes: List[Dict[str,any]]
+    :returns: Map of chassis name to counts before and after.
+    :rtype: Dict[str,Dict[str,int]]
+    """
+    before = [[m['chassis_name'] for m in group['members']]
+              for group in groups]
+    changed = {(c['table'], c['name']): c['after'] for c in changes}
+    after = [changed.get((group['table'], group['name']), order)
+             for group, order in zip(groups, before)]
+    after_loads = loads(after)
+    return {
+        chassis: {'before': count, 'after': after_loads[chassis]}
+        for chassis, count in sorted(loads(before).items())
+    }
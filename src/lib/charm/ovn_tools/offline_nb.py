@@ -0,0 +1,313 @@
+# Copyright 2026 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Build the OVN Northbound DB contents offline.
+
+``neutron-ovn-db-sync-util`` creates every object in its own transaction,
+against a clustered database each of them has to be replicated before the
+next one is sent.  For a first-time migration the tool is instead pointed
+at a standalone database served by a local ``ovsdb-server``, the resulting
+file is compacted and, as a separate step, loaded into the cluster in one
+transaction with ``ovsdb-client restore``.
+
+Loading the file replaces the whole database, the rows configuring the
+remotes of the cluster are copied into the local database before the sync
+to preserve them.
+"""
+
+import contextlib
+import json
+import os
+import subprocess
+import time
+
+import charm.ovn_tools.ovsdb as ovsdb
+
+NB_DB = 'OVN_Northbound'
+DB_FILE = 'ovnnb_db.db'
+SCHEMA_FILE = 'ovn-nb.ovsschema'
+SOCKET = 'ovnnb_db.sock'
+CONFIG_FILE = 'neutron-ovn-offline-build.conf'
+# Tables with rows not managed by Neutron that are copied from the cluster,
+# referenced tables first.
+COPIED_TABLES = ('SSL', 'Connection', 'NB_Global')
+# Tables that have rows once Neutron has synced any network or router.
+NEUTRON_TABLES = ('Logical_Switch', 'Logical_Router')
+# Tables counted in the report of a build.
+REPORTED_TABLES = ('Logical_Switch', 'Logical_Switch_Port', 'Logical_Router',
+                   'Logical_Router_Port', 'ACL', 'Port_Group', 'Address_Set')
+START_TIMEOUT = 30
+TOOLS = ('ovsdb-tool', 'ovsdb-server', 'ovsdb-client')
+
+
+class OfflineBuildError(Exception):
+    pass
+
+
+def check_empty(client):
+    """Check that Neutron has not synced anything to the Northbound DB yet.
+
+    :param client: Client connected to the cluster.
+    :type client: ovsdb.Client
+    :raises: OfflineBuildError
+    """
+    for table in NEUTRON_TABLES:
+        rows = client.select(NB_DB, table, ['_uuid'])
+        if rows:
+            raise OfflineBuildError(
+                'the OVN Northbound DB has {} {} rows, an offline build can '
+                'only be used for a first-time migration'.format(
+                    len(rows), table))
+
+
+def _run(cmd, stdin=None):
+    """Run an OVSDB tool.
+
+    :param cmd: Command
+    :type cmd: Sequence[str]
+    :param stdin: File passed as standard input.
+    :type stdin: Optional[IO]
+    :raises: OfflineBuildError
+    """
+    cp = subprocess.run(cmd, stdin=stdin, capture_output=True,
+                        universal_newlines=True)
+    if cp.returncode != 0:
+        raise OfflineBuildError('{} failed: {}'.format(
+            ' '.join(cmd), cp.stderr.strip()))
+
+
+def _named_uuid(uuid):
+    return 'row_{}'.format(uuid.replace('-', '_'))
+
+
+def _replace_uuids(value, names):
+    """Replace references to copied rows in a column value by named UUIDs.
+
+    :param value: Column value in OVSDB JSON representation.
+    :type value: any
+    :param names: Map of UUID of copied rows to named UUID.
+    :type names: Dict[str,str]
+    :returns: Column value
+    :rtype: any
+    """
+    if isinstance(value, list) and len(value) == 2:
+        kind, data = value
+        if kind == 'uuid' and data in names:
+            return ['named-uuid', names[data]]
+        if kind == 'set':
+            return [kind, [_replace_uuids(element, names)
+                           for element in data]]
+        if kind == 'map':
+            return [kind, [[_replace_uuids(k, names),
+                            _replace_uuids(v, names)] for k, v in data]]
+    return value
+
+
+def copy_operations(tables):
+    """Build operations inserting rows of ``COPIED_TABLES``.
+
+    :param tables: Map of table name to rows in OVSDB JSON representation,
+                   as returned by a select operation.
+    :type tables: Dict[str,List[Dict[str,any]]]
+    :returns: Operations
+    :rtype: List[Dict[str,any]]
+    """
+    names = {
+        row['_uuid'][1]: _named_uuid(row['_uuid'][1])
+        for table in COPIED_TABLES
+        for row in tables.get(table, [])
+    }
+    return [
+        {
+            'op': 'insert',
+            'table': table,
+            'uuid-name': names[row['_uuid'][1]],
+            'row': {
+                column: _replace_uuids(value, names)
+                for column, value in row.items()
+                if column not in ('_uuid', '_version')
+            },
+        }
+        for table in COPIED_TABLES
+        for row in tables.get(table, [])
+    ]
+
+
+def copy_rows(source, target):
+    """Copy rows of ``COPIED_TABLES`` between databases.
+
+    :param source: Client connected to the cluster.
+    :type source: ovsdb.Client
+    :param target: Client connected to the local database.
+    :type target: ovsdb.Client
+    :raises: ovsdb.OVSDBError
+    """
+    # rows are selected with plain operations, references have to be kept
+    # in OVSDB JSON representation to be rewritten.
+    results = source.transact(NB_DB, *(
+        {'op': 'select', 'table': table, 'where': []}
+        for table in COPIED_TABLES))
+    ops = copy_operations({
+        table: result['rows']
+        for table, result in zip(COPIED_TABLES, results)
+    })
+    if ops:
+        target.transact(NB_DB, *ops)
+
+
+def write_config(workdir, remote):
+    """Write configuration pointing the ML2 driver at the local database.
+
+    The file is passed to ``neutron-ovn-db-sync-util`` after the ML2
+    configuration file and overrides its Northbound connection.
+
+    :param workdir: Directory of the build
+    :type workdir: str
+    :param remote: Remote of the local database.
+    :type remote: str
+    :returns: Path to the configuration file.
+    :rtype: str
+    """
+    path = os.path.join(workdir, CONFIG_FILE)
+    with open(path, 'w') as f:
+        f.write('[ovn]\n'
+                'ovn_nb_connection = {}\n'
+                'ovn_nb_private_key =\n'
+                'ovn_nb_certificate =\n'
+                'ovn_nb_ca_cert =\n'.format(remote))
+    return path
+
+
+def _wait_ready(server, remote, timeout=START_TIMEOUT):
+    """Wait for a local ``ovsdb-server`` to accept connections.
+
+    :param server: Server process
+    :type server: subprocess.Popen
+    :param remote: Remote of the server.
+    :type remote: str
+    :param timeout: Seconds to wait.
+    :type timeout: float
+    :raises: OfflineBuildError
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        if server.poll() is not None:
+            raise OfflineBuildError('ovsdb-server exited with code {}'
+                                    .format(server.returncode))
+        try:
+            with ovsdb.Client(remote, timeout=1) as client:
+                client.echo()
+            return
+        except ovsdb.OVSDBError:
+            if time.monotonic() > deadline:
+                raise OfflineBuildError('ovsdb-server did not start within '
+                                        '{} seconds'.format(timeout))
+            time.sleep(0.1)
+
+
+@contextlib.contextmanager
+def local_server(workdir, schema):
+    """Serve a new standalone database with a local ``ovsdb-server``.
+
+    The database, its schema, socket and log are kept in workdir.  The
+    server is stopped on exit, leaving the database file in place.
+
+    :param workdir: Directory of the build
+    :type workdir: str
+    :param schema: Northbound DB schema as returned by ``get_schema``.
+    :type schema: Dict[str,any]
+    :returns: Context manager yielding the remote of the local database.
+    :rtype: Iterator[str]
+    :raises: OfflineBuildError
+    """
+    db = os.path.join(workdir, DB_FILE)
+    schema_file = os.path.join(workdir, SCHEMA_FILE)
+    with open(schema_file, 'w') as f:
+        json.dump(schema, f)
+    _run(('ovsdb-tool', 'create', db, schema_file))
+    remote = 'unix:{}'.format(os.path.join(workdir, SOCKET))
+    server = subprocess.Popen(
+        (
+            'ovsdb-server',
+            db,
+            '--remote=p{}'.format(remote),
+            '--unixctl={}'.format(os.path.join(workdir, 'ovsdb-server.ctl')),
+            '--log-file={}'.format(os.path.join(workdir, 'ovsdb-server.log')),
+            '--no-chdir',
+            '-vconsole:off',
+        ),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_ready(server, remote)
+        yield remote
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=START_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            server.kill()
+            server.wait()
+
+
+def count_rows(client):
+    """Count rows of ``REPORTED_TABLES``.
+
+    :param client: Connected client
+    :type client: ovsdb.Client
+    :returns: Map of table name to number of rows.
+    :rtype: Dict[str,int]
+    """
+    results = client.transact(NB_DB, *(
+        {'op': 'select', 'table': table, 'where': [], 'columns': ['_uuid']}
+        for table in REPORTED_TABLES))
+    return {table: len(result['rows'])
+            for table, result in zip(REPORTED_TABLES, results)}
+
+
+def compact(db):
+    """Compact a database file, dropping the history of the build.
+
+    :param db: Path to database file
+    :type db: str
+    :raises: OfflineBuildError
+    """
+    _run(('ovsdb-tool', 'compact', db))
+
+
+def restore(db, remotes, private_key=None, certificate=None, ca_cert=None):
+    """Replace the contents of the cluster with a database file.
+
+    :param db: Path to database file
+    :type db: str
+    :param remotes: Comma separated list of remotes of the cluster.
+    :type remotes: str
+    :param private_key: Path to TLS private key for ssl remotes.
+    :type private_key: Optional[str]
+    :param certificate: Path to TLS certificate for ssl remotes.
+    :type certificate: Optional[str]
+    :param ca_cert: Path to TLS CA certificate for ssl remotes.
+    :type ca_cert: Optional[str]
+    :raises: OfflineBuildError
+    """
+    cmd = ['ovsdb-client']
+    for option, value in (('private-key', private_key),
+                          ('certificate', certificate),
+                          ('ca-cert', ca_cert)):
+        if value:
+            cmd.append('--{}={}'.format(option, value))
+    cmd.extend(('restore', remotes, NB_DB))
+    with open(db) as f:
+        _run(cmd, stdin=f)
@@ -0,0 +1,193 @@
+# Copyright 2026 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Find and delete OVN Northbound rows no Neutron resource owns.
+
+Rows are matched with Neutron resources by the IDs the Neutron OVN driver
+stores in the row name or in ``external_ids``.  Rows without these keys
+were not created by Neutron and are left alone.
+
+The Northbound DB is read before the Neutron DB, as Neutron commits a
+resource before creating its Northbound rows, a resource created in
+between is not mistaken for an orphan.
+
+Logical switch ports and ACLs are not root rows, they are deleted by
+removing the references to them from their logical switch or port group.
+"""
+
+import collections
+
+import charm.ovn_tools.ovsdb as ovsdb
+
+NB_DB = 'OVN_Northbound'
+SECURITY_GROUP_KEY = 'neutron:security_group_id'
+SECURITY_GROUP_RULE_KEY = 'neutron:security_group_rule_id'
+LPORT_KEY = 'neutron:lport'
+# Neutron resource types the Northbound rows are matched with.
+NEUTRON_RESOURCES = ('ports', 'security_groups', 'security_group_rules')
+# Tables in the order orphans are reported and deleted.
+TABLES = ('Logical_Switch_Port', 'ACL', 'Port_Group', 'Address_Set')
+
+Orphan = collections.namedtuple('Orphan',
+                                ['table', 'uuid', 'name', 'parent'])
+Orphan.__doc__ = """Northbound row no Neutron resource owns.
+
+The parent is a (table, UUID, column) tuple of the row referencing a
+non-root row, or None for root rows.
+"""
+
+
+def _neutron_owned(row):
+    """Check whether row was created by the Neutron OVN driver.
+
+    :param row: Row with ``external_ids``
+    :type row: Dict[str,any]
+    :rtype: bool
+    """
+    return any(key.startswith('neutron:') for key in row['external_ids'])
+
+
+def find(client, neutron_ids):
+    """Find Northbound rows no Neutron resource owns.
+
+    :param client: Connected client
+    :type client: ovsdb.Client
+    :param neutron_ids: Callable returning the set of IDs of a Neutron
+                        resource type, called once the Northbound DB has
+                        been read.
+    :type neutron_ids: Callable[[str],Set[str]]
+    :returns: Orphans sorted by table in ``TABLES`` order, then by name.
+    :rtype: List[Orphan]
+    """
+    switches = client.select(NB_DB, 'Logical_Switch',
+                             ['_uuid', 'ports', 'acls'])
+    lsps = client.select(NB_DB, 'Logical_Switch_Port',
+                         ['_uuid', 'name', 'type', 'external_ids'])
+    port_groups = client.select(NB_DB, 'Port_Group',
+                                ['_uuid', 'name', 'acls', 'external_ids'])
+    acls = client.select(NB_DB, 'ACL', ['_uuid', 'external_ids'])
+    address_sets = client.select(NB_DB, 'Address_Set',
+                                 ['_uuid', 'name', 'external_ids'])
+    ids = {resource: neutron_ids(resource) for resource in NEUTRON_RESOURCES}
+
+    # strong references of the non-root rows, references of port groups to
+    # logical switch ports are weak
+    parents = {}
+    for table, rows, columns in (
+            ('Logical_Switch', switches, ('ports', 'acls')),
+            ('Port_Group', port_groups, ('acls',))):
+        for row in rows:
+            for column in columns:
+                for uuid in ovsdb.as_set(row[column]):
+                    parents[uuid] = (table, row['_uuid'], column)
+
+    orphans = []
+    for row in lsps:
+        if (_neutron_owned(row) and row['type'] != 'localnet' and
+                row['name'] not in ids['ports']):
+            orphans.append(Orphan('Logical_Switch_Port', row['_uuid'],
+                                  row['name'], parents.get(row['_uuid'])))
+    deleted_groups = set()
+    for table, rows in (('Port_Group', port_groups),
+                        ('Address_Set', address_sets)):
+        for row in rows:
+            sg_id = row['external_ids'].get(SECURITY_GROUP_KEY)
+            if sg_id and sg_id not in ids['security_groups']:
+                orphans.append(Orphan(table, row['_uuid'], row['name'], None))
+                deleted_groups.add(row['_uuid'])
+    for row in acls:
+        rule_id = row['external_ids'].get(SECURITY_GROUP_RULE_KEY)
+        lport = row['external_ids'].get(LPORT_KEY)
+        if ((rule_id and rule_id not in ids['security_group_rules']) or
+                (not rule_id and lport and lport not in ids['ports'])):
+            parent = parents.get(row['_uuid'])
+            if parent and parent[1] in deleted_groups:
+                # deleted with its port group
+                continue
+            orphans.append(Orphan('ACL', row['_uuid'], rule_id or lport,
+                                  parent))
+    return sorted(orphans, key=lambda o: (TABLES.index(o.table), o.name))
+
+
+def operations(orphans):
+    """Build operations deleting orphans.
+
+    References from the same parent are removed with one mutation.
+
+    :param orphans: Orphans
+    :type orphans: Iterable[Orphan]
+    :returns: Operations
+    :rtype: List[Dict[str,any]]
+    """
+    references = collections.OrderedDict()
+    deletes = []
+    for orphan in orphans:
+        if orphan.parent:
+            references.setdefault(orphan.parent, []).append(orphan.uuid)
+        elif orphan.table in ('Port_Group', 'Address_Set'):
+            deletes.append({
+                'op': 'delete',
+                'table': orphan.table,
+                'where': [['_uuid', '==', ['uuid', orphan.uuid]]],
+            })
+    return [
+        {
+            'op': 'mutate',
+            'table': table,
+            'where': [['_uuid', '==', ['uuid', parent_uuid]]],
+            'mutations': [[column, 'delete', ovsdb.to_ovsdb_set(
+                ['uuid', uuid] for uuid in uuids)]],
+        }
+        for (table, parent_uuid, column), uuids in references.items()
+    ] + deletes
+
+
+def delete(client, orphans, batch_size=500):
+    """Delete orphans in batches.
+
+    :param client: Connected client
+    :type client: ovsdb.Client
+    :param orphans: Orphans
+    :type orphans: List[Orphan]
+    :param batch_size: Number of orphans to delete per transaction.
+    :type batch_size: int
+    :returns: Number of transactions
+    :rtype: int
+    :raises: ovsdb.OVSDBError
+    """
+    transactions = 0
+    for start in range(0, len(orphans), batch_size):
+        ops = operations(orphans[start:start + batch_size])
+        if ops:
+            client.transact(NB_DB, *ops)
+            transactions += 1
+    return transactions
+
+
+def report(orphans, samples=10):
+    """Summarize orphans per table.
+
+    :param orphans: Orphans
+    :type orphans: Iterable[Orphan]
+    :param samples: Maximum number of names to report per table.
+    :type samples: int
+    :returns: Map of table to number of orphans and sample names.
+    :rtype: Dict[str,Dict[str,any]]
+    """
+    result = {table: {'orphans': 0, 'samples': []} for table in TABLES}
+    for orphan in orphans:
+        result[orphan.table]['orphans'] += 1
+        if len(result[orphan.table]['samples']) < samples:
+            result[orphan.table]['samples'].append(orphan.name)
+    return result
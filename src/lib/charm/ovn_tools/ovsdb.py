@@ -0,0 +1,645 @@
+# Copyright 2026 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Minimal OVSDB client (RFC 7047) for use in charm actions.
+
+The charm venv does not include the Open vSwitch Python bindings, this
+module implements the subset of the OVSDB management protocol needed to
+inspect and maintain the OVN databases using only the standard library.
+"""
+
+import asyncio
+import collections
+import hashlib
+import json
+import re
+import socket
+import ssl
+import time
+
+# Default timeout for connecting and for waiting on replies (seconds).
+TIMEOUT = 30
+# Size of reads from the socket
+READ_SIZE = 65536
+
+# Complete JSON string and remainder of a JSON string without the quote.
+_STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_STRING_CONTENT = re.compile(rb'[^"\\]*(?:\\.[^"\\]*)*', re.DOTALL)
+
+
+class OVSDBError(Exception):
+    pass
+
+
+def parse_remote(remote):
+    """Parse OVSDB remote specification.
+
+    :param remote: Remote such as ``ssl:10.0.0.1:6641``, ``tcp:[::1]:6641``
+                   or ``unix:/run/ovn/ovnnb_db.sock``.
+    :type remote: str
+    :returns: Tuple of protocol and address, where address is a path for the
+              unix protocol and a tuple of host and port otherwise.
+    :rtype: Tuple[str,Union[str,Tuple[str,int]]]
+    :raises: ValueError
+    """
+    protocol, _, address = remote.partition(':')
+    if protocol == 'unix' and address:
+        return protocol, address
+    if protocol not in ('ssl', 'tcp'):
+        raise ValueError('unsupported remote "{}"'.format(remote))
+    host, _, port = address.rpartition(':')
+    if not host or not port.isdigit():
+        raise ValueError('unsupported remote "{}"'.format(remote))
+    return protocol, (host.strip('[]'), int(port))
+
+
+def to_python(value):
+    """Convert OVSDB JSON representation of a column value to Python.
+
+    Sets become lists, maps become dicts and UUIDs become strings.
+
+    :param value: Column value as received from the server.
+    :type value: any
+    :returns: Python value
+    :rtype: any
+    """
+    if isinstance(value, list) and len(value) == 2:
+        kind, data = value
+        if kind == 'set':
+            return [to_python(element) for element in data]
+        if kind == 'map':
+            return {to_python(k): to_python(v) for k, v in data}
+        if kind in ('uuid', 'named-uuid'):
+            return data
+    return value
+
+
+def as_set(value):
+    """Get set column value converted by ``to_python`` as list.
+
+    A set with exactly one element is sent as the bare element.
+
+    :param value: Column value
+    :type value: any
+    :returns: Elements
+    :rtype: List[any]
+    """
+    return value if isinstance(value, list) else [value]
+
+
+def to_ovsdb_set(values):
+    """Convert Python iterable to OVSDB JSON representation of a set.
+
+    :param values: Atoms
+    :type values: Iterable[any]
+    :returns: OVSDB set
+    :rtype: List
+    """
+    return ['set', list(values)]
+
+
+def to_ovsdb_map(values):
+    """Convert Python dict to OVSDB JSON representation of a map.
+
+    :param values: Map
+    :type values: Dict[any,any]
+    :returns: OVSDB map
+    :rtype: List
+    """
+    return ['map', [[k, v] for k, v in sorted(values.items())]]
+
+
+def ssl_context(private_key=None, certificate=None, ca_cert=None):
+    """Get TLS context for ssl remotes.
+
+    Certificates of OVN databases are issued for addresses that do not
+    necessarily match the address in the remote, as with ``ovsdb-client``
+    the peer is verified against the CA only.
+
+    :param private_key: Path to TLS private key.
+    :type private_key: Optional[str]
+    :param certificate: Path to TLS certificate.
+    :type certificate: Optional[str]
+    :param ca_cert: Path to TLS CA certificate.
+    :type ca_cert: Optional[str]
+    :returns: TLS context
+    :rtype: ssl.SSLContext
+    """
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_REQUIRED
+    if ca_cert:
+        context.load_verify_locations(cafile=ca_cert)
+    if certificate:
+        context.load_cert_chain(certificate, keyfile=private_key)
+    return context
+
+
+class Framer(object):
+    """Split a stream of JSON-RPC messages into messages.
+
+    Messages are JSON objects sent back to back without delimiters.  Rather
+    than attempting to decode the buffer after every read, which is
+    quadratic in the size of large replies, the nesting depth of the stream
+    is tracked and the buffer is decoded once the depth is back at zero.
+    Strings are skipped as they may contain brackets.  The characters
+    tracked are all ASCII, which never occur inside multi-byte UTF-8
+    sequences, so the scan is done on bytes.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._messages = collections.deque()
+
+    def _scan(self, data):
+        """Update nesting depth and string state with data.
+
+        :param data: Data
+        :type data: bytes
+        """
+        pos = 0
+        if self._in_string:
+            if self._escape:
+                pos = 1
+                self._escape = False
+            pos = _STRING_CONTENT.match(data, pos).end()
+            if pos == len(data):
+                return
+            if data[pos:pos + 1] == b'\\':
+                # escape character split from the escaped character
+                self._escape = True
+                return
+            # closing quote
+            self._in_string = False
+            pos += 1
+        rest = _STRING.sub(b'', data[pos:])
+        quote = rest.find(b'"')
+        if quote != -1:
+            # a string continues in the next read
+            self._in_string = True
+            tail = data[data.rfind(b'"') + 1:]
+            backslashes = len(tail) - len(tail.rstrip(b'\\'))
+            self._escape = bool(backslashes % 2)
+            rest = rest[:quote]
+        self._depth += (rest.count(b'{') + rest.count(b'[') -
+                        rest.count(b'}') - rest.count(b']'))
+
+    def feed(self, data):
+        """Add data received from the stream.
+
+        :param data: Data
+        :type data: bytes
+        :raises: OVSDBError
+        """
+        self._chunks.append(data)
+        self._scan(data)
+        if self._depth or self._in_string:
+            return
+        try:
+            text = b''.join(self._chunks).decode('utf-8')
+        except UnicodeDecodeError as e:
+            raise OVSDBError('invalid message: {}'.format(e))
+        self._chunks = []
+        decoder = json.JSONDecoder()
+        pos = 0
+        while True:
+            while pos < len(text) and text[pos].isspace():
+                pos += 1
+            if pos == len(text):
+                break
+            try:
+                message, pos = decoder.raw_decode(text, pos)
+            except ValueError as e:
+                raise OVSDBError('invalid message: {}'.format(e))
+            self._messages.append(message)
+
+    def pop(self):
+        """Get next complete message.
+
+        :returns: Message or None if no complete message has been received.
+        :rtype: Optional[Dict[str,any]]
+        """
+        if self._messages:
+            return self._messages.popleft()
+        return None
+
+
+class Client(object):
+    """Synchronous OVSDB JSON-RPC client.
+
+    The client connects to the first reachable remote in a comma separated
+    list, as used for ``ovn_nb_connection`` in the ML2 configuration.
+    """
+
+    def __init__(self, remotes, private_key=None, certificate=None,
+                 ca_cert=None, timeout=TIMEOUT):
+        """Initialize client.
+
+        :param remotes: Comma separated list of remotes.
+        :type remotes: str
+        :param private_key: Path to TLS private key for ssl remotes.
+        :type private_key: Optional[str]
+        :param certificate: Path to TLS certificate for ssl remotes.
+        :type certificate: Optional[str]
+        :param ca_cert: Path to TLS CA certificate for ssl remotes.
+        :type ca_cert: Optional[str]
+        :param timeout: Timeout for connect and replies in seconds.
+        :type timeout: float
+        """
+        self.remotes = [
+            remote.strip() for remote in remotes.split(',') if remote.strip()]
+        self.private_key = private_key
+        self.certificate = certificate
+        self.ca_cert = ca_cert
+        self.timeout = timeout
+        self.remote = None
+        self._sock = None
+        self._framer = None
+        self._next_id = 0
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def ssl_context(self):
+        """Get TLS context for ssl remotes.
+
+        :returns: TLS context
+        :rtype: ssl.SSLContext
+        """
+        return ssl_context(self.private_key, self.certificate, self.ca_cert)
+
+    def open_socket(self, remote):
+        """Open socket to remote.
+
+        :param remote: Remote
+        :type remote: str
+        :returns: Connected socket
+        :rtype: socket.socket
+        :raises: OSError, ValueError
+        """
+        protocol, address = parse_remote(remote)
+        if protocol == 'unix':
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(address)
+            except OSError:
+                sock.close()
+                raise
+            return sock
+        sock = socket.create_connection(address, timeout=self.timeout)
+        if protocol == 'ssl':
+            try:
+                sock = self.ssl_context().wrap_socket(sock)
+            except (OSError, ssl.SSLError):
+                sock.close()
+                raise
+        return sock
+
+    def connect(self):
+        """Connect to the first reachable remote.
+
+        :raises: OVSDBError
+        """
+        errors = []
+        for remote in self.remotes:
+            try:
+                self._sock = self.open_socket(remote)
+            except (OSError, ValueError) as e:
+                errors.append('{}: {}'.format(remote, e))
+                continue
+            self.remote = remote
+            self._framer = Framer()
+            return
+        raise OVSDBError('unable to connect: {}'.format('; '.join(errors)))
+
+    def close(self):
+        """Close connection."""
+        if self._sock:
+            self._sock.close()
+            self._sock = None
+
+    def _send(self, message):
+        self._sock.sendall(json.dumps(message).encode('utf-8'))
+
+    def _receive(self):
+        """Receive one JSON-RPC message.
+
+        :returns: Message
+        :rtype: Dict[str,any]
+        :raises: OVSDBError
+        """
+        while True:
+            message = self._framer.pop()
+            if message is not None:
+                return message
+            try:
+                data = self._sock.recv(READ_SIZE)
+            except socket.timeout:
+                raise OVSDBError('timeout waiting for reply from {}'
+                                 .format(self.remote))
+            if not data:
+                raise OVSDBError('connection to {} closed'
+                                 .format(self.remote))
+            self._framer.feed(data)
+
+    def call(self, method, *params):
+        """Call method on the server and wait for its reply.
+
+        Echo requests sent by the server while waiting are answered.
+
+        :param method: Method name
+        :type method: str
+        :param params: Method parameters
+        :type params: any
+        :returns: Result
+        :rtype: any
+        :raises: OVSDBError
+        """
+        if not self._sock:
+            self.connect()
+        self._next_id += 1
+        request_id = self._next_id
+        self._send({'method': method, 'params': list(params),
+                    'id': request_id})
+        while True:
+            message = self._receive()
+            if message.get('method') == 'echo':
+                self._send({'result': message.get('params'), 'error': None,
+                            'id': message.get('id')})
+                continue
+            if message.get('id') != request_id:
+                # notifications and replies to abandoned requests
+                continue
+            if message.get('error'):
+                raise OVSDBError('{} failed: {}'
+                                 .format(method, message['error']))
+            return message.get('result')
+
+    def echo(self):
+        """Send echo request.
+
+        :returns: Echoed parameters
+        :rtype: List
+        """
+        return self.call('echo', 'ping')
+
+    def list_dbs(self):
+        """Get names of databases on the server.
+
+        :returns: Database names
+        :rtype: List[str]
+        """
+        return self.call('list_dbs')
+
+    def get_schema(self, db):
+        """Get database schema.
+
+        :param db: Database name
+        :type db: str
+        :returns: Schema
+        :rtype: Dict[str,any]
+        """
+        return self.call('get_schema', db)
+
+    def transact(self, db, *operations):
+        """Execute operations in a transaction.
+
+        :param db: Database name
+        :type db: str
+        :param operations: Operations
+        :type operations: Dict[str,any]
+        :returns: Results of operations
+        :rtype: List[Dict[str,any]]
+        :raises: OVSDBError
+        """
+        results = self.call('transact', db, *operations)
+        # Failure to commit is reported in an additional result, results of
+        # operations following a failed operation are null.
+        for result in results or []:
+            if result and 'error' in result:
+                raise OVSDBError('transaction failed: {}: {}'.format(
+                    result['error'], result.get('details', '')))
+        return results
+
+    def select(self, db, table, columns=None, where=None):
+        """Select rows from table.
+
+        :param db: Database name
+        :type db: str
+        :param table: Table name
+        :type table: str
+        :param columns: Columns to retrieve, defaults to all columns.
+        :type columns: Optional[List[str]]
+        :param where: Conditions
+        :type where: Optional[List[List[any]]]
+        :returns: Rows with column values converted by ``to_python``.
+        :rtype: List[Dict[str,any]]
+        """
+        operation = {'op': 'select', 'table': table, 'where': where or []}
+        if columns is not None:
+            operation['columns'] = list(columns)
+        result = self.transact(db, operation)[0]
+        return [
+            {column: to_python(value) for column, value in row.items()}
+            for row in result['rows']
+        ]
+
+
+def fingerprint(client, db):
+    """Get a value that changes with every transaction committed to db.
+
+    Clustered databases report the index of the last applied log entry in
+    the ``_Server`` database, for standalone databases the ``_version`` of
+    every row is hashed instead.
+
+    :param client: Connected client
+    :type client: Client
+    :param db: Database name
+    :type db: str
+    :returns: Fingerprint
+    :rtype: str
+    :raises: OVSDBError
+    """
+    rows = client.select('_Server', 'Database', ['cid', 'index'],
+                         where=[['name', '==', db]])
+    if rows and rows[0]['index']:
+        return 'index:{}:{}'.format(rows[0]['cid'], rows[0]['index'])
+    digest = hashlib.sha256()
+    for table in sorted(client.get_schema(db)['tables']):
+        digest.update(table.encode('utf-8'))
+        for row in sorted(client.select(db, table, ['_uuid', '_version']),
+                          key=lambda row: row['_uuid']):
+            digest.update('{_uuid}{_version}'.format(**row).encode('utf-8'))
+    return 'sha256:{}'.format(digest.hexdigest())
+
+
+class _ProbeProtocol(asyncio.Protocol):
+    """Exchange JSON-RPC messages for ``probe``."""
+
+    def __init__(self):
+        self.transport = None
+        self.framer = Framer()
+        self.messages = asyncio.Queue()
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        try:
+            self.framer.feed(data)
+        except OVSDBError as e:
+            self.messages.put_nowait(e)
+            return
+        message = self.framer.pop()
+        while message is not None:
+            self.messages.put_nowait(message)
+            message = self.framer.pop()
+
+    def connection_lost(self, exc):
+        self.messages.put_nowait(OVSDBError('connection closed'))
+
+    async def call(self, method, *params):
+        """Call method on the server and wait for its reply.
+
+        :param method: Method name
+        :type method: str
+        :param params: Method parameters
+        :type params: any
+        :returns: Result
+        :rtype: any
+        :raises: OVSDBError
+        """
+        self.transport.write(json.dumps(
+            {'method': method, 'params': list(params), 'id': method}
+        ).encode('utf-8'))
+        while True:
+            message = await self.messages.get()
+            if isinstance(message, Exception):
+                raise message
+            if message.get('method') == 'echo':
+                self.transport.write(json.dumps(
+                    {'result': message.get('params'), 'error': None,
+                     'id': message.get('id')}).encode('utf-8'))
+                continue
+            if message.get('id') != method:
+                continue
+            if message.get('error'):
+                raise OVSDBError('{} failed: {}'
+                                 .format(method, message['error']))
+            return message.get('result')
+
+
+def _milliseconds(start):
+    return round((time.monotonic() - start) * 1000, 1)
+
+
+async def probe(remote, context=None, timeout=TIMEOUT):
+    """Measure connectivity and latency of a remote.
+
+    The time to connect, to complete the TLS handshake for ssl remotes and
+    the round trip time of an ``echo`` and a ``list_dbs`` request are
+    measured in milliseconds.  The clustered databases the server is the
+    raft leader for are looked up in its ``_Server`` database.
+
+    :param remote: Remote
+    :type remote: str
+    :param context: TLS context for ssl remotes.
+    :type context: Optional[ssl.SSLContext]
+    :param timeout: Timeout for each step in seconds.
+    :type timeout: float
+    :returns: Measurements, and the error if a step failed.
+    :rtype: Dict[str,any]
+    """
+    loop = asyncio.get_running_loop()
+    result = {'remote': remote}
+    transport = None
+    try:
+        protocol_name, address = parse_remote(remote)
+        start = time.monotonic()
+        if protocol_name == 'unix':
+            transport, protocol = await asyncio.wait_for(
+                loop.create_unix_connection(_ProbeProtocol, address),
+                timeout)
+        else:
+            transport, protocol = await asyncio.wait_for(
+                loop.create_connection(_ProbeProtocol, *address), timeout)
+        result['connect'] = _milliseconds(start)
+        if protocol_name == 'ssl':
+            start = time.monotonic()
+            transport = await asyncio.wait_for(
+                loop.start_tls(transport, protocol,
+                               context or ssl_context()),
+                timeout)
+            protocol.transport = transport
+            result['tls'] = _milliseconds(start)
+        start = time.monotonic()
+        await asyncio.wait_for(protocol.call('echo', 'probe'), timeout)
+        result['echo'] = _milliseconds(start)
+        start = time.monotonic()
+        result['dbs'] = await asyncio.wait_for(protocol.call('list_dbs'),
+                                               timeout)
+        result['list_dbs'] = _milliseconds(start)
+        if '_Server' in result['dbs']:
+            reply = await asyncio.wait_for(protocol.call(
+                'transact', '_Server',
+                {'op': 'select', 'table': 'Database', 'where': [],
+                 'columns': ['name', 'model', 'leader']}), timeout)
+            result['leader'] = sorted(
+                row['name'] for row in reply[0]['rows']
+                if row['model'] == 'clustered' and row['leader'] is True)
+    except asyncio.TimeoutError:
+        result['error'] = 'timeout after {}s'.format(timeout)
+    except (OSError, ValueError, ssl.SSLError, OVSDBError) as e:
+        result['error'] = str(e) or e.__class__.__name__
+    finally:
+        if transport:
+            transport.abort()
+    return result
+
+
+def probe_all(remotes, context=None, timeout=TIMEOUT):
+    """Probe remotes concurrently.
+
+    :param remotes: Map of name to comma separated list of remotes.
+    :type remotes: Dict[str,str]
+    :param context: TLS context for ssl remotes.
+    :type context: Optional[ssl.SSLContext]
+    :param timeout: Timeout for each step in seconds.
+    :type timeout: float
+    :returns: Results of ``probe`` with the name added, in input order.
+    :rtype: List[Dict[str,any]]
+    """
+    targets = [
+        (name, remote.strip())
+        for name, value in remotes.items()
+        for remote in value.split(',') if remote.strip()
+    ]
+
+    async def _probe_all():
+        return await asyncio.gather(*(
+            probe(remote, context=context, timeout=timeout)
+            for _, remote in targets))
+
+    results = asyncio.run(_probe_all())
+    for (name, _), result in zip(targets, results):
+        result['db'] = name
+    return results
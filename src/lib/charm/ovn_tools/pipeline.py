@@ -0,0 +1,129 @@
+# Copyright 2026 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Run stages of a long operation in order, with timings and resume.
+
+Consecutive stages that may overlap, typically read-only verification
+stages that do not depend on each other, run concurrently.  Every other
+stage runs on its own, in the calling thread, once all previous stages
+have succeeded.  Stages completed by an earlier run are skipped, which
+allows resuming after a failure.
+"""
+
+import collections
+import concurrent.futures
+import time
+
+# Stage status
+OK = 'ok'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+NOT_RUN = 'not-run'
+
+Stage = collections.namedtuple('Stage', ['name', 'function', 'overlap'])
+Stage.__doc__ = """Stage of a pipeline.
+
+The function takes no arguments and returns output to pass on in the result
+of the stage, it raises ``StageFailed`` on failure.  Adjacent stages that
+may overlap run concurrently.
+"""
+
+
+class StageFailed(Exception):
+
+    def __init__(self, message, output=None):
+        super().__init__(message)
+        self.output = output
+
+
+def batches(stages):
+    """Group consecutive stages that may overlap.
+
+    :param stages: Stages
+    :type stages: Iterable[Stage]
+    :returns: Stages to run concurrently, in order.
+    :rtype: List[List[Stage]]
+    """
+    result = []
+    for stage in stages:
+        if stage.overlap and result and all(
+                s.overlap for s in result[-1]):
+            result[-1].append(stage)
+        else:
+            result.append([stage])
+    return result
+
+
+def _run_stage(stage):
+    """Run stage and measure its duration.
+
+    :param stage: Stage
+    :type stage: Stage
+    :returns: Result with name, status, duration, output and error.
+    :rtype: Dict[str,any]
+    """
+    start = time.monotonic()
+    result = {'name': stage.name, 'status': OK}
+    try:
+        result['output'] = stage.function()
+    except StageFailed as e:
+        result.update(status=FAILED, error=str(e), output=e.output)
+    except Exception as e:
+        result.update(status=FAILED, error='{}: {}'.format(
+            type(e).__name__, e), output=None)
+    result['seconds'] = round(time.monotonic() - start, 3)
+    return result
+
+
+def run(stages, completed=(), on_result=None):
+    """Run stages, skipping completed ones and stopping at first failure.
+
+    :param stages: Stages
+    :type stages: Iterable[Stage]
+    :param completed: Names of stages completed by earlier runs.
+    :type completed: Iterable[str]
+    :param on_result: Callable receiving the result of each stage run, once
+                      its batch has finished.
+    :type on_result: Optional[Callable[[Dict[str,any]],None]]
+    :returns: Result for every stage in order.
+    :rtype: List[Dict[str,any]]
+    """
+    completed = set(completed)
+    results = []
+    failed = False
+    for batch in batches(stages):
+        if failed:
+            results.extend({'name': stage.name, 'status': NOT_RUN}
+                           for stage in batch)
+            continue
+        pending = [stage for stage in batch if stage.name not in completed]
+        if len(pending) > 1:
+            with concurrent.futures.ThreadPoolExecutor(
+                    max_workers=len(pending)) as executor:
+                batch_results = dict(zip(
+                    (stage.name for stage in pending),
+                    executor.map(_run_stage, pending)))
+        else:
+            batch_results = {
+                stage.name: _run_stage(stage) for stage in pending}
+        for stage in batch:
+            if stage.name not in batch_results:
+                results.append({'name': stage.name, 'status': SKIPPED})
+                continue
+            result = batch_results[stage.name]
+            failed = failed or result['status'] == FAILED
+            if on_result:
+                on_result(result)
+            results.append(result)
+    return results
@@ -0,0 +1,150 @@
+# Copyright 2026 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Scale report of the Neutron and OVN Northbound databases.
+
+Resource counts are turned into recommended values for the settings this
+charm renders.
+"""
+
+import math
+
+import charm.openstack.neutron_api_plugin_ovn as neutron_api_plugin_ovn
+
+# Ratio of VNIs available to VNIs in use to keep for growth.
+VNI_HEADROOM_FACTOR = 2
+# DHCP renewals per second across the cloud the lease time is sized for.
+# Clients renew at half the lease time.
+DHCP_RENEWALS_PER_SECOND = 10
+# Granularity of recommended lease times in seconds.
+DHCP_LEASE_TIME_STEP = 3600
+
+
+def nb_row_counts(client, db='OVN_Northbound'):
+    """Count rows per table.
+
+    OVSDB has no aggregate operations, only the UUID of each row is
+    transferred.
+
+    :param client: Connected client
+    :type client: ovsdb.Client
+    :param db: Database name
+    :type db: str
+    :returns: Map of table name to number of rows.
+    :rtype: Dict[str,int]
+    """
+    return {
+        table: len(client.select(db, table, ['_uuid']))
+        for table in sorted(client.get_schema(db)['tables'])
+    }
+
+
+def recommend_geneve_vni_ranges(vni_ranges, in_use):
+    """Recommend Geneve VNI ranges with headroom for growth.
+
+    :param vni_ranges: Value of the ``geneve-vni-ranges`` option.
+    :type vni_ranges: str
+    :param in_use: Number of Geneve network segments.
+    :type in_use: int
+    :returns: Current and recommended size and ranges.
+    :rtype: Dict[str,any]
+    :raises: ValueError
+    """
+    ranges = neutron_api_plugin_ovn.parse_vni_ranges(vni_ranges)
+    size = neutron_api_plugin_ovn.vni_ranges_size(ranges)
+    wanted = in_use * VNI_HEADROOM_FACTOR
+    recommended = list(ranges)
+    if wanted > size:
+        # grow the highest range, then add a range below the lowest one
+        missing = wanted - size
+        vni_min, vni_max = recommended[-1] if recommended else (
+            neutron_api_plugin_ovn.GENEVE_VNI_MIN,
+            neutron_api_plugin_ovn.GENEVE_VNI_MIN - 1)
+        grown = min(vni_max + missing, neutron_api_plugin_ovn.GENEVE_VNI_MAX)
+        recommended[-1:] = [(vni_min, grown)]
+        missing -= grown - vni_max
+        if missing > 0 and recommended[0][0] > 1:
+            low_max = recommended[0][0] - 1
+            recommended.insert(0, (max(1, low_max - missing + 1), low_max))
+        # merge adjacent ranges
+        recommended = neutron_api_plugin_ovn.parse_vni_ranges(
+            ' '.join('{}:{}'.format(*r) for r in recommended))
+    return {
+        'size': size,
+        'in-use': in_use,
+        'headroom': size - in_use,
+        'recommended-size': neutron_api_plugin_ovn.vni_ranges_size(
+            recommended),
+        'recommended': ' '.join(
+            '{}:{}'.format(*r) for r in recommended),
+    }
+
+
+def recommend_dhcp_lease_time(lease_time, n_clients):
+    """Recommend a DHCP lease time keeping renewals at a sustainable rate.
+
+    :param lease_time: Value of the ``dhcp-default-lease-time`` option, 0
+                       for infinite leases.
+    :type lease_time: int
+    :param n_clients: Number of DHCP clients, i.e. instance ports.
+    :type n_clients: int
+    :returns: Current and recommended lease time and renewal rates.
+    :rtype: Dict[str,any]
+    """
+    if not lease_time:
+        # infinite leases are never renewed
+        return {
+            'lease-time': lease_time,
+            'renewals-per-second': 0,
+            'recommended': lease_time,
+            'recommended-renewals-per-second': 0,
+        }
+    needed = 2 * n_clients / DHCP_RENEWALS_PER_SECOND
+    recommended = max(
+        lease_time,
+        math.ceil(needed / DHCP_LEASE_TIME_STEP) * DHCP_LEASE_TIME_STEP)
+    return {
+        'lease-time': lease_time,
+        'renewals-per-second': round(2 * n_clients / lease_time, 2),
+        'recommended': recommended,
+        'recommended-renewals-per-second': round(
+            2 * n_clients / recommended, 2),
+    }
+
+
+def report(neutron_counts, nb_counts, config):
+    """Build scale report.
+
+    :param neutron_counts: Output of ``neutron_db_util.py counts``.
+    :type neutron_counts: Dict[str,any]
+    :param nb_counts: Output of ``nb_row_counts``.
+    :type nb_counts: Dict[str,int]
+    :param config: Charm configuration
+    :type config: Dict[str,any]
+    :returns: Report
+    :rtype: Dict[str,any]
+    """
+    return {
+        'neutron': neutron_counts,
+        'nb': nb_counts,
+        'nb-rows': sum(nb_counts.values()),
+        'recommendations': {
+            'geneve-vni-ranges': recommend_geneve_vni_ranges(
+                config['geneve-vni-ranges'],
+                neutron_counts['segments'].get('geneve', 0)),
+            'dhcp-default-lease-time': recommend_dhcp_lease_time(
+                config['dhcp-default-lease-time'],
+                neutron_counts['compute-ports']),
+        },
+    }
@@ -20,13 +20,26 @@ import charms.reactive as reactive
 import charms_openstack.bus
 import charms_openstack.charm as charm
 
+import charm.openstack.fan_in as fan_in
+import charm.openstack.neutron_api_plugin_ovn as neutron_api_plugin_ovn
+import charm.openstack.timings as timings
+import charm.openstack.update_status as update_status
+
 
 charms_openstack.bus.discover()
 
-# Use the charms.openstack defaults for common states and hooks
+# The coordinator must be instantiated before the reactive framework runs the
+# ``atstart`` callbacks for it to process lock requests and grants.
+neutron_api_plugin_ovn.RestartSerial()
+
+# Handlers may change the flags the workload status is derived from, make
+# update-status hooks perform a full run until the status is recorded again.
+ch_core.hookenv.atstart(update_status.invalidate_snapshot)
+
+# Use the charms.openstack defaults for common states and hooks, the release
+# is selected by ``neutron_api_plugin_ovn.select_release``.
 charm.use_defaults(
     'config.changed',
-    'charm.default-select-release',
     'update-status',
     'upgrade-charm',
     'certificates.available',
@@ -35,6 +48,7 @@ charm.use_defaults(
 
 @reactive.when_none('charm.installed', 'leadership.set.install_stamp')
 @reactive.when('leadership.is_leader')
+@timings.timed
 def stamp_fresh_deployment():
     """Stamp the deployment with leader setting, fresh deployment.
     This is used to determine whether this application is a fresh or upgraded
@@ -48,6 +62,7 @@ def stamp_fresh_deployment():
                     'leadership.set.install_stamp',
                     'leadership.set.upgrade_stamp')
 @reactive.when('charm.installed', 'leadership.is_leader')
+@timings.timed
 def stamp_upgraded_deployment():
     """Stamp the deployment with leader setting, upgrade.
     This is needed so that the units of this application can safely enable
@@ -59,6 +74,7 @@ def stamp_upgraded_deployment():
 @reactive.when_none('charm.installed', 'is-update-status-hook')
 @reactive.when_any('leadership.set.install_stamp',
                    'leadership.set.upgrade_stamp')
+@timings.timed
 def enable_install():
     """Enable the default install hook."""
     charm.use_defaults('charm.installed')
@@ -67,6 +83,7 @@ def enable_install():
 @reactive.when_none('neutron-plugin.db_migration',
                     'neutron-plugin.available')
 @reactive.when('charm.installed')
+@timings.timed
 def maybe_flag_db_migration():
     with charm.provide_charm_instance() as instance:
         if instance.db_migration_needed:
@@ -75,6 +92,7 @@ def maybe_flag_db_migration():
 
 @reactive.when_none('neutron-plugin.available', 'run-default-update-status')
 @reactive.when('neutron-plugin.connected')
+@timings.timed
 def maybe_request_db_migration():
     neutron = reactive.endpoint_from_flag('neutron-plugin.connected')
     with charm.provide_charm_instance() as instance:
@@ -83,6 +101,7 @@ def maybe_request_db_migration():
 
 
 @reactive.when('neutron-plugin.connected', 'ovsdb-cms.available')
+@timings.timed
 def configure_neutron():
     neutron = reactive.endpoint_from_flag(
         'neutron-plugin.connected')
@@ -96,6 +115,17 @@ def configure_neutron():
         return _s.split()
 
     with charm.provide_charm_instance() as instance:
+        vni_ranges_status, vni_ranges_message = (
+            instance.geneve_vni_ranges_status())
+        if vni_ranges_status == 'blocked':
+            ch_core.hookenv.log('Not publishing configuration: {}'
+                                .format(vni_ranges_message),
+                                level=ch_core.hookenv.WARNING)
+            instance.assess_status()
+            return
+        elif vni_ranges_status:
+            ch_core.hookenv.log(vni_ranges_message,
+                                level=ch_core.hookenv.WARNING)
         mechanism_drivers = instance.mechanism_drivers(
             neutron.neutron_config_data.get('mechanism_drivers'))
         service_plugins = instance.service_plugins(
@@ -141,39 +171,95 @@ def configure_neutron():
                 # This allows having a mix of DPDK and non-DPDK nodes in the
                 # same deployment.
                 ('vhost_sock_dir', '/run/libvirt-vhost-user'),
-            ],
+            ] + instance.ovsdb_tunables(len(ovsdb.db_nb_connection_strs)),
             'ml2_type_geneve': [
                 ('vni_ranges', ','.join(
                     _split_if_str(options.geneve_vni_ranges))),
                 ('max_header_size', '38'),
             ],
         }
-        neutron.configure_plugin(
-            'ovn',
-            service_plugins=','.join(service_plugins),
-            mechanism_drivers=','.join(mechanism_drivers),
-            tenant_network_types=','.join(tenant_network_types),
-            subordinate_configuration={
+        plugin_config = {
+            'service_plugins': ','.join(service_plugins),
+            'mechanism_drivers': ','.join(mechanism_drivers),
+            'tenant_network_types': ','.join(tenant_network_types),
+            'subordinate_configuration': {
                 'neutron-api': {
                     '/etc/neutron/plugins/ml2/ml2_conf.ini': {
                         'sections': sections,
                     },
                 },
             },
-        )
+        }
+        digest = neutron_api_plugin_ovn.plugin_config_digest(plugin_config)
+        published_digest = neutron_api_plugin_ovn.published_config_digest()
+        if digest != published_digest:
+            # Publishing changed configuration makes the principal charm
+            # restart neutron-server, have that coordinated with restarts of
+            # the other units.
+            neutron_api_plugin_ovn.request_restart(
+                neutron_api_plugin_ovn.RESTART_REASON_CONFIG)
+        if (digest != published_digest and
+                not neutron_api_plugin_ovn.RestartSerial().acquire(
+                    neutron_api_plugin_ovn.RESTART_LOCK)):
+            ch_core.hookenv.log('Deferring publishing of changed '
+                                'configuration until lock "{}" is granted.'
+                                .format(neutron_api_plugin_ovn.RESTART_LOCK))
+        else:
+            neutron.configure_plugin('ovn', **plugin_config)
+            neutron_api_plugin_ovn.record_published_config(digest)
+            instance.record_geneve_vni_ranges()
         instance.assess_status()
 
 
+@reactive.when('ovsdb-cms.available')
+@timings.timed
+def publish_ovsdb_fan_in():
+    """Publish expected OVSDB client connections of this unit.
+
+    Relations are only written to on change and when newly joined.
+    """
+    fan_in.refresh(new_relations=True)
+
+
 @reactive.when('config.changed.ovn-source')
 @reactive.when_not('config.default.ovn-source')
+@timings.timed
 def ovn_source_changed():
     with charm.provide_charm_instance() as instance:
         instance.upgrade_ovn()
 
 
-@reactive.when('restart-needed')
+@reactive.when_not('restart-scheduled')
+@reactive.when('restart-needed', 'neutron-plugin.connected')
+@timings.timed
 def restart_neutron():
-    ch_core.hookenv.log('DEBUG: Executing neutron restart')
+    if not neutron_api_plugin_ovn.RestartSerial().acquire(
+            neutron_api_plugin_ovn.RESTART_LOCK):
+        ch_core.hookenv.log('Deferring neutron restart until lock "{}" is '
+                            'granted.'
+                            .format(neutron_api_plugin_ovn.RESTART_LOCK))
+        return
+    # Any further restart requests made while processing this hook are merged
+    # into the single request sent at the end of it, while we still hold the
+    # lock.
+    reactive.set_flag('restart-scheduled')
+    ch_core.hookenv.atexit(request_neutron_restart)
+
+
+@timings.timed
+def request_neutron_restart():
+    """Send one restart request to the principal for all pending reasons."""
+    reasons = neutron_api_plugin_ovn.pop_restart_reasons()
+    reactive.clear_flag('restart-needed')
+    reactive.clear_flag('restart-scheduled')
+    if neutron_api_plugin_ovn.RESTART_REASON_CONFIG in reasons:
+        # The principal charm restarts neutron-server by itself when the
+        # configuration we publish changes, which satisfies any other reason.
+        ch_core.hookenv.log('DEBUG: neutron restart by principal on changed '
+                            'configuration, reasons: "{}"'
+                            .format(', '.join(reasons)))
+        return
+    ch_core.hookenv.log('DEBUG: Executing neutron restart, reasons: "{}"'
+                        .format(', '.join(reasons)))
     neutron = reactive.endpoint_from_flag('neutron-plugin.connected')
     neutron.request_restart()
-    reactive.clear_flag('restart-needed')
@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
 import os
 import sys
 import unittest.mock as mock
@@ -138,8 +139,15 @@ class TestActions(test_utils.PatchHelper):
 
     def test_migrate_ovn_db(self):
         self.patch_object(actions.ch_core.hookenv, 'action_get')
-        self.action_get.return_value = False
+        params = {'i-really-mean-it': False, 'since': '',
+                  'reuse-dry-run': True, 'offline-build': False}
+        self.action_get.side_effect = lambda x: params[x]
         self.patch_object(actions.subprocess, 'run')
+        self.patch_object(actions, 'record_ovn_db_sync')
+        self.patch_object(actions, 'get_ovn_db_sync_fingerprint')
+        self.get_ovn_db_sync_fingerprint.return_value = None
+        self.patch_object(actions.unitdata, 'kv', name='unitdata_kv')
+        self.unitdata_kv.return_value.get.return_value = None
 
         fcp = FakeCalledProcess()
         self.run.return_value = fcp
@@ -174,8 +182,10 @@ class TestActions(test_utils.PatchHelper):
             ])
             self.run.reset_mock()
             self.builtin_print.reset_mock()
-            self.action_get.return_value = True
+            self.assertFalse(self.record_ovn_db_sync.called)
+            params['i-really-mean-it'] = True
             actions.migrate_ovn_db(['/some/path/migrate-ovn-db'])
+            self.record_ovn_db_sync.assert_called_once_with(mock.ANY)
             self.run.assert_called_once_with(
                 (
                     'neutron-ovn-db-sync-util',
@@ -203,6 +213,512 @@ class TestActions(test_utils.PatchHelper):
             fcp.stderr = 'ERROR'
             actions.migrate_ovn_db(['/some/path/migrate-ovn-db'])
             self.action_fail.assert_called_once()
+            self.record_ovn_db_sync.assert_called_once_with(mock.ANY)
+
+    def test_migrate_ovn_db_reuse_dry_run(self):
+        self.patch_object(actions.ch_core.hookenv, 'action_get')
+        self.patch_object(actions.ch_core.hookenv, 'action_set')
+        self.patch_object(actions.ch_core.hookenv, 'action_fail')
+        self.patch_object(actions.subprocess, 'run')
+        self.patch_object(actions, 'record_ovn_db_sync')
+        self.patch_object(actions, 'get_ovn_db_sync_fingerprint')
+        self.patch_object(actions,
+                          'write_filtered_neutron_config_for_sync_util')
+        self.patch_object(actions.unitdata, 'kv', name='unitdata_kv')
+        self.patch('builtins.print', name='builtin_print')
+        kv_data = {}
+        kv = self.unitdata_kv.return_value
+        kv.get.side_effect = kv_data.get
+        kv.set.side_effect = kv_data.__setitem__
+        kv.unset.side_effect = lambda k: kv_data.pop(k, None)
+        params = {'i-really-mean-it': False, 'since': '',
+                  'reuse-dry-run': True, 'offline-build': False}
+        self.action_get.side_effect = lambda x: params[x]
+        fingerprint = {'neutron': 'sha256:n', 'nb': 'index:c:42'}
+        self.get_ovn_db_sync_fingerprint.return_value = fingerprint
+        fcp = FakeCalledProcess()
+        fcp.stdout = ''
+        fcp.stderr = ''
+        self.run.return_value = fcp
+
+        # clean dry-run is recorded and reused
+        actions.migrate_ovn_db(['/some/path/migrate-ovn-db'])
+        self.assertEqual(
+            kv_data[actions.OVN_DB_SYNC_DRY_RUN_KEY],
+            {'fingerprint': fingerprint, 'started': mock.ANY, 'warnings': 0,
+             'resources': []})
+        self.action_set.assert_called_once_with({'warnings': 0})
+        self.run.reset_mock()
+        params['i-really-mean-it'] = True
+        actions.migrate_ovn_db(['/some/path/migrate-ovn-db'])
+        self.assertFalse(self.run.called)
+        self.record_ovn_db_sync.assert_called_once_with(mock.ANY)
+
+        # not reused when asked not to
+        params['reuse-dry-run'] = False
+        actions.migrate_ovn_db(['/some/path/migrate-ovn-db'])
+        self.assertTrue(self.run.called)
+        self.assertNotIn(actions.OVN_DB_SYNC_DRY_RUN_KEY, kv_data)
+
+        # not reused when a database changed
+        params['reuse-dry-run'] = True
+        params['i-really-mean-it'] = False
+        actions.migrate_ovn_db(['/some/path/migrate-ovn-db'])
+        self.run.reset_mock()
+        self.get_ovn_db_sync_fingerprint.return_value = {
+            'neutron': 'sha256:n', 'nb': 'index:c:43'}
+        params['i-really-mean-it'] = True
+        actions.migrate_ovn_db(['/some/path/migrate-ovn-db'])
+        self.assertTrue(self.run.called)
+
+        # not reused when the dry-run found something to repair that it
+        # did not name
+        params['i-really-mean-it'] = False
+        fcp.stderr = '2026-10-19 08:00:00.000 42 WARNING neutron.fake [-] x'
+        actions.migrate_ovn_db(['/some/path/migrate-ovn-db'])
+        self.assertEqual(
+            kv_data[actions.OVN_DB_SYNC_DRY_RUN_KEY]['warnings'], 1)
+        self.assertIsNone(
+            kv_data[actions.OVN_DB_SYNC_DRY_RUN_KEY]['resources'])
+        self.run.reset_mock()
+        params['i-really-mean-it'] = True
+        actions.migrate_ovn_db(['/some/path/migrate-ovn-db'])
+        self.assertTrue(self.run.called)
+        self.assertFalse(self.action_fail.called)
+
+        # only the resources the dry-run found are repaired
+        self.patch_object(actions, 'repair_ovn_db_resources')
+        self.repair_ovn_db_resources.return_value = {'marked': 1}
+        params['i-really-mean-it'] = False
+        fcp.stderr = (
+            '2026-10-19 08:00:00.000 42 WARNING neutron.fake '
+            '[req-0f0e0d0c-0b0a-4908-8706-050403020100 - - - - -] Port '
+            'found in Neutron but not in OVN DB, '
+            'port_id=a2ed8a85-0dd8-4bc2-9a4c-7c3c1d0a6e4f')
+        actions.migrate_ovn_db(['/some/path/migrate-ovn-db'])
+        self.assertEqual(
+            kv_data[actions.OVN_DB_SYNC_DRY_RUN_KEY]['resources'],
+            ['a2ed8a85-0dd8-4bc2-9a4c-7c3c1d0a6e4f'])
+        self.run.reset_mock()
+        self.record_ovn_db_sync.reset_mock()
+        self.action_set.reset_mock()
+        params['i-really-mean-it'] = True
+        actions.migrate_ovn_db(['/some/path/migrate-ovn-db'])
+        self.assertFalse(self.run.called)
+        self.repair_ovn_db_resources.assert_called_once_with(
+            ['a2ed8a85-0dd8-4bc2-9a4c-7c3c1d0a6e4f'])
+        self.record_ovn_db_sync.assert_called_once_with(mock.ANY)
+        self.action_set.assert_called_once_with({
+            'result': json.dumps({'marked': 1}, indent=2, sort_keys=True)})
+
+        # the sync runs when a resource is not found in Neutron
+        params['i-really-mean-it'] = False
+        actions.migrate_ovn_db(['/some/path/migrate-ovn-db'])
+        self.repair_ovn_db_resources.return_value = None
+        params['i-really-mean-it'] = True
+        actions.migrate_ovn_db(['/some/path/migrate-ovn-db'])
+        self.assertTrue(self.run.called)
+        self.assertFalse(self.action_fail.called)
+
+    def test_warning_resource_ids(self):
+        self.assertEqual(actions.warning_resource_ids([]), [])
+        self.assertEqual(actions.warning_resource_ids([
+            '... WARNING x [req-0f0e0d0c-0b0a-4908-8706-050403020100] '
+            'network_id=b2ed8a85-0dd8-4bc2-9a4c-7c3c1d0a6e4f',
+            '... WARNING x [-] port_id=a2ed8a85-0dd8-4bc2-9a4c-7c3c1d0a6e4f',
+        ]), ['a2ed8a85-0dd8-4bc2-9a4c-7c3c1d0a6e4f',
+             'b2ed8a85-0dd8-4bc2-9a4c-7c3c1d0a6e4f'])
+        self.assertIsNone(actions.warning_resource_ids([
+            '... WARNING x [-] port_id=a2ed8a85-0dd8-4bc2-9a4c-7c3c1d0a6e4f',
+            '... WARNING x [-] ACLs-to-be-added 1 ACLs-to-be-removed 0',
+        ]))
+
+    def test_repair_ovn_db_resources(self):
+        self.patch_object(actions, 'run_neutron_db_util')
+        self.run_neutron_db_util.side_effect = [
+            {'not-found': 0}, {'not-found': 0, 'marked': 2}]
+        self.assertEqual(actions.repair_ovn_db_resources(['a', 'b']),
+                         {'not-found': 0, 'marked': 2})
+        self.run_neutron_db_util.assert_has_calls([
+            mock.call('mark-ids', data='a\nb\n'),
+            mock.call('mark-ids', '--commit', data='a\nb\n'),
+        ])
+        self.run_neutron_db_util.reset_mock()
+        self.run_neutron_db_util.side_effect = [{'not-found': 1}]
+        self.assertIsNone(actions.repair_ovn_db_resources(['a', 'b']))
+        self.run_neutron_db_util.assert_called_once_with(
+            'mark-ids', data='a\nb\n')
+
+    def test_get_ovn_db_sync_fingerprint(self):
+        self.patch_object(actions, 'run_neutron_db_util')
+        self.patch_object(actions, 'get_ovn_connection')
+        self.patch_object(actions.ovsdb, 'Client')
+        self.patch_object(actions.ovsdb, 'fingerprint', name='nb_fingerprint')
+        self.patch_object(actions.ch_core.hookenv, 'log')
+        self.run_neutron_db_util.return_value = {'fingerprint': 'sha256:n'}
+        self.get_ovn_connection.return_value = {'remotes': 'fake'}
+        self.nb_fingerprint.return_value = 'index:c:42'
+        self.assertEqual(actions.get_ovn_db_sync_fingerprint(),
+                         {'neutron': 'sha256:n', 'nb': 'index:c:42'})
+        self.run_neutron_db_util.assert_called_once_with('fingerprint')
+        self.Client.assert_called_once_with(remotes='fake')
+        self.nb_fingerprint.assert_called_once_with(
+            self.Client.return_value.__enter__.return_value, 'OVN_Northbound')
+        self.nb_fingerprint.side_effect = actions.ovsdb.OVSDBError('fake')
+        self.assertIsNone(actions.get_ovn_db_sync_fingerprint())
+        self.assertTrue(self.log.called)
+
+    def test_migration_preflight(self):
+        self.patch_object(actions.shutil, 'which')
+        self.patch_object(actions, 'run_neutron_db_util')
+        self.patch_object(actions, 'get_ovn_connection')
+        self.patch_object(actions.ovsdb, 'Client')
+        self.patch_object(actions.ch_core.host, 'service_running')
+        self.get_ovn_connection.return_value = {'remotes': 'fake'}
+        client = self.Client.return_value.__enter__.return_value
+        self.which.return_value = None
+        with self.assertRaisesRegex(actions.pipeline.StageFailed,
+                                    'neutron-ovn-migration-mtu is not '
+                                    'installed'):
+            actions.migration_preflight(True, [], True)
+        self.which.return_value = '/usr/bin/tool'
+        self.run_neutron_db_util.side_effect = (
+            actions.subprocess.CalledProcessError(1, 'util'))
+        with self.assertRaisesRegex(actions.pipeline.StageFailed,
+                                    'unable to query the Neutron DB'):
+            actions.migration_preflight(True, [], True)
+        self.run_neutron_db_util.side_effect = None
+        client.echo.side_effect = actions.ovsdb.OVSDBError('fake')
+        with self.assertRaisesRegex(actions.pipeline.StageFailed,
+                                    'unable to connect to the OVN'):
+            actions.migration_preflight(True, [], True)
+        client.echo.side_effect = None
+        self.service_running.return_value = False
+        with self.assertRaisesRegex(actions.pipeline.StageFailed,
+                                    'neutron-server is not running'):
+            actions.migration_preflight(True, [], True)
+        actions.migration_preflight(True, ['verify-mtu'], True)
+        self.service_running.assert_called_with('neutron-server')
+        with self.assertRaisesRegex(actions.pipeline.StageFailed,
+                                    'complete dry-run-ovn-db-sync, '
+                                    'rehearse-morph'):
+            actions.migration_preflight(False, ['verify-mtu'], True)
+        actions.migration_preflight(
+            False, ['verify-mtu', 'dry-run-ovn-db-sync'], False)
+        self.service_running.return_value = True
+        actions.migration_preflight(True, [], True)
+        with self.assertRaisesRegex(actions.pipeline.StageFailed,
+                                    'running on this unit, pause all '
+                                    'neutron-api units'):
+            actions.migration_preflight(
+                False, list(actions.MIGRATION_VERIFY_STAGES), True)
+
+    def test_rehearse_morph_stage(self):
+        self.patch_object(actions, 'run_offline_morph_tool')
+        cp = actions.subprocess.CompletedProcess(
+            'tool', 0, json.dumps({'error': None}), '')
+        self.run_offline_morph_tool.return_value = cp
+        self.assertEqual(actions.rehearse_morph_stage(), cp)
+        self.run_offline_morph_tool.assert_called_once_with('rehearse')
+        cp.stdout = json.dumps({'error': 'not enough free VNIs.'})
+        with self.assertRaisesRegex(actions.pipeline.StageFailed,
+                                    'morphing the snapshot failed: not '
+                                    'enough free VNIs$'):
+            actions.rehearse_morph_stage()
+        cp.stdout = 'Traceback'
+        with self.assertRaisesRegex(actions.pipeline.StageFailed,
+                                    'unexpected output'):
+            actions.rehearse_morph_stage()
+        cp.returncode = 1
+        with self.assertRaisesRegex(actions.pipeline.StageFailed,
+                                    'execution failed'):
+            actions.rehearse_morph_stage()
+
+    def test_migrate_to_ovn(self):
+        self.patch_object(actions.ch_core.hookenv, 'action_get')
+        self.patch_object(actions.ch_core.hookenv, 'action_set')
+        self.patch_object(actions.ch_core.hookenv, 'action_fail')
+        self.patch_object(actions, 'migration_preflight')
+        self.patch_object(actions, 'run_migration_mtu_tool')
+        self.patch_object(actions, 'run_ovn_db_sync_util')
+        self.patch_object(actions, 'run_offline_morph_tool')
+        self.patch_object(actions, 'record_ovn_db_sync')
+        self.patch_object(actions.unitdata, 'kv', name='unitdata_kv')
+        self.patch('builtins.print', name='builtin_print')
+        kv_data = {}
+        kv = self.unitdata_kv.return_value
+        kv.get.side_effect = lambda k: kv_data.get(k)
+        kv.set.side_effect = kv_data.__setitem__
+        kv.unset.side_effect = lambda k: kv_data.pop(k, None)
+        for run in (self.run_migration_mtu_tool, self.run_ovn_db_sync_util,
+                    self.run_offline_morph_tool):
+            run.return_value = actions.subprocess.CompletedProcess(
+                'tool', 0, 'fake-stdout', 'fake-stderr')
+        self.run_offline_morph_tool.return_value.stdout = '{"error": null}'
+        params = {'i-really-mean-it': False, 'morph': True, 'reset': False}
+        self.action_get.side_effect = lambda x: params[x]
+
+        actions.migrate_to_ovn(['/some/path/migrate-to-ovn'])
+        self.migration_preflight.assert_called_once_with(True, [], True)
+        self.run_migration_mtu_tool.assert_called_once_with('verify')
+        self.run_ovn_db_sync_util.assert_called_once_with('log')
+        self.run_offline_morph_tool.assert_called_once_with('rehearse')
+        self.builtin_print.assert_any_call(
+            'migrate-to-ovn: VERIFY-MTU: OUTPUT ON STDOUT:\nfake-stdout',
+            file=mock.ANY)
+        self.assertFalse(self.action_fail.called)
+        state = kv_data[actions.MIGRATION_PIPELINE_KEY]
+        self.assertEqual(state['completed'],
+                         list(actions.MIGRATION_VERIFY_STAGES))
+        self.assertEqual(
+            sorted(state['timings']),
+            ['dry-run-ovn-db-sync', 'pre-flight', 'rehearse-morph',
+             'verify-mtu'])
+        stages = self.action_set.call_args[0][0]['stages'].splitlines()
+        self.assertEqual(stages[0].split(),
+                         ['stage', 'status', 'seconds', 'error'])
+        self.assertEqual([line.split()[:2] for line in stages[1:]],
+                         [['pre-flight', 'ok'], ['verify-mtu', 'ok'],
+                          ['dry-run-ovn-db-sync', 'ok'],
+                          ['rehearse-morph', 'ok']])
+
+        # resume: the verify stages are skipped, the morph stage fails
+        params['i-really-mean-it'] = True
+        self.run_ovn_db_sync_util.reset_mock()
+        self.run_offline_morph_tool.return_value.returncode = 1
+        actions.migrate_to_ovn(['/some/path/migrate-to-ovn'])
+        self.run_ovn_db_sync_util.assert_called_once_with('repair')
+        self.run_offline_morph_tool.assert_called_with('morph')
+        self.record_ovn_db_sync.assert_called_once_with(mock.ANY)
+        self.action_fail.assert_called_once_with(
+            'Stage morph-db failed: execution failed, please investigate '
+            'output and run the action again to resume.')
+        self.assertEqual(
+            kv_data[actions.MIGRATION_PIPELINE_KEY]['completed'],
+            list(actions.MIGRATION_VERIFY_STAGES) + ['sync-ovn-db'])
+
+        # verify stages expire, the other completed stages do not
+        state = kv_data[actions.MIGRATION_PIPELINE_KEY]
+        state['completed-at']['verify-mtu'] = '2000-01-01 00:00:00'
+        del state['completed-at']['rehearse-morph']
+        self.run_migration_mtu_tool.reset_mock()
+        self.run_offline_morph_tool.reset_mock()
+        self.run_offline_morph_tool.return_value.returncode = 0
+        self.migration_preflight.reset_mock()
+        actions.migrate_to_ovn(['/some/path/migrate-to-ovn'])
+        self.migration_preflight.assert_called_once_with(
+            False, ['dry-run-ovn-db-sync', 'sync-ovn-db'], True)
+        self.run_migration_mtu_tool.assert_called_once_with('verify')
+        self.run_offline_morph_tool.assert_has_calls(
+            [mock.call('rehearse'), mock.call('morph')])
+
+        # reset starts over
+        params['reset'] = True
+        params['i-really-mean-it'] = False
+        params['morph'] = False
+        self.migration_preflight.reset_mock()
+        actions.migrate_to_ovn(['/some/path/migrate-to-ovn'])
+        self.migration_preflight.assert_called_once_with(True, [], False)
+        self.assertEqual(
+            kv_data[actions.MIGRATION_PIPELINE_KEY]['completed'],
+            ['verify-mtu', 'dry-run-ovn-db-sync'])
+
+    def test_migrate_ovn_db_offline(self):
+        self.patch_object(actions.ch_core.hookenv, 'action_get')
+        self.patch_object(actions.ch_core.hookenv, 'action_set')
+        self.patch_object(actions.ch_core.hookenv, 'action_fail')
+        self.patch_object(actions, 'record_ovn_db_sync')
+        self.patch_object(actions, 'get_ovn_db_sync_fingerprint')
+        self.patch_object(actions, 'get_ovn_connection')
+        self.patch_object(actions, 'run_ovn_db_sync_util')
+        self.patch_object(actions.unitdata, 'kv', name='unitdata_kv')
+        self.patch_object(actions.shutil, 'which')
+        self.patch_object(actions.shutil, 'rmtree')
+        self.patch_object(actions.tempfile, 'mkdtemp')
+        self.patch_object(actions.os, 'replace')
+        self.patch_object(actions.os.path, 'getsize')
+        self.patch_object(actions.ovsdb, 'Client')
+        self.patch_object(actions.offline_nb, 'check_empty')
+        self.patch_object(actions.offline_nb, 'local_server')
+        self.patch_object(actions.offline_nb, 'copy_rows')
+        self.patch_object(actions.offline_nb, 'write_config')
+        self.patch_object(actions.offline_nb, 'count_rows')
+        self.patch_object(actions.offline_nb, 'compact')
+        self.patch_object(actions.offline_nb, 'restore')
+        self.patch('builtins.print', name='builtin_print')
+        params = {'i-really-mean-it': False, 'since': '',
+                  'offline-build': True}
+        self.action_get.side_effect = lambda x: params[x]
+        connection = {'remotes': 'ssl:10.0.0.1:6641', 'private_key': 'k',
+                      'certificate': 'c', 'ca_cert': 'ca'}
+        self.get_ovn_connection.return_value = connection
+        self.which.side_effect = lambda x: None if x == 'ovsdb-server' else x
+        actions.migrate_ovn_db(['/some/path/migrate-ovn-db'])
+        self.action_fail.assert_called_once_with(
+            'Offline build failed: ovsdb-server not installed')
+        self.assertFalse(self.Client.called)
+
+        self.which.side_effect = None
+        self.action_fail.reset_mock()
+        client = self.Client.return_value.__enter__.return_value
+        actions.migrate_ovn_db(['/some/path/migrate-ovn-db'])
+        self.check_empty.assert_called_once_with(client)
+        self.assertFalse(self.local_server.called)
+        self.assertFalse(self.record_ovn_db_sync.called)
+        self.assertFalse(self.get_ovn_db_sync_fingerprint.called)
+        self.action_set.assert_called_once_with({'result': json.dumps(
+            {'file': actions.OFFLINE_NB_DB}, indent=2, sort_keys=True)})
+
+        params['i-really-mean-it'] = True
+        self.mkdtemp.return_value = '/var/lib/neutron/build'
+        self.local_server.return_value.__enter__.return_value = 'unix:sock'
+        self.write_config.return_value = '/var/lib/neutron/build/conf'
+        fcp = FakeCalledProcess()
+        fcp.stdout = ''
+        fcp.stderr = ''
+        self.run_ovn_db_sync_util.return_value = fcp
+        self.count_rows.return_value = {'Logical_Switch': 2}
+        self.getsize.return_value = 4096
+        actions.migrate_ovn_db(['/some/path/migrate-ovn-db'])
+        self.local_server.assert_called_once_with(
+            '/var/lib/neutron/build', client.get_schema.return_value)
+        self.Client.assert_any_call('unix:sock')
+        self.run_ovn_db_sync_util.assert_called_once_with(
+            'repair', config_files=('/var/lib/neutron/build/conf',))
+        self.compact.assert_called_once_with(
+            '/var/lib/neutron/build/ovnnb_db.db')
+        self.replace.assert_called_once_with(
+            '/var/lib/neutron/build/ovnnb_db.db', actions.OFFLINE_NB_DB)
+        self.rmtree.assert_called_once_with('/var/lib/neutron/build')
+        # the build stops at the file, loading it is a separate step
+        self.assertFalse(self.restore.called)
+        self.assertFalse(self.record_ovn_db_sync.called)
+        self.unitdata_kv.return_value.set.assert_called_once_with(
+            actions.OFFLINE_NB_BUILD_KEY,
+            {'file': actions.OFFLINE_NB_DB, 'started': mock.ANY})
+        result = json.loads(self.action_set.call_args[0][0]['result'])
+        self.assertEqual(result['file'], actions.OFFLINE_NB_DB)
+        self.assertEqual(result['rows'], {'Logical_Switch': 2})
+        self.assertEqual(result['bytes'], 4096)
+        self.assertEqual(sorted(result['seconds']), ['build', 'compact'])
+        self.assertFalse(self.action_fail.called)
+
+        # a failed build keeps the build directory and is not recorded
+        self.rmtree.reset_mock()
+        self.unitdata_kv.return_value.set.reset_mock()
+        fcp.stderr = 'ERROR something'
+        actions.migrate_ovn_db(['/some/path/migrate-ovn-db'])
+        self.action_fail.assert_called_once_with(
+            'Offline build failed: neutron-ovn-db-sync-util failed, build '
+            'directory kept in /var/lib/neutron/build')
+        self.assertFalse(self.rmtree.called)
+        self.assertFalse(self.unitdata_kv.return_value.set.called)
+
+    def test_restore_offline_nb_db(self):
+        self.patch_object(actions.ch_core.hookenv, 'action_get')
+        self.patch_object(actions.ch_core.hookenv, 'action_set')
+        self.patch_object(actions.ch_core.hookenv, 'action_fail')
+        self.patch_object(actions, 'record_ovn_db_sync')
+        self.patch_object(actions, 'get_ovn_connection')
+        self.patch_object(actions.unitdata, 'kv', name='unitdata_kv')
+        self.patch_object(actions.os.path, 'exists')
+        self.patch_object(actions.os.path, 'getsize')
+        self.patch_object(actions.ovsdb, 'Client')
+        self.patch_object(actions.offline_nb, 'check_empty')
+        self.patch_object(actions.offline_nb, 'restore')
+        kv_data = {}
+        kv = self.unitdata_kv.return_value
+        kv.get.side_effect = kv_data.get
+        kv.unset.side_effect = lambda k: kv_data.pop(k, None)
+        params = {'i-really-mean-it': False}
+        self.action_get.side_effect = lambda x: params[x]
+        connection = {'remotes': 'ssl:10.0.0.1:6641'}
+        self.get_ovn_connection.return_value = connection
+        actions.restore_offline_nb_db(['/some/path/restore-offline-nb-db'])
+        self.action_fail.assert_called_once_with(
+            'No database file built offline, run migrate-ovn-db with '
+            'offline-build=true and i-really-mean-it=true first.')
+
+        self.action_fail.reset_mock()
+        build = {'file': actions.OFFLINE_NB_DB,
+                 'started': '2026-10-19 08:00:00'}
+        kv_data[actions.OFFLINE_NB_BUILD_KEY] = build
+        self.exists.return_value = True
+        self.getsize.return_value = 4096
+        actions.restore_offline_nb_db(['/some/path/restore-offline-nb-db'])
+        self.check_empty.assert_called_once_with(
+            self.Client.return_value.__enter__.return_value)
+        self.assertFalse(self.restore.called)
+        self.assertFalse(self.record_ovn_db_sync.called)
+        self.action_set.assert_called_once_with({'result': json.dumps(
+            dict(build, bytes=4096), indent=2, sort_keys=True)})
+
+        self.check_empty.side_effect = actions.offline_nb.OfflineBuildError(
+            'not empty')
+        params['i-really-mean-it'] = True
+        actions.restore_offline_nb_db(['/some/path/restore-offline-nb-db'])
+        self.action_fail.assert_called_once_with('Restore failed: not empty')
+        self.assertFalse(self.restore.called)
+
+        self.check_empty.side_effect = None
+        self.action_set.reset_mock()
+        actions.restore_offline_nb_db(['/some/path/restore-offline-nb-db'])
+        self.restore.assert_called_once_with(actions.OFFLINE_NB_DB,
+                                             **connection)
+        self.record_ovn_db_sync.assert_called_once_with(
+            actions.datetime.datetime(2026, 10, 19, 8, 0, 0))
+        self.assertNotIn(actions.OFFLINE_NB_BUILD_KEY, kv_data)
+        result = json.loads(self.action_set.call_args[0][0]['result'])
+        self.assertIn('seconds', result)
+
+    def test_migrate_ovn_db_incremental(self):
+        self.patch_object(actions.ch_core.hookenv, 'action_get')
+        self.patch_object(actions.ch_core.hookenv, 'action_set')
+        self.patch_object(actions.subprocess, 'run')
+        self.patch_object(actions, 'run_neutron_db_util')
+        self.patch_object(actions, 'record_ovn_db_sync')
+        params = {'i-really-mean-it': False, 'since': '2026-10-19T08:00:00'}
+        self.action_get.side_effect = lambda x: params[x]
+        self.run_neutron_db_util.return_value = {'marked': 42}
+        actions.migrate_ovn_db(['/some/path/migrate-ovn-db'])
+        self.run_neutron_db_util.assert_called_once_with(
+            'mark-changed', '2026-10-19 08:00:00')
+        self.assertFalse(self.run.called)
+        self.assertFalse(self.record_ovn_db_sync.called)
+        self.action_set.assert_called_once_with({
+            'result': json.dumps({'marked': 42}, indent=2, sort_keys=True),
+        })
+
+        self.run_neutron_db_util.reset_mock()
+        params['i-really-mean-it'] = True
+        params['since'] = '2026-10-19T10:00:00+02:00'
+        actions.migrate_ovn_db(['/some/path/migrate-ovn-db'])
+        self.run_neutron_db_util.assert_called_once_with(
+            'mark-changed', '2026-10-19 08:00:00', '--commit')
+        self.record_ovn_db_sync.assert_called_once_with(mock.ANY)
+
+    def test_parse_since(self):
+        self.patch_object(actions.unitdata, 'kv', name='unitdata_kv')
+        kv = self.unitdata_kv.return_value
+        kv.get.return_value = '2026-10-19 08:00:00'
+        self.assertEqual(actions.parse_since('last'), '2026-10-19 08:00:00')
+        kv.get.assert_called_once_with(actions.LAST_OVN_DB_SYNC_KEY)
+        kv.get.return_value = None
+        with self.assertRaises(ValueError):
+            actions.parse_since('last')
+        self.assertEqual(actions.parse_since('2026-10-19'),
+                         '2026-10-19 00:00:00')
+        with self.assertRaises(ValueError):
+            actions.parse_since('yesterday')
+
+    def test_record_ovn_db_sync(self):
+        self.patch_object(actions.unitdata, 'kv', name='unitdata_kv')
+        kv = self.unitdata_kv.return_value
+        actions.record_ovn_db_sync(
+            actions.datetime.datetime(2026, 10, 19, 8, 0, 0))
+        kv.set.assert_called_once_with(actions.LAST_OVN_DB_SYNC_KEY,
+                                       '2026-10-19 08:00:00')
+        kv.flush.assert_called_once_with()
 
     def test_get_neutron_db_connection_string(self):
         self.patch_object(actions.cfg, 'ConfigParser')
@@ -224,7 +740,9 @@ class TestActions(test_utils.PatchHelper):
 
     def test_offline_neutron_morph_db(self):
         self.patch_object(actions.ch_core.hookenv, 'action_get')
-        self.action_get.return_value = False
+        params = {'i-really-mean-it': False, 'rehearse': False,
+                  'preserve-vni': False}
+        self.action_get.side_effect = lambda x: params[x]
         self.patch_object(actions.subprocess, 'run')
         self.patch_object(actions.ch_core.hookenv, 'charm_dir')
         self.charm_dir.return_value = '/path/to/charm'
@@ -259,7 +777,7 @@ class TestActions(test_utils.PatchHelper):
                       file=mock.ANY),
         ])
         self.run.reset_mock()
-        self.action_get.return_value = True
+        params['i-really-mean-it'] = True
         actions.offline_neutron_morph_db(
             ['/some/path/offline-neutron-morph-db'])
         self.run.assert_called_once_with(
@@ -287,3 +805,613 @@ class TestActions(test_utils.PatchHelper):
         actions.offline_neutron_morph_db(
             ['/some/path/offline-neutron-morph-db'])
         self.action_fail.assert_called_once()
+        # segmentation IDs are preserved on request
+        self.run.reset_mock()
+        params['preserve-vni'] = True
+        actions.offline_neutron_morph_db(
+            ['/some/path/offline-neutron-morph-db'])
+        self.assertEqual(self.run.call_args[0][0][2:],
+                         ('morph', '--preserve-vni'))
+
+    def test_offline_neutron_morph_db_rehearse(self):
+        self.patch_object(actions.ch_core.hookenv, 'action_get')
+        self.patch_object(actions.ch_core.hookenv, 'action_set')
+        self.patch_object(actions.ch_core.hookenv, 'action_fail')
+        self.patch_object(actions, 'run_offline_morph_tool')
+        self.patch('builtins.print', name='builtin_print')
+        params = {'i-really-mean-it': True, 'rehearse': True,
+                  'preserve-vni': False}
+        self.action_get.side_effect = lambda x: params[x]
+        result = {
+            'morphed': {'gre': 1, 'vxlan': 2},
+            'segments': {'gre': 1, 'vxlan': 2},
+            'seconds': {'snapshot': 1.5, 'morph': 0.5},
+        }
+        self.run_offline_morph_tool.return_value = (
+            actions.subprocess.CompletedProcess(
+                'tool', 0, json.dumps(result), 'copied 3 rows'))
+        actions.offline_neutron_morph_db(
+            ['/some/path/offline-neutron-morph-db'])
+        self.run_offline_morph_tool.assert_called_once_with(
+            'rehearse', preserve_vni=False)
+        self.action_set.assert_called_once_with({
+            'result': json.dumps(result, indent=2, sort_keys=True)})
+        self.assertFalse(self.action_fail.called)
+
+        result['error'] = 'unable to allocate "geneve" segment.'
+        self.run_offline_morph_tool.return_value.stdout = json.dumps(result)
+        actions.offline_neutron_morph_db(
+            ['/some/path/offline-neutron-morph-db'])
+        self.action_fail.assert_called_once_with(
+            'Morphing the snapshot failed: unable to allocate "geneve" '
+            'segment, the geneve VNI range must have at least 3 free VNIs.')
+
+    def test_stage_ovn_packages(self):
+        self.patch_object(actions.ch_fetch, 'SourceConfigError',
+                          new=type('SourceConfigError', (Exception,), {}))
+        self.patch_object(actions.ch_core.hookenv, 'action_get')
+        self.patch_object(actions.ch_core.hookenv, 'action_set')
+        self.patch_object(actions.ch_core.hookenv, 'action_fail')
+        self.patch_object(actions.charms_openstack.charm,
+                          'provide_charm_instance')
+        instance = mock.MagicMock()
+        self.provide_charm_instance.return_value.__enter__.return_value = (
+            instance)
+        self.action_get.return_value = ''
+        instance.stage_ovn_packages.return_value = {
+            'source': 'cloud:focal-ovn-22.03', 'packages': 2, 'bytes': 50}
+        actions.stage_ovn_packages(['/some/path/stage-ovn-packages'])
+        instance.stage_ovn_packages.assert_called_once_with(None)
+        self.action_set.assert_called_once_with({'result': json.dumps(
+            instance.stage_ovn_packages.return_value, indent=2,
+            sort_keys=True)})
+
+        self.action_set.reset_mock()
+        instance.stage_ovn_packages.side_effect = ValueError(
+            'no OVN source configured or given')
+        actions.stage_ovn_packages(['/some/path/stage-ovn-packages'])
+        self.action_fail.assert_called_once_with(
+            'no OVN source configured or given')
+        self.assertFalse(self.action_set.called)
+
+        self.action_fail.reset_mock()
+        instance.stage_ovn_packages.side_effect = (
+            actions.ch_fetch.SourceConfigError('Unknown source: bogus'))
+        actions.stage_ovn_packages(['/some/path/stage-ovn-packages'])
+        self.action_fail.assert_called_once_with('Unknown source: bogus')
+
+        self.action_fail.reset_mock()
+        instance = mock.MagicMock(spec=['release'])
+        instance.release = 'train'
+        self.provide_charm_instance.return_value.__enter__.return_value = (
+            instance)
+        actions.stage_ovn_packages(['/some/path/stage-ovn-packages'])
+        self.action_fail.assert_called_once_with(
+            'OVN packages are not installed by this charm on OpenStack '
+            'Train.')
+
+    def test_ovn_sync_health(self):
+        self.patch_object(actions.ch_core.hookenv, 'action_set')
+        self.patch_object(actions.ch_core.hookenv, 'action_fail')
+        self.patch_object(actions, 'run_neutron_db_util')
+        self.patch_object(actions.sync_health, 'enabled', return_value=True)
+        self.patch_object(actions.sync_health, 'record')
+        self.patch_object(actions.unitdata, 'kv', name='unitdata_kv')
+        result = {
+            'backlog': {'ports': 2},
+            'pending-deletes': {},
+            'oldest-lagging': '2026-10-19 10:00:00',
+            'hash-ring': {
+                'node-0': {'nodes': 2, 'alive': 2, 'last-seen': 'now'},
+            },
+        }
+        self.run_neutron_db_util.return_value = result
+        actions.ovn_sync_health(['/some/path/ovn-sync-health'])
+        self.run_neutron_db_util.assert_called_once_with('ovn-health')
+        self.record.assert_called_once_with(
+            {'backlog': 2, 'hosts': 1, 'alive-hosts': 1})
+        self.unitdata_kv.return_value.flush.assert_called_once_with()
+        self.action_set.assert_called_once_with({
+            'result': json.dumps(result, indent=2, sort_keys=True),
+            'hash-ring': actions.format_table(
+                ('hostname', 'nodes', 'alive', 'last-seen'),
+                [['node-0', 2, 2, 'now']]),
+        })
+
+        self.action_set.reset_mock()
+        self.run_neutron_db_util.side_effect = (
+            actions.subprocess.CalledProcessError(1, 'tool'))
+        actions.ovn_sync_health(['/some/path/ovn-sync-health'])
+        self.assertTrue(self.action_fail.called)
+        self.assertFalse(self.action_set.called)
+
+    def test_show_timings(self):
+        self.patch_object(actions.timings, 'report')
+        self.report.return_value = {
+            'update-status': {'assess_status': {'p50': 0.1}},
+            'config-changed': {'configure_neutron': {'p50': 0.2}},
+        }
+        self.patch_object(actions.ch_core.hookenv, 'action_get')
+        self.patch_object(actions.ch_core.hookenv, 'action_set')
+        self.action_get.return_value = ''
+        actions.show_timings(['/some/path/show-timings'])
+        self.action_set.assert_called_once_with({
+            'timings': json.dumps(self.report.return_value, indent=2,
+                                  sort_keys=True),
+        })
+        self.action_set.reset_mock()
+        self.action_get.return_value = 'update-status'
+        actions.show_timings(['/some/path/show-timings'])
+        self.action_set.assert_called_once_with({
+            'timings': json.dumps(
+                {'update-status': {'assess_status': {'p50': 0.1}}},
+                indent=2, sort_keys=True),
+        })
+
+    def test_run_neutron_db_util(self):
+        self.patch_object(actions.subprocess, 'run')
+        self.patch_object(actions.ch_core.hookenv, 'charm_dir')
+        self.charm_dir.return_value = '/path/to/charm'
+        self.patch_object(actions, 'get_neutron_db_connection_string')
+        self.get_neutron_db_connection_string.return_value = 'fake-connection'
+        self.patch('builtins.print', name='builtin_print')
+        fcp = mock.MagicMock()
+        fcp.stdout = '{"inserted": 42}'
+        fcp.stderr = 'fake-progress'
+        self.run.return_value = fcp
+        self.assertEqual(
+            actions.run_neutron_db_util('geneve-allocations', '1:2'),
+            {'inserted': 42})
+        self.run.assert_called_once_with(
+            (
+                '/path/to/charm/files/scripts/neutron_db_util.py',
+                'fake-connection',
+                'geneve-allocations',
+                '1:2',
+            ),
+            input=None,
+            capture_output=True,
+            universal_newlines=True,
+            env={'PATH': '/usr/bin'},
+        )
+        self.builtin_print.assert_called_once_with('fake-progress',
+                                                   file=mock.ANY)
+        fcp.check_returncode.assert_called_once_with()
+
+    def test_sync_geneve_allocations(self):
+        self.patch_object(actions.ch_core.hookenv, 'is_leader')
+        self.patch_object(actions.ch_core.hookenv, 'action_get')
+        self.patch_object(actions.ch_core.hookenv, 'action_set')
+        self.patch_object(actions.ch_core.hookenv, 'action_fail')
+        self.patch_object(actions.ch_core.hookenv, 'config')
+        self.patch_object(actions.ch_core.hookenv, 'leader_set')
+        self.patch_object(actions, 'run_neutron_db_util')
+        self.is_leader.return_value = False
+        actions.sync_geneve_allocations(['/some/path/sync-geneve-alloc'])
+        self.action_fail.assert_called_once_with(
+            'This action must be run on the leader unit.')
+        self.assertFalse(self.run_neutron_db_util.called)
+
+        self.is_leader.return_value = True
+        params = {
+            'i-really-mean-it': False,
+            'vni-ranges': '',
+            'chunk-size': 500,
+        }
+        self.action_get.side_effect = lambda x: params[x]
+        self.config.return_value = '3001:4000 1001:2000'
+        self.run_neutron_db_util.return_value = {'inserted': 42}
+        actions.sync_geneve_allocations(['/some/path/sync-geneve-alloc'])
+        self.config.assert_called_once_with('geneve-vni-ranges')
+        self.run_neutron_db_util.assert_called_once_with(
+            'geneve-allocations', '1001:2000,3001:4000',
+            '--chunk-size', '500')
+        self.assertFalse(self.leader_set.called)
+        self.action_set.assert_called_once_with({
+            'result': json.dumps({'inserted': 42}, indent=2, sort_keys=True),
+        })
+
+        self.run_neutron_db_util.reset_mock()
+        params['i-really-mean-it'] = True
+        params['vni-ranges'] = '1:100'
+        actions.sync_geneve_allocations(['/some/path/sync-geneve-alloc'])
+        self.run_neutron_db_util.assert_called_once_with(
+            'geneve-allocations', '1:100', '--chunk-size', '500', '--commit')
+        self.leader_set.assert_called_once_with({
+            actions.neutron_api_plugin_ovn.GENEVE_ALLOCATIONS_KEY: '1:100'})
+
+        self.run_neutron_db_util.reset_mock()
+        self.action_fail.reset_mock()
+        params['vni-ranges'] = ''
+        self.config.return_value = ''
+        actions.sync_geneve_allocations(['/some/path/sync-geneve-alloc'])
+        self.action_fail.assert_called_once_with(
+            "no VNI ranges, set the 'vni-ranges' parameter or the "
+            "'geneve-vni-ranges' configuration option")
+        self.action_fail.reset_mock()
+        params['vni-ranges'] = '1:0'
+        actions.sync_geneve_allocations(['/some/path/sync-geneve-alloc'])
+        self.action_fail.assert_called_once_with(
+            'invalid VNI ranges: "1:0" is not a range within 1:16777215')
+        self.assertFalse(self.run_neutron_db_util.called)
+
+    def test_get_ovn_connection(self):
+        self.patch_object(actions.cfg, 'ConfigParser')
+        parser = mock.MagicMock()
+
+        def _fakeparser(x, y):
+            y.update({
+                'ovn': {
+                    'ovn_nb_connection': [
+                        'ssl:10.0.0.1:6641,ssl:10.0.0.2:6641'],
+                    'ovn_nb_private_key': ['/path/to/key'],
+                    'ovn_nb_certificate': ['/path/to/cert'],
+                    'ovn_nb_ca_cert': ['/path/to/ca'],
+                    'ovn_sb_connection': ['ssl:10.0.0.1:16642'],
+                },
+            })
+            return parser
+
+        self.ConfigParser.side_effect = _fakeparser
+        self.assertEqual(actions.get_ovn_connection(), {
+            'remotes': 'ssl:10.0.0.1:6641,ssl:10.0.0.2:6641',
+            'private_key': '/path/to/key',
+            'certificate': '/path/to/cert',
+            'ca_cert': '/path/to/ca',
+        })
+        self.assertEqual(actions.get_ovn_connection('sb'), {
+            'remotes': 'ssl:10.0.0.1:16642',
+            'private_key': None,
+            'certificate': None,
+            'ca_cert': None,
+        })
+        self.ConfigParser.assert_called_with(actions.ML2_CONF, mock.ANY)
+        parser.parse.assert_called_with()
+
+    def test_apply_dhcp_global_options(self):
+        self.patch_object(actions.ch_core.hookenv, 'is_leader')
+        self.patch_object(actions.ch_core.hookenv, 'action_get')
+        self.patch_object(actions.ch_core.hookenv, 'action_set')
+        self.patch_object(actions.ch_core.hookenv, 'action_fail')
+        self.patch_object(actions.ch_core.hookenv, 'config')
+        self.patch_object(actions.ch_core.hookenv, 'leader_get')
+        self.patch_object(actions.ch_core.hookenv, 'leader_set')
+        self.patch_object(actions, 'get_ovn_connection')
+        self.patch_object(actions.ovsdb, 'Client')
+        self.patch_object(actions.dhcp, 'apply')
+        self.is_leader.return_value = False
+        actions.apply_dhcp_global_options(['/some/path/apply-dhcp'])
+        self.action_fail.assert_called_once_with(
+            'This action must be run on the leader unit.')
+        self.assertFalse(self.apply.called)
+
+        self.action_fail.reset_mock()
+        self.is_leader.return_value = True
+        params = {'i-really-mean-it': False, 'batch-size': 100}
+        self.action_get.side_effect = lambda x: params[x]
+        config = {
+            'ovn-dhcp4-global-options': 'ntp_server:10.0.0.1 wpad:',
+            'ovn-dhcp6-global-options': 'ntp_server',
+        }
+        self.config.side_effect = lambda x: config[x]
+        self.leader_get.return_value = json.dumps({'4': {'dns': '10.0.0.2'}})
+        actions.apply_dhcp_global_options(['/some/path/apply-dhcp'])
+        self.action_fail.assert_called_once_with(
+            "invalid 'ovn-dhcp6-global-options': \"ntp_server\" is not an "
+            "<option>:<value> pair")
+        self.assertFalse(self.apply.called)
+
+        config['ovn-dhcp6-global-options'] = ''
+        self.apply.return_value = {'changed': 3}
+        client = self.Client.return_value.__enter__.return_value
+        actions.apply_dhcp_global_options(['/some/path/apply-dhcp'])
+        self.leader_get.assert_called_with(
+            actions.neutron_api_plugin_ovn.DHCP_GLOBAL_OPTIONS_KEY)
+        deltas = {
+            4: ({'ntp_server': '10.0.0.1'}, ['wpad']),
+            6: ({}, []),
+        }
+        self.apply.assert_called_once_with(client, deltas, batch_size=100,
+                                           dry_run=True)
+        self.assertFalse(self.leader_set.called)
+        self.action_set.assert_called_once_with({
+            'result': json.dumps({
+                'changed': 3,
+                'delta': {
+                    'ipv4': {'set': {'ntp_server': '10.0.0.1'},
+                             'unset': ['wpad'], 'dropped': ['dns']},
+                    'ipv6': {'set': {}, 'unset': [], 'dropped': []},
+                },
+            }, indent=2, sort_keys=True),
+        })
+
+        params['i-really-mean-it'] = True
+        self.apply.reset_mock()
+        actions.apply_dhcp_global_options(['/some/path/apply-dhcp'])
+        self.apply.assert_called_once_with(client, deltas, batch_size=100,
+                                           dry_run=False)
+        self.leader_set.assert_called_once_with({
+            actions.neutron_api_plugin_ovn.DHCP_GLOBAL_OPTIONS_KEY:
+                json.dumps({'4': {'ntp_server': '10.0.0.1', 'wpad': ''},
+                            '6': {}}, sort_keys=True)})
+
+    def test_apply_distributed_floating_ip(self):
+        self.patch_object(actions.ch_core.hookenv, 'is_leader')
+        self.patch_object(actions.ch_core.hookenv, 'action_get')
+        self.patch_object(actions.ch_core.hookenv, 'action_set')
+        self.patch_object(actions.ch_core.hookenv, 'action_fail')
+        self.patch_object(actions.ch_core.hookenv, 'config')
+        self.patch_object(actions.ch_core.hookenv, 'charm_dir',
+                          return_value='/charm')
+        self.patch_object(actions, 'get_neutron_db_connection_string',
+                          return_value='mysql://db')
+        self.patch_object(actions, 'get_ovn_connection')
+        self.patch_object(actions.ovsdb, 'Client')
+        self.patch_object(actions.drift, 'neutron_records')
+        self.patch_object(actions.fip, 'apply')
+        self.is_leader.return_value = False
+        actions.apply_distributed_floating_ip(['/some/path/apply-fip'])
+        self.action_fail.assert_called_once_with(
+            'This action must be run on the leader unit.')
+        self.assertFalse(self.apply.called)
+
+        self.is_leader.return_value = True
+        params = {'i-really-mean-it': False, 'batch-size': 100}
+        self.action_get.side_effect = lambda x: params[x]
+        self.config.return_value = False
+        self.apply.return_value = {'changed': 3}
+        client = self.Client.return_value.__enter__.return_value
+        actions.apply_distributed_floating_ip(['/some/path/apply-fip'])
+        self.config.assert_called_once_with('enable-distributed-floating-ip')
+        self.assertFalse(self.neutron_records.called)
+        self.apply.assert_called_once_with(client, False, {}, batch_size=100,
+                                           dry_run=True)
+        self.action_set.assert_called_once_with({
+            'result': json.dumps({'changed': 3, 'distributed': False},
+                                 indent=2, sort_keys=True),
+        })
+
+        params['i-really-mean-it'] = True
+        self.config.return_value = True
+        self.neutron_records.return_value = iter([('f1', 'fa:16:3e:00:00:01')])
+        self.apply.reset_mock()
+        actions.apply_distributed_floating_ip(['/some/path/apply-fip'])
+        self.neutron_records.assert_called_once_with(
+            '/charm/files/scripts/neutron_db_util.py', 'mysql://db',
+            'floating_ip_macs')
+        self.apply.assert_called_once_with(
+            client, True, {'f1': 'fa:16:3e:00:00:01'}, batch_size=100,
+            dry_run=False)
+
+    def test_cleanup_ovn_orphans(self):
+        self.patch_object(actions.ch_core.hookenv, 'is_leader')
+        self.patch_object(actions.ch_core.hookenv, 'action_get')
+        self.patch_object(actions.ch_core.hookenv, 'action_set')
+        self.patch_object(actions.ch_core.hookenv, 'action_fail')
+        self.patch_object(actions.ch_core.hookenv, 'charm_dir')
+        self.patch_object(actions, 'get_neutron_db_connection_string')
+        self.patch_object(actions, 'get_ovn_connection')
+        self.patch_object(actions.ovsdb, 'Client')
+        self.patch_object(actions.drift, 'neutron_records')
+        self.patch_object(actions.orphans, 'find')
+        self.patch_object(actions.orphans, 'delete')
+        self.is_leader.return_value = False
+        actions.cleanup_ovn_orphans(['/some/path/cleanup-ovn-orphans'])
+        self.action_fail.assert_called_once_with(
+            'This action must be run on the leader unit.')
+        self.assertFalse(self.find.called)
+
+        self.is_leader.return_value = True
+        params = {'i-really-mean-it': False, 'batch-size': 50, 'samples': 1}
+        self.action_get.side_effect = lambda x: params[x]
+        self.charm_dir.return_value = '/path/to/charm'
+        self.get_neutron_db_connection_string.return_value = 'fake-conn'
+        self.get_ovn_connection.return_value = {'remotes': 'fake'}
+        client = self.Client.return_value.__enter__.return_value
+        found = [actions.orphans.Orphan('Address_Set', 'as1', 'as_x', None)]
+        self.find.return_value = found
+        self.neutron_records.return_value = iter([('p1', 1), ('p2', 3)])
+        actions.cleanup_ovn_orphans(['/some/path/cleanup-ovn-orphans'])
+        self.find.assert_called_once_with(client, mock.ANY)
+        self.assertEqual(self.find.call_args[0][1]('ports'), {'p1', 'p2'})
+        self.neutron_records.assert_called_once_with(
+            '/path/to/charm/files/scripts/neutron_db_util.py', 'fake-conn',
+            'ports')
+        self.assertFalse(self.delete.called)
+        result = json.loads(self.action_set.call_args[0][0]['result'])
+        self.assertEqual(result['Address_Set'],
+                         {'orphans': 1, 'samples': ['as_x']})
+        self.assertEqual(result['transactions'], 0)
+
+        params['i-really-mean-it'] = True
+        self.delete.return_value = 1
+        actions.cleanup_ovn_orphans(['/some/path/cleanup-ovn-orphans'])
+        self.delete.assert_called_once_with(client, found, batch_size=50)
+        result = json.loads(self.action_set.call_args[0][0]['result'])
+        self.assertEqual(result['transactions'], 1)
+
+    def test_ovn_drift_report(self):
+        self.patch_object(actions.ch_core.hookenv, 'action_get')
+        self.patch_object(actions.ch_core.hookenv, 'action_set')
+        self.patch_object(actions.ch_core.hookenv, 'charm_dir')
+        self.patch_object(actions, 'get_neutron_db_connection_string')
+        self.patch_object(actions, 'get_ovn_connection')
+        self.patch_object(actions.drift, 'detect')
+        self.patch_object(actions.drift, 'neutron_records')
+        self.patch_object(actions.ovsdb, 'Client')
+        params = {'resources': '', 'samples': 3}
+        self.action_get.side_effect = lambda x: params[x]
+        self.charm_dir.return_value = '/path/to/charm'
+        self.get_neutron_db_connection_string.return_value = 'fake-conn'
+        self.get_ovn_connection.return_value = {'remotes': 'fake-remotes'}
+        self.detect.return_value = {'total-drift': 0}
+        actions.ovn_drift_report(['/some/path/ovn-drift-report'])
+        self.detect.assert_called_once_with(
+            actions.drift.RESOURCES, mock.ANY, mock.ANY, samples=3)
+        _, neutron_source, nb_client_factory = self.detect.call_args[0]
+        neutron_source('networks')
+        self.neutron_records.assert_called_once_with(
+            '/path/to/charm/files/scripts/neutron_db_util.py', 'fake-conn',
+            'networks')
+        nb_client_factory()
+        self.Client.assert_called_once_with(remotes='fake-remotes')
+        self.action_set.assert_called_once_with({
+            'drift': json.dumps({'total-drift': 0}, indent=2, sort_keys=True),
+        })
+
+        self.detect.reset_mock()
+        params['resources'] = 'ports routers'
+        actions.ovn_drift_report(['/some/path/ovn-drift-report'])
+        self.detect.assert_called_once_with(
+            ['ports', 'routers'], mock.ANY, mock.ANY, samples=3)
+
+    def test_format_table(self):
+        self.assertEqual(
+            actions.format_table(('a', 'long header'),
+                                 [('long value', 1), ('b', '')]),
+            'a           long header\n'
+            'long value  1\n'
+            'b')
+
+    def test_ovsdb_probe(self):
+        self.patch_object(actions.ch_core.hookenv, 'action_get')
+        self.patch_object(actions.ch_core.hookenv, 'action_set')
+        self.patch_object(actions, 'get_ovn_connection')
+        self.patch_object(actions.ovsdb, 'ssl_context')
+        self.patch_object(actions.ovsdb, 'probe_all')
+        self.action_get.return_value = 5
+        self.get_ovn_connection.side_effect = lambda db: {
+            'remotes': 'ssl:10.0.0.1:{}'.format(
+                6641 if db == 'nb' else 16642),
+            'private_key': '/path/to/key',
+            'certificate': '/path/to/cert',
+            'ca_cert': '/path/to/ca',
+        }
+        results = [
+            {'db': 'nb', 'remote': 'ssl:10.0.0.1:6641', 'connect': 0.5,
+             'tls': 3.1, 'echo': 0.4, 'list_dbs': 0.3,
+             'leader': ['OVN_Northbound']},
+            {'db': 'sb', 'remote': 'ssl:10.0.0.1:16642', 'connect': 0.5,
+             'error': 'timeout after 5s'},
+        ]
+        self.probe_all.return_value = results
+        actions.ovsdb_probe(['/some/path/ovsdb-probe'])
+        self.ssl_context.assert_called_once_with(
+            '/path/to/key', '/path/to/cert', '/path/to/ca')
+        self.probe_all.assert_called_once_with(
+            {'nb': 'ssl:10.0.0.1:6641', 'sb': 'ssl:10.0.0.1:16642'},
+            context=self.ssl_context.return_value, timeout=5)
+        self.action_set.assert_called_once_with({
+            'table': actions.format_table(
+                ('db', 'remote', 'connect', 'tls', 'echo', 'list_dbs',
+                 'leader', 'error'),
+                [['nb', 'ssl:10.0.0.1:6641', 0.5, 3.1, 0.4, 0.3,
+                  'OVN_Northbound', ''],
+                 ['sb', 'ssl:10.0.0.1:16642', 0.5, '-', '-', '-', '-',
+                  'timeout after 5s']]),
+            'result': json.dumps(results, indent=2, sort_keys=True),
+            'unreachable': 1,
+        })
+
+    def test_rebalance_gateway_chassis(self):
+        self.patch_object(actions.ch_core.hookenv, 'is_leader')
+        self.patch_object(actions.ch_core.hookenv, 'action_get')
+        self.patch_object(actions.ch_core.hookenv, 'action_set')
+        self.patch_object(actions.ch_core.hookenv, 'action_fail')
+        self.patch_object(actions, 'get_ovn_connection')
+        self.patch_object(actions.ovsdb, 'Client')
+        self.patch_object(actions.gateway, 'apply')
+        self.is_leader.return_value = False
+        actions.rebalance_gateway_chassis(['/some/path/rebalance'])
+        self.action_fail.assert_called_once_with(
+            'This action must be run on the leader unit.')
+        self.assertFalse(self.Client.called)
+
+        self.is_leader.return_value = True
+        params = {'i-really-mean-it': False, 'batch-size': 10}
+        self.action_get.side_effect = lambda x: params[x]
+        self.get_ovn_connection.return_value = {'remotes': 'fake'}
+        client = self.Client.return_value.__enter__.return_value
+        client.get_schema.return_value = {'tables': {
+            'Logical_Router_Port': {}, 'Gateway_Chassis': {}}}
+        rows = {
+            'Logical_Router_Port': [
+                {'name': 'lrp-1', 'gateway_chassis': ['g1', 'g2']},
+                {'name': 'lrp-2', 'gateway_chassis': ['g3', 'g4']},
+            ],
+            'Gateway_Chassis': [
+                {'_uuid': 'g1', 'chassis_name': 'c1', 'priority': 2},
+                {'_uuid': 'g2', 'chassis_name': 'c2', 'priority': 1},
+                {'_uuid': 'g3', 'chassis_name': 'c1', 'priority': 2},
+                {'_uuid': 'g4', 'chassis_name': 'c2', 'priority': 1},
+            ],
+        }
+        client.select.side_effect = lambda db, table, columns: rows[table]
+        actions.rebalance_gateway_chassis(['/some/path/rebalance'])
+        self.Client.assert_called_once_with(remotes='fake')
+        self.assertFalse(self.apply.called)
+        self.action_set.assert_called_once_with({
+            'plan': 'group  before  after\n'
+                    'lrp-1  c1,c2   c2,c1',
+            'loads': 'chassis  before  after\n'
+                     'c1       2       1\n'
+                     'c2       0       1',
+            'result': json.dumps({
+                'groups': 2,
+                'changed': 1,
+                'transactions': 0,
+            }, indent=2, sort_keys=True),
+        })
+
+        params['i-really-mean-it'] = True
+        self.apply.return_value = 1
+        actions.rebalance_gateway_chassis(['/some/path/rebalance'])
+        self.apply.assert_called_once_with(client, mock.ANY, batch_size=10)
+        self.assertEqual(self.apply.call_args[0][1][0]['updates'],
+                         [('g1', 2, 1), ('g2', 1, 2)])
+
+    def test_scale_report(self):
+        self.patch_object(actions.ch_core.hookenv, 'action_set')
+        self.patch_object(actions.ch_core.hookenv, 'config')
+        self.patch_object(actions, 'run_neutron_db_util')
+        self.patch_object(actions, 'get_ovn_connection')
+        self.patch_object(actions.ovsdb, 'Client')
+        self.patch_object(actions.scale, 'nb_row_counts')
+        self.patch_object(actions.scale, 'report')
+        self.patch_object(actions.ch_core.hookenv, 'is_leader',
+                          return_value=False)
+        self.patch_object(actions.ch_core.hookenv, 'leader_set')
+        self.patch_object(actions.ch_core.hookenv, 'action_get')
+        self.patch_object(actions.ch_core.hookenv, 'action_fail')
+        params = {'apply': False}
+        self.action_get.side_effect = lambda x: params[x]
+        self.run_neutron_db_util.return_value = {'ports': 10}
+        self.get_ovn_connection.return_value = {'remotes': 'fake'}
+        self.nb_row_counts.return_value = {'ACL': 3}
+        self.report.return_value = {'nb-rows': 3}
+        actions.scale_report(['/some/path/scale-report'])
+        self.run_neutron_db_util.assert_called_once_with('counts')
+        self.nb_row_counts.assert_called_once_with(
+            self.Client.return_value.__enter__.return_value)
+        self.report.assert_called_once_with(
+            {'ports': 10}, {'ACL': 3}, self.config.return_value)
+        self.assertFalse(self.leader_set.called)
+        self.action_set.assert_called_once_with({
+            'report': json.dumps({'nb-rows': 3}, indent=2, sort_keys=True),
+        })
+        # the size is only recorded when asked to, on the leader
+        self.is_leader.return_value = True
+        actions.scale_report(['/some/path/scale-report'])
+        self.assertFalse(self.leader_set.called)
+        params['apply'] = True
+        self.is_leader.return_value = False
+        self.run_neutron_db_util.reset_mock()
+        actions.scale_report(['/some/path/scale-report'])
+        self.action_fail.assert_called_once_with(
+            'Recording the Northbound DB size with apply=true must be run on '
+            'the leader unit.')
+        self.assertFalse(self.run_neutron_db_util.called)
+        self.is_leader.return_value = True
+        actions.scale_report(['/some/path/scale-report'])
+        self.leader_set.assert_called_once_with({
+            actions.neutron_api_plugin_ovn.SCALE_NB_ROWS_KEY: '3'})
@@ -0,0 +1,59 @@
+# Copyright 2026 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import unittest
+
+import yaml
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), '..', 'src')
+OPTION_TYPES = ('string', 'int', 'float', 'boolean')
+
+
+class UniqueKeyLoader(yaml.SafeLoader):
+    """Loader failing on duplicate mapping keys, like Juju's."""
+
+    def construct_mapping(self, node, deep=False):
+        keys = set()
+        for key_node, _ in node.value:
+            key = self.construct_object(key_node, deep=deep)
+            if key in keys:
+                raise yaml.constructor.ConstructorError(
+                    None, None, 'duplicate key {!r}'.format(key),
+                    key_node.start_mark)
+            keys.add(key)
+        return super().construct_mapping(node, deep=deep)
+
+
+def load(name):
+    with open(os.path.join(SRC_DIR, name)) as fin:
+        return yaml.load(fin, Loader=UniqueKeyLoader)
+
+
+class TestConfig(unittest.TestCase):
+
+    def test_config_options(self):
+        options = load('config.yaml')['options']
+        for name, option in options.items():
+            self.assertIn(option['type'], OPTION_TYPES, name)
+            self.assertIn('description', option, name)
+        self.assertEqual(options['ovn-sync-status']['type'], 'boolean')
+        self.assertEqual(
+            options['prometheus-textfile-directory']['type'], 'string')
+
+    def test_actions(self):
+        actions = load('actions.yaml')
+        for name in actions:
+            self.assertTrue(
+                os.path.islink(os.path.join(SRC_DIR, 'actions', name)), name)
@@ -0,0 +1,113 @@
+# Copyright 2026 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import tempfile
+import unittest.mock as mock
+
+import charms_openstack.test_utils as test_utils
+
+import charm.openstack.fan_in as fan_in
+
+
+class TestFanIn(test_utils.PatchHelper):
+
+    def setUp(self):
+        super().setUp()
+        self.kv = mock.MagicMock()
+        self.kv_data = {}
+        self.kv.get.side_effect = lambda k, d=None: self.kv_data.get(k, d)
+        self.kv.set.side_effect = self.kv_data.__setitem__
+        self.kv.unset.side_effect = lambda k: self.kv_data.pop(k, None)
+        self.patch_object(fan_in.unitdata, 'kv', name='unitdata_kv',
+                          return_value=self.kv)
+        self.patch_object(fan_in.hookenv, 'log')
+        self.patch_object(fan_in.hookenv, 'relation_ids',
+                          return_value=['ovsdb-cms:2'])
+        self.patch_object(fan_in.hookenv, 'relation_set')
+        self.patch_object(fan_in.os, 'cpu_count', return_value=8)
+        self.conf = tempfile.NamedTemporaryFile(mode='w')
+        self.addCleanup(self.conf.close)
+        self.patch_object(fan_in, 'NEUTRON_CONF', new=self.conf.name)
+
+    def write_conf(self, content):
+        self.conf.seek(0)
+        self.conf.truncate()
+        self.conf.write(content)
+        self.conf.flush()
+
+    def test_worker_counts(self):
+        self.write_conf('[DEFAULT]\n'
+                        'api_workers = 4\n'
+                        'rpc_workers = 3\n'
+                        'rpc_state_report_workers = 2\n')
+        self.assertEqual(fan_in.worker_counts(self.conf.name), {
+            'api': 4, 'rpc': 3, 'rpc-state-report': 2, 'ovn-driver': 1})
+        # Neutron defaults
+        self.write_conf('[DEFAULT]\ncore_plugin = ml2\n')
+        self.assertEqual(fan_in.worker_counts(self.conf.name), {
+            'api': 8, 'rpc': 4, 'rpc-state-report': 1, 'ovn-driver': 1})
+        self.write_conf('[DEFAULT]\napi_workers = 0\n')
+        self.assertEqual(fan_in.worker_counts(self.conf.name), {
+            'api': 1, 'rpc': 1, 'rpc-state-report': 1, 'ovn-driver': 1})
+        self.write_conf('[DEFAULT]\napi_workers = many\n')
+        with self.assertRaises(ValueError):
+            fan_in.worker_counts(self.conf.name)
+        with self.assertRaises(fan_in.configparser.Error):
+            fan_in.worker_counts('/nonexistent')
+
+    def test_refresh(self):
+        self.write_conf('[DEFAULT]\napi_workers = 4\nrpc_workers = 2\n')
+        fan_in.refresh()
+        self.assertEqual(self.kv_data[fan_in.FAN_IN_KEY], {
+            'nb': 8, 'sb': 8, 'workers': {
+                'api': 4, 'rpc': 2, 'rpc-state-report': 1, 'ovn-driver': 1}})
+        self.relation_set.assert_called_once_with(
+            relation_id='ovsdb-cms:2',
+            relation_settings={
+                'ovsdb-client-connections': '{"nb": 8, "sb": 8}'})
+        self.assertEqual(fan_in.status_note(), 'OVSDB connections NB 8, SB 8')
+
+        self.assertEqual(self.kv_data[fan_in.PUBLISHED_KEY], ['ovsdb-cms:2'])
+
+        # unchanged
+        self.relation_set.reset_mock()
+        fan_in.refresh()
+        fan_in.refresh(new_relations=True)
+        self.assertFalse(self.relation_set.called)
+
+        # new relation
+        self.relation_ids.return_value = ['ovsdb-cms:2', 'ovsdb-cms:5']
+        fan_in.refresh()
+        self.assertFalse(self.relation_set.called)
+        fan_in.refresh(new_relations=True)
+        self.relation_set.assert_called_once_with(
+            relation_id='ovsdb-cms:5',
+            relation_settings={
+                'ovsdb-client-connections': '{"nb": 8, "sb": 8}'})
+        self.assertEqual(self.kv_data[fan_in.PUBLISHED_KEY],
+                         ['ovsdb-cms:2', 'ovsdb-cms:5'])
+
+        # changed
+        self.relation_set.reset_mock()
+        self.write_conf('[DEFAULT]\napi_workers = 2\nrpc_workers = 2\n')
+        fan_in.refresh()
+        self.assertEqual(self.relation_set.call_count, 2)
+
+        # neutron.conf not rendered
+        self.relation_set.reset_mock()
+        self.patch_object(fan_in, 'NEUTRON_CONF', new='/nonexistent')
+        fan_in.refresh()
+        self.assertFalse(self.relation_set.called)
+        self.assertNotIn(fan_in.FAN_IN_KEY, self.kv_data)
+        self.assertIsNone(fan_in.status_note())
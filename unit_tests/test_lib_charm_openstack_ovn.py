@@ -49,6 +49,192 @@ class TestNeutronAPIPluginOvnConfigProperties(test_utils.PatchHelper):
                          'neutron-api-plugin-ovn.crt'))
 
 
+class TestNeutronAPIPluginOvnVNIRanges(test_utils.PatchHelper):
+
+    def test_parse_vni_ranges(self):
+        self.assertEqual(neutron_api_plugin_ovn.parse_vni_ranges(None), [])
+        self.assertEqual(
+            neutron_api_plugin_ovn.parse_vni_ranges(
+                '3001:4000 1001:2000,1500:2500 2501:2600 5:5'),
+            [(5, 5), (1001, 2600), (3001, 4000)])
+        for value in ('1001', '1001:a', '2000:1001', '0:10',
+                      '1:16777216', '1:2:3'):
+            with self.assertRaises(ValueError):
+                neutron_api_plugin_ovn.parse_vni_ranges(value)
+
+    def test_format_vni_ranges(self):
+        self.assertEqual(
+            neutron_api_plugin_ovn.format_vni_ranges([(5, 5), (10, 20)]),
+            '5:5,10:20')
+
+    def test_vni_ranges_size(self):
+        self.assertEqual(
+            neutron_api_plugin_ovn.vni_ranges_size([(5, 5), (10, 20)]), 12)
+
+    def test_vni_ranges_delta(self):
+        self.assertEqual(
+            neutron_api_plugin_ovn.vni_ranges_delta([], [(1, 1000)]), 1000)
+        self.assertEqual(
+            neutron_api_plugin_ovn.vni_ranges_delta([(1, 1000)], []), 1000)
+        self.assertEqual(
+            neutron_api_plugin_ovn.vni_ranges_delta(
+                [(1, 1000)], [(1, 1000)]), 0)
+        self.assertEqual(
+            neutron_api_plugin_ovn.vni_ranges_delta(
+                [(1, 100), (201, 300)], [(51, 250), (1001, 1010)]),
+            # 1:50 and 251:300 removed, 101:200 and 1001:1010 added
+            50 + 50 + 100 + 10)
+
+    def test_auto_ovsdb_tunables(self):
+        self.assertEqual(neutron_api_plugin_ovn.auto_ovsdb_tunables(3), {
+            'ovsdb_connection_timeout': 180,
+            'ovsdb_probe_interval': 60000,
+            'ovsdb_retry_max_interval': 180,
+            'ovsdb_log_level': 'INFO',
+        })
+        self.assertEqual(
+            neutron_api_plugin_ovn.auto_ovsdb_tunables(5, 2000000), {
+                'ovsdb_connection_timeout': 600,
+                'ovsdb_probe_interval': 180000,
+                'ovsdb_retry_max_interval': 300,
+                'ovsdb_log_level': 'INFO',
+            })
+        self.assertEqual(
+            neutron_api_plugin_ovn.auto_ovsdb_tunables(
+                4, 100000)['ovsdb_connection_timeout'], 300)
+
+    def test_parse_ovsdb_tunable(self):
+        self.assertEqual(
+            neutron_api_plugin_ovn.parse_ovsdb_tunable(
+                'ovsdb_log_level', 'warning'), 'WARNING')
+        self.assertEqual(
+            neutron_api_plugin_ovn.parse_ovsdb_tunable(
+                'ovsdb_probe_interval', '0'), 0)
+        self.assertEqual(
+            neutron_api_plugin_ovn.parse_ovsdb_tunable(
+                'ovsdb_connection_timeout', '90'), 90)
+        for key, value in (('ovsdb_log_level', 'loud'),
+                           ('ovsdb_connection_timeout', '0'),
+                           ('ovsdb_retry_max_interval', '-1'),
+                           ('ovsdb_probe_interval', '1.5')):
+            with self.assertRaises(ValueError):
+                neutron_api_plugin_ovn.parse_ovsdb_tunable(key, value)
+
+
+class TestNeutronAPIPluginOvnMemoize(test_utils.PatchHelper):
+
+    def test_memoize(self):
+        class FakeCharm(object):
+            calls = 0
+
+            @neutron_api_plugin_ovn.memoize
+            def derived(self, value, suffix=''):
+                self.calls += 1
+                return value + suffix
+
+        c = FakeCharm()
+        self.assertEqual(c.derived('a'), 'a')
+        self.assertEqual(c.derived('a'), 'a')
+        self.assertEqual(c.derived('a', suffix='b'), 'ab')
+        self.assertEqual(c.derived('b'), 'b')
+        self.assertEqual(c.calls, 3)
+        self.assertEqual(FakeCharm().derived('a'), 'a')
+
+
+class TestNeutronAPIPluginOvnRestart(test_utils.PatchHelper):
+
+    def setUp(self):
+        super().setUp()
+        self.kv = mock.MagicMock()
+        self.kv_data = {}
+        self.kv.get.side_effect = lambda k, d=None: self.kv_data.get(k, d)
+        self.kv.set.side_effect = self.kv_data.__setitem__
+        self.kv.unset.side_effect = lambda k: self.kv_data.pop(k, None)
+        self.patch_object(neutron_api_plugin_ovn.unitdata, 'kv',
+                          name='unitdata_kv', return_value=self.kv)
+
+    def test_request_restart(self):
+        self.patch_object(neutron_api_plugin_ovn.reactive, 'set_flag')
+        neutron_api_plugin_ovn.request_restart('upgrade-charm')
+        neutron_api_plugin_ovn.request_restart('ovn-source')
+        neutron_api_plugin_ovn.request_restart('upgrade-charm')
+        self.assertEqual(
+            self.kv_data[neutron_api_plugin_ovn.RESTART_REASONS_KEY],
+            ['upgrade-charm', 'ovn-source'])
+        self.set_flag.assert_called_with('restart-needed')
+
+    def test_pop_restart_reasons(self):
+        self.kv_data[neutron_api_plugin_ovn.RESTART_REASONS_KEY] = ['a', 'b']
+        self.assertEqual(neutron_api_plugin_ovn.pop_restart_reasons(),
+                         ['a', 'b'])
+        self.assertEqual(neutron_api_plugin_ovn.pop_restart_reasons(), [])
+
+    def test_restart_grant_due(self):
+        self.patch_object(neutron_api_plugin_ovn.hookenv, 'leader_get')
+        self.leader_get.return_value = None
+        self.assertTrue(neutron_api_plugin_ovn.restart_grant_due(1000.0))
+        self.leader_get.assert_called_once_with(
+            neutron_api_plugin_ovn.RESTART_GRANTED_KEY)
+        self.leader_get.return_value = '900.5'
+        self.assertFalse(neutron_api_plugin_ovn.restart_grant_due(1000.0))
+        self.assertTrue(neutron_api_plugin_ovn.restart_grant_due(
+            900.5 + neutron_api_plugin_ovn.RESTART_INTERVAL))
+
+    def test_plugin_config_digest(self):
+        self.assertEqual(
+            neutron_api_plugin_ovn.plugin_config_digest({'a': 1, 'b': 2}),
+            neutron_api_plugin_ovn.plugin_config_digest({'b': 2, 'a': 1}))
+        self.assertNotEqual(
+            neutron_api_plugin_ovn.plugin_config_digest({'a': 1}),
+            neutron_api_plugin_ovn.plugin_config_digest({'a': 2}))
+
+    def test_published_config_digest(self):
+        self.assertIsNone(neutron_api_plugin_ovn.published_config_digest())
+        neutron_api_plugin_ovn.record_published_config('fake-digest')
+        self.assertEqual(neutron_api_plugin_ovn.published_config_digest(),
+                         'fake-digest')
+
+    def test_host_facts_fingerprint(self):
+        self.patch_object(neutron_api_plugin_ovn.os, 'stat')
+        self.stat.side_effect = [
+            mock.MagicMock(st_mtime_ns=42, st_size=1024), FileNotFoundError]
+        self.assertEqual(neutron_api_plugin_ovn.host_facts_fingerprint(),
+                         [['/var/lib/dpkg/status', 42, 1024], None])
+
+    def test_cached_host_fact(self):
+        self.patch_object(neutron_api_plugin_ovn, 'host_facts_fingerprint')
+        self.host_facts_fingerprint.return_value = ['fp1']
+        detect = mock.MagicMock(return_value='focal')
+        self.assertEqual(
+            neutron_api_plugin_ovn.cached_host_fact('series', detect),
+            'focal')
+        self.assertEqual(
+            neutron_api_plugin_ovn.cached_host_fact('series', detect),
+            'focal')
+        detect.assert_called_once_with()
+        self.assertEqual(
+            neutron_api_plugin_ovn.cached_host_fact('release', lambda: 'yoga'),
+            'yoga')
+        self.assertEqual(self.kv_data[neutron_api_plugin_ovn.HOST_FACTS_KEY], {
+            'fingerprint': ['fp1'], 'series': 'focal', 'release': 'yoga'})
+        self.host_facts_fingerprint.return_value = ['fp2']
+        detect.return_value = 'jammy'
+        self.assertEqual(
+            neutron_api_plugin_ovn.cached_host_fact('series', detect),
+            'jammy')
+        self.assertEqual(self.kv_data[neutron_api_plugin_ovn.HOST_FACTS_KEY], {
+            'fingerprint': ['fp2'], 'series': 'jammy'})
+
+    def test_select_release(self):
+        self.patch_object(neutron_api_plugin_ovn, 'host_facts_fingerprint',
+                          return_value=['fp'])
+        self.patch_object(neutron_api_plugin_ovn.os_utils, 'os_release',
+                          return_value='yoga')
+        self.assertEqual(neutron_api_plugin_ovn.select_release(), 'yoga')
+        self.assertEqual(neutron_api_plugin_ovn.select_release(), 'yoga')
+        self.os_release.assert_called_once_with('neutron-common')
+
+
 class Helper(test_utils.PatchHelper):
 
     def setUp(self):
@@ -115,6 +301,165 @@ class TestNeutronAPIPluginOvnCharm(Helper):
         ])
         self.assertDictEqual(c.states_to_check(), expect)
 
+    def test_geneve_vni_ranges_status(self):
+        self.patch_object(neutron_api_plugin_ovn.hookenv, 'leader_get')
+        self.leader_get.return_value = '1001:2000'
+        c = neutron_api_plugin_ovn.UssuriNeutronAPIPluginCharm()
+        c.options.geneve_vni_ranges = '1001:2000 3001:3500'
+        c.options.geneve_vni_ranges_threshold = 1000
+        c.options.geneve_vni_ranges_guard = 'warn'
+        self.assertEqual(c.geneve_vni_ranges_status(), (None, None))
+        self.leader_get.assert_called_once_with(
+            neutron_api_plugin_ovn.GENEVE_ALLOCATIONS_KEY)
+        c.options.geneve_vni_ranges = '1001:200000'
+        expect = ("'geneve-vni-ranges' changes 198000 of 199000 VNIs, above "
+                  "threshold 1000, run action 'sync-geneve-allocations'")
+        self.assertEqual(c.geneve_vni_ranges_status(), ('active', expect))
+        c.options.geneve_vni_ranges_guard = 'block'
+        self.assertEqual(c.geneve_vni_ranges_status(), ('blocked', expect))
+        c.options.geneve_vni_ranges_guard = 'blocked'
+        self.assertEqual(
+            c.geneve_vni_ranges_status(),
+            ('blocked', "invalid 'geneve-vni-ranges-guard': \"blocked\" is "
+                        "not one of warn, block"))
+        c.options.geneve_vni_ranges_guard = 'block'
+        self.leader_get.return_value = None
+        self.assertEqual(c.geneve_vni_ranges_status(), (None, None))
+        self.leader_get.return_value = '1001:2000'
+        c.options.geneve_vni_ranges_threshold = 0
+        self.assertEqual(c.geneve_vni_ranges_status(), (None, None))
+        c.options.geneve_vni_ranges = '1001'
+        self.assertEqual(
+            c.geneve_vni_ranges_status(),
+            ('blocked', "invalid 'geneve-vni-ranges': \"1001\" is not a "
+                        "<vni_min>:<vni_max> tuple"))
+
+    def test_record_geneve_vni_ranges(self):
+        self.patch_object(neutron_api_plugin_ovn.hookenv, 'is_leader')
+        self.patch_object(neutron_api_plugin_ovn.hookenv, 'leader_get')
+        self.patch_object(neutron_api_plugin_ovn.leadership, 'leader_set')
+        c = neutron_api_plugin_ovn.UssuriNeutronAPIPluginCharm()
+        c.options.geneve_vni_ranges = '3001:4000 1001:2000'
+        self.is_leader.return_value = False
+        c.record_geneve_vni_ranges()
+        self.assertFalse(self.leader_set.called)
+        self.is_leader.return_value = True
+        self.leader_get.return_value = '1001:2000,3001:4000'
+        c.record_geneve_vni_ranges()
+        self.assertFalse(self.leader_set.called)
+        self.leader_get.return_value = None
+        c.record_geneve_vni_ranges()
+        self.leader_set.assert_called_once_with({
+            neutron_api_plugin_ovn.GENEVE_ALLOCATIONS_KEY:
+                '1001:2000,3001:4000'})
+
+    def test_ovsdb_tunables(self):
+        self.patch_object(neutron_api_plugin_ovn.hookenv, 'leader_get',
+                          return_value=None)
+        c = neutron_api_plugin_ovn.UssuriNeutronAPIPluginCharm()
+        c.options.ovsdb_connection_timeout = 'auto'
+        c.options.ovsdb_probe_interval = 'auto'
+        c.options.ovsdb_retry_max_interval = 'auto'
+        c.options.ovsdb_log_level = 'auto'
+        self.assertEqual(c.ovsdb_tunables(3), [
+            ('ovsdb_connection_timeout', 180),
+            ('ovsdb_probe_interval', 60000),
+            ('ovsdb_retry_max_interval', 180),
+            ('ovsdb_log_level', 'INFO'),
+        ])
+        self.leader_get.assert_called_once_with(
+            neutron_api_plugin_ovn.SCALE_NB_ROWS_KEY)
+        self.assertEqual(c.ovsdb_tunables_errors(), [])
+        self.leader_get.return_value = '250000'
+        c.options.ovsdb_probe_interval = '0'
+        c.options.ovsdb_log_level = 'debug'
+        c.options.ovsdb_retry_max_interval = 'soon'
+        self.assertEqual(c.ovsdb_tunables(7), [
+            ('ovsdb_connection_timeout', 420),
+            ('ovsdb_probe_interval', 0),
+            ('ovsdb_retry_max_interval', 180),
+            ('ovsdb_log_level', 'DEBUG'),
+        ])
+        self.assertEqual(c.ovsdb_tunables_errors(), [
+            "invalid 'ovsdb-retry-max-interval': \"soon\" is not \"auto\" "
+            "or an integer"])
+
+    def test_custom_assess_status_check(self):
+        c = neutron_api_plugin_ovn.UssuriNeutronAPIPluginCharm()
+        self.patch_object(c, 'geneve_vni_ranges_status')
+        self.patch_object(c, 'ovsdb_tunables_errors', return_value=[])
+        self.patch_object(neutron_api_plugin_ovn.fan_in, 'status_note',
+                          name='fan_in_status_note',
+                          return_value='OVSDB connections NB 4, SB 4')
+        self.patch_object(neutron_api_plugin_ovn.sync_health, 'status_note',
+                          return_value=None)
+        self.geneve_vni_ranges_status.return_value = ('active', 'note')
+        self.assertEqual(c.custom_assess_status_check(), (None, None))
+        self.assertEqual(c.status_notes(),
+                         ['note', 'OVSDB connections NB 4, SB 4'])
+        self.fan_in_status_note.return_value = None
+        self.assertEqual(c.status_notes(), ['note'])
+        self.status_note.return_value = 'OVN sync backlog 0'
+        self.assertEqual(c.status_notes(), ['note', 'OVN sync backlog 0'])
+        self.status_note.return_value = None
+        self.ovsdb_tunables_errors.return_value = ['err1', 'err2']
+        self.assertEqual(c.custom_assess_status_check(),
+                         ('blocked', 'err1; err2'))
+        self.geneve_vni_ranges_status.return_value = ('blocked', 'msg')
+        self.assertEqual(c.custom_assess_status_check(), ('blocked', 'msg'))
+        self.assertEqual(c.status_notes(), [])
+
+    @mock.patch.object(
+        neutron_api_plugin_ovn.charms_openstack.charm.OpenStackCharm,
+        'assess_status')
+    def test_assess_status(self, assess_status):
+        self.patch_object(neutron_api_plugin_ovn.timings, 'schedule_flush')
+        c = neutron_api_plugin_ovn.UssuriNeutronAPIPluginCharm()
+        c.assess_status()
+        self.schedule_flush.assert_called_once_with()
+        assess_status.assert_called_once_with()
+
+    @mock.patch.object(
+        neutron_api_plugin_ovn.charms_openstack.charm.OpenStackCharm,
+        '_assess_status')
+    def test__assess_status_notes(self, _assess_status):
+        self.patch_object(neutron_api_plugin_ovn.hookenv, 'hook_name',
+                          return_value='config-changed')
+        self.patch_object(neutron_api_plugin_ovn.hookenv, 'status_get')
+        self.patch_object(neutron_api_plugin_ovn.hookenv, 'status_set')
+        c = neutron_api_plugin_ovn.UssuriNeutronAPIPluginCharm()
+        self.patch_object(c, 'status_notes', return_value=['a', 'b'])
+        self.status_get.return_value = ('blocked', 'Missing relations')
+        c._assess_status()
+        self.assertFalse(self.status_set.called)
+        self.status_get.return_value = ('active', 'Unit is ready')
+        c._assess_status()
+        self.status_set.assert_called_once_with('active',
+                                                'Unit is ready; a; b')
+
+    @mock.patch.object(
+        neutron_api_plugin_ovn.charms_openstack.charm.OpenStackCharm,
+        '_assess_status')
+    def test__assess_status(self, _assess_status):
+        self.patch_object(neutron_api_plugin_ovn.hookenv, 'hook_name')
+        self.patch_object(neutron_api_plugin_ovn.reactive, 'is_flag_set')
+        self.patch_object(neutron_api_plugin_ovn.update_status,
+                          'record_snapshot')
+        self.hook_name.return_value = 'config-changed'
+        self.is_flag_set.return_value = False
+        c = neutron_api_plugin_ovn.UssuriNeutronAPIPluginCharm()
+        self.patch_object(c, 'status_notes', return_value=[])
+        c._assess_status()
+        _assess_status.assert_called_once_with()
+        self.assertFalse(self.record_snapshot.called)
+        self.hook_name.return_value = 'update-status'
+        self.is_flag_set.return_value = True
+        c._assess_status()
+        self.assertFalse(self.record_snapshot.called)
+        self.is_flag_set.return_value = False
+        c._assess_status()
+        self.record_snapshot.assert_called_once_with()
+
     def test_service_plugins(self):
         c = neutron_api_plugin_ovn.UssuriNeutronAPIPluginCharm()
         svc_plugins = (
@@ -143,6 +488,8 @@ class TestNeutronAPIPluginOvnCharm(Helper):
         network_types = 'gre,vlan,flat,local'
         expect = ['geneve', 'gre', 'vlan', 'flat', 'local']
         self.assertEqual(c.tenant_network_types(network_types), expect)
+        self.assertIs(c.tenant_network_types(network_types),
+                      c.tenant_network_types(network_types))
 
     @mock.patch.object(
         neutron_api_plugin_ovn.charms_openstack.charm.OpenStackCharm,
@@ -274,14 +621,105 @@ class TestNeutronAPIPluginOvnCharm(Helper):
             new_callable=ovn_source_mock
         )
         self.patch_object(charm_class, '_upgrade_packages')
+        self.patch_object(charm_class, 'packages_cached')
         self.patch_object(neutron_api_plugin_ovn.ch_fetch, 'add_source')
-        neutron_principal_mock = mock.MagicMock()
-        self.patch_object(neutron_api_plugin_ovn.reactive,
-                          'endpoint_from_flag',
-                          return_value=neutron_principal_mock)
+        self.patch_object(neutron_api_plugin_ovn, 'request_restart')
+        self.patch_object(neutron_api_plugin_ovn.unitdata, 'kv',
+                          name='unitdata_kv')
+        kv = self.unitdata_kv.return_value
+        kv.get.return_value = None
         c = neutron_api_plugin_ovn.UssuriNeutronAPIPluginCharm()
         c.upgrade_ovn()
 
         self.add_source.assert_called_once_with(ovn_source_data)
         self._upgrade_packages.assert_called_once_with()
-        neutron_principal_mock.request_restart.assert_called_once_with()
+        self.request_restart.assert_called_once_with(
+            'ovn-source focal-ovn-22.03')
+        self.assertFalse(self.packages_cached.called)
+        kv.unset.assert_called_once_with(
+            neutron_api_plugin_ovn.STAGED_OVN_SOURCE_KEY)
+
+        # staged packages are installed without updating the indexes
+        self._upgrade_packages.reset_mock()
+        kv.get.return_value = ovn_source_data
+        self.packages_cached.return_value = True
+        c.upgrade_ovn()
+        self._upgrade_packages.assert_called_once_with(update=False)
+
+        # unless the cache is missing packages
+        self._upgrade_packages.reset_mock()
+        self.packages_cached.return_value = False
+        c.upgrade_ovn()
+        self._upgrade_packages.assert_called_once_with()
+
+    def test_stage_ovn_packages(self):
+        charm_class = neutron_api_plugin_ovn.UssuriNeutronAPIPluginCharm
+        self.patch_object(charm_class, 'ovn_source',
+                          new_callable=mock.PropertyMock(return_value=''))
+        self.patch_object(charm_class, '_upgrade_packages')
+        self.patch_object(neutron_api_plugin_ovn.ch_fetch, 'add_source')
+        self.patch_object(neutron_api_plugin_ovn.unitdata, 'kv',
+                          name='unitdata_kv')
+        self.patch_object(neutron_api_plugin_ovn.os, 'scandir')
+
+        def entry(name, size):
+            e = mock.MagicMock()
+            e.name = name
+            e.stat.return_value.st_size = size
+            return e
+
+        self.scandir.return_value.__enter__.side_effect = [
+            [entry('lock', 0), entry('a.deb', 10)],
+            [entry('lock', 0), entry('a.deb', 10), entry('b.deb', 20),
+             entry('c.deb', 30)],
+        ]
+        c = neutron_api_plugin_ovn.UssuriNeutronAPIPluginCharm()
+        with self.assertRaises(ValueError):
+            c.stage_ovn_packages()
+        self.assertEqual(c.stage_ovn_packages('cloud:focal-ovn-22.03'), {
+            'source': 'cloud:focal-ovn-22.03',
+            'packages': 2,
+            'bytes': 50,
+        })
+        self.add_source.assert_called_once_with('cloud:focal-ovn-22.03')
+        self._upgrade_packages.assert_called_once_with(download_only=True)
+        self.unitdata_kv.return_value.set.assert_called_once_with(
+            neutron_api_plugin_ovn.STAGED_OVN_SOURCE_KEY,
+            'cloud:focal-ovn-22.03')
+
+    def test_upgrade_packages(self):
+        charm_class = neutron_api_plugin_ovn.UssuriNeutronAPIPluginCharm
+        self.patch_object(charm_class, 'remove_obsolete_packages')
+        self.patch_object(neutron_api_plugin_ovn.ch_fetch, 'apt_update')
+        self.patch_object(neutron_api_plugin_ovn.ch_fetch, 'apt_upgrade')
+        self.patch_object(neutron_api_plugin_ovn.ch_fetch, 'apt_install')
+        c = neutron_api_plugin_ovn.UssuriNeutronAPIPluginCharm()
+        c._upgrade_packages(download_only=True)
+        self.apt_update.assert_called_once_with()
+        self.apt_upgrade.assert_called_once_with(
+            options=neutron_api_plugin_ovn.DPKG_OPTIONS + ['--download-only'],
+            fatal=True, dist=True)
+        self.assertFalse(self.remove_obsolete_packages.called)
+        self.apt_update.reset_mock()
+        c._upgrade_packages(update=False)
+        self.assertFalse(self.apt_update.called)
+        self.apt_upgrade.assert_called_with(
+            options=neutron_api_plugin_ovn.DPKG_OPTIONS, fatal=True,
+            dist=True)
+        self.remove_obsolete_packages.assert_called_once_with()
+
+    def test_packages_cached(self):
+        self.patch_object(neutron_api_plugin_ovn.subprocess, 'check_output')
+        c = neutron_api_plugin_ovn.UssuriNeutronAPIPluginCharm()
+        self.check_output.return_value = ''
+        self.assertTrue(c.packages_cached())
+        self.check_output.assert_called_once_with(
+            ['apt-get', '-qq', '--print-uris', 'dist-upgrade'],
+            universal_newlines=True)
+        self.check_output.return_value = (
+            "'http://archive/ovn-common.deb' ovn-common.deb 1024 SHA256:x\n")
+        self.assertFalse(c.packages_cached())
+        self.patch_object(neutron_api_plugin_ovn.hookenv, 'log')
+        self.check_output.side_effect = (
+            neutron_api_plugin_ovn.subprocess.CalledProcessError(100, 'apt'))
+        self.assertFalse(c.packages_cached())
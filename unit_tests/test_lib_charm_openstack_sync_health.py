@@ -0,0 +1,97 @@
+# Copyright 2026 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import subprocess
+import tempfile
+import unittest.mock as mock
+
+import charms_openstack.test_utils as test_utils
+
+import charm.openstack.sync_health as sync_health
+
+RESULT = {
+    'backlog': {'ports': 3, 'networks': 1},
+    'pending-deletes': {'ports': 1},
+    'oldest-lagging': '2026-10-19 10:00:00',
+    'hash-ring': {
+        'node-0': {'nodes': 4, 'alive': 4, 'last-seen': '2026-10-19'},
+        'node-1': {'nodes': 4, 'alive': 0, 'last-seen': '2026-10-18'},
+    },
+}
+
+
+class TestSyncHealth(test_utils.PatchHelper):
+
+    def setUp(self):
+        super().setUp()
+        self.kv = mock.MagicMock()
+        self.kv_data = {}
+        self.kv.get.side_effect = lambda k, d=None: self.kv_data.get(k, d)
+        self.kv.set.side_effect = self.kv_data.__setitem__
+        self.kv.unset.side_effect = lambda k: self.kv_data.pop(k, None)
+        self.patch_object(sync_health.unitdata, 'kv', name='unitdata_kv',
+                          return_value=self.kv)
+        self.patch_object(sync_health.hookenv, 'config',
+                          return_value=True)
+        self.patch_object(sync_health.hookenv, 'is_leader',
+                          return_value=True)
+        self.patch_object(sync_health.hookenv, 'log')
+
+    def test_neutron_db_connection(self):
+        with tempfile.NamedTemporaryFile(mode='w') as conf:
+            conf.write('[DEFAULT]\n'
+                       'core_plugin = ml2\n'
+                       '[database]\n'
+                       'connection = mysql+pymysql://neutron:%p@db/neutron\n')
+            conf.flush()
+            self.patch_object(sync_health, 'NEUTRON_CONF', new=conf.name)
+            self.assertEqual(sync_health.neutron_db_connection(),
+                             'mysql+pymysql://neutron:%p@db/neutron')
+        self.patch_object(sync_health, 'NEUTRON_CONF', new='/nonexistent')
+        with self.assertRaises(sync_health.configparser.Error):
+            sync_health.neutron_db_connection()
+
+    def test_summarize(self):
+        self.assertEqual(sync_health.summarize(RESULT), {
+            'backlog': 5,
+            'hosts': 2,
+            'alive-hosts': 1,
+        })
+
+    def test_refresh(self):
+        self.patch_object(sync_health, 'query', return_value=RESULT)
+        sync_health.refresh()
+        self.assertEqual(self.kv_data[sync_health.SYNC_HEALTH_KEY],
+                         {'backlog': 5, 'hosts': 2, 'alive-hosts': 1})
+        self.assertEqual(sync_health.status_note(),
+                         'OVN sync backlog 5, hash ring 1/2 hosts alive')
+
+        self.query.side_effect = subprocess.TimeoutExpired('cmd', 60)
+        sync_health.refresh()
+        self.assertEqual(self.kv_data[sync_health.SYNC_HEALTH_KEY],
+                         {'error': True})
+        self.assertEqual(sync_health.status_note(), 'OVN sync health unknown')
+
+        self.is_leader.return_value = False
+        self.query.reset_mock()
+        sync_health.refresh()
+        self.assertFalse(self.query.called)
+        self.assertNotIn(sync_health.SYNC_HEALTH_KEY, self.kv_data)
+        self.assertIsNone(sync_health.status_note())
+
+    def test_status_note_disabled(self):
+        self.kv_data[sync_health.SYNC_HEALTH_KEY] = {
+            'backlog': 0, 'hosts': 1, 'alive-hosts': 1}
+        self.config.return_value = False
+        self.assertIsNone(sync_health.status_note())
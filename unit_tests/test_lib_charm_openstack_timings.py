@@ -0,0 +1,151 @@
+# Copyright 2026 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import tempfile
+import unittest.mock as mock
+
+import charms_openstack.test_utils as test_utils
+
+import charm.openstack.timings as timings
+
+
+class TestTimings(test_utils.PatchHelper):
+
+    def setUp(self):
+        super().setUp()
+        timings._samples.clear()
+        timings._flush_scheduled = False
+        self.kv = mock.MagicMock()
+        self.kv_data = {}
+        self.kv.get.side_effect = lambda k, d=None: self.kv_data.get(k, d)
+        self.kv.set.side_effect = self.kv_data.__setitem__
+        self.patch_object(timings.unitdata, 'kv', name='unitdata_kv',
+                          return_value=self.kv)
+        self.patch_object(timings.hookenv, 'atexit')
+        self.patch_object(timings.hookenv, 'hook_name',
+                          return_value='config-changed')
+        self.patch_object(timings.hookenv, 'config', return_value={})
+
+    def test_timed(self):
+        def fake_handler(arg, kwarg=None):
+            return (arg, kwarg)
+
+        wrapped = timings.timed(fake_handler)
+        self.assertEqual(wrapped('a', kwarg='b'), ('a', 'b'))
+        self.assertEqual(wrapped.__name__, 'fake_handler')
+        self.assertEqual(
+            wrapped._action_id,
+            '{}:{}:fake_handler'.format(
+                fake_handler.__code__.co_filename,
+                fake_handler.__code__.co_firstlineno))
+        self.assertEqual(
+            wrapped._short_action_id,
+            '{}:{}:fake_handler'.format(
+                os.path.relpath(fake_handler.__code__.co_filename),
+                fake_handler.__code__.co_firstlineno))
+        self.atexit.assert_called_once_with(timings.flush)
+        wrapped('a')
+        self.atexit.assert_called_once_with(timings.flush)
+        self.assertEqual(list(timings._samples.keys()),
+                         ['TestTimings.test_timed.<locals>.fake_handler'])
+
+    def test_schedule_flush(self):
+        timings.schedule_flush()
+        timings.schedule_flush()
+        self.atexit.assert_called_once_with(timings.flush)
+        timings.flush()
+        timings.schedule_flush()
+        self.assertEqual(self.atexit.call_count, 2)
+
+    def test_timed_exception(self):
+        def fake_handler():
+            raise ValueError
+
+        wrapped = timings.timed(fake_handler)
+        with self.assertRaises(ValueError):
+            wrapped()
+        self.assertEqual(len(timings._samples), 1)
+
+    def test_flush(self):
+        self.kv_data[timings.TIMINGS_KEY] = {
+            'config-changed': {
+                'configure_neutron': [0.1] * timings.HISTORY_LENGTH,
+            },
+        }
+        timings._samples['configure_neutron'] = 0.5
+        timings._samples['assess_status'] = 0.2
+        timings.flush()
+        history = self.kv_data[timings.TIMINGS_KEY]['config-changed']
+        self.assertEqual(len(history['configure_neutron']),
+                         timings.HISTORY_LENGTH)
+        self.assertEqual(history['configure_neutron'][-1], 0.5)
+        self.assertEqual(history['assess_status'], [0.2])
+        self.assertFalse(timings._samples)
+
+    def test_flush_prometheus(self):
+        self.config.return_value = {
+            'prometheus-textfile-directory': '/some/dir'}
+        self.patch_object(timings, 'write_prometheus_textfile')
+        timings._samples['configure_neutron'] = 0.5
+        timings.flush()
+        self.write_prometheus_textfile.assert_called_once_with(
+            '/some/dir', self.kv_data[timings.TIMINGS_KEY])
+
+    def test_percentile(self):
+        samples = [float(n) for n in range(1, 101)]
+        self.assertEqual(timings.percentile(samples, 50), 50.0)
+        self.assertEqual(timings.percentile(samples, 99), 99.0)
+        self.assertEqual(timings.percentile([3.0], 90), 3.0)
+        self.assertIsNone(timings.percentile([], 50))
+
+    def test_report(self):
+        self.kv_data[timings.TIMINGS_KEY] = {
+            'update-status': {
+                'assess_status': [0.3, 0.1, 0.2],
+            },
+        }
+        self.assertDictEqual(timings.report(), {
+            'update-status': {
+                'assess_status': {
+                    'count': 3,
+                    'sum': 0.6,
+                    'max': 0.3,
+                    'p50': 0.2,
+                    'p90': 0.3,
+                    'p99': 0.3,
+                },
+            },
+        })
+
+    def test_write_prometheus_textfile(self):
+        self.patch_object(timings.hookenv, 'local_unit',
+                          return_value='neutron-api-plugin-ovn/0')
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        timings.write_prometheus_textfile(
+            tmpdir, {'update-status': {'assess_status': [0.5]}})
+        self.assertEqual(os.listdir(tmpdir), [timings.PROMETHEUS_TEXTFILE])
+        with open(os.path.join(tmpdir, timings.PROMETHEUS_TEXTFILE)) as fin:
+            lines = fin.read().splitlines()
+        labels = ('unit="neutron-api-plugin-ovn/0",hook="update-status",'
+                  'handler="assess_status"')
+        self.assertIn(
+            '{}{{{},quantile="0.5"}} 0.5'.format(
+                timings.PROMETHEUS_METRIC, labels),
+            lines)
+        self.assertIn(
+            '{}_count{{{}}} 1'.format(timings.PROMETHEUS_METRIC, labels),
+            lines)
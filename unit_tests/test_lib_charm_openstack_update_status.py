@@ -0,0 +1,106 @@
+# Copyright 2026 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest.mock as mock
+
+import charms_openstack.test_utils as test_utils
+
+import charm.openstack.update_status as update_status
+
+
+class TestUpdateStatus(test_utils.PatchHelper):
+
+    def setUp(self):
+        super().setUp()
+        self.kv = mock.MagicMock()
+        self.kv_data = {}
+        self.kv.get.side_effect = lambda k, d=None: self.kv_data.get(k, d)
+        self.kv.set.side_effect = self.kv_data.__setitem__
+        self.kv.unset.side_effect = lambda k: self.kv_data.pop(k, None)
+        self.patch_object(update_status.unitdata, 'kv', name='unitdata_kv',
+                          return_value=self.kv)
+        self.patch_object(update_status.hookenv, 'relation_ids')
+        self.relation_ids.side_effect = lambda x: {
+            'neutron-plugin': ['neutron-plugin:1'],
+            'ovsdb-cms': ['ovsdb-cms:2'],
+        }.get(x, [])
+        self.patch_object(update_status.hookenv, 'related_units')
+        self.related_units.side_effect = lambda x: {
+            'neutron-plugin:1': ['neutron-api/0'],
+            'ovsdb-cms:2': ['ovn-central/0', 'ovn-central/1'],
+        }[x]
+        self.relation_data = {
+            ('neutron-plugin:1', 'neutron-api/0'): {'a': 'b'},
+            ('ovsdb-cms:2', 'ovn-central/0'): {'bound-address': '"10.0.0.1"'},
+            ('ovsdb-cms:2', 'ovn-central/1'): {'bound-address': '"10.0.0.2"'},
+        }
+        self.patch_object(update_status.hookenv, 'relation_get')
+        self.relation_get.side_effect = (
+            lambda rid=None, unit=None: self.relation_data[(rid, unit)])
+        self.patch_object(update_status.hookenv, 'config',
+                          return_value={'ovn-source': 'distro'})
+        self.patch_object(update_status.hookenv, 'is_leader',
+                          return_value=True)
+        self.patch_object(update_status.hookenv, 'leader_get',
+                          return_value={'install_stamp': '2203'})
+        self.patch_object(update_status.hookenv, 'status_get',
+                          return_value=('active', 'Unit is ready'))
+        self.patch_object(update_status.hookenv, 'status_set')
+        self.patch_object(update_status.time, 'time', return_value=1000.0)
+
+    def test_inputs_digest(self):
+        digest = update_status.inputs_digest()
+        self.assertEqual(digest, update_status.inputs_digest())
+        self.relation_data[('ovsdb-cms:2', 'ovn-central/1')] = {
+            'bound-address': '"10.0.0.3"'}
+        self.assertNotEqual(digest, update_status.inputs_digest())
+        digest = update_status.inputs_digest()
+        self.is_leader.return_value = False
+        self.assertNotEqual(digest, update_status.inputs_digest())
+        digest = update_status.inputs_digest()
+        self.kv_data[update_status.fan_in.FAN_IN_KEY] = {'nb': 4, 'sb': 4}
+        self.assertNotEqual(digest, update_status.inputs_digest())
+
+    def test_record_snapshot(self):
+        update_status.record_snapshot()
+        self.assertDictEqual(self.kv_data[update_status.SNAPSHOT_KEY], {
+            'digest': update_status.inputs_digest(),
+            'status': 'active',
+            'message': 'Unit is ready',
+            'timestamp': 1000.0,
+        })
+        update_status.invalidate_snapshot()
+        self.assertNotIn(update_status.SNAPSHOT_KEY, self.kv_data)
+
+    def test_fast_path(self):
+        self.assertFalse(update_status.fast_path())
+        update_status.record_snapshot()
+        self.assertTrue(update_status.fast_path())
+        self.status_set.assert_called_once_with('active', 'Unit is ready')
+        self.status_set.reset_mock()
+        # changed input
+        self.config.return_value = {'ovn-source': ''}
+        self.assertFalse(update_status.fast_path())
+        self.assertFalse(self.status_set.called)
+        # expired snapshot
+        self.config.return_value = {'ovn-source': 'distro'}
+        self.time.return_value = 1001.0 + update_status.SNAPSHOT_MAX_AGE
+        self.assertFalse(update_status.fast_path())
+        self.assertFalse(self.status_set.called)
+
+    def test_finish(self):
+        self.patch_object(update_status.timings, 'flush')
+        update_status.finish()
+        self.flush.assert_called_once_with()
+        self.kv.flush.assert_called_once_with()
@@ -0,0 +1,96 @@
+# Copyright 2026 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest.mock as mock
+
+import charms_openstack.test_utils as test_utils
+
+import charm.ovn_tools.dhcp as dhcp
+
+ROWS = [
+    {'_uuid': 'u1', 'cidr': '10.0.0.0/24',
+     'options': {'ntp_server': '10.0.0.1', 'wpad': 'w'},
+     'external_ids': {'subnet_id': 's1'}},
+    {'_uuid': 'u2', 'cidr': '10.0.1.0/24',
+     'options': {'ntp_server': '10.0.0.2'},
+     'external_ids': {'subnet_id': 's2'}},
+    {'_uuid': 'u3', 'cidr': '10.0.1.0/24',
+     'options': {'ntp_server': '10.0.0.1'},
+     'external_ids': {'subnet_id': 's2', 'port_id': 'p1'}},
+    {'_uuid': 'u4', 'cidr': 'fd00::/64',
+     'options': {'ntp_server': 'fd00::1'},
+     'external_ids': {'subnet_id': 's3'}},
+    {'_uuid': 'u5', 'cidr': '10.0.2.0/24',
+     'options': {},
+     'external_ids': {}},
+]
+
+
+class TestDHCP(test_utils.PatchHelper):
+
+    def test_parse_global_options(self):
+        self.assertEqual(dhcp.parse_global_options(None), {})
+        self.assertEqual(
+            dhcp.parse_global_options('ntp_server:10.0.0.1,wpad: dns:fd00::1'),
+            {'ntp_server': '10.0.0.1', 'wpad': '', 'dns': 'fd00::1'})
+        for value in ('ntp_server', ':1'):
+            with self.assertRaises(ValueError):
+                dhcp.parse_global_options(value)
+
+    def test_options_delta(self):
+        self.assertEqual(
+            dhcp.options_delta({'a': '3', 'd': ''}),
+            ({'a': '3'}, ['d']))
+
+    def test_dropped_options(self):
+        # a dropped override is left on the subnets, not unset
+        old = {'a': '1', 'b': '2', 'c': ''}
+        new = {'a': '3', 'd': ''}
+        self.assertEqual(dhcp.dropped_options(old, new), ['b'])
+        self.assertNotIn('b', dhcp.options_delta(new)[1])
+
+    def test_row_mutations(self):
+        mutations, skipped = dhcp.row_mutations(ROWS, {
+            4: ({'ntp_server': '10.0.0.1'}, ['wpad']),
+            6: ({}, ['wpad']),
+        })
+        self.assertEqual(skipped, 1)
+        self.assertEqual(mutations, [
+            ('u1', [['options', 'delete', ['set', ['wpad']]]]),
+            ('u2', [['options', 'delete', ['set', ['ntp_server']]],
+                    ['options', 'insert',
+                     ['map', [['ntp_server', '10.0.0.1']]]]]),
+        ])
+
+    def test_apply(self):
+        client = mock.MagicMock()
+        client.select.return_value = ROWS
+        deltas = {4: ({'ntp_server': '10.0.0.9'}, [])}
+        self.assertEqual(dhcp.apply(client, deltas), {
+            'rows': 5,
+            'changed': 2,
+            'skipped-port-rows': 1,
+            'transactions': 0,
+        })
+        client.select.assert_called_once_with(
+            dhcp.NB_DB, dhcp.TABLE,
+            ['_uuid', 'cidr', 'options', 'external_ids'])
+        self.assertFalse(client.transact.called)
+        self.assertEqual(
+            dhcp.apply(client, deltas, batch_size=1, dry_run=False)[
+                'transactions'], 2)
+        self.assertEqual(client.transact.call_count, 2)
+        operation = client.transact.call_args_list[1][0][1]
+        self.assertEqual(operation['op'], 'mutate')
+        self.assertEqual(operation['where'], [['_uuid', '==', ['uuid', 'u2']]])
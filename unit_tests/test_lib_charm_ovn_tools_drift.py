@@ -0,0 +1,160 @@
+# Copyright 2026 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import subprocess
+import unittest.mock as mock
+
+import charms_openstack.test_utils as test_utils
+
+import charm.ovn_tools.drift as drift
+
+NB_ROWS = {
+    'Logical_Switch': [
+        {'name': 'neutron-n2', 'external_ids': {drift.REVISION_KEY: '3'}},
+        {'name': 'neutron-n1', 'external_ids': {drift.REVISION_KEY: '1'}},
+        {'name': 'other', 'external_ids': {}},
+    ],
+    'Logical_Switch_Port': [
+        {'name': 'p1', 'external_ids': {drift.REVISION_KEY: '2'}},
+        {'name': 'provnet-n1', 'external_ids': {}},
+    ],
+    'Logical_Router': [],
+    'Port_Group': [
+        {'name': 'pg_s_1'},
+        {'name': 'neutron_pg_drop'},
+    ],
+    'Address_Set': [
+        {'name': 'as_ip6_s_1', 'addresses': 'fd00::1'},
+        {'name': 'as_ip4_s_1', 'addresses': ['10.0.0.2', '10.0.0.1']},
+    ],
+}
+
+
+class FakeClient(object):
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def select(self, db, table, columns=None, where=None):
+        assert db == drift.NB_DB
+        return self.rows[table]
+
+
+class TestDrift(test_utils.PatchHelper):
+
+    def test_keyed_merge(self):
+        self.assertEqual(
+            list(drift.keyed_merge([('a', 1), ('b', 2), ('d', 4)],
+                                   [('b', 2), ('c', 3), ('d', 5), ('e', 6)])),
+            [('a', 1, drift.MISSING_VALUE),
+             ('b', 2, 2),
+             ('c', drift.MISSING_VALUE, 3),
+             ('d', 4, 5),
+             ('e', drift.MISSING_VALUE, 6)])
+        self.assertEqual(list(drift.keyed_merge([], [])), [])
+        # values may be None
+        self.assertEqual(list(drift.keyed_merge([('a', None)], [])),
+                         [('a', None, drift.MISSING_VALUE)])
+
+    def test_compare(self):
+        result = drift.compare(
+            iter([('a', 1), ('b', 2), ('c', 3), ('e', [])]),
+            [('b', 2), ('c', 4), ('d', 1), ('e', ['10.0.0.1'])],
+            samples=1)
+        self.assertEqual(result, {
+            'neutron': 4,
+            'nb': 4,
+            drift.MISSING: 1,
+            drift.EXTRA: 1,
+            drift.MISMATCHED: 2,
+            'samples': {
+                drift.MISSING: ['a'],
+                drift.EXTRA: ['d'],
+                drift.MISMATCHED: ['c'],
+            },
+        })
+
+    def test_nb_records(self):
+        client = FakeClient(NB_ROWS)
+        self.assertEqual(drift.nb_records(client, 'networks'),
+                         [('n1', 1), ('n2', 3)])
+        self.assertEqual(drift.nb_records(client, 'ports'), [('p1', 2)])
+        self.assertEqual(drift.nb_records(client, 'routers'), [])
+        self.assertEqual(drift.nb_records(client, 'security_groups'),
+                         [('s-1', None)])
+        self.assertEqual(drift.nb_records(client, 'address_sets'), [
+            (('s-1', 'ip4'), ['10.0.0.1', '10.0.0.2']),
+            (('s-1', 'ip6'), ['fd00::1']),
+        ])
+        with self.assertRaises(ValueError):
+            drift.nb_records(client, 'subnets')
+        client = FakeClient({'Address_Set': []})
+        self.assertIsNone(drift.nb_records(client, 'address_sets'))
+
+    def test_neutron_records(self):
+        self.patch_object(drift.subprocess, 'Popen')
+        proc = self.Popen.return_value.__enter__.return_value
+        proc.stdout = io.StringIO('["n1", 5]\n[["s1", "ip4"], []]\n')
+        proc.stderr = io.StringIO('fake-error')
+        proc.returncode = 0
+        self.assertEqual(
+            list(drift.neutron_records('/path/to/util', 'fake-conn',
+                                       'networks')),
+            [('n1', 5), (('s1', 'ip4'), [])])
+        self.Popen.assert_called_once_with(
+            ('/path/to/util', 'fake-conn', 'dump', 'networks'),
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            universal_newlines=True, env={'PATH': '/usr/bin'})
+        proc.stdout = io.StringIO('')
+        proc.returncode = 1
+        with self.assertRaises(subprocess.CalledProcessError):
+            list(drift.neutron_records('/path/to/util', 'fake-conn',
+                                       'networks'))
+
+    def test_detect(self):
+        neutron = {
+            'networks': [('n1', 1), ('n2', 2)],
+            'ports': [('p1', 2), ('p2', 1)],
+            'routers': [],
+            'security_groups': [('s-1', None)],
+            'address_sets': [],
+        }
+        neutron_source = mock.MagicMock(side_effect=lambda r: neutron[r])
+        result = drift.detect(drift.RESOURCES, neutron_source,
+                              lambda: FakeClient(NB_ROWS), samples=5)
+        self.assertEqual(result['total-drift'], 4)
+        self.assertEqual(result['networks'][drift.MISMATCHED], 1)
+        self.assertEqual(result['ports'][drift.MISSING], 1)
+        self.assertEqual(result['routers']['neutron'], 0)
+        self.assertEqual(result['security_groups'][drift.EXTRA], 0)
+        self.assertEqual(result['address_sets'][drift.EXTRA], 2)
+        self.assertEqual(result['address_sets']['samples'][drift.EXTRA],
+                         ['s-1-ip4', 's-1-ip6'])
+        self.assertIn('seconds', result['networks'])
+
+        result = drift.detect(['address_sets'], neutron_source,
+                              lambda: FakeClient({'Address_Set': []}))
+        self.assertEqual(result, {
+            'address_sets': {'skipped': 'not used by the Northbound DB'},
+            'total-drift': 0,
+        })
+        with self.assertRaises(ValueError):
+            drift.detect(['subnets'], neutron_source, None)
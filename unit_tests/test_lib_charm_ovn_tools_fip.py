@@ -0,0 +1,122 @@
+# Copyright 2026 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest.mock as mock
+
+import charms_openstack.test_utils as test_utils
+
+import charm.ovn_tools.fip as fip
+
+ROWS = [
+    # distributed, port up
+    {'_uuid': 'u1', 'type': 'dnat_and_snat', 'logical_port': 'p1',
+     'external_mac': 'fa:16:3e:00:00:01',
+     'external_ids': {fip.FIP_ID_KEY: 'f1', fip.FIP_PORT_KEY: 'p1',
+                      fip.FIP_MAC_KEY: 'fa:16:3e:00:00:01'}},
+    # port down, stale MAC
+    {'_uuid': 'u2', 'type': 'dnat_and_snat', 'logical_port': 'p2',
+     'external_mac': 'fa:16:3e:00:00:02',
+     'external_ids': {fip.FIP_ID_KEY: 'f2', fip.FIP_PORT_KEY: 'p2'}},
+    # centralized, floating IP missing in Neutron
+    {'_uuid': 'u3', 'type': 'dnat_and_snat', 'logical_port': 'p3',
+     'external_mac': [],
+     'external_ids': {fip.FIP_ID_KEY: 'f3', fip.FIP_PORT_KEY: 'p3'}},
+    # router SNAT
+    {'_uuid': 'u4', 'type': 'snat', 'logical_port': [],
+     'external_mac': [],
+     'external_ids': {'neutron:router_name': 'r1'}},
+]
+MACS = {'f1': 'fa:16:3e:00:00:01', 'f2': 'fa:16:3e:00:00:02'}
+
+
+class TestFIP(test_utils.PatchHelper):
+
+    def test_row_changes_distributed(self):
+        changes, rows, unknown = fip.row_changes(ROWS, True, MACS, {'p1'})
+        self.assertEqual((rows, unknown), (3, 1))
+        where = [['_uuid', '==', ['uuid', 'u2']]]
+        self.assertEqual(changes, [
+            ('u2', [
+                {'op': 'update', 'table': fip.TABLE, 'where': where,
+                 'row': {'logical_port': ['set', ['p2']],
+                         'external_mac': ['set', []]}},
+                {'op': 'mutate', 'table': fip.TABLE, 'where': where,
+                 'mutations': [
+                     ['external_ids', 'delete',
+                      ['set', [fip.FIP_MAC_KEY]]],
+                     ['external_ids', 'insert',
+                      ['map', [[fip.FIP_MAC_KEY, 'fa:16:3e:00:00:02']]]],
+                 ]},
+            ]),
+        ])
+
+    def test_row_changes_centralized(self):
+        changes, rows, unknown = fip.row_changes(ROWS, False, {}, set())
+        self.assertEqual((rows, unknown), (3, 0))
+        # the logical port is kept, only the external MAC is cleared
+        self.assertEqual(changes, [
+            ('u1', [
+                {'op': 'update', 'table': fip.TABLE,
+                 'where': [['_uuid', '==', ['uuid', 'u1']]],
+                 'row': {'logical_port': ['set', ['p1']],
+                         'external_mac': ['set', []]}},
+            ]),
+            ('u2', [
+                {'op': 'update', 'table': fip.TABLE,
+                 'where': [['_uuid', '==', ['uuid', 'u2']]],
+                 'row': {'logical_port': ['set', ['p2']],
+                         'external_mac': ['set', []]}},
+            ]),
+        ])
+
+    def test_up_ports(self):
+        client = mock.MagicMock()
+        client.select.return_value = [
+            {'name': 'p1', 'up': True},
+            {'name': 'p2', 'up': False},
+            {'name': 'p3', 'up': []},
+        ]
+        self.assertEqual(fip.up_ports(client), {'p1'})
+        client.select.assert_called_once_with(
+            fip.NB_DB, 'Logical_Switch_Port', ['name', 'up'])
+
+    def test_apply(self):
+        client = mock.MagicMock()
+        client.select.return_value = ROWS
+        self.assertEqual(fip.apply(client, False, {}), {
+            'rows': 3,
+            'changed': 2,
+            'unknown-floating-ips': 0,
+            'transactions': 0,
+        })
+        client.select.assert_called_once_with(
+            fip.NB_DB, fip.TABLE,
+            ['_uuid', 'type', 'logical_port', 'external_mac', 'external_ids'])
+        self.assertFalse(client.transact.called)
+
+        self.patch_object(fip, 'up_ports', return_value=set())
+        self.assertEqual(
+            fip.apply(client, True, MACS, batch_size=1, dry_run=False), {
+                'rows': 3,
+                'changed': 2,
+                'unknown-floating-ips': 1,
+                'transactions': 2,
+            })
+        self.up_ports.assert_called_once_with(client)
+        self.assertEqual(client.transact.call_count, 2)
+        operations = client.transact.call_args_list[1][0][1:]
+        self.assertEqual([op['op'] for op in operations],
+                         ['update', 'mutate'])
+        self.assertEqual(operations[0]['where'],
+                         [['_uuid', '==', ['uuid', 'u2']]])
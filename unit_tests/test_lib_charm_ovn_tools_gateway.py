@@ -0,0 +1,131 @@
+# Copyright 2026 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest.mock as mock
+
+import charms_openstack.test_utils as test_utils
+
+import charm.ovn_tools.gateway as gateway
+
+TABLES = {
+    'Logical_Router_Port': [
+        {'name': 'lrp-2', 'gateway_chassis': ['g3', 'g4']},
+        {'name': 'lrp-1', 'gateway_chassis': ['g1', 'g2']},
+        {'name': 'lrp-3', 'gateway_chassis': 'g5'},
+        {'name': 'lrp-4', 'gateway_chassis': []},
+    ],
+    'Gateway_Chassis': [
+        {'_uuid': 'g1', 'chassis_name': 'c1', 'priority': 2},
+        {'_uuid': 'g2', 'chassis_name': 'c2', 'priority': 1},
+        {'_uuid': 'g3', 'chassis_name': 'c2', 'priority': 1},
+        {'_uuid': 'g4', 'chassis_name': 'c1', 'priority': 2},
+        {'_uuid': 'g5', 'chassis_name': 'c1', 'priority': 1},
+    ],
+    'HA_Chassis_Group': [
+        {'name': 'hg', 'ha_chassis': ['h1', 'h2']},
+    ],
+    'HA_Chassis': [
+        {'_uuid': 'h1', 'chassis_name': 'c1', 'priority': 32767},
+        {'_uuid': 'h2', 'chassis_name': 'c3', 'priority': 32766},
+    ],
+}
+
+
+def group(name, *members, table='Gateway_Chassis'):
+    return {
+        'name': name,
+        'table': table,
+        'members': [
+            {'_uuid': '{}-{}'.format(name, chassis), 'chassis_name': chassis,
+             'priority': priority}
+            for chassis, priority in members
+        ],
+    }
+
+
+class TestGateway(test_utils.PatchHelper):
+
+    def test_read_groups(self):
+        client = mock.MagicMock()
+        client.get_schema.return_value = {'tables': TABLES}
+        client.select.side_effect = lambda db, table, columns: TABLES[table]
+        self.assertEqual(
+            [(g['table'], g['name'],
+              [m['chassis_name'] for m in g['members']])
+             for g in gateway.read_groups(client)],
+            [('Gateway_Chassis', 'lrp-1', ['c1', 'c2']),
+             ('Gateway_Chassis', 'lrp-2', ['c1', 'c2']),
+             ('HA_Chassis', 'hg', ['c1', 'c3'])])
+        client.get_schema.return_value = {'tables': {
+            'Logical_Router_Port': {}, 'Gateway_Chassis': {}}}
+        self.assertEqual(len(gateway.read_groups(client)), 2)
+
+    def test_loads(self):
+        orders = [['c1', 'c2'], ['c1', 'c3'], ['c2']]
+        self.assertEqual(gateway.loads(orders),
+                         {'c1': 2, 'c2': 1, 'c3': 0})
+        self.assertEqual(gateway.loads(orders, 1),
+                         {'c2': 1, 'c3': 1})
+
+    def test_balance(self):
+        orders = [['c1', 'c2', 'c3']] * 6
+        balanced = gateway.balance(orders)
+        self.assertEqual(gateway.loads(balanced), {'c1': 2, 'c2': 2, 'c3': 2})
+        self.assertEqual(gateway.loads(balanced, 1),
+                         {'c1': 2, 'c2': 2, 'c3': 2})
+        # the input is not changed
+        self.assertEqual(orders[0], ['c1', 'c2', 'c3'])
+        # balanced groups are kept
+        orders = [['c1', 'c2'], ['c2', 'c1'], ['c1', 'c2']]
+        self.assertEqual(gateway.balance(orders), orders)
+        self.assertEqual(gateway.balance([]), [])
+
+    def test_plan(self):
+        groups = [
+            group('lrp-1', ('c1', 2), ('c2', 1)),
+            group('lrp-2', ('c1', 2), ('c2', 1)),
+            group('lrp-3', ('c1', 1), ('c2', 1)),
+        ]
+        changes = gateway.plan(groups)
+        self.assertEqual(changes, [{
+            'name': 'lrp-1',
+            'table': 'Gateway_Chassis',
+            'before': ['c1', 'c2'],
+            'after': ['c2', 'c1'],
+            'updates': [('lrp-1-c1', 2, 1), ('lrp-1-c2', 1, 2)],
+        }])
+        self.assertEqual(gateway.chassis_loads(groups, changes), {
+            'c1': {'before': 3, 'after': 2},
+            'c2': {'before': 0, 'after': 1},
+        })
+
+    def test_apply(self):
+        client = mock.MagicMock()
+        changes = [
+            {'table': 'Gateway_Chassis', 'updates': [('u1', 2, 1)]},
+            {'table': 'HA_Chassis', 'updates': [('u2', 1, 2)]},
+        ]
+        self.assertEqual(gateway.apply(client, changes, batch_size=1), 2)
+        client.transact.assert_called_with(
+            gateway.NB_DB,
+            {'op': 'wait', 'timeout': 0, 'table': 'HA_Chassis',
+             'where': [['_uuid', '==', ['uuid', 'u2']]],
+             'columns': ['priority'], 'until': '==',
+             'rows': [{'priority': 1}]},
+            {'op': 'update', 'table': 'HA_Chassis',
+             'where': [['_uuid', '==', ['uuid', 'u2']]],
+             'row': {'priority': 2}})
+        client.reset_mock()
+        self.assertEqual(gateway.apply(client, changes), 1)
+        self.assertEqual(len(client.transact.call_args[0]), 5)
@@ -0,0 +1,140 @@
+# Copyright 2026 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import subprocess
+import tempfile
+import unittest.mock as mock
+
+import charms_openstack.test_utils as test_utils
+
+import charm.ovn_tools.offline_nb as offline_nb
+
+
+class TestOfflineNB(test_utils.PatchHelper):
+
+    def test_check_empty(self):
+        client = mock.MagicMock()
+        client.select.return_value = []
+        offline_nb.check_empty(client)
+        client.select.side_effect = lambda db, table, columns: (
+            [{'_uuid': 'lr1'}] if table == 'Logical_Router' else [])
+        with self.assertRaisesRegex(offline_nb.OfflineBuildError,
+                                    'has 1 Logical_Router rows'):
+            offline_nb.check_empty(client)
+
+    def test_copy_rows(self):
+        source = mock.MagicMock()
+        source.transact.return_value = [
+            {'rows': [{'_uuid': ['uuid', 'ssl-1'], '_version': ['uuid', 'v'],
+                       'private_key': '/etc/ovn/key.pem'}]},
+            {'rows': [{'_uuid': ['uuid', 'conn-1'], '_version': ['uuid', 'v'],
+                       'target': 'pssl:6641',
+                       'external_ids': ['map', [['owner', 'charm']]]}]},
+            {'rows': [{'_uuid': ['uuid', 'nbg-1'], '_version': ['uuid', 'v'],
+                       'connections': ['uuid', 'conn-1'],
+                       'ssl': ['set', [['uuid', 'ssl-1']]],
+                       'nb_cfg': 42}]},
+        ]
+        target = mock.MagicMock()
+        offline_nb.copy_rows(source, target)
+        target.transact.assert_called_once_with(
+            'OVN_Northbound',
+            {'op': 'insert', 'table': 'SSL', 'uuid-name': 'row_ssl_1',
+             'row': {'private_key': '/etc/ovn/key.pem'}},
+            {'op': 'insert', 'table': 'Connection',
+             'uuid-name': 'row_conn_1',
+             'row': {'target': 'pssl:6641',
+                     'external_ids': ['map', [['owner', 'charm']]]}},
+            {'op': 'insert', 'table': 'NB_Global', 'uuid-name': 'row_nbg_1',
+             'row': {'connections': ['named-uuid', 'row_conn_1'],
+                     'ssl': ['set', [['named-uuid', 'row_ssl_1']]],
+                     'nb_cfg': 42}})
+
+        target.reset_mock()
+        source.transact.return_value = [{'rows': []}] * 3
+        offline_nb.copy_rows(source, target)
+        self.assertFalse(target.transact.called)
+
+    def test_write_config(self):
+        with tempfile.TemporaryDirectory() as workdir:
+            path = offline_nb.write_config(workdir, 'unix:/tmp/nb.sock')
+            self.assertEqual(path,
+                             os.path.join(workdir, offline_nb.CONFIG_FILE))
+            with open(path) as f:
+                self.assertIn('ovn_nb_connection = unix:/tmp/nb.sock\n',
+                              f.read())
+
+    def test_local_server(self):
+        self.patch_object(offline_nb.subprocess, 'run')
+        self.patch_object(offline_nb.subprocess, 'Popen')
+        self.patch_object(offline_nb, '_wait_ready')
+        self.run.return_value = subprocess.CompletedProcess([], 0, '', '')
+        server = self.Popen.return_value
+        with tempfile.TemporaryDirectory() as workdir:
+            with offline_nb.local_server(workdir, {'name': 'nb'}) as remote:
+                self.assertEqual(remote, 'unix:{}/ovnnb_db.sock'.format(
+                    workdir))
+                self.assertTrue(os.path.exists(
+                    os.path.join(workdir, offline_nb.SCHEMA_FILE)))
+                self.assertFalse(server.terminate.called)
+            self.run.assert_called_once_with(
+                ('ovsdb-tool', 'create', workdir + '/ovnnb_db.db',
+                 workdir + '/ovn-nb.ovsschema'),
+                stdin=None, capture_output=True, universal_newlines=True)
+            self.assertEqual(self.Popen.call_args[0][0][:3], (
+                'ovsdb-server', workdir + '/ovnnb_db.db',
+                '--remote=punix:{}/ovnnb_db.sock'.format(workdir)))
+            server.terminate.assert_called_once_with()
+
+            # the server is stopped when it does not come up
+            server.reset_mock()
+            self._wait_ready.side_effect = offline_nb.OfflineBuildError('x')
+            with self.assertRaises(offline_nb.OfflineBuildError):
+                with offline_nb.local_server(workdir, {'name': 'nb'}):
+                    pass
+            server.terminate.assert_called_once_with()
+
+    def test_wait_ready(self):
+        self.patch_object(offline_nb.ovsdb, 'Client')
+        self.patch_object(offline_nb.time, 'sleep')
+        server = mock.MagicMock()
+        server.poll.return_value = None
+        self.Client.return_value.__enter__.side_effect = [
+            offline_nb.ovsdb.OVSDBError('not yet'), mock.MagicMock()]
+        offline_nb._wait_ready(server, 'unix:sock')
+        self.assertEqual(self.Client.call_count, 2)
+        server.poll.return_value = 1
+        server.returncode = 1
+        with self.assertRaisesRegex(offline_nb.OfflineBuildError,
+                                    'exited with code 1'):
+            offline_nb._wait_ready(server, 'unix:sock')
+
+    def test_restore(self):
+        self.patch_object(offline_nb.subprocess, 'run')
+        self.run.return_value = subprocess.CompletedProcess([], 0, '', '')
+        with tempfile.NamedTemporaryFile() as db:
+            offline_nb.restore(db.name, 'ssl:10.0.0.1:6641,ssl:10.0.0.2:6641',
+                               private_key='k', certificate='c',
+                               ca_cert='ca')
+            self.run.assert_called_once_with(
+                ['ovsdb-client', '--private-key=k', '--certificate=c',
+                 '--ca-cert=ca', 'restore',
+                 'ssl:10.0.0.1:6641,ssl:10.0.0.2:6641', 'OVN_Northbound'],
+                stdin=mock.ANY, capture_output=True, universal_newlines=True)
+            self.run.return_value = subprocess.CompletedProcess(
+                [], 1, '', 'schema mismatch\n')
+            with self.assertRaisesRegex(offline_nb.OfflineBuildError,
+                                        'restore .* failed: schema mismatch'):
+                offline_nb.restore(db.name, 'tcp:10.0.0.1:6641')
@@ -0,0 +1,115 @@
+# Copyright 2026 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest.mock as mock
+
+import charms_openstack.test_utils as test_utils
+
+import charm.ovn_tools.orphans as orphans
+
+SG = orphans.SECURITY_GROUP_KEY
+RULE = orphans.SECURITY_GROUP_RULE_KEY
+REV = 'neutron:revision_number'
+
+TABLES = {
+    'Logical_Switch': [
+        {'_uuid': 'ls1', 'ports': ['lsp1', 'lsp2', 'lsp3'], 'acls': 'acl4'},
+    ],
+    'Logical_Switch_Port': [
+        {'_uuid': 'lsp1', 'name': 'p1', 'type': '',
+         'external_ids': {REV: '1'}},
+        {'_uuid': 'lsp2', 'name': 'p-gone', 'type': '',
+         'external_ids': {REV: '1'}},
+        {'_uuid': 'lsp3', 'name': 'provnet-1', 'type': 'localnet',
+         'external_ids': {REV: '1'}},
+        {'_uuid': 'lsp4', 'name': 'manual', 'type': '',
+         'external_ids': {}},
+    ],
+    'Port_Group': [
+        {'_uuid': 'pg1', 'name': 'pg_sg1', 'acls': ['acl1', 'acl2'],
+         'external_ids': {SG: 'sg1'}},
+        {'_uuid': 'pg2', 'name': 'pg_sg_gone', 'acls': 'acl3',
+         'external_ids': {SG: 'sg-gone'}},
+        {'_uuid': 'pg3', 'name': 'neutron_pg_drop', 'acls': [],
+         'external_ids': {}},
+    ],
+    'ACL': [
+        {'_uuid': 'acl1', 'external_ids': {RULE: 'r1'}},
+        {'_uuid': 'acl2', 'external_ids': {RULE: 'r-gone'}},
+        {'_uuid': 'acl3', 'external_ids': {RULE: 'r-gone-too'}},
+        {'_uuid': 'acl4', 'external_ids': {orphans.LPORT_KEY: 'p-gone'}},
+    ],
+    'Address_Set': [
+        {'_uuid': 'as1', 'name': 'as_ip4_sg_gone',
+         'external_ids': {SG: 'sg-gone'}},
+        {'_uuid': 'as2', 'name': 'as_ip4_sg1', 'external_ids': {SG: 'sg1'}},
+    ],
+}
+NEUTRON = {
+    'ports': {'p1'},
+    'security_groups': {'sg1'},
+    'security_group_rules': {'r1'},
+}
+
+
+class TestOrphans(test_utils.PatchHelper):
+
+    def test_find(self):
+        client = mock.MagicMock()
+        client.select.side_effect = lambda db, table, columns: TABLES[table]
+        neutron_ids = mock.MagicMock(side_effect=NEUTRON.get)
+        found = orphans.find(client, neutron_ids)
+        self.assertEqual(found, [
+            orphans.Orphan('Logical_Switch_Port', 'lsp2', 'p-gone',
+                           ('Logical_Switch', 'ls1', 'ports')),
+            orphans.Orphan('ACL', 'acl4', 'p-gone',
+                           ('Logical_Switch', 'ls1', 'acls')),
+            orphans.Orphan('ACL', 'acl2', 'r-gone',
+                           ('Port_Group', 'pg1', 'acls')),
+            orphans.Orphan('Port_Group', 'pg2', 'pg_sg_gone', None),
+            orphans.Orphan('Address_Set', 'as1', 'as_ip4_sg_gone', None),
+        ])
+        self.assertEqual(neutron_ids.call_count, 3)
+        self.assertEqual(orphans.report(found, samples=1), {
+            'Logical_Switch_Port': {'orphans': 1, 'samples': ['p-gone']},
+            'ACL': {'orphans': 2, 'samples': ['p-gone']},
+            'Port_Group': {'orphans': 1, 'samples': ['pg_sg_gone']},
+            'Address_Set': {'orphans': 1, 'samples': ['as_ip4_sg_gone']},
+        })
+
+    def test_operations(self):
+        self.assertEqual(orphans.operations([
+            orphans.Orphan('Logical_Switch_Port', 'lsp1', 'p1',
+                           ('Logical_Switch', 'ls1', 'ports')),
+            orphans.Orphan('Logical_Switch_Port', 'lsp2', 'p2',
+                           ('Logical_Switch', 'ls1', 'ports')),
+            orphans.Orphan('Address_Set', 'as1', 'as_ip4_sg', None),
+        ]), [
+            {'op': 'mutate', 'table': 'Logical_Switch',
+             'where': [['_uuid', '==', ['uuid', 'ls1']]],
+             'mutations': [['ports', 'delete',
+                            ['set', [['uuid', 'lsp1'], ['uuid', 'lsp2']]]]]},
+            {'op': 'delete', 'table': 'Address_Set',
+             'where': [['_uuid', '==', ['uuid', 'as1']]]},
+        ])
+
+    def test_delete(self):
+        client = mock.MagicMock()
+        found = [
+            orphans.Orphan('Port_Group', 'pg{}'.format(n), 'pg', None)
+            for n in range(5)
+        ]
+        self.assertEqual(orphans.delete(client, found, batch_size=2), 3)
+        self.assertEqual(len(client.transact.call_args_list[0][0]), 3)
+        self.assertEqual(orphans.delete(client, []), 0)
@@ -0,0 +1,373 @@
+# Copyright 2026 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import random
+import shutil
+import socket
+import ssl
+import subprocess
+import tempfile
+import threading
+import unittest
+import unittest.mock as mock
+
+import charm.ovn_tools.ovsdb as ovsdb
+
+
+class FakeServer(object):
+    """Serve JSON-RPC replies from a handler on a listening socket."""
+
+    def __init__(self, sock, handler, context=None):
+        self.sock = sock
+        self.handler = handler
+        self.context = context
+        self.requests = []
+        self.sock.listen(5)
+        self.thread = threading.Thread(target=self.accept, daemon=True)
+        self.thread.start()
+
+    def accept(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self.serve, args=(conn,),
+                             daemon=True).start()
+
+    def serve(self, conn):
+        if self.context:
+            try:
+                conn = self.context.wrap_socket(conn, server_side=True)
+            except (OSError, ssl.SSLError):
+                conn.close()
+                return
+        framer = ovsdb.Framer()
+        with conn:
+            while True:
+                data = conn.recv(4096)
+                if not data:
+                    return
+                framer.feed(data)
+                request = framer.pop()
+                while request is not None:
+                    self.requests.append(request)
+                    for reply in self.handler(request):
+                        # send in small pieces to exercise framing
+                        data = json.dumps(reply).encode('utf-8')
+                        for pos in range(0, len(data), 7):
+                            conn.sendall(data[pos:pos + 7])
+                    request = framer.pop()
+
+    def close(self):
+        self.sock.close()
+
+
+def ovsdb_server_handler(request):
+    """Reply like a clustered OVN Northbound DB server that is the leader."""
+    method = request.get('method')
+    if method == 'echo':
+        result = request['params']
+    elif method == 'list_dbs':
+        result = ['OVN_Northbound', '_Server']
+    elif method == 'transact' and request['params'][0] == '_Server':
+        result = [{'rows': [
+            {'name': 'OVN_Northbound', 'model': 'clustered',
+             'leader': True},
+            {'name': '_Server', 'model': 'standalone', 'leader': True},
+        ]}]
+    else:
+        return
+    yield {'id': request['id'], 'result': result, 'error': None}
+
+
+class TestOVSDBHelpers(unittest.TestCase):
+
+    def test_parse_remote(self):
+        self.assertEqual(ovsdb.parse_remote('ssl:10.0.0.1:6641'),
+                         ('ssl', ('10.0.0.1', 6641)))
+        self.assertEqual(ovsdb.parse_remote('tcp:[2001:db8::1]:6641'),
+                         ('tcp', ('2001:db8::1', 6641)))
+        self.assertEqual(ovsdb.parse_remote('unix:/run/ovn/ovnnb_db.sock'),
+                         ('unix', '/run/ovn/ovnnb_db.sock'))
+        for remote in ('pssl:6641', 'ssl:10.0.0.1', 'tcp:host:port', 'unix:'):
+            with self.assertRaises(ValueError):
+                ovsdb.parse_remote(remote)
+
+    def test_to_python(self):
+        self.assertEqual(ovsdb.to_python(['set', ['a', 'b']]), ['a', 'b'])
+        self.assertEqual(ovsdb.to_python(['map', [['k', 'v']]]), {'k': 'v'})
+        self.assertEqual(ovsdb.to_python(['uuid', 'fake-uuid']), 'fake-uuid')
+        self.assertEqual(
+            ovsdb.to_python(['set', [['uuid', 'a'], ['uuid', 'b']]]),
+            ['a', 'b'])
+        self.assertEqual(ovsdb.to_python('name'), 'name')
+        self.assertEqual(ovsdb.to_python(42), 42)
+
+    def test_as_set(self):
+        self.assertEqual(ovsdb.as_set(['a', 'b']), ['a', 'b'])
+        self.assertEqual(ovsdb.as_set('a'), ['a'])
+        self.assertEqual(ovsdb.as_set([]), [])
+
+    def test_to_ovsdb(self):
+        self.assertEqual(ovsdb.to_ovsdb_set(('a', 'b')), ['set', ['a', 'b']])
+        self.assertEqual(ovsdb.to_ovsdb_map({'b': '2', 'a': '1'}),
+                         ['map', [['a', '1'], ['b', '2']]])
+
+
+class TestFingerprint(unittest.TestCase):
+
+    def test_fingerprint_clustered(self):
+        client = mock.MagicMock()
+        client.select.return_value = [{'cid': 'fake-cid', 'index': 42}]
+        self.assertEqual(ovsdb.fingerprint(client, 'OVN_Northbound'),
+                         'index:fake-cid:42')
+        client.select.assert_called_once_with(
+            '_Server', 'Database', ['cid', 'index'],
+            where=[['name', '==', 'OVN_Northbound']])
+        self.assertFalse(client.get_schema.called)
+
+    def test_fingerprint_standalone(self):
+        rows = {
+            ('_Server', 'Database'): [{'cid': [], 'index': []}],
+            ('OVN_Northbound', 'ACL'): [
+                {'_uuid': 'b', '_version': 'v1'},
+                {'_uuid': 'a', '_version': 'v2'},
+            ],
+            ('OVN_Northbound', 'NB_Global'): [
+                {'_uuid': 'c', '_version': 'v3'},
+            ],
+        }
+        client = mock.MagicMock()
+        client.select.side_effect = (
+            lambda db, table, columns, where=None: list(rows[(db, table)]))
+        client.get_schema.return_value = {
+            'tables': {'NB_Global': {}, 'ACL': {}}}
+        first = ovsdb.fingerprint(client, 'OVN_Northbound')
+        self.assertTrue(first.startswith('sha256:'))
+        rows[('OVN_Northbound', 'ACL')].reverse()
+        self.assertEqual(ovsdb.fingerprint(client, 'OVN_Northbound'), first)
+        rows[('OVN_Northbound', 'NB_Global')][0]['_version'] = 'v4'
+        self.assertNotEqual(ovsdb.fingerprint(client, 'OVN_Northbound'),
+                            first)
+
+
+class TestFramer(unittest.TestCase):
+
+    def test_feed(self):
+        messages = [
+            {'id': 1, 'result': [{'rows': [{'name': 'a"{[\\'}]}]},
+            {'id': None, 'method': 'echo', 'params': []},
+            {'id': 2, 'result': ['ünïcode', '}]', '\\"', '"\\\\"']},
+        ]
+        data = ''.join(json.dumps(m, ensure_ascii=False)
+                       for m in messages).encode('utf-8')
+        rand = random.Random(42)
+        for _ in range(200):
+            framer = ovsdb.Framer()
+            received = []
+            pos = 0
+            while pos < len(data):
+                size = rand.randint(1, 8)
+                framer.feed(data[pos:pos + size])
+                pos += size
+                message = framer.pop()
+                while message is not None:
+                    received.append(message)
+                    message = framer.pop()
+            self.assertEqual(received, messages)
+
+    def test_feed_invalid(self):
+        framer = ovsdb.Framer()
+        with self.assertRaises(ovsdb.OVSDBError):
+            framer.feed(b'{"id": }')
+
+
+class TestClient(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.path = os.path.join(self.tmpdir, 'ovnnb_db.sock')
+
+    def serve(self, handler):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(self.path)
+        server = FakeServer(sock, handler)
+        self.addCleanup(server.close)
+        return server
+
+    def test_connect_failure(self):
+        client = ovsdb.Client('unix:{}, tcp:nonsense'.format(self.path))
+        with self.assertRaises(ovsdb.OVSDBError) as cm:
+            client.connect()
+        self.assertIn('unix:{}'.format(self.path), str(cm.exception))
+        self.assertIn('tcp:nonsense', str(cm.exception))
+
+    def test_call(self):
+        def handler(request):
+            if request.get('method') == 'list_dbs':
+                # server sends an echo request before replying
+                yield {'id': 'echo', 'method': 'echo', 'params': []}
+                yield {'id': request['id'], 'result': ['OVN_Northbound'],
+                       'error': None}
+            elif request['id'] == 'echo':
+                return
+            else:
+                yield {'id': request['id'], 'result': None,
+                       'error': 'unknown method'}
+
+        server = self.serve(handler)
+        with ovsdb.Client('tcp:127.0.0.1:1,unix:{}'.format(self.path),
+                          timeout=5) as client:
+            self.assertEqual(client.remote, 'unix:{}'.format(self.path))
+            self.assertEqual(client.list_dbs(), ['OVN_Northbound'])
+            with self.assertRaises(ovsdb.OVSDBError):
+                client.get_schema('OVN_Northbound')
+        self.assertEqual(server.requests[1],
+                         {'id': 'echo', 'result': [], 'error': None})
+
+    def test_select(self):
+        def handler(request):
+            yield {
+                'id': request['id'],
+                'error': None,
+                'result': [{'rows': [{
+                    'name': 'neutron-net',
+                    'external_ids': ['map', [['k', 'v']]],
+                    'ports': ['set', [['uuid', 'u1']]],
+                }]}],
+            }
+
+        server = self.serve(handler)
+        with ovsdb.Client('unix:{}'.format(self.path), timeout=5) as client:
+            self.assertEqual(
+                client.select('OVN_Northbound', 'Logical_Switch',
+                              ['name', 'external_ids', 'ports']),
+                [{'name': 'neutron-net', 'external_ids': {'k': 'v'},
+                  'ports': ['u1']}])
+        self.assertEqual(server.requests[0]['params'], [
+            'OVN_Northbound',
+            {'op': 'select', 'table': 'Logical_Switch', 'where': [],
+             'columns': ['name', 'external_ids', 'ports']}])
+
+    def test_transact_error(self):
+        def handler(request):
+            yield {'id': request['id'], 'error': None,
+                   'result': [{}, {'error': 'constraint violation',
+                                   'details': 'fake-details'}]}
+
+        self.serve(handler)
+        with ovsdb.Client('unix:{}'.format(self.path), timeout=5) as client:
+            with self.assertRaises(ovsdb.OVSDBError) as cm:
+                client.transact('OVN_Northbound', {'op': 'comment'})
+        self.assertIn('constraint violation: fake-details', str(cm.exception))
+
+    def test_closed(self):
+        self.serve(lambda request: iter(()))
+        client = ovsdb.Client('unix:{}'.format(self.path), timeout=5)
+        client.connect()
+        client._sock.shutdown(socket.SHUT_WR)
+        with self.assertRaises(ovsdb.OVSDBError):
+            client._receive()
+        client.close()
+
+
+@unittest.skipUnless(shutil.which('openssl'), 'openssl not available')
+class TestProbe(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.mkdtemp()
+        cls.ca_cert = os.path.join(cls.tmpdir, 'ca.crt')
+        ca_key = os.path.join(cls.tmpdir, 'ca.key')
+        cls.cert = os.path.join(cls.tmpdir, 'cert_host')
+        cls.key = os.path.join(cls.tmpdir, 'key_host')
+        csr = os.path.join(cls.tmpdir, 'host.csr')
+        for cmd in (
+                ('req', '-x509', '-newkey', 'rsa:2048', '-nodes',
+                 '-keyout', ca_key, '-out', cls.ca_cert, '-days', '1',
+                 '-subj', '/CN=ca'),
+                ('req', '-newkey', 'rsa:2048', '-nodes', '-keyout', cls.key,
+                 '-out', csr, '-subj', '/CN=host'),
+                ('x509', '-req', '-in', csr, '-CA', cls.ca_cert,
+                 '-CAkey', ca_key, '-CAcreateserial', '-out', cls.cert,
+                 '-days', '1')):
+            subprocess.run(('openssl',) + cmd, check=True,
+                           stdout=subprocess.DEVNULL,
+                           stderr=subprocess.DEVNULL)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmpdir)
+
+    def serve(self, context=None, handler=ovsdb_server_handler):
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        server = FakeServer(sock, handler, context=context)
+        self.addCleanup(server.close)
+        return 'ssl' if context else 'tcp', sock.getsockname()[1]
+
+    def server_context(self):
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(self.cert, keyfile=self.key)
+        context.load_verify_locations(cafile=self.ca_cert)
+        context.verify_mode = ssl.CERT_REQUIRED
+        return context
+
+    def test_probe_all(self):
+        ssl_remote = 'ssl:127.0.0.1:{}'.format(
+            self.serve(self.server_context())[1])
+        tcp_remote = 'tcp:127.0.0.1:{}'.format(self.serve()[1])
+        closed = socket.socket()
+        closed.bind(('127.0.0.1', 0))
+        closed_remote = 'tcp:127.0.0.1:{}'.format(closed.getsockname()[1])
+        closed.close()
+        context = ovsdb.ssl_context(self.key, self.cert, self.ca_cert)
+        results = ovsdb.probe_all(
+            {'nb': '{},{}'.format(ssl_remote, closed_remote),
+             'sb': tcp_remote},
+            context=context, timeout=5)
+        self.assertEqual([(r['db'], r['remote']) for r in results],
+                         [('nb', ssl_remote), ('nb', closed_remote),
+                          ('sb', tcp_remote)])
+        for result in (results[0], results[2]):
+            self.assertNotIn('error', result)
+            self.assertEqual(result['dbs'], ['OVN_Northbound', '_Server'])
+            self.assertEqual(result['leader'], ['OVN_Northbound'])
+            for step in ('connect', 'echo', 'list_dbs'):
+                self.assertGreaterEqual(result[step], 0)
+        self.assertGreaterEqual(results[0]['tls'], 0)
+        self.assertNotIn('tls', results[2])
+        self.assertIn('error', results[1])
+        self.assertNotIn('echo', results[1])
+
+    def test_probe_untrusted(self):
+        remote = 'ssl:127.0.0.1:{}'.format(
+            self.serve(self.server_context())[1])
+        # client without certificate nor trusted CA
+        results = ovsdb.probe_all({'nb': remote},
+                                  context=ovsdb.ssl_context(), timeout=5)
+        self.assertIn('error', results[0])
+        self.assertNotIn('tls', results[0])
+
+    def test_probe_timeout(self):
+        remote = 'tcp:127.0.0.1:{}'.format(
+            self.serve(handler=lambda request: iter(()))[1])
+        results = ovsdb.probe_all({'sb': remote}, timeout=0.2)
+        self.assertEqual(results[0]['error'], 'timeout after 0.2s')
+        self.assertIn('connect', results[0])
@@ -0,0 +1,85 @@
+# Copyright 2026 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import unittest.mock as mock
+
+import charms_openstack.test_utils as test_utils
+
+import charm.ovn_tools.pipeline as pipeline
+
+
+class TestPipeline(test_utils.PatchHelper):
+
+    def test_batches(self):
+        stages = [
+            pipeline.Stage('a', None, False),
+            pipeline.Stage('b', None, True),
+            pipeline.Stage('c', None, True),
+            pipeline.Stage('d', None, False),
+            pipeline.Stage('e', None, True),
+        ]
+        self.assertEqual(
+            [[stage.name for stage in batch]
+             for batch in pipeline.batches(stages)],
+            [['a'], ['b', 'c'], ['d'], ['e']])
+
+    def test_run(self):
+        # overlapping stages wait for each other, they must run concurrently
+        barrier = threading.Barrier(2, timeout=5)
+        threads = []
+
+        def verify():
+            threads.append(threading.current_thread())
+            barrier.wait()
+            return 'verified'
+
+        def fail():
+            raise pipeline.StageFailed('broken', output='details')
+
+        stages = [
+            pipeline.Stage('check', lambda: threads.append(
+                threading.current_thread()), False),
+            pipeline.Stage('verify1', verify, True),
+            pipeline.Stage('verify2', verify, True),
+            pipeline.Stage('apply', fail, False),
+            pipeline.Stage('finish', mock.MagicMock(), False),
+        ]
+        on_result = mock.MagicMock()
+        results = pipeline.run(stages, on_result=on_result)
+        self.assertEqual(threads[0], threading.current_thread())
+        self.assertEqual(
+            [(r['name'], r['status'], r.get('output'), r.get('error'))
+             for r in results],
+            [('check', pipeline.OK, None, None),
+             ('verify1', pipeline.OK, 'verified', None),
+             ('verify2', pipeline.OK, 'verified', None),
+             ('apply', pipeline.FAILED, 'details', 'broken'),
+             ('finish', pipeline.NOT_RUN, None, None)])
+        self.assertIn('seconds', results[0])
+        self.assertEqual(on_result.call_count, 4)
+        self.assertFalse(stages[-1].function.called)
+
+        stages[3] = pipeline.Stage('apply', lambda: 1 / 0, False)
+        results = pipeline.run(stages, completed=['check', 'verify1',
+                                                  'verify2'])
+        self.assertEqual(
+            [(r['name'], r['status']) for r in results],
+            [('check', pipeline.SKIPPED),
+             ('verify1', pipeline.SKIPPED),
+             ('verify2', pipeline.SKIPPED),
+             ('apply', pipeline.FAILED),
+             ('finish', pipeline.NOT_RUN)])
+        self.assertEqual(results[3]['error'],
+                         'ZeroDivisionError: division by zero')
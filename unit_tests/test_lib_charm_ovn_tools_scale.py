@@ -0,0 +1,81 @@
+# Copyright 2026 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest.mock as mock
+
+import charms_openstack.test_utils as test_utils
+
+import charm.ovn_tools.scale as scale
+
+
+class TestScale(test_utils.PatchHelper):
+
+    def test_nb_row_counts(self):
+        client = mock.MagicMock()
+        client.get_schema.return_value = {'tables': {'ACL': {}, 'NAT': {}}}
+        client.select.side_effect = lambda db, table, columns: (
+            [{'_uuid': 'a'}] * (3 if table == 'ACL' else 1))
+        self.assertEqual(scale.nb_row_counts(client), {'ACL': 3, 'NAT': 1})
+        client.get_schema.assert_called_once_with('OVN_Northbound')
+        client.select.assert_any_call('OVN_Northbound', 'ACL', ['_uuid'])
+
+    def test_recommend_geneve_vni_ranges(self):
+        self.assertEqual(
+            scale.recommend_geneve_vni_ranges('1001:2000', 400),
+            {'size': 1000, 'in-use': 400, 'headroom': 600,
+             'recommended-size': 1000, 'recommended': '1001:2000'})
+        self.assertEqual(
+            scale.recommend_geneve_vni_ranges('3001:4000 1001:2000', 1500),
+            {'size': 2000, 'in-use': 1500, 'headroom': 500,
+             'recommended-size': 3000, 'recommended': '1001:2000 3001:5000'})
+        # the highest range can not grow past the maximum VNI
+        self.assertEqual(
+            scale.recommend_geneve_vni_ranges('16777000:16777215', 500),
+            {'size': 216, 'in-use': 500, 'headroom': -284,
+             'recommended-size': 1000,
+             'recommended': '16776216:16777215'})
+        self.assertEqual(
+            scale.recommend_geneve_vni_ranges('', 10)['recommended'], '1:20')
+
+    def test_recommend_dhcp_lease_time(self):
+        self.assertEqual(
+            scale.recommend_dhcp_lease_time(43200, 1000),
+            {'lease-time': 43200, 'renewals-per-second': 0.05,
+             'recommended': 43200,
+             'recommended-renewals-per-second': 0.05})
+        self.assertEqual(
+            scale.recommend_dhcp_lease_time(43200, 300000),
+            {'lease-time': 43200, 'renewals-per-second': 13.89,
+             'recommended': 61200,
+             'recommended-renewals-per-second': 9.8})
+        self.assertEqual(
+            scale.recommend_dhcp_lease_time(0, 300000),
+            {'lease-time': 0, 'renewals-per-second': 0,
+             'recommended': 0,
+             'recommended-renewals-per-second': 0})
+
+    def test_report(self):
+        neutron_counts = {'ports': 10, 'compute-ports': 4,
+                          'segments': {'vlan': 2}}
+        report = scale.report(
+            neutron_counts, {'ACL': 3, 'NAT': 1},
+            {'geneve-vni-ranges': '1001:2000',
+             'dhcp-default-lease-time': 43200})
+        self.assertEqual(report['neutron'], neutron_counts)
+        self.assertEqual(report['nb-rows'], 4)
+        self.assertEqual(
+            report['recommendations']['geneve-vni-ranges']['in-use'], 0)
+        self.assertEqual(
+            report['recommendations']['dhcp-default-lease-time'][
+                'recommended'], 43200)
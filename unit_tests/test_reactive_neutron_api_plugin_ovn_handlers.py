@@ -59,7 +59,10 @@ class TestRegisteredHooks(test_utils.TestRegisteredHooks):
                     'ovsdb-cms.available',),
                 'assess_status': ('neutron-plugin.available',),
                 'poke_ovsdb': ('ovsdb-cms.available',),
-                'restart_neutron': ('restart-needed',),
+                'publish_ovsdb_fan_in': ('ovsdb-cms.available',),
+                'restart_neutron': (
+                    'restart-needed',
+                    'neutron-plugin.connected',),
                 'ovn_source_changed': ('config.changed.ovn-source',),
                 'stamp_fresh_deployment': ('leadership.is_leader',),
                 'stamp_upgraded_deployment': (
@@ -73,7 +76,8 @@ class TestRegisteredHooks(test_utils.TestRegisteredHooks):
                     'leadership.set.upgrade_stamp'),
             },
             'when_not': {
-                'ovn_source_changed': ('config.default.ovn-source',)
+                'ovn_source_changed': ('config.default.ovn-source',),
+                'restart_neutron': ('restart-scheduled',),
             }
         }
         # test that the hooks were registered via the
@@ -91,6 +95,7 @@ class TestOvnHandlers(test_utils.PatchHelper):
         self.provide_charm_instance().__enter__.return_value = \
             self.charm
         self.provide_charm_instance().__exit__.return_value = None
+        self.charm.geneve_vni_ranges_status.return_value = (None, None)
 
     def patch_charm(self, attr, return_value=None):
         mocked = mock.patch.object(self.charm, attr)
@@ -125,6 +130,14 @@ class TestOvnHandlers(test_utils.PatchHelper):
         neutron_plugin.request_db_migration.assert_called_once_with()
 
     def test_render(self):
+        self.patch_object(handlers.neutron_api_plugin_ovn,
+                          'published_config_digest',
+                          return_value=None)
+        self.patch_object(handlers.neutron_api_plugin_ovn,
+                          'record_published_config')
+        self.patch_object(handlers.neutron_api_plugin_ovn, 'request_restart')
+        self.patch_object(handlers.neutron_api_plugin_ovn, 'RestartSerial')
+        self.RestartSerial().acquire.return_value = True
         self.patch_object(handlers.reactive, 'endpoint_from_flag')
         neutron = mock.MagicMock()
         ovsdb = mock.MagicMock()
@@ -159,7 +172,12 @@ class TestOvnHandlers(test_utils.PatchHelper):
         self.patch_charm('tenant_network_types')
         self.tenant_network_types.return_value = [
             'geneve', 'gre', 'vlan', 'flat', 'local']
+        self.charm.ovsdb_tunables.return_value = [
+            ('ovsdb_connection_timeout', 180)]
         handlers.configure_neutron()
+        self.charm.ovsdb_tunables.assert_called_once_with(0)
+        # the first publish is coordinated with the other units too
+        self.RestartSerial().acquire.assert_called_once_with('restart')
         neutron.configure_plugin.assert_called_once_with(
             'ovn',
             service_plugins='metering,segments,lbaasv2,ovn-router',
@@ -188,7 +206,8 @@ class TestOvnHandlers(test_utils.PatchHelper):
                                 ('ovn_dhcp4_global_options', 'a:A4,b:B4'),
                                 ('ovn_dhcp6_global_options', 'a:A6,b:B6'),
                                 ('ovn_emit_need_to_frag', 'aFrag'),
-                                ('vhost_sock_dir', '/run/libvirt-vhost-user')
+                                ('vhost_sock_dir', '/run/libvirt-vhost-user'),
+                                ('ovsdb_connection_timeout', 180),
                             ],
                             'ml2_type_geneve': [
                                 ('vni_ranges', 'vnia:vniA,vnib:vniB'),
@@ -199,17 +218,97 @@ class TestOvnHandlers(test_utils.PatchHelper):
                 },
             },
         )
+        self.record_published_config.assert_called_once_with(mock.ANY)
+        self.charm.record_geneve_vni_ranges.assert_called_once_with()
+        self.request_restart.assert_called_once_with(
+            handlers.neutron_api_plugin_ovn.RESTART_REASON_CONFIG)
+
+    def test_render_vni_ranges_blocked(self):
+        self.patch_object(handlers.neutron_api_plugin_ovn,
+                          'record_published_config')
+        self.patch_object(handlers.reactive, 'endpoint_from_flag')
+        neutron = mock.MagicMock()
+        self.endpoint_from_flag.return_value = neutron
+        self.charm.geneve_vni_ranges_status.return_value = (
+            'blocked', 'fake-message')
+        handlers.configure_neutron()
+        self.assertFalse(neutron.configure_plugin.called)
+        self.assertFalse(self.record_published_config.called)
+        self.charm.assess_status.assert_called_once_with()
+
+    def test_render_changed_deferred(self):
+        self.patch_object(handlers.neutron_api_plugin_ovn,
+                          'plugin_config_digest',
+                          return_value='new-digest')
+        self.patch_object(handlers.neutron_api_plugin_ovn,
+                          'published_config_digest',
+                          return_value='old-digest')
+        self.patch_object(handlers.neutron_api_plugin_ovn,
+                          'record_published_config')
+        self.patch_object(handlers.neutron_api_plugin_ovn, 'request_restart')
+        self.patch_object(handlers.neutron_api_plugin_ovn, 'RestartSerial')
+        self.patch_object(handlers.reactive, 'endpoint_from_flag')
+        neutron = mock.MagicMock()
+        self.endpoint_from_flag.return_value = neutron
+        self.RestartSerial().acquire.return_value = False
+        handlers.configure_neutron()
+        self.RestartSerial().acquire.assert_called_once_with('restart')
+        self.request_restart.assert_called_once_with(
+            handlers.neutron_api_plugin_ovn.RESTART_REASON_CONFIG)
+        self.assertFalse(neutron.configure_plugin.called)
+        self.assertFalse(self.record_published_config.called)
+        self.RestartSerial().acquire.return_value = True
+        handlers.configure_neutron()
+        neutron.configure_plugin.assert_called_once_with('ovn', **{
+            'service_plugins': mock.ANY,
+            'mechanism_drivers': mock.ANY,
+            'tenant_network_types': mock.ANY,
+            'subordinate_configuration': mock.ANY,
+        })
+        self.record_published_config.assert_called_once_with('new-digest')
+
+    def test_restart_neutron(self):
+        self.patch_object(handlers.neutron_api_plugin_ovn, 'RestartSerial')
+        self.patch_object(handlers.reactive, 'set_flag')
+        self.patch_object(handlers.ch_core.hookenv, 'atexit')
+        self.RestartSerial().acquire.return_value = False
+        handlers.restart_neutron()
+        self.RestartSerial().acquire.assert_called_once_with('restart')
+        self.assertFalse(self.set_flag.called)
+        self.assertFalse(self.atexit.called)
+        self.RestartSerial().acquire.return_value = True
+        handlers.restart_neutron()
+        self.set_flag.assert_called_once_with('restart-scheduled')
+        self.atexit.assert_called_once_with(handlers.request_neutron_restart)
 
     @mock.patch.object(handlers.reactive, 'endpoint_from_flag')
     @mock.patch.object(handlers.reactive, 'clear_flag')
-    def test_restart_neutron(self, clear_flag, endpoint_from_flag):
+    def test_request_neutron_restart(self, clear_flag, endpoint_from_flag):
+        self.patch_object(handlers.neutron_api_plugin_ovn,
+                          'pop_restart_reasons')
+        self.pop_restart_reasons.return_value = ['upgrade-charm',
+                                                 'ovn-source']
         neutron_plugin = mock.MagicMock()
         endpoint_from_flag.return_value = neutron_plugin
-        handlers.restart_neutron()
-        neutron_plugin.request_restart.assert_called_once()
+        handlers.request_neutron_restart()
         neutron_plugin.request_restart.assert_called_once_with()
-        clear_flag.assert_called_once()
-        clear_flag.assert_called_once_with('restart-needed')
+        clear_flag.assert_has_calls([
+            mock.call('restart-needed'),
+            mock.call('restart-scheduled'),
+        ])
+        # the principal restarts on changed configuration by itself
+        neutron_plugin.reset_mock()
+        self.pop_restart_reasons.return_value = [
+            'upgrade-charm',
+            handlers.neutron_api_plugin_ovn.RESTART_REASON_CONFIG,
+        ]
+        handlers.request_neutron_restart()
+        self.assertFalse(neutron_plugin.request_restart.called)
+
+    def test_publish_ovsdb_fan_in(self):
+        self.patch_object(handlers.fan_in, 'refresh')
+        handlers.publish_ovsdb_fan_in()
+        self.refresh.assert_called_once_with(new_relations=True)
 
     def test_ovn_source_config_changed(self):
         """Test that changing 'ovn-source' config triggers package upgrade."""